@@ -21,19 +21,29 @@ const CONFIG = {
     })(),
     endpoints: {
         chat: '/api/chat',
+        session: '/api/chat/session',
         freshdesk: '/api/freshdesk',
+        prefetch: '/api/freshdesk/prefetch',
+        suggest: '/api/products/suggest',
         health: '/health'
-    }
+    },
+    suggestDebounceMs: 150,
+    // Wait for the ticket ID to stop changing before prefetching it
+    prefetchDebounceMs: 600,
+    // Field set for chat responses: the spec panel only shows key specs
+    responseFields: 'summary'
 };
 
 // Application State
 const AppState = {
     config: {
-        modelMode: 'flash'
+        modelMode: 'flash',
+        agentId: null  // Per-browser id for usage attribution
     },
     chat: {
         messages: [],
-        isLoading: false
+        isLoading: false,
+        sessionId: null  // Server-side conversation; follow-ups reuse its context
     },
     context: {
         currentAssets: null,
@@ -42,7 +52,16 @@ const AppState = {
         latestResponse: null
     },
     freshdesk: {
-        ticketId: null
+        ticketId: null,
+        prefetchTimer: null,
+        prefetchedTicketId: null  // Last ticket whose products the server warmed
+    },
+    suggest: {
+        items: [],
+        activeIndex: -1,
+        token: null,
+        timer: null,
+        controller: null
     }
 };
 
@@ -62,6 +81,7 @@ const elements = {
     chatForm: document.getElementById('chat-form'),
     userInput: document.getElementById('user-input'),
     sendBtn: document.getElementById('send-btn'),
+    suggestions: document.getElementById('model-suggestions'),
     mediaPanel: document.getElementById('media-panel'),
     ticketIdInput: document.getElementById('ticket-id'),
     exportBtn: document.getElementById('export-btn'),
@@ -80,6 +100,7 @@ async function initializeApp() {
     await checkHealth();
     setupEventListeners();
     loadModelPreference();
+    loadAgentId();
     
     console.log('✅ Application ready');
 }
@@ -116,6 +137,7 @@ function setupEventListeners() {
     elements.ticketIdInput.addEventListener('input', (e) => {
         AppState.freshdesk.ticketId = e.target.value.trim();
         elements.exportBtn.disabled = !AppState.freshdesk.ticketId || !AppState.context.latestResponse;
+        schedulePrefetch();
     });
     
     elements.exportBtn.addEventListener('click', handleFreshdeskExport);
@@ -123,9 +145,27 @@ function setupEventListeners() {
     elements.userInput.addEventListener('keypress', (e) => {
         if (e.key === 'Enter' && !e.shiftKey) {
             e.preventDefault();
+            if (AppState.suggest.activeIndex >= 0) {
+                applySuggestion(AppState.suggest.activeIndex);
+                return;
+            }
             elements.chatForm.dispatchEvent(new Event('submit'));
         }
     });
+    
+    // Model number autocomplete
+    elements.userInput.addEventListener('input', scheduleSuggest);
+    elements.userInput.addEventListener('keydown', handleSuggestKeys);
+    elements.userInput.addEventListener('blur', () => setTimeout(hideSuggestions, 150));
+}
+
+function loadAgentId() {
+    let agentId = localStorage.getItem('agentId');
+    if (!agentId) {
+        agentId = `agent-${Math.random().toString(36).slice(2, 10)}`;
+        localStorage.setItem('agentId', agentId);
+    }
+    AppState.config.agentId = agentId;
 }
 
 function loadModelPreference() {
@@ -143,6 +183,7 @@ async function handleChatSubmit(e) {
     const query = elements.userInput.value.trim();
     if (!query || AppState.chat.isLoading) return;
     
+    hideSuggestions();
     elements.userInput.value = '';
     addMessage('user', query);
     setLoading(true);
@@ -158,10 +199,21 @@ async function handleChatSubmit(e) {
             },
             body: JSON.stringify({
                 query: query,
-                model_mode: AppState.config.modelMode
+                model_mode: AppState.config.modelMode,
+                fields: CONFIG.responseFields,
+                session_id: AppState.chat.sessionId,
+                agent_id: AppState.config.agentId,
+                ticket_id: AppState.freshdesk.ticketId || null
             })
         });
 
+        // A newer query from this agent (e.g. another tab) replaced this one
+        if (response.status === 409) {
+            removeTypingIndicator();
+            addMessage('system', 'ℹ Query superseded by a newer one.');
+            return;
+        }
+
         if (!response.ok) {
             const errorText = await response.text();
             console.error('❌ API Error Response:', errorText);
@@ -206,6 +258,7 @@ async function handleChatSubmit(e) {
         addMessage('assistant', data.markdown_response, data);
 
         // Update context
+        AppState.chat.sessionId = data.session_id || null;
         AppState.context.currentAssets = data.media_assets || null;
         AppState.context.matchedProduct = data.matched_product || null;
         AppState.context.sources = Array.isArray(data.sources) ? data.sources : [];
@@ -506,6 +559,146 @@ function renderMediaPanel(assets, productName) {
     elements.mediaPanel.innerHTML = html;
 }
 
+// ---------------------------------------------------------------------------
+// Model number autocomplete
+// ---------------------------------------------------------------------------
+
+/**
+ * Partial SKU under the cursor: a token with at least one digit and
+ * three characters, e.g. "10.FGC.40". Returns null otherwise.
+ */
+function currentModelToken() {
+    const input = elements.userInput;
+    const upToCursor = input.value.slice(0, input.selectionStart);
+    const match = upToCursor.match(/([A-Za-z0-9][A-Za-z0-9.\-]*)$/);
+    if (!match) return null;
+    const token = match[1];
+    if (token.length < 3 || !/\d/.test(token)) return null;
+    return { text: token, start: upToCursor.length - token.length, end: upToCursor.length };
+}
+
+function schedulePrefetch() {
+    clearTimeout(AppState.freshdesk.prefetchTimer);
+    AppState.freshdesk.prefetchTimer = setTimeout(prefetchTicket, CONFIG.prefetchDebounceMs);
+}
+
+async function prefetchTicket() {
+    // Freshdesk ticket IDs are numeric; skip partial input and repeats
+    const ticketId = AppState.freshdesk.ticketId;
+    if (!ticketId || !/^\d+$/.test(ticketId) || ticketId === AppState.freshdesk.prefetchedTicketId) return;
+    AppState.freshdesk.prefetchedTicketId = ticketId;
+    
+    try {
+        const url = `${CONFIG.apiBaseUrl}${CONFIG.endpoints.prefetch}/${encodeURIComponent(ticketId)}`;
+        const response = await fetch(url, { method: 'POST' });
+        if (!response.ok) {
+            AppState.freshdesk.prefetchedTicketId = null;
+            console.warn(`⚠ Ticket prefetch skipped (HTTP ${response.status})`);
+            return;
+        }
+        const data = await response.json();
+        console.log(`✓ Prefetched ticket #${ticketId}`, data.products);
+    } catch (error) {
+        AppState.freshdesk.prefetchedTicketId = null;
+        console.warn('⚠ Ticket prefetch failed', error);
+    }
+}
+
+function scheduleSuggest() {
+    clearTimeout(AppState.suggest.timer);
+    AppState.suggest.timer = setTimeout(fetchSuggestions, CONFIG.suggestDebounceMs);
+}
+
+async function fetchSuggestions() {
+    const token = currentModelToken();
+    if (!token) {
+        hideSuggestions();
+        return;
+    }
+    
+    // Only the latest keystroke's request matters
+    if (AppState.suggest.controller) {
+        AppState.suggest.controller.abort();
+    }
+    AppState.suggest.controller = new AbortController();
+    
+    try {
+        const url = `${CONFIG.apiBaseUrl}${CONFIG.endpoints.suggest}?prefix=${encodeURIComponent(token.text)}&limit=8`;
+        const response = await fetch(url, { signal: AppState.suggest.controller.signal });
+        if (!response.ok) return;
+        const data = await response.json();
+        AppState.suggest.token = token;
+        renderSuggestions(data.suggestions || []);
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.warn('⚠ Suggest request failed', error);
+        }
+    }
+}
+
+function renderSuggestions(items) {
+    AppState.suggest.items = items;
+    AppState.suggest.activeIndex = -1;
+    
+    // Nothing useful to offer if the token already is the only match
+    const token = AppState.suggest.token;
+    if (!items.length || (items.length === 1 && token && items[0].model_number.toLowerCase() === token.text.toLowerCase())) {
+        hideSuggestions();
+        return;
+    }
+    
+    elements.suggestions.innerHTML = items.map((item, i) => `
+        <li data-index="${i}">
+            <span class="suggestion-model">${escapeHtml(item.model_number)}</span>
+            <span class="suggestion-meta">${escapeHtml([item.finish, item.title].filter(Boolean).join(' • '))}</span>
+        </li>
+    `).join('');
+    elements.suggestions.querySelectorAll('li').forEach(li => {
+        li.addEventListener('mousedown', (e) => {
+            e.preventDefault();
+            applySuggestion(Number(li.dataset.index));
+        });
+    });
+    elements.suggestions.classList.remove('hidden');
+}
+
+function handleSuggestKeys(e) {
+    const count = AppState.suggest.items.length;
+    if (elements.suggestions.classList.contains('hidden') || !count) return;
+    
+    if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+        e.preventDefault();
+        const step = e.key === 'ArrowDown' ? 1 : -1;
+        AppState.suggest.activeIndex = (AppState.suggest.activeIndex + step + count) % count;
+        elements.suggestions.querySelectorAll('li').forEach((li, i) => {
+            li.classList.toggle('active', i === AppState.suggest.activeIndex);
+        });
+    } else if (e.key === 'Escape') {
+        hideSuggestions();
+    }
+}
+
+function applySuggestion(index) {
+    const item = AppState.suggest.items[index];
+    const token = AppState.suggest.token;
+    if (!item || !token) return;
+    
+    // Replace the partial SKU with the resolved model number
+    const input = elements.userInput;
+    input.value = input.value.slice(0, token.start) + item.model_number + input.value.slice(token.end);
+    const cursor = token.start + item.model_number.length;
+    input.setSelectionRange(cursor, cursor);
+    input.focus();
+    hideSuggestions();
+}
+
+function hideSuggestions() {
+    AppState.suggest.items = [];
+    AppState.suggest.activeIndex = -1;
+    elements.suggestions.classList.add('hidden');
+    elements.suggestions.innerHTML = '';
+}
+
 async function handleFreshdeskExport() {
     if (!AppState.freshdesk.ticketId || !AppState.context.latestResponse) {
         return;
@@ -515,23 +708,28 @@ async function handleFreshdeskExport() {
     elements.exportBtn.innerHTML = '<span class="flex items-center justify-center">Exporting...</span>';
     
     try {
-        const formattedNote = formatFreshdeskNote(
-            AppState.chat.messages[AppState.chat.messages.length - 2].content,
-            AppState.context.latestResponse.markdown_response,
-            AppState.context.latestResponse.model_used,
-            AppState.context.sources
-        );
-
-        const response = await fetch(`${CONFIG.apiBaseUrl}${CONFIG.endpoints.freshdesk}`, {
+        const latest = AppState.context.latestResponse;
+        const exportNote = (body) => fetch(`${CONFIG.apiBaseUrl}${CONFIG.endpoints.freshdesk}`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({
-                ticket_id: AppState.freshdesk.ticketId,
-                formatted_note: formattedNote
-            })
+            body: JSON.stringify({ ticket_id: AppState.freshdesk.ticketId, ...body })
         });
+        
+        // The server rendered the note with the answer; send it by reference
+        let response = latest.response_id ? await exportNote({ response_id: latest.response_id }) : null;
+        if (!response || response.status === 404) {
+            // Note expired (or older server): render and upload it here
+            response = await exportNote({
+                formatted_note: formatFreshdeskNote(
+                    AppState.chat.messages[AppState.chat.messages.length - 2].content,
+                    latest.markdown_response,
+                    latest.model_used,
+                    AppState.context.sources
+                )
+            });
+        }
 
         let data;
         try {
@@ -661,7 +859,27 @@ function clearChat() {
         `;
         
         AppState.context.currentAssets = null;
+        AppState.context.matchedProduct = null;
+        AppState.context.sources = [];
         AppState.context.latestResponse = null;
+        endSession();
+    }
+}
+
+async function endSession() {
+    // The next question starts a new conversation; drop the old one server-side
+    const sessionId = AppState.chat.sessionId;
+    AppState.chat.sessionId = null;
+    if (!sessionId) return;
+    
+    try {
+        const url = `${CONFIG.apiBaseUrl}${CONFIG.endpoints.session}/${encodeURIComponent(sessionId)}`;
+        const response = await fetch(url, { method: 'DELETE' });
+        if (!response.ok && response.status !== 404) {
+            console.warn(`⚠ Session delete failed (HTTP ${response.status})`);
+        }
+    } catch (error) {
+        console.warn('⚠ Session delete failed', error);
     }
 }
 
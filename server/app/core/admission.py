@@ -0,0 +1,228 @@
+"""
+Admission Control - Per-lane concurrency with a bounded priority queue
+
+Every /api/chat request is admitted into a lane before it reaches
+Orchestrator.process_query:
+- "cheap":     answered without the LLM (response cache hit, catalog
+               fast-path question)
+- "flash":     flash synthesis
+- "reasoning": reasoning synthesis
+
+Each lane has its own concurrency limit. Requests that cannot start wait
+in one shared queue ordered by lane priority (cheap first), bounded by
+max_queue; a full queue sheds the newest lowest-priority waiter if the
+newcomer outranks it, otherwise the newcomer. Waits are bounded by
+max_wait_seconds and the request deadline. Shed requests get
+Overloaded with a Retry-After estimate.
+"""
+
+import asyncio
+import bisect
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import numpy as np
+
+from ..services.resilience import Deadline
+
+
+# Lower value = served first
+LANE_PRIORITY = {"cheap": 0, "flash": 1, "reasoning": 2}
+
+
+class Overloaded(Exception):
+    """Request shed by admission control"""
+
+    def __init__(self, lane: str, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({lane} lane: {reason})")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    lane: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class _LaneStats:
+    def __init__(self, window: int = 500):
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {"queue_full": 0, "timeout": 0, "displaced": 0}
+        self.waits: Deque[float] = deque(maxlen=window)
+        self.service_time = 1.0  # EWMA seconds, seeds Retry-After
+        self.max_queue_depth = 0
+
+
+class AdmissionController:
+    """
+    Lane-based admission controller (event-loop only, not thread-safe).
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 50,
+        max_wait_seconds: float = 10.0,
+        total_limit: Optional[int] = None
+    ):
+        """
+        Args:
+            limits: Concurrent requests per lane
+            max_queue: Waiting requests across all lanes
+            max_wait_seconds: Longest a request may wait for a slot
+            total_limit: Optional cap on running requests across lanes
+        """
+        self.limits = {"cheap": 32, "flash": 8, "reasoning": 2, **(limits or {})}
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.total_limit = total_limit
+        self.active: Dict[str, int] = {lane: 0 for lane in self.limits}
+        self.waiters: List[_Waiter] = []
+        self.lanes: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in self.limits}
+        self._seq = itertools.count()
+
+    def _can_run(self, lane: str) -> bool:
+        if self.active[lane] >= self.limits[lane]:
+            return False
+        return self.total_limit is None or sum(self.active.values()) < self.total_limit
+
+    def _lane_waiting(self, lane: str) -> int:
+        return sum(1 for w in self.waiters if w.lane == lane)
+
+    def retry_after(self, lane: str) -> float:
+        """Seconds until a slot is likely to free up for lane"""
+        waiting = self._lane_waiting(lane) + 1
+        estimate = self.lanes[lane].service_time * waiting / max(self.limits[lane], 1)
+        return float(max(1, math.ceil(estimate)))
+
+    def _grant(self, lane: str) -> None:
+        self.active[lane] += 1
+        self.lanes[lane].admitted += 1
+
+    def _dispatch(self) -> None:
+        """Start waiters in priority order while their lanes have capacity"""
+        for waiter in list(self.waiters):
+            if waiter.future.done():
+                self.waiters.remove(waiter)
+            elif self._can_run(waiter.lane):
+                self.waiters.remove(waiter)
+                self._grant(waiter.lane)
+                waiter.future.set_result(None)
+
+    async def acquire(self, lane: str, deadline: Optional[Deadline] = None) -> None:
+        """
+        Wait for a slot in lane.
+
+        Raises:
+            Overloaded: queue full, displaced by higher-priority work, or timed out
+        """
+        stats = self.lanes[lane]
+        if self._lane_waiting(lane) == 0 and self._can_run(lane):
+            self._grant(lane)
+            stats.waits.append(0.0)
+            return
+
+        priority = LANE_PRIORITY.get(lane, len(LANE_PRIORITY))
+        if len(self.waiters) >= self.max_queue:
+            victim = self.waiters[-1] if self.waiters else None  # max_queue=0: no queueing at all
+            if victim is None or victim.priority <= priority:
+                stats.shed["queue_full"] += 1
+                raise Overloaded(lane, "queue full", self.retry_after(lane))
+            # Newcomer outranks the lowest-priority waiter: shed that one instead
+            self.waiters.pop()
+            self.lanes[victim.lane].shed["displaced"] += 1
+            victim.future.set_exception(
+                Overloaded(victim.lane, "displaced by higher-priority request", self.retry_after(victim.lane))
+            )
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), lane, loop.create_future(), time.monotonic())
+        bisect.insort(self.waiters, waiter)
+        stats.queued += 1
+        stats.max_queue_depth = max(stats.max_queue_depth, self._lane_waiting(lane))
+
+        timeout = self.max_wait_seconds
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining())
+        try:
+            # asyncio.timeout rather than wait_for: wait_for drops a cancel that
+            # arrives after the slot was granted, so the request would run anyway
+            async with asyncio.timeout(max(timeout, 0.0)):
+                await waiter.future
+            stats.waits.append(time.monotonic() - waiter.enqueued_at)
+        except asyncio.TimeoutError:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            stats.shed["timeout"] += 1
+            raise Overloaded(lane, "queue wait timed out", self.retry_after(lane))
+        except asyncio.CancelledError:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self.release(lane)  # Granted just as the client went away
+            raise
+
+    def release(self, lane: str, service_time: Optional[float] = None) -> None:
+        """Free a slot and hand it to the best eligible waiter"""
+        self.active[lane] -= 1
+        if service_time is not None:
+            stats = self.lanes[lane]
+            stats.service_time = 0.8 * stats.service_time + 0.2 * service_time
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, lane: str, deadline: Optional[Deadline] = None) -> AsyncIterator[None]:
+        """Hold a slot in lane for the duration of the block"""
+        await self.acquire(lane, deadline)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(lane, time.monotonic() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-lane concurrency, queue depth, wait times and shed counts"""
+        lanes = {}
+        for lane, stats in self.lanes.items():
+            waits = list(stats.waits)
+            lanes[lane] = {
+                "limit": self.limits[lane],
+                "active": self.active[lane],
+                "queue_depth": self._lane_waiting(lane),
+                "max_queue_depth": stats.max_queue_depth,
+                "admitted": stats.admitted,
+                "queued": stats.queued,
+                "shed": dict(stats.shed),
+                "wait_p50_ms": round(float(np.percentile(waits, 50)) * 1000, 1) if waits else 0.0,
+                "wait_p95_ms": round(float(np.percentile(waits, 95)) * 1000, 1) if waits else 0.0,
+                "avg_service_s": round(stats.service_time, 3)
+            }
+        return {
+            "queue_depth": len(self.waiters),
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "total_limit": self.total_limit,
+            "lanes": lanes
+        }
+
+
+# Global instance (initialized in main.py)
+admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get global admission controller instance"""
+    if admission_controller is None:
+        raise RuntimeError("Admission controller not initialized")
+    return admission_controller
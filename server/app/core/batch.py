@@ -0,0 +1,275 @@
+"""
+Batch Jobs - Bulk ticket triage through the orchestrator
+
+Accepts hundreds of queries in one job, runs them through
+Orchestrator.process_query with bounded concurrency (sharing the
+orchestrator's retrieval/response caches), streams per-item results as
+they complete, and can export each answer to its Freshdesk ticket.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from .prompts import PromptsManager
+
+
+@dataclass
+class BatchItem:
+    """One query in a batch job"""
+
+    index: int
+    query: str
+    model_mode: str = "flash"
+    ticket_id: Optional[str] = None
+
+
+@dataclass
+class BatchJob:
+    """Batch job state and per-item results"""
+
+    job_id: str
+    items: List[BatchItem]
+    concurrency: int
+    auto_export: bool = False
+    status: str = "queued"  # queued | running | completed | cancelled | failed
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    failed: int = 0
+    exported: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+    updated: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed") or (self.task is not None and self.task.done())
+
+    def progress(self) -> Dict[str, Any]:
+        """Progress and throughput summary"""
+        completed = len(self.results)
+        total = len(self.items)
+        elapsed = 0.0
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        per_minute = completed / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = total - completed
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": total,
+            "completed": completed,
+            "failed": self.failed,
+            "exported": self.exported,
+            "percent": round(completed / total * 100, 1) if total else 100.0,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_per_min": round(per_minute, 2),
+            "eta_s": round(remaining / per_minute * 60, 1) if per_minute > 0 and not self.done else None,
+            "concurrency": self.concurrency,
+            "auto_export": self.auto_export,
+            "created_at": datetime.utcfromtimestamp(self.created_at).isoformat() + "Z"
+        }
+
+
+class BatchJobManager:
+    """
+    Creates, runs and tracks batch jobs.
+
+    Finished jobs are kept (for polling / streaming replay) up to
+    max_finished_jobs, oldest evicted first.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        freshdesk_getter: Callable[[], Any],
+        prompts: PromptsManager,
+        default_concurrency: int = 4,
+        max_concurrency: int = 16,
+        max_finished_jobs: int = 20
+    ):
+        """
+        Args:
+            orchestrator: Orchestrator used for every item
+            freshdesk_getter: Returns the FreshdeskService (or None) at export time
+            prompts: Prompts manager (for Freshdesk note formatting)
+            default_concurrency: Concurrent items per job unless overridden
+            max_concurrency: Upper bound a caller may request
+            max_finished_jobs: Finished jobs retained in memory
+        """
+        self.orchestrator = orchestrator
+        self.freshdesk_getter = freshdesk_getter
+        self.prompts = prompts
+        self.default_concurrency = default_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, BatchJob] = {}
+        self._notifications: Set[asyncio.Task] = set()
+
+    def create_job(
+        self,
+        items: List[BatchItem],
+        auto_export: bool = False,
+        concurrency: Optional[int] = None
+    ) -> BatchJob:
+        """Register a job and start it in the background"""
+        self._evict_finished()
+        job = BatchJob(
+            job_id=uuid.uuid4().hex[:12],
+            items=items,
+            concurrency=max(1, min(concurrency or self.default_concurrency, self.max_concurrency)),
+            auto_export=auto_export
+        )
+        self.jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        job.task.add_done_callback(lambda task: self._settle(job, task))
+        print(f"✓ Batch job {job.job_id} created: {len(items)} items, concurrency {job.concurrency}")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(job_id)
+
+    def cancel_job(self, job_id: str, reason: str = "batch_cancelled") -> bool:
+        """Cancel a running job; reason reaches in-flight queries as the CancelledError message"""
+        job = self.jobs.get(job_id)
+        if not job or job.done or not job.task:
+            return False
+        job.task.cancel(reason)
+        return True
+
+    async def _run(self, job: BatchJob) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        semaphore = asyncio.Semaphore(job.concurrency)
+
+        async def run_item(item: BatchItem) -> None:
+            async with semaphore:
+                result = await self._process_item(job, item)
+            async with job.updated:
+                job.results.append(result)
+                job.updated.notify_all()
+
+        try:
+            await asyncio.gather(*(run_item(item) for item in job.items))
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        finally:
+            job.finished_at = time.time()
+            async with job.updated:
+                job.updated.notify_all()
+            progress = job.progress()
+            print(f"✓ Batch job {job.job_id} {job.status}: {progress['completed']}/{progress['total']} "
+                  f"in {progress['elapsed_s']}s ({progress['throughput_per_min']}/min)")
+
+    def _settle(self, job: BatchJob, task: asyncio.Task) -> None:
+        """
+        Finish a job whose task ended outside _run's own bookkeeping
+        (cancelled before its first step, or _run raised) and wake its streams.
+        """
+        if job.status in ("completed", "cancelled"):
+            return
+        job.status = "cancelled" if task.cancelled() else "failed"
+        job.finished_at = job.finished_at or time.time()
+        notification = asyncio.ensure_future(self._notify(job))
+        self._notifications.add(notification)
+        notification.add_done_callback(self._notifications.discard)
+
+    @staticmethod
+    async def _notify(job: BatchJob) -> None:
+        async with job.updated:
+            job.updated.notify_all()
+
+    async def _process_item(self, job: BatchJob, item: BatchItem) -> Dict[str, Any]:
+        started = time.perf_counter()
+        entry: Dict[str, Any] = {
+            "index": item.index,
+            "query": item.query,
+            "ticket_id": item.ticket_id,
+            "status": "completed",
+            "result": None,
+            "error": None,
+            "export": None
+        }
+        try:
+            entry["result"] = await self.orchestrator.process_query(
+                query=item.query,
+                model_mode=item.model_mode
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failed += 1
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+
+        if entry["result"] and job.auto_export and item.ticket_id:
+            entry["export"] = await self._export(item, entry["result"])
+            if entry["export"].get("success"):
+                job.exported += 1
+
+        entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return entry
+
+    async def _export(self, item: BatchItem, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Post the answer to the item's Freshdesk ticket as a private note"""
+        freshdesk = self.freshdesk_getter()
+        if not freshdesk:
+            return {"success": False, "note_id": None, "error": "Freshdesk service not configured"}
+        # Rendered when the answer was produced; re-rendered if the note has expired
+        note_html = self.orchestrator.get_note(result["response_id"]) if result.get("response_id") else None
+        if note_html is None:
+            note_html = self.prompts.format_freshdesk_note(
+                query=item.query,
+                response=result["markdown_response"],
+                model_used=result["model_used"],
+                sources=result.get("sources", [])
+            )
+        return await freshdesk.add_private_note(ticket_id=item.ticket_id, note_html=note_html)
+
+    async def stream(self, job: BatchJob) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield each item result as it completes (replaying earlier ones first),
+        then a final progress record.
+        """
+        sent = 0
+        while True:
+            async with job.updated:
+                if sent == len(job.results) and not job.done:
+                    await job.updated.wait()
+                pending = job.results[sent:]
+            for result in pending:
+                yield {"type": "result", **result}
+            sent += len(pending)
+            if job.done and sent == len(job.results):
+                break
+        yield {"type": "progress", **job.progress()}
+
+    def _evict_finished(self) -> None:
+        finished = sorted((j for j in self.jobs.values() if j.done), key=lambda j: j.finished_at or 0)
+        for job in finished[:max(0, len(finished) - self.max_finished_jobs + 1)]:
+            del self.jobs[job.job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summary of jobs held in memory"""
+        running = [j for j in self.jobs.values() if j.status == "running"]
+        return {
+            "jobs": len(self.jobs),
+            "running": len(running),
+            "items_in_flight": sum(len(j.items) - len(j.results) for j in running)
+        }
+
+
+# Global instance (initialized in main.py)
+batch_manager: Optional[BatchJobManager] = None
+
+
+def get_batch_manager() -> BatchJobManager:
+    """Get global batch job manager instance"""
+    if batch_manager is None:
+        raise RuntimeError("Batch job manager not initialized")
+    return batch_manager
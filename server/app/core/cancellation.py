@@ -0,0 +1,148 @@
+"""
+Request Cancellation - Stop upstream work nobody will read
+
+An /api/chat turn runs as its own task, raced against the client
+connection:
+- the client disconnects (tab closed, fetch aborted): the task is
+  cancelled with reason "disconnected"
+- latest-request-wins: a newer query from the same agent cancels the
+  agent's in-flight one with reason "superseded"
+
+Cancellation is plain asyncio task cancellation, so it propagates through
+the session lock, the admission queue, the orchestrator stages and the
+upstream policy into the in-flight generate_content calls (hedges
+included). The reason travels as the CancelledError message; the
+orchestrator counts the LLM calls and seconds already spent on the
+cancelled query as wasted work.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# CancelledError messages
+DISCONNECTED = "disconnected"
+SUPERSEDED = "superseded"
+
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class RequestCancelled(Exception):
+    """The request's work was cancelled before it produced a response"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled ({reason})")
+        self.reason = reason
+
+
+async def wait_for_disconnect(receive: Receive) -> None:
+    """Return once the ASGI client connection reports http.disconnect"""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+class InflightRequests:
+    """
+    Tracks in-flight chat requests (event-loop only, not thread-safe).
+    """
+
+    def __init__(self, latest_wins: bool = False):
+        """
+        Args:
+            latest_wins: Default for per-agent latest-request-wins; a new
+                         query from an agent cancels its in-flight one
+        """
+        self.latest_wins = latest_wins
+        self.by_agent: Dict[str, asyncio.Task] = {}
+        self.inflight = 0
+        self.stats = {"started": 0, "completed": 0, DISCONNECTED: 0, SUPERSEDED: 0}
+
+    async def run(
+        self,
+        work: Awaitable[Any],
+        receive: Optional[Receive] = None,
+        agent_id: Optional[str] = None,
+        latest_wins: Optional[bool] = None
+    ) -> Any:
+        """
+        Run work, cancelling it if the client goes away or is superseded.
+
+        Args:
+            work: The request's coroutine
+            receive: ASGI receive callable of the request (None = don't
+                     watch the connection)
+            agent_id: Agent the request belongs to
+            latest_wins: Supersede the agent's in-flight request
+                         (default: the registry's latest_wins)
+
+        Returns:
+            work's result
+
+        Raises:
+            RequestCancelled: Client disconnected or a newer request
+                              from the same agent superseded this one
+        """
+        task = asyncio.ensure_future(work)
+        self.stats["started"] += 1
+        self.inflight += 1
+
+        if agent_id and (self.latest_wins if latest_wins is None else latest_wins):
+            previous = self.by_agent.get(agent_id)
+            if previous is not None and not previous.done():
+                print(f"⚠ Superseding in-flight request from agent {agent_id}")
+                previous.cancel(SUPERSEDED)
+            self.by_agent[agent_id] = task
+
+        watcher = asyncio.ensure_future(wait_for_disconnect(receive)) if receive else None
+        started = time.monotonic()
+        try:
+            await asyncio.wait({task, watcher} - {None}, return_when=asyncio.FIRST_COMPLETED)
+            if not task.done():
+                # The client went away first
+                task.cancel(DISCONNECTED)
+                await asyncio.wait({task})
+                if task.cancelled():
+                    self.stats[DISCONNECTED] += 1
+                    print(f"⚠ Client disconnected after {time.monotonic() - started:.1f}s; request cancelled")
+                    raise RequestCancelled(DISCONNECTED)
+            if task.cancelled():
+                self.stats[SUPERSEDED] += 1
+                raise RequestCancelled(SUPERSEDED)
+            self.stats["completed"] += 1
+            return task.result()
+        except asyncio.CancelledError:
+            # The handler itself was cancelled (server shutdown, or the
+            # server cancelling handlers of disconnected clients)
+            if not task.done():
+                task.cancel(DISCONNECTED)
+                self.stats[DISCONNECTED] += 1
+            raise
+        finally:
+            self.inflight -= 1
+            if watcher is not None:
+                watcher.cancel()
+            if agent_id and self.by_agent.get(agent_id) is task:
+                del self.by_agent[agent_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counts by outcome and current in-flight requests"""
+        return {
+            "latest_wins": self.latest_wins,
+            "inflight": self.inflight,
+            "agents_inflight": len(self.by_agent),
+            **self.stats
+        }
+
+
+# Global instance (initialized in main.py)
+inflight_requests: Optional[InflightRequests] = None
+
+
+def get_inflight_requests() -> InflightRequests:
+    """Get global in-flight request registry"""
+    if inflight_requests is None:
+        raise RuntimeError("In-flight request registry not initialized")
+    return inflight_requests
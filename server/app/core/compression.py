@@ -0,0 +1,143 @@
+"""
+Compression Middleware - Brotli/gzip for JSON responses
+
+Negotiates Content-Encoding from Accept-Encoding, preferring brotli
+(when the brotli package is installed) over gzip. Only complete,
+single-message bodies are compressed: streamed responses (NDJSON batch
+results, event streams) pass through untouched so they keep flushing
+incrementally. A strong ETag on a compressed response is made weak, as
+the encoded bytes differ from the identity representation it names.
+"""
+
+import gzip
+from typing import Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+# Media types that are already compressed or must keep streaming
+_SKIP_MEDIA_PREFIXES = (
+    "image/", "video/", "audio/", "application/pdf", "application/zip",
+    "application/x-ndjson", "text/event-stream"
+)
+
+
+def _choose_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """Pick the first server-preferred encoding the client accepts (q > 0)"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        pieces = part.strip().split(";")
+        name = pieces[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in pieces[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a body with the given Content-Encoding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing buffered responses above minimum_size.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 512,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        enable_brotli: bool = True
+    ):
+        """
+        Args:
+            app: Wrapped ASGI app
+            minimum_size: Bodies smaller than this are sent uncompressed
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11; 4 is a good latency trade-off)
+            enable_brotli: Offer brotli when the package is installed
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings: List[str] = (["br"] if enable_brotli and brotli is not None else []) + ["gzip"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            media_type = headers.get("content-type", "")
+            skip = (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or media_type.startswith(_SKIP_MEDIA_PREFIXES)
+            )
+            if skip:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            headers.add_vary_header("Accept-Encoding")
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
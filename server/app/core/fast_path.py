@@ -0,0 +1,357 @@
+"""
+Catalog Fast Path - Deterministic Spec Lookups
+
+Answers short single-attribute questions ("What is the price of
+10.FGC.4003CP?", "10.FGC.4003CP height?") directly from the product
+catalog, skipping file search and LLM synthesis entirely. A question is
+only answered when it is lookup-shaped: once the attribute phrase and
+model number are removed, nothing but question words and filler may be
+left. "How do I clean the finish on 10.FGC.4003CP?" names an attribute
+but asks something else, so it falls through to the regular pipeline,
+as does anything ambiguous.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..services.data_loader import ProductContext
+from .intents import SPEC_LOOKUP, IntentClassifier, IntentResult
+
+
+# Attribute -> catalog columns + trigger phrases.
+# Order matters only for rendering; matching considers all attributes.
+SPEC_ATTRIBUTES: Dict[str, Dict[str, Any]] = {
+    "map_price": {
+        "label": "MAP Price",
+        "columns": ["MAP_Price"],
+        "patterns": [r"map\s+price", r"minimum\s+advertised"],
+        "format": "currency"
+    },
+    "price": {
+        "label": "List Price",
+        "columns": ["List_Price"],
+        "patterns": [r"price", r"cost", r"msrp"],
+        "format": "currency"
+    },
+    "finish": {
+        "label": "Finish",
+        "columns": ["Finish"],
+        "patterns": [r"finish", r"what\s+colou?r"],
+        "format": "text"
+    },
+    "dimensions": {
+        "label": "Dimensions",
+        "columns": ["Product_Height_Inches", "Product_Length_Inches", "Product_Width_Inches"],
+        "patterns": [r"dimensions?", r"overall\s+size", r"how\s+big", r"measurements?"],
+        "format": "inches"
+    },
+    "height": {
+        "label": "Height",
+        "columns": ["Product_Height_Inches"],
+        "patterns": [r"height", r"how\s+tall"],
+        "format": "inches"
+    },
+    "length": {
+        "label": "Length",
+        "columns": ["Product_Length_Inches"],
+        "patterns": [r"length", r"how\s+long"],
+        "format": "inches"
+    },
+    "width": {
+        "label": "Width",
+        "columns": ["Product_Width_Inches"],
+        "patterns": [r"width", r"how\s+wide"],
+        "format": "inches"
+    },
+    "weight": {
+        "label": "Package Weight",
+        "columns": ["Package_Weight_lbs"],
+        "patterns": [r"weight", r"how\s+heavy", r"weigh"],
+        "format": "pounds"
+    },
+    "flow_rate": {
+        "label": "Flow Rate",
+        "columns": ["Flow_Rate_GPM"],
+        "patterns": [r"flow\s*rate", r"gpm"],
+        "format": "gpm"
+    },
+    "warranty": {
+        "label": "Warranty",
+        "columns": ["Warranty"],
+        "patterns": [r"warranty", r"guarantee"],
+        "format": "text"
+    },
+    "upc": {
+        "label": "UPC",
+        "columns": ["Item_UPC_Number"],
+        "patterns": [r"upc", r"barcode"],
+        "format": "text"
+    },
+    "status": {
+        "label": "Product Status",
+        "columns": ["Product_Status"],
+        "patterns": [r"status", r"discontinued", r"still\s+available"],
+        "format": "text"
+    },
+    "collection": {
+        "label": "Collection",
+        "columns": ["Collection"],
+        "patterns": [r"collection"],
+        "format": "text"
+    },
+    "holes": {
+        "label": "Holes Needed for Installation",
+        "columns": ["Holes_Needed_For_Installation"],
+        "patterns": [r"(?:number\s+of|how\s+many)\s+holes", r"holes?\s+(?:needed|required)"],
+        "format": "number"
+    }
+}
+
+# Attributes that are subsumed by a broader one when both are mentioned
+# ("map price" also contains "price"; "size and height" is still dimensions).
+SUBSUMED_BY = {
+    "price": "map_price",
+    "height": "dimensions",
+    "length": "dimensions",
+    "width": "dimensions"
+}
+
+# Spec lookups are short; long questions usually carry extra intent
+MAX_QUERY_WORDS = 16
+
+# Words a lookup-shaped question may contain besides the attribute
+# phrase and model number ("what is the price of ...", "and its height?")
+LOOKUP_WORDS = frozenset("""
+    a an and the this that it its it's is are was does do did has have
+    what what's whats which how much tell me give show please can could i you we get know
+    of for on about with per to in need needed
+    current exact overall listed
+    product model item unit sku number fixture faucet
+""".split())
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'./-]*")
+
+# Only trust exact / regex matches, never a loose fuzzy guess
+MIN_MATCH_CONFIDENCE = 0.95
+
+
+def attribute_patterns() -> Dict[str, List[str]]:
+    """Attribute trigger phrases, for building the shared IntentClassifier"""
+    return {name: spec["patterns"] for name, spec in SPEC_ATTRIBUTES.items()}
+
+
+@dataclass
+class FastPathStats:
+    """
+    Counters for fast-path hit rate reporting. Only spec questions (the
+    query names an attribute) are attempts; other queries are counted
+    as not_spec_lookup and do not dilute the hit rate.
+    """
+
+    attempts: int = 0
+    hits: int = 0
+    not_spec_lookup: int = 0
+    misses: Dict[str, int] = field(default_factory=dict)
+    hits_by_attribute: Dict[str, int] = field(default_factory=dict)
+
+    def record_hit(self, attribute: str) -> None:
+        self.attempts += 1
+        self.hits += 1
+        self.hits_by_attribute[attribute] = self.hits_by_attribute.get(attribute, 0) + 1
+
+    def record_miss(self, reason: str) -> None:
+        self.attempts += 1
+        self.misses[reason] = self.misses.get(reason, 0) + 1
+
+    def record_skip(self) -> None:
+        self.not_spec_lookup += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.attempts, 4) if self.attempts else 0.0,
+            "not_spec_lookup": self.not_spec_lookup,
+            "misses_by_reason": dict(self.misses),
+            "hits_by_attribute": dict(self.hits_by_attribute)
+        }
+
+
+class CatalogFastPath:
+    """
+    Recognizes single-attribute spec questions and renders a
+    deterministic markdown answer from ProductContext.specs.
+    """
+
+    def __init__(
+        self,
+        max_query_words: int = MAX_QUERY_WORDS,
+        classifier: Optional[IntentClassifier] = None
+    ):
+        """
+        Args:
+            max_query_words: Longer queries always fall through
+            classifier: Shared intent classifier (must be built with
+                        attribute_patterns(); one is created if omitted)
+        """
+        self.max_query_words = max_query_words
+        self.stats = FastPathStats()
+        self.classifier = classifier or IntentClassifier(attributes=attribute_patterns())
+
+    def match_attribute(
+        self,
+        query: str,
+        intent: Optional[IntentResult] = None
+    ) -> Tuple[Optional[str], str]:
+        """
+        Detect which single spec attribute the query asks for.
+
+        Args:
+            query: User query (model number may still be present)
+            intent: Classifier result for query (classified here if omitted)
+
+        Returns:
+            (attribute name or None, reason) - reason explains a miss
+        """
+        if len(query.split()) > self.max_query_words:
+            return None, "query_too_long"
+
+        intent = intent or self.classifier.classify(query)
+        if intent.needs_llm:
+            return None, "needs_llm"
+
+        matched = set(intent.attributes)
+        matched = {
+            name for name in matched
+            if SUBSUMED_BY.get(name) not in matched
+        }
+        # Several dimension words without "dimensions" still mean dimensions
+        if len(matched) > 1 and matched <= {"height", "length", "width"}:
+            matched = {"dimensions"}
+
+        if not matched:
+            return None, "no_attribute"
+        if len(matched) > 1:
+            return None, "ambiguous"
+        if not self._is_lookup(query, intent):
+            return None, "not_lookup"
+        return matched.pop(), "matched"
+
+    @staticmethod
+    def _is_lookup(query: str, intent: IntentResult) -> bool:
+        """Nothing but attribute phrases, model numbers and LOOKUP_WORDS in the query"""
+        text = query.lower()
+        for phrase in intent.matches.get(SPEC_LOOKUP, ()):
+            text = re.sub(rf"\b{re.escape(phrase)}\b", " ", text)
+        for word in _WORD.findall(text):
+            word = word.rstrip(".'-/")
+            # Model numbers ("10.FGC.4003CP", "10fgc4003cp") carry a digit
+            if word and word not in LOOKUP_WORDS and not any(c.isdigit() for c in word):
+                return False
+        return True
+
+    def try_answer(
+        self,
+        query: str,
+        product_context: Optional[ProductContext],
+        intent: Optional[IntentResult] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer from the catalog if the query is an unambiguous spec lookup.
+
+        Args:
+            query: User's question
+            product_context: Product resolved in the extraction stage
+            intent: Classifier result for query (classified here if omitted)
+
+        Returns:
+            LLM-shaped response dict ({"response", "sources", "model_used"})
+            or None to fall through to retrieval + synthesis
+        """
+        intent = intent or self.classifier.classify(query)
+        if not intent.attributes:
+            # Not a spec question at all: not a fast-path attempt
+            self.stats.record_skip()
+            return None
+
+        attribute, reason = self.match_attribute(query, intent)
+        if not attribute:
+            self.stats.record_miss(reason)
+            return None
+        if not product_context:
+            self.stats.record_miss("no_product")
+            return None
+        if product_context.matched_confidence < MIN_MATCH_CONFIDENCE:
+            self.stats.record_miss("low_confidence")
+            return None
+
+        spec = SPEC_ATTRIBUTES[attribute]
+        values = [
+            (column, product_context.specs[column])
+            for column in spec["columns"]
+            if column in product_context.specs
+        ]
+        if not values:
+            self.stats.record_miss("missing_value")
+            return None
+
+        self.stats.record_hit(attribute)
+        return {
+            "response": self._render(product_context, spec, values),
+            "sources": ["Product Catalog"],
+            "model_used": "catalog"
+        }
+
+    def _render(
+        self,
+        product_context: ProductContext,
+        spec: Dict[str, Any],
+        values: List[Tuple[str, Any]]
+    ) -> str:
+        """Render a short markdown answer"""
+        model = product_context.model_number
+        title = product_context.specs.get("Product_Title")
+
+        lines = [f"# {model} - {spec['label']}", ""]
+        if title:
+            lines.append(f"**Product:** {title}")
+            lines.append("")
+
+        lines.append("| Attribute | Value |")
+        lines.append("|---|---|")
+        for column, value in values:
+            label = spec["label"] if len(values) == 1 else self._column_label(column)
+            lines.append(f"| {label} | {self._format_value(value, spec['format'])} |")
+
+        lines.append("")
+        lines.append("_Answered directly from the product catalog._")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _column_label(column: str) -> str:
+        """Product_Height_Inches -> Height"""
+        return column.replace("Product_", "").replace("_Inches", "").replace("_", " ")
+
+    @staticmethod
+    def _format_value(value: Any, fmt: str) -> str:
+        """Format a raw catalog value for display"""
+        if isinstance(value, float) and value.is_integer() and fmt != "currency":
+            value = int(value)
+
+        if fmt == "currency":
+            try:
+                return f"${float(value):,.2f}"
+            except (TypeError, ValueError):
+                return str(value)
+        if fmt == "inches":
+            return f"{value} in"
+        if fmt == "pounds":
+            return f"{value} lbs"
+        if fmt == "gpm":
+            return f"{value} GPM"
+        return str(value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fast-path hit rate statistics"""
+        return self.stats.to_dict()
@@ -0,0 +1,147 @@
+"""
+HTTP Cache - ETag / Cache-Control for catalog read endpoints
+
+Catalog reads (/api/product/{model}, /api/products) are pure functions
+of the loaded catalog snapshot. Their serialized bodies are memoized
+per catalog_version with an ETag over version + body, so repeat
+requests skip recomputation and conditional requests get a 304 without
+a body. A new catalog_version (catalog reload) drops every entry.
+
+The ETags are weak (W/"..."): CompressionMiddleware sends the same body
+as identity, gzip or brotli bytes, and a strong tag would claim those
+representations are byte-identical. If-None-Match uses weak comparison,
+so revalidation works across encodings.
+
+Dynamic payloads (/stats) use conditional_response(): the ETag is
+computed from the fresh body, saving only bytes on the wire.
+"""
+
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .cache import TTLCache
+from .response_shaping import dumps
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """ETag (quoted, W/ prefixed when weak) over the given parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    tag = f'"{digest.hexdigest()[:32]}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def _build_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def conditional_response(request: Request, content: Any, cache_control: str = "no-cache") -> Response:
+    """JSON response with a content ETag; 304 when the client copy is current"""
+    body = dumps(content)
+    return _build_response(request, body, make_etag(body, weak=True), cache_control)
+
+
+class CatalogResponseCache:
+    """
+    Serialized catalog responses keyed by endpoint + parameters,
+    scoped to one catalog_version.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_age: int = 300):
+        """
+        Args:
+            max_entries: Serialized bodies kept (LRU)
+            max_age: Cache-Control max-age for browsers / proxies, in seconds
+        """
+        # Entries stay valid until the catalog version changes
+        self.cache = TTLCache(max_entries=max_entries, ttl_seconds=float("inf"))
+        self.max_age = max_age
+        self.catalog_version: Optional[str] = None
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @property
+    def cache_control(self) -> str:
+        return f"public, max-age={self.max_age}, stale-while-revalidate={self.max_age}"
+
+    async def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        catalog_version: Optional[str],
+        build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """
+        Serve a catalog read, building and serializing it only on a miss.
+
+        Args:
+            request: Incoming request (for If-None-Match)
+            key: Endpoint + normalized parameters
+            catalog_version: ProductDatabase.catalog_version
+            build: Coroutine producing the JSON-able payload (may raise
+                   HTTPException; may await the CPU executor)
+
+        Returns:
+            200 with body, or 304 when the client's ETag matches
+        """
+        if catalog_version != self.catalog_version:
+            if self.catalog_version is not None:
+                self.invalidations += 1
+            self.cache.clear()
+            self.catalog_version = catalog_version
+
+        entry = self.cache.get(key)
+        if entry is None:
+            body = dumps(await build())
+            entry = (make_etag(catalog_version, body, weak=True), body)
+            self.cache.set(key, entry)
+
+        etag, body = entry
+        response = _build_response(request, body, etag, self.cache_control)
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.cache.get_stats()
+        stats.pop("ttl_seconds", None)
+        stats.update({
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "catalog_version": self.catalog_version,
+            "max_age": self.max_age
+        })
+        return stats
+
+
+# Global instance (max_age configured in main.py)
+catalog_response_cache = CatalogResponseCache()
+
+
+def get_catalog_response_cache() -> CatalogResponseCache:
+    """Get global catalog response cache"""
+    return catalog_response_cache
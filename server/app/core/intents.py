@@ -0,0 +1,209 @@
+"""
+Query Intent Classifier - One compiled pass, scores for every intent
+
+Replaces the substring keyword scans that mis-routed queries ("vs"
+inside words, "fix" inside "fixture", comparison silently overriding
+troubleshooting). All trigger phrases of all intents are compiled into
+a single word-bounded alternation (longest phrases first), so one
+finditer() pass over the query finds every trigger. Each intent is then
+scored by noisy-OR over the weights of its matched triggers:
+
+    score = 1 - prod(1 - weight)
+
+The primary intent is the highest score (ties broken by INTENT_PRIORITY);
+prompt selection, retrieval strategy and the catalog fast path all read
+the same IntentResult.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+# Intent -> [(trigger regex, weight)]. Triggers are matched on word
+# boundaries, so "fix" never fires inside "fixture".
+INTENT_PATTERNS: Dict[str, List[Tuple[str, float]]] = {
+    "troubleshooting": [
+        (r"leak(?:s|ing|ed|y)?", 0.9),
+        (r"drip(?:s|ping|py)?", 0.8),
+        (r"(?:not|stopped|isn'?t|doesn'?t)\s+work(?:ing)?", 0.9),
+        (r"broken|broke", 0.8),
+        (r"fix(?:es|ed|ing)?", 0.7),
+        (r"repair(?:s|ed|ing)?", 0.8),
+        (r"troubleshoot(?:ing)?", 0.9),
+        (r"problems?", 0.6),
+        (r"issues?", 0.5),
+        (r"clog(?:s|ged)?", 0.8),
+        (r"low\s+(?:water\s+)?pressure", 0.7),
+        (r"noisy|noise|squeak(?:s|ing|y)?", 0.6),
+        (r"crack(?:s|ed)?", 0.7),
+        (r"stuck|wobbl(?:es|y|ing)", 0.6),
+        (r"(?:won'?t|doesn'?t|can'?t|will\s+not)\s+(?:it\s+)?(?:turn|drain|shut|stop|close|open|flow|fit)", 0.9),
+        (r"won'?t", 0.5)
+    ],
+    "comparison": [
+        (r"compar(?:e|ed|ing|ison)", 0.9),
+        (r"versus|vs\.?", 0.9),
+        (r"differen(?:ce|ces|t)\s+between", 0.9),
+        (r"differences?", 0.7),
+        (r"(?:better|worse)\s+than", 0.9),
+        (r"better|best", 0.5)
+    ],
+    "installation": [
+        (r"install(?:s|ed|ing|ation)?", 0.9),
+        (r"rough[\s-]?in", 0.8),
+        (r"mount(?:s|ed|ing)?", 0.8),
+        (r"set\s*up", 0.5),
+        (r"replac(?:e|ed|ing|ement)", 0.5),
+        (r"steps?", 0.4)
+    ],
+    "alternatives": [
+        (r"alternatives?", 0.9),
+        (r"similar", 0.8),
+        (r"substitutes?", 0.8),
+        (r"recommend(?:s|ed|ation|ations)?", 0.7),
+        (r"suggest(?:ion|ions)?", 0.6),
+        (r"instead", 0.6)
+    ],
+    "documentation": [
+        (r"manuals?", 0.9),
+        (r"spec(?:ification)?\s+sheets?", 0.9),
+        (r"videos?", 0.8),
+        (r"diagrams?", 0.8),
+        (r"instructions?", 0.8),
+        (r"guides?", 0.6),
+        (r"pdf", 0.7)
+    ],
+    "explanation": [
+        (r"why", 0.8),
+        (r"explain", 0.9),
+        (r"how\s+does", 0.6)
+    ]
+}
+
+# Intents that need retrieval + synthesis (the fast path must not answer them)
+LLM_INTENTS = frozenset(INTENT_PATTERNS)
+
+# Catalog attribute questions ("price", "how tall") score this intent
+SPEC_LOOKUP = "spec_lookup"
+SPEC_LOOKUP_WEIGHT = 0.8
+
+# Tie-break order for the primary intent
+INTENT_PRIORITY = [
+    "troubleshooting", "comparison", "installation", "alternatives",
+    "documentation", "explanation", SPEC_LOOKUP
+]
+
+GENERAL = "general"
+
+
+@dataclass(frozen=True)
+class IntentResult:
+    """Classifier output for one query"""
+
+    primary: str
+    scores: Dict[str, float]
+    matches: Dict[str, Tuple[str, ...]] = field(default_factory=dict)  # intent -> matched phrases
+    attributes: Tuple[str, ...] = ()  # spec attributes mentioned (catalog fast path)
+    threshold: float = 0.4
+
+    def has(self, intent: str) -> bool:
+        """Whether intent scored at or above the activation threshold"""
+        return self.scores.get(intent, 0.0) >= self.threshold
+
+    @property
+    def needs_llm(self) -> bool:
+        """Any intent that a catalog value cannot answer"""
+        return any(self.has(intent) for intent in LLM_INTENTS)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "primary": self.primary,
+            "scores": {k: v for k, v in self.scores.items() if v > 0},
+            "attributes": list(self.attributes)
+        }
+
+
+class IntentClassifier:
+    """
+    Word-boundary multi-pattern intent classifier.
+    """
+
+    def __init__(
+        self,
+        intents: Optional[Dict[str, List[Tuple[str, float]]]] = None,
+        attributes: Optional[Dict[str, List[str]]] = None,
+        threshold: float = 0.4,
+        cache_size: int = 2048
+    ):
+        """
+        Args:
+            intents: Intent -> [(trigger regex, weight)] (defaults to INTENT_PATTERNS)
+            attributes: Spec attribute -> trigger regexes; matches score
+                        the spec_lookup intent and are reported per attribute
+            threshold: Score at which an intent counts as present
+            cache_size: Recent queries memoized (admission and the pipeline
+                        classify the same query)
+        """
+        self.intents = intents or INTENT_PATTERNS
+        self.threshold = threshold
+        self.stats = {"classified": 0, "by_primary": {}}
+
+        # (label, kind, weight) per named group; kind is "intent" or "attribute"
+        triggers: List[Tuple[str, str, str, float]] = []
+        for intent, patterns in self.intents.items():
+            triggers.extend((pattern, intent, "intent", weight) for pattern, weight in patterns)
+        for attribute, patterns in (attributes or {}).items():
+            triggers.extend((pattern, attribute, "attribute", SPEC_LOOKUP_WEIGHT) for pattern in patterns)
+
+        # Longer phrases first so "map price" wins over "price" at the same position
+        triggers.sort(key=lambda t: len(t[0]), reverse=True)
+        self._groups: Dict[str, Tuple[str, str, float]] = {}
+        alternatives = []
+        for i, (pattern, label, kind, weight) in enumerate(triggers):
+            name = f"t{i}"
+            self._groups[name] = (label, kind, weight)
+            alternatives.append(f"(?P<{name}>{pattern})")
+        self._pattern = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE)
+
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, query: str) -> IntentResult:
+        misses: Dict[str, float] = {}  # intent -> prod(1 - weight)
+        matches: Dict[str, List[str]] = {}
+        attributes: List[str] = []
+
+        for match in self._pattern.finditer(query):
+            label, kind, weight = self._groups[match.lastgroup]
+            intent = SPEC_LOOKUP if kind == "attribute" else label
+            if kind == "attribute" and label not in attributes:
+                attributes.append(label)
+            misses[intent] = misses.get(intent, 1.0) * (1.0 - weight)
+            matches.setdefault(intent, []).append(match.group(0).lower())
+
+        scores = {intent: round(1.0 - miss, 4) for intent, miss in misses.items()}
+        ranked = sorted(
+            (s for s in scores.items() if s[1] >= self.threshold),
+            key=lambda s: (-s[1], INTENT_PRIORITY.index(s[0]) if s[0] in INTENT_PRIORITY else len(INTENT_PRIORITY))
+        )
+        primary = ranked[0][0] if ranked else GENERAL
+
+        self.stats["classified"] += 1
+        self.stats["by_primary"][primary] = self.stats["by_primary"].get(primary, 0) + 1
+        return IntentResult(
+            primary=primary,
+            scores=scores,
+            matches={k: tuple(v) for k, v in matches.items()},
+            attributes=tuple(attributes),
+            threshold=self.threshold
+        )
+
+    def get_stats(self) -> Dict[str, object]:
+        info = self.classify.cache_info()
+        return {
+            **self.stats,
+            "by_primary": dict(self.stats["by_primary"]),
+            "cache_hits": info.hits,
+            "cache_misses": info.misses
+        }
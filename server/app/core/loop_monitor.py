@@ -0,0 +1,106 @@
+"""
+Event Loop Lag Monitor - How long ready callbacks wait to run
+
+A background task sleeps for interval_seconds and measures how late it
+wakes up. The overshoot is the time the loop spent running something
+else without yielding (a synchronous fuzzy match, a large serialization),
+i.e. the extra latency every concurrent request saw at that moment.
+Overshoots above stall_threshold_seconds are counted and logged.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+
+class LoopLagMonitor:
+    """
+    Periodic event-loop lag sampler.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.1,
+        stall_threshold_seconds: float = 0.1,
+        window: int = 3000,
+        warn_interval_seconds: float = 10.0
+    ):
+        """
+        Args:
+            interval_seconds: Sampling period
+            stall_threshold_seconds: Lag counted (and logged) as a stall
+            window: Recent samples kept for percentiles
+            warn_interval_seconds: Minimum time between stall log lines
+        """
+        self.interval_seconds = interval_seconds
+        self.stall_threshold_seconds = stall_threshold_seconds
+        self.warn_interval_seconds = warn_interval_seconds
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._last_warning = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Begin sampling on the running loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample_loop(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.record(max(time.perf_counter() - expected, 0.0))
+
+    def record(self, lag: float) -> None:
+        """Add one lag sample (seconds)"""
+        self.samples.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.stall_threshold_seconds:
+            return
+        self.stalls += 1
+        now = time.monotonic()
+        if now - self._last_warning >= self.warn_interval_seconds:
+            self._last_warning = now
+            print(f"⚠ Event loop stalled for {lag * 1000:.0f}ms ({self.stalls} stalls so far)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag percentiles over the recent window, max and stall count"""
+        samples = list(self.samples)
+
+        def percentile(q: float) -> Optional[float]:
+            return round(float(np.percentile(samples, q)) * 1000, 2) if samples else None
+
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval_seconds * 1000,
+            "samples": len(samples),
+            "lag_p50_ms": percentile(50),
+            "lag_p99_ms": percentile(99),
+            "lag_max_ms": round(self.max_lag * 1000, 2),
+            "stalls": self.stalls,
+            "stall_threshold_ms": self.stall_threshold_seconds * 1000
+        }
+
+
+# Global instance (initialized in main.py)
+loop_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """Get global event loop lag monitor"""
+    if loop_monitor is None:
+        raise RuntimeError("Event loop monitor not initialized")
+    return loop_monitor
@@ -0,0 +1,250 @@
+"""
+Note HTML - Markdown to sanitized HTML for Freshdesk notes
+
+Chat answers are Markdown. Freshdesk renders private notes as HTML, so
+each answer is converted once on the server (Orchestrator stores the
+finished note by response_id) instead of in the browser on export.
+
+render_markdown() covers what the synthesis prompts produce (GitHub
+flavour): headings, paragraphs, bullet / numbered lists (nested by
+indentation), tables, fenced and inline code, block quotes, rules,
+bold / italic / strikethrough, links and bare URLs.
+
+Sanitizing is by construction rather than by filtering: all source text
+is HTML-escaped before any markup is added, the only tags emitted are
+the ones generated here, and links keep only http(s) / mailto targets.
+Raw HTML in the answer comes out as text.
+"""
+
+import html
+import re
+from typing import List, Optional, Tuple
+
+
+SAFE_LINK_SCHEMES = ("http://", "https://", "mailto:")
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RULE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])\s+(.*)$")
+_QUOTE = re.compile(r"^\s{0,3}>\s?(.*)$")
+_TABLE_DIVIDER = re.compile(r"^\s*\|?\s*:?-{1,}:?\s*(\|\s*:?-{1,}:?\s*)*\|?\s*$")
+
+# Links and bare URLs are matched on the raw text (before escaping), so an
+# entity such as &lt; can never be split by a URL boundary
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1", re.DOTALL)
+# Target: <...>, or text with at most one level of balanced parentheses
+_LINK = re.compile(r'\[([^\]]+)\]\(\s*(<[^<>\n]*>|(?:[^\s()]|\([^\s()]*\))+)(?:\s+"[^"]*")?\s*\)')
+_BARE_URL = re.compile(r"(?<![\w/@])(https?://[^\s<>\"'`]*[^\s<>\"'`.,;:!?)\]])")
+_BOLD = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_ITALIC = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+_STRIKE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+_PLACEHOLDER = "\x00{}\x00"
+
+
+def render_markdown(markdown: Optional[str]) -> str:
+    """
+    Convert Markdown to sanitized HTML.
+
+    Args:
+        markdown: Markdown text (None / empty gives "")
+
+    Returns:
+        HTML fragment
+    """
+    if not markdown:
+        return ""
+    lines = markdown.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(_render_blocks(lines))
+
+
+def _render_blocks(lines: List[str]) -> List[str]:
+    out: List[str] = []
+    paragraph: List[str] = []
+    i = 0
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            out.append(f"<p>{render_inline(' '.join(line.strip() for line in paragraph))}</p>")
+            paragraph.clear()
+
+    while i < len(lines):
+        line = lines[i]
+
+        if not line.strip():
+            flush_paragraph()
+            i += 1
+            continue
+
+        fence = _FENCE.match(line)
+        if fence:
+            flush_paragraph()
+            code, i = _collect_fence(lines, i + 1, fence.group(1))
+            out.append(f"<pre><code>{html.escape(code)}</code></pre>")
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            flush_paragraph()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+            i += 1
+            continue
+
+        if _RULE.match(line):
+            flush_paragraph()
+            out.append("<hr>")
+            i += 1
+            continue
+
+        if _QUOTE.match(line):
+            flush_paragraph()
+            quoted = []
+            while i < len(lines) and _QUOTE.match(lines[i]):
+                quoted.append(_QUOTE.match(lines[i]).group(1))
+                i += 1
+            out.append("<blockquote>" + "\n".join(_render_blocks(quoted)) + "</blockquote>")
+            continue
+
+        if "|" in line and i + 1 < len(lines) and _TABLE_DIVIDER.match(lines[i + 1]):
+            flush_paragraph()
+            table, i = _render_table(lines, i)
+            out.append(table)
+            continue
+
+        if _LIST_ITEM.match(line):
+            flush_paragraph()
+            block, i = _render_list(lines, i)
+            out.append(block)
+            continue
+
+        paragraph.append(line)
+        i += 1
+
+    flush_paragraph()
+    return out
+
+
+def _collect_fence(lines: List[str], start: int, marker: str) -> Tuple[str, int]:
+    """Code lines up to the closing fence (or the end of the text)"""
+    code = []
+    i = start
+    while i < len(lines) and not lines[i].strip().startswith(marker):
+        code.append(lines[i])
+        i += 1
+    return "\n".join(code), i + 1
+
+
+def _split_row(line: str) -> List[str]:
+    cells = line.strip()
+    if cells.startswith("|"):
+        cells = cells[1:]
+    if cells.endswith("|"):
+        cells = cells[:-1]
+    return [cell.strip() for cell in cells.split("|")]
+
+
+def _render_table(lines: List[str], start: int) -> Tuple[str, int]:
+    header = _split_row(lines[start])
+    rows = []
+    i = start + 2
+    while i < len(lines) and "|" in lines[i] and lines[i].strip():
+        rows.append(_split_row(lines[i]))
+        i += 1
+
+    parts = ["<table>", "<thead><tr>"]
+    parts += [f"<th>{render_inline(cell)}</th>" for cell in header]
+    parts.append("</tr></thead>")
+    if rows:
+        parts.append("<tbody>")
+        for row in rows:
+            cells = (row + [""] * len(header))[:len(header)]
+            parts.append("<tr>" + "".join(f"<td>{render_inline(cell)}</td>" for cell in cells) + "</tr>")
+        parts.append("</tbody>")
+    parts.append("</table>")
+    return "".join(parts), i
+
+
+def _render_list(lines: List[str], start: int) -> Tuple[str, int]:
+    """
+    A list and the lists nested in it. Items indented deeper than the
+    first item's marker open a nested list; continuation lines (indented,
+    not markers) join the item's text.
+    """
+    first = _LIST_ITEM.match(lines[start])
+    indent = len(first.group(1).expandtabs(4))
+    ordered = first.group(2)[0].isdigit()
+    tag = "ol" if ordered else "ul"
+    opening = f"<{tag}>"
+    if ordered and int(first.group(2)[:-1]) != 1:
+        opening = f'<ol start="{int(first.group(2)[:-1])}">'
+
+    items: List[str] = []
+    i = start
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            # A blank line ends the list unless another item follows at this depth
+            following = _LIST_ITEM.match(lines[i + 1]) if i + 1 < len(lines) else None
+            if following and len(following.group(1).expandtabs(4)) >= indent:
+                i += 1
+                continue
+            break
+        match = _LIST_ITEM.match(line)
+        depth = len(line) - len(line.lstrip()) if not match else len(match.group(1).expandtabs(4))
+        if match and depth < indent:
+            break
+        if match and depth == indent:
+            if match.group(2)[0].isdigit() != ordered:
+                break
+            items.append(render_inline(match.group(3).strip()))
+            i += 1
+            continue
+        if match and items:
+            nested, i = _render_list(lines, i)
+            items[-1] += nested
+            continue
+        if depth > indent and items:
+            items[-1] += " " + render_inline(line.strip())
+            i += 1
+            continue
+        break
+
+    return opening + "".join(f"<li>{item}</li>" for item in items) + f"</{tag}>", i
+
+
+def render_inline(text: str) -> str:
+    """Escape a line of text and apply inline Markdown (code, links, emphasis)"""
+    stash: List[str] = []
+
+    def keep(fragment: str) -> str:
+        stash.append(fragment)
+        return _PLACEHOLDER.format(len(stash) - 1)
+
+    # Code spans are literal: stashed before anything else is interpreted
+    text = _CODE_SPAN.sub(lambda m: keep(f"<code>{html.escape(m.group(2).strip())}</code>"), text.replace("\x00", ""))
+    text = _LINK.sub(lambda m: keep(_link(m.group(2).strip("<>"), _emphasis(html.escape(m.group(1))))), text)
+    text = _BARE_URL.sub(lambda m: keep(_link(m.group(1), html.escape(m.group(1)))), text)
+    text = _emphasis(html.escape(text))
+    return _unstash(text, stash)
+
+
+def _unstash(text: str, stash: List[str]) -> str:
+    """Put stashed fragments back (a link label may itself hold a code span)"""
+    while "\x00" in text:
+        text = re.sub("\x00(\\d+)\x00", lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def _emphasis(text: str) -> str:
+    text = _BOLD.sub(r"<strong>\2</strong>", text)
+    text = _ITALIC.sub(r"<em>\2</em>", text)
+    return _STRIKE.sub(r"<del>\1</del>", text)
+
+
+def _link(url: str, escaped_label: str) -> str:
+    """Anchor for a raw URL; unsafe schemes keep only the (escaped) label"""
+    if not url.lower().startswith(SAFE_LINK_SCHEMES):
+        return escaped_label
+    return (f'<a href="{html.escape(url, quote=True)}" target="_blank" '
+            f'rel="noopener noreferrer">{escaped_label}</a>')
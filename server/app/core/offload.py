@@ -0,0 +1,192 @@
+"""
+CPU Offload - Run catalog matching off the event loop
+
+ProductDatabase.find_product (regex + fuzzy scoring over every model
+number, then the pandas lookups in _build_product_context) and
+search_by_category (string scans over three category columns) take tens
+to hundreds of milliseconds. Run inline in a handler they stall every
+other request on the worker, /health included.
+
+CpuExecutor runs these methods on a dedicated, bounded pool:
+- "thread":  a ThreadPoolExecutor sharing the loaded ProductDatabase;
+             the event loop keeps getting GIL time slices while a match
+             runs (no extra memory, no parallel speed-up)
+- "process": a ProcessPoolExecutor whose workers each load their own
+             copy of the catalog at start-up; matches run truly in
+             parallel at the cost of one catalog per worker
+
+Submissions beyond max_workers + max_queue wait for a slot, so a burst
+queues in the pool rather than piling up unbounded. Side effects that
+must stay on the event loop (suggestion popularity) are applied there.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from ..services import tracing
+from ..services.data_loader import ProductContext, ProductDatabase
+
+
+EXECUTOR_KINDS = ("thread", "process")
+
+# Methods that may be called through the executor (read-only on the catalog)
+OFFLOADED_METHODS = ("find_product", "find_products", "search_by_category", "get_product_by_model")
+
+# Catalog copy inside each process-pool worker
+_worker_db: Optional[ProductDatabase] = None
+
+
+def _init_worker(data_dir: str) -> None:
+    """Process-pool initializer: load the catalog once per worker"""
+    global _worker_db
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_db = ProductDatabase(data_dir)
+        _worker_db.load_data()
+    print(f"✓ CPU worker {os.getpid()} loaded catalog {_worker_db.catalog_version}")
+
+
+def _call_worker(method: str, args: tuple) -> Any:
+    """Run a ProductDatabase method on the worker's catalog"""
+    return getattr(_worker_db, method)(*args)
+
+
+class CpuExecutor:
+    """
+    Bounded executor for CPU-bound catalog methods.
+    """
+
+    def __init__(
+        self,
+        product_db: ProductDatabase,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue: int = 64,
+        window: int = 500
+    ):
+        """
+        Args:
+            product_db: Loaded catalog (thread workers use it directly;
+                        process workers load product_db.data_dir)
+            kind: "thread" or "process"
+            max_workers: Pool size (default: min(4, CPU count))
+            max_queue: Submissions allowed to wait for a free worker
+            window: Recent run / wait times kept for percentiles
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind} (expected one of {EXECUTOR_KINDS})")
+        self.product_db = product_db
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(self.max_workers + max_queue)
+        self._executor: Executor
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(str(product_db.data_dir),)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+
+        self.active = 0
+        self.max_active = 0
+        self.calls: Dict[str, int] = {}
+        self.failed = 0
+        self.run_times: Deque[float] = deque(maxlen=window)
+        self.wait_times: Deque[float] = deque(maxlen=window)
+        print(f"✓ CPU executor initialized ({kind}, {self.max_workers} workers)")
+
+    async def run(self, method: str, *args: Any) -> Any:
+        """
+        Call product_db.<method>(*args) on the pool.
+
+        Args:
+            method: One of OFFLOADED_METHODS
+            args: Positional arguments (picklable for the process pool)
+
+        Returns:
+            The method's return value
+        """
+        if method not in OFFLOADED_METHODS:
+            raise ValueError(f"Method not offloadable: {method}")
+
+        queued = time.monotonic()
+        with tracing.span("cpu_executor.run", **{"cpu_executor.method": method, "cpu_executor.kind": self.kind}) as span:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                if self.kind == "process":
+                    # Spans inside worker processes are not exported: this span times the call
+                    future = loop.run_in_executor(self._executor, _call_worker, method, args)
+                else:
+                    # Thread workers run in a copy of the caller's context, so catalog spans nest here
+                    future = loop.run_in_executor(
+                        self._executor, contextvars.copy_context().run, getattr(self.product_db, method), *args
+                    )
+
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                self.calls[method] = self.calls.get(method, 0) + 1
+                submitted = time.monotonic()
+                span.set_attribute("cpu_executor.slot_wait_ms", round((submitted - queued) * 1000, 1))
+                try:
+                    return await future
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.active -= 1
+                    # Pool time includes waiting for a busy worker
+                    self.run_times.append(time.monotonic() - submitted)
+                    self.wait_times.append(submitted - queued)
+
+    async def find_product(self, query: str) -> Optional[ProductContext]:
+        """find_product on the pool; the popularity bump is applied on the loop"""
+        product = await self.run("find_product", query, False)
+        if product:
+            self.product_db.model_trie.record_hit(product.model_number)
+        return product
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+        if not samples:
+            return {"p50_ms": None, "p95_ms": None}
+        return {
+            "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 1),
+            "p95_ms": round(float(np.percentile(samples, 95)) * 1000, 1)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool configuration, load and per-call timings"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "max_active": self.max_active,
+            "calls": dict(self.calls),
+            "failed": self.failed,
+            "pool_time": self._percentiles(list(self.run_times)),
+            "slot_wait": self._percentiles(list(self.wait_times))
+        }
+
+
+# Global instance (initialized in main.py)
+cpu_executor: Optional[CpuExecutor] = None
+
+
+def get_cpu_executor() -> Optional[CpuExecutor]:
+    """Get global CPU executor (None = catalog methods run inline)"""
+    return cpu_executor
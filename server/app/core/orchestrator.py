@@ -3,17 +3,39 @@ Orchestrator - The Brain of Agent Assist Console
 
 Implements the linear processing pipeline:
 1. EXTRACTION - Find model number in query
+   (single-attribute spec lookups are answered here from the catalog)
 2. RETRIEVAL - Gather structured + unstructured data
 3. SYNTHESIS - Generate comprehensive response with LLM
 4. FORMATTING - Structure output for frontend
 """
 
+import asyncio
+import time
+import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from ..services.data_loader import ProductDatabase, ProductContext
+from ..services import tracing, usage
 from ..services.gemini_service import GeminiService
+from ..services.resilience import Deadline, DeadlineExceeded
+from ..services.retrieval import GeminiFileSearchBackend, RetrievalBackend
+from .cache import TTLCache
+from .fast_path import CatalogFastPath, attribute_patterns
+from .intents import SPEC_LOOKUP, IntentClassifier, IntentResult
+from .offload import CpuExecutor
+from .precompute import AnswerStore, TemplateMatcher
+from .reranker import ExcerptReranker
 from .prompts import PromptsManager
+from .sessions import ConversationSession
+
+
+# Intents whose answers draw on more documentation excerpts
+DEEP_RETRIEVAL_INTENTS = ("troubleshooting", "installation", "documentation")
+
+# "two_call": file search, then synthesis over its excerpts
+# "single_call": synthesis with the File Search tool attached (one upstream call)
+PIPELINE_MODES = ("two_call", "single_call")
 
 
 class Orchestrator:
@@ -28,7 +50,21 @@ class Orchestrator:
         self,
         product_db: ProductDatabase,
         gemini: GeminiService,
-        prompts: PromptsManager
+        prompts: PromptsManager,
+        enable_fast_path: bool = True,
+        answer_store: Optional[AnswerStore] = None,
+        answer_templates: Optional[List[Dict[str, Any]]] = None,
+        retriever: Optional[RetrievalBackend] = None,
+        reranker: Optional[ExcerptReranker] = None,
+        retrieval_cache: Optional[TTLCache] = None,
+        response_cache: Optional[TTLCache] = None,
+        default_deadline_seconds: float = 60.0,
+        session_reuse_threshold: float = 0.3,
+        pipeline_mode: str = "two_call",
+        cpu_executor: Optional[CpuExecutor] = None,
+        catalog_match_limit: int = 15,
+        prefetch_cache: Optional[TTLCache] = None,
+        note_cache: Optional[TTLCache] = None
     ):
         """
         Initialize orchestrator with required services.
@@ -37,23 +73,107 @@ class Orchestrator:
             product_db: Product database instance
             gemini: Gemini service instance
             prompts: Prompts manager instance
+            enable_fast_path: Answer simple spec lookups from the catalog
+            answer_store: Optional store of precomputed per-product answers
+            answer_templates: Template questions the store was built from
+            retriever: Unstructured retrieval backend (defaults to Gemini File Search)
+            reranker: Optional excerpt reranker applied before synthesis
+            retrieval_cache: Optional cache of file-search results
+            response_cache: Optional cache of complete responses
+            default_deadline_seconds: Time budget for requests that don't set one
+            session_reuse_threshold: Best excerpt score at which a follow-up
+                                     reuses the session's excerpts instead
+                                     of retrieving again
+            pipeline_mode: Default PIPELINE_MODES entry: "two_call" (file
+                           search, then synthesis over its excerpts) or
+                           "single_call" (synthesis with the File Search
+                           tool attached)
+            cpu_executor: Pool that runs product extraction off the event
+                          loop (None = inline)
+            catalog_match_limit: Catalog rows put in the prompt when a query
+                                 filters the catalog instead of naming a product
+            prefetch_cache: Optional cache of ticket products and excerpts
+                            warmed by warm_ticket() before the first question
+            note_cache: Optional cache of rendered Freshdesk notes by
+                        response_id (export by reference)
         """
         self.product_db = product_db
         self.gemini = gemini
         self.prompts = prompts
+        self.retriever = retriever or GeminiFileSearchBackend(gemini)
+        self.reranker = reranker
+        self.retrieval_cache = retrieval_cache
+        self.response_cache = response_cache
+        self.default_deadline_seconds = default_deadline_seconds
+        self.cpu_executor = cpu_executor
+        # One classification per query drives fast path, retrieval and prompt choice
+        self.intent_classifier = IntentClassifier(attributes=attribute_patterns())
+        self.fast_path = CatalogFastPath(classifier=self.intent_classifier) if enable_fast_path else None
+        
+        self.answer_store = answer_store
+        self.template_matcher = TemplateMatcher(answer_templates) if answer_store and answer_templates else None
+        self.precomputed_stats = {"hits": 0, "misses": 0}
+        self.intent_stats = {"file_search_skipped": 0, "alternatives_from_index": 0}
+        self.pipeline_mode = pipeline_mode
+        self.pipeline_stats = {mode: 0 for mode in PIPELINE_MODES}
+        self.catalog_match_limit = catalog_match_limit
+        self.catalog_query_stats = {"queries": 0, "with_matches": 0}
+        
+        # Ticket prefetch: ("ticket", id) -> [ProductContext], ("excerpts", model) -> excerpts
+        self.prefetch_cache = prefetch_cache
+        self.prefetch_stats = {
+            "tickets_warmed": 0,
+            "models_warmed": 0,
+            "ticket_turns": 0,
+            "product_hits": 0,
+            "excerpt_hits": 0,
+            "excerpt_misses": 0
+        }
+        
+        # Freshdesk note HTML rendered once per answer, exported by response_id
+        self.note_cache = note_cache
+        self.note_stats = {"rendered": 0, "render_ms": 0.0}
+        
+        # Follow-ups judge excerpt coverage with the reranker's scorer
+        self.session_scorer = reranker or ExcerptReranker()
+        self.session_reuse_threshold = session_reuse_threshold
+        self.session_stats = {
+            "turns": 0,
+            "follow_up_turns": 0,
+            "variant_switches": 0,
+            "retrievals_reused": 0,
+            "retrievals_run": 0
+        }
+        
+        # Queries cancelled mid-pipeline and the upstream work already spent on them
+        self.cancel_stats = {
+            "cancelled": 0,
+            "by_reason": {},
+            "by_stage": {},
+            "wasted_calls": 0,
+            "wasted_tokens": 0,
+            "wasted_cost_usd": 0.0,
+            "wasted_seconds": 0.0
+        }
         
         print("✓ Orchestrator initialized")
     
     async def process_query(
         self,
         query: str,
-        model_mode: str = "flash"
+        model_mode: str = "flash",
+        deadline: Optional[Deadline] = None,
+        session: Optional[ConversationSession] = None,
+        agent_id: Optional[str] = None,
+        pipeline: Optional[str] = None,
+        ticket_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Main processing pipeline.
         
         Pipeline Stages:
         1. EXTRACTION - Extract model number from query
+           (catalog fast path may answer here and skip stages 2-3)
         2. RETRIEVAL - Retrieve data (structured + unstructured)
         3. SYNTHESIS - Synthesize with LLM
         4. FORMATTING - Format response
@@ -61,6 +181,16 @@ class Orchestrator:
         Args:
             query: User's question
             model_mode: "flash" (fast) or "reasoning" (complex)
+            deadline: Time budget shared by every upstream call
+                      (default_deadline_seconds from now if omitted)
+            session: Conversation the query belongs to; follow-ups resolve
+                     against its product, reuse its excerpts and extend its
+                     history (callers serialize turns with session.lock)
+            agent_id: Support agent the request is attributed to (usage rollups)
+            pipeline: "two_call" or "single_call" (default: pipeline_mode)
+            ticket_id: Freshdesk ticket the agent is working; a question that
+                       names no product is about the ticket's product when
+                       warm_ticket() found one
             
         Returns:
             {
@@ -75,45 +205,227 @@ class Orchestrator:
                 "model_used": str,
                 "matched_product": Optional[str],
                 "confidence": float,
+                "rerank": Optional[Dict] (excerpt pruning report),
+                "catalog_matches": Optional[Dict] (catalog rows matching the
+                                   query's spec constraints: total, rows, filters),
+                "usage": {calls, prompt/cached/output/total tokens,
+                          cost_usd, by_stage: [...]} (LLM calls made for
+                          this request; zero when served without the LLM),
+                "response_id": Optional[str] (rendered Freshdesk note, see
+                               get_note; None without a note cache),
                 "timestamp": str
             }
+            
+        Raises:
+            DeadlineExceeded: The request's time budget ran out
+            asyncio.CancelledError: The caller cancelled the query (client
+                                    disconnected or superseded); counted
+                                    as wasted work in get_stats()
         """
+        with tracing.span("orchestrator.process_query", **{
+            "orchestrator.model_mode": model_mode,
+            "orchestrator.pipeline": pipeline or self.pipeline_mode,
+            "orchestrator.follow_up": session is not None and session.turns > 0,
+            "freshdesk.ticket_id": ticket_id
+        }) as span:
+            with usage.track(agent_id) as scope:
+                result = await self._run_pipeline(query, model_mode, deadline, session, pipeline, ticket_id)
+            result = {**result, "usage": scope.summary()}
+            result["response_id"] = self._store_note(query, result)
+            span.set_attributes({
+                "orchestrator.matched_product": result.get("matched_product"),
+                "gen_ai.request.model": result.get("model_used"),
+                "orchestrator.llm_calls": result["usage"]["calls"],
+                "gen_ai.usage.input_tokens": result["usage"]["prompt_tokens"],
+                "gen_ai.usage.cached_tokens": result["usage"]["cached_tokens"],
+                "gen_ai.usage.output_tokens": result["usage"]["output_tokens"],
+                "gen_ai.usage.cost_usd": result["usage"]["cost_usd"]
+            })
+            return result
+    
+    def _store_note(self, query: str, result: Dict[str, Any]) -> Optional[str]:
+        """Render the answer's Freshdesk note and cache it under a new response_id"""
+        if self.note_cache is None:
+            return None
+        started = time.perf_counter()
+        note_html = self.prompts.format_freshdesk_note(
+            query=query,
+            response=result["markdown_response"],
+            model_used=result["model_used"],
+            sources=result.get("sources", [])
+        )
+        response_id = uuid.uuid4().hex
+        self.note_cache.set(response_id, note_html)
+        self.note_stats["rendered"] += 1
+        self.note_stats["render_ms"] = round(self.note_stats["render_ms"] + (time.perf_counter() - started) * 1000, 3)
+        return response_id
+    
+    def get_note(self, response_id: str) -> Optional[str]:
+        """Freshdesk note HTML for an answer (None if unknown or expired)"""
+        if self.note_cache is None:
+            return None
+        return self.note_cache.get(response_id)
+    
+    async def _run_pipeline(
+        self,
+        query: str,
+        model_mode: str,
+        deadline: Optional[Deadline],
+        session: Optional[ConversationSession],
+        pipeline: Optional[str] = None,
+        ticket_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Stages 1-4 of process_query (LLM calls are accounted to the caller's usage scope)"""
+        deadline = deadline or Deadline.after(self.default_deadline_seconds)
+        started = time.monotonic()
+        stage = "extraction"
         try:
             print(f"\n{'='*60}")
             print(f"Processing Query: {query[:100]}...")
             print(f"Mode: {model_mode}")
             print(f"{'='*60}\n")
             
+            # Follow-ups depend on the conversation so far
+            follow_up = session is not None and session.turns > 0
+            
+            # RESPONSE CACHE: identical question asked recently (about the same ticket product)
+            scope = self._ticket_scope(ticket_id)
+            cached = None if follow_up else self.get_cached_response(query, model_mode, scope)
+            root_span = tracing.current_span()
+            root_span.set_attribute("orchestrator.response_cache_hit", bool(cached))
+            if cached:
+                print("✓ Served cached response")
+                root_span.set_attribute("orchestrator.served_by", "response_cache")
+                # The session still needs the answer's product for follow-ups
+                product_context = await self._cached_product(cached) if session is not None else None
+                return self._end_session_turn(session, query, cached, product_context)
+            
             # STAGE 1: EXTRACTION
             print("STAGE 1: EXTRACTION")
-            product_context = self._extract_product(query)
+            with tracing.span("orchestrator.extraction") as span:
+                intent = self.intent_classifier.classify(query)
+                print(f"ℹ Intent: {intent.primary} {intent.to_dict()['scores']}")
+                # Known before retrieval, so file search usage is attributed to the variant too
+                usage_scope = usage.current_scope()
+                if usage_scope:
+                    usage_scope.prompt_variant = self._prompt_variant(intent)
+                product_context = await self._extract_product(query)
+                if follow_up:
+                    product_context = self._resolve_session_product(query, product_context, session)
+                if ticket_id:
+                    product_context = self._resolve_ticket_product(ticket_id, product_context)
+                
+                if product_context:
+                    print(f"✓ Found product: {product_context.model_number} "
+                          f"(confidence: {product_context.matched_confidence:.2f})")
+                else:
+                    print("ℹ No specific product identified")
+                # Spec constraints ("matte black kitchen faucets under $400") select catalog rows
+                catalog_matches = self._match_catalog(query, product_context, intent)
+                span.set_attributes({
+                    "orchestrator.intent": intent.primary,
+                    "catalog.model": product_context.model_number if product_context else None,
+                    "catalog.confidence": product_context.matched_confidence if product_context else None,
+                    "catalog.matches": catalog_matches["total"] if catalog_matches else None
+                })
             
-            if product_context:
-                print(f"✓ Found product: {product_context.model_number} "
-                      f"(confidence: {product_context.matched_confidence:.2f})")
-            else:
-                print("ℹ No specific product identified")
+            # CATALOG FAST PATH: single-attribute spec lookups skip the LLM
+            if self.fast_path:
+                fast_response = self.fast_path.try_answer(query, product_context, intent)
+                if fast_response:
+                    print("✓ Answered from catalog fast path")
+                    root_span.set_attribute("orchestrator.served_by", "fast_path")
+                    return self._end_session_turn(session, query, self._format_output(
+                        llm_response=fast_response,
+                        product_context=product_context,
+                        retrieval_context={"structured": {}, "unstructured": []}
+                    ), product_context)
             
-            # STAGE 2: RETRIEVAL
-            print("\nSTAGE 2: RETRIEVAL")
-            retrieval_context = await self._retrieve_data(query, product_context)
+            # PRECOMPUTED ANSWERS: template questions about popular products
+            precomputed = self._lookup_precomputed(query, model_mode, product_context)
+            if precomputed:
+                print("✓ Served precomputed answer")
+                root_span.set_attribute("orchestrator.served_by", "precomputed")
+                return self._end_session_turn(session, query, precomputed, product_context)
             
-            # STAGE 3: SYNTHESIS
-            print("\nSTAGE 3: SYNTHESIS")
-            llm_response = await self._synthesize_response(
-                query=query,
-                context=retrieval_context,
-                mode=model_mode,
-                product_context=product_context
-            )
+            if self._use_single_call(pipeline, session):
+                # STAGES 2+3: one synthesis call retrieves through the File Search tool
+                print("\nSTAGE 2+3: RETRIEVAL + SYNTHESIS (single grounded call)")
+                stage = "grounded_synthesis"
+                root_span.set_attribute("orchestrator.served_by", "single_call")
+                self.pipeline_stats["single_call"] += 1
+                with tracing.span("orchestrator.grounded_synthesis") as span:
+                    retrieval_context = {"structured": self._structured_data(product_context, intent), "unstructured": []}
+                    if catalog_matches:
+                        retrieval_context["structured"]["catalog_matches"] = catalog_matches
+                    llm_response = await self._synthesize_response(
+                        query=query,
+                        context=retrieval_context,
+                        mode=model_mode,
+                        product_context=product_context,
+                        deadline=deadline,
+                        intent=intent,
+                        grounded=True
+                    )
+                    retrieval_context["unstructured"] = llm_response.get("excerpts", [])
+                    if session is not None:
+                        # Follow-ups (two-call) reuse what this call was grounded on
+                        session.set_product(product_context)
+                        session.add_excerpts(retrieval_context["unstructured"])
+                    span.set_attributes({
+                        "gen_ai.request.model": llm_response.get("model_used"),
+                        "orchestrator.excerpts": len(retrieval_context["unstructured"])
+                    })
+            else:
+                # STAGE 2: RETRIEVAL
+                print("\nSTAGE 2: RETRIEVAL")
+                stage = "retrieval"
+                root_span.set_attribute("orchestrator.served_by", "two_call")
+                self.pipeline_stats["two_call"] += 1
+                with tracing.span("orchestrator.retrieval") as span:
+                    if session is not None:
+                        retrieval_context = await self._retrieve_for_session(
+                            query, product_context, session, deadline, intent
+                        )
+                    else:
+                        retrieval_context = await self._retrieve_data(query, product_context, deadline, intent)
+                    span.set_attribute("orchestrator.excerpts", len(retrieval_context["unstructured"]))
+                
+                if catalog_matches:
+                    retrieval_context["structured"]["catalog_matches"] = catalog_matches
+                
+                if deadline.expired:
+                    raise DeadlineExceeded("Deadline reached before synthesis")
+                
+                # STAGE 3: SYNTHESIS
+                print("\nSTAGE 3: SYNTHESIS")
+                stage = "synthesis"
+                with tracing.span("orchestrator.synthesis") as span:
+                    llm_response = await self._synthesize_response(
+                        query=query,
+                        context=retrieval_context,
+                        mode=model_mode,
+                        product_context=product_context,
+                        deadline=deadline,
+                        session=session,
+                        intent=intent
+                    )
+                    span.set_attribute("gen_ai.request.model", llm_response.get("model_used"))
             
             # STAGE 4: FORMATTING
             print("\nSTAGE 4: FORMATTING")
-            final_output = self._format_output(
-                llm_response=llm_response,
-                product_context=product_context,
-                retrieval_context=retrieval_context
-            )
+            with tracing.span("orchestrator.formatting"):
+                final_output = self._format_output(
+                    llm_response=llm_response,
+                    product_context=product_context,
+                    retrieval_context=retrieval_context
+                )
+            
+            if self.response_cache is not None and not follow_up:
+                self.response_cache.set(self._response_cache_key(query, model_mode, scope), final_output)
+            
+            if session is not None:
+                self._end_session_turn(session, query, final_output, product_context)
             
             print(f"\n{'='*60}")
             print("✓ Processing complete")
@@ -121,107 +433,596 @@ class Orchestrator:
             
             return final_output
             
+        except asyncio.CancelledError as e:
+            self._record_cancelled(e, stage, time.monotonic() - started)
+            raise
         except Exception as e:
             print(f"✗ Error in orchestrator pipeline: {e}")
             raise
     
-    def _extract_product(self, query: str) -> Optional[ProductContext]:
+    @staticmethod
+    def _prompt_variant(intent: IntentResult) -> str:
+        """System prompt an intent is answered with (also its usage rollup key)"""
+        return intent.primary if intent.primary in ("troubleshooting", "comparison") else "synthesis"
+    
+    def _record_cancelled(self, error: asyncio.CancelledError, stage: str, elapsed: float) -> None:
+        """Count a cancelled query and the LLM calls it already paid for"""
+        reason = error.args[0] if error.args and isinstance(error.args[0], str) else "cancelled"
+        scope = usage.current_scope()
+        spent = scope.summary() if scope else {"calls": 0, "total_tokens": 0, "cost_usd": 0.0}
+        
+        stats = self.cancel_stats
+        stats["cancelled"] += 1
+        stats["by_reason"][reason] = stats["by_reason"].get(reason, 0) + 1
+        stats["by_stage"][stage] = stats["by_stage"].get(stage, 0) + 1
+        stats["wasted_calls"] += spent["calls"]
+        stats["wasted_tokens"] += spent["total_tokens"]
+        stats["wasted_cost_usd"] = round(stats["wasted_cost_usd"] + spent["cost_usd"], 8)
+        stats["wasted_seconds"] = round(stats["wasted_seconds"] + elapsed, 3)
+        print(f"⚠ Query cancelled ({reason}) during {stage} after {elapsed:.1f}s; "
+              f"discarded {spent['calls']} LLM call(s), {spent['total_tokens']} tokens")
+    
+    @staticmethod
+    def _response_cache_key(query: str, model_mode: str, scope: Optional[str] = None) -> tuple:
+        key = (" ".join(query.lower().split()), model_mode)
+        return key + (scope,) if scope else key
+    
+    def admission_lane(
+        self,
+        query: str,
+        model_mode: str,
+        session: Optional[ConversationSession] = None,
+        ticket_id: Optional[str] = None
+    ) -> str:
+        """
+        Admission lane for a query: "cheap" when it will most likely be
+        answered without the LLM (cached response, or a catalog fast-path
+        question that names a catalog model number or follows up on the
+        session's product), otherwise the model mode.
+        """
+        follow_up = session is not None and session.turns > 0
+        if (
+            self.response_cache is not None
+            and not follow_up
+            and self._response_cache_key(query, model_mode, self._ticket_scope(ticket_id)) in self.response_cache
+        ):
+            return "cheap"
+        if self.fast_path:
+            # An attribute alone ("price of kitchen faucets?") goes to the LLM
+            names_product = (
+                (follow_up and session.product_context is not None)
+                or self.product_db.mentions_model(query)
+            )
+            if names_product and self.fast_path.match_attribute(query)[0]:
+                return "cheap"
+        return model_mode
+    
+    def get_cached_response(
+        self,
+        query: str,
+        model_mode: str,
+        scope: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return a recent response to the same question, with a fresh timestamp"""
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.get(self._response_cache_key(query, model_mode, scope))
+        if cached is None:
+            return None
+        return {**cached, "timestamp": datetime.utcnow().isoformat() + "Z"}
+    
+    async def _search(
+        self,
+        query: str,
+        model_filter: Optional[str] = None,
+        max_results: int = 5,
+        deadline: Optional[Deadline] = None,
+        use_prefetched: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Run the retrieval backend through the shared retrieval cache (and prefetched excerpts)"""
+        key = (self.retriever.name, " ".join(query.lower().split()), model_filter, max_results)
+        with tracing.span("orchestrator.search", **{
+            "retrieval.backend": self.retriever.name,
+            "retrieval.model_filter": model_filter,
+            "retrieval.max_results": max_results
+        }) as span:
+            if self.retrieval_cache is not None:
+                cached = self.retrieval_cache.get(key)
+                if cached is not None:
+                    print("    - Retrieval cache hit")
+                    span.set_attributes({"retrieval.served_by": "cache", "retrieval.results": len(cached)})
+                    return cached
+            
+            prefetched = self._prefetched_excerpts(query, model_filter) if use_prefetched else None
+            if prefetched is not None:
+                span.set_attributes({"retrieval.served_by": "prefetch", "retrieval.results": len(prefetched)})
+                return prefetched
+            
+            results = await self.retriever.search(
+                query=query,
+                model_filter=model_filter,
+                max_results=max_results,
+                deadline=deadline
+            )
+            span.set_attributes({"retrieval.served_by": "backend", "retrieval.results": len(results)})
+            # Empty results may be a swallowed upstream error; don't pin them
+            if self.retrieval_cache is not None and results:
+                self.retrieval_cache.set(key, results)
+            return results
+    
+    def _prefetched_excerpts(self, query: str, model_filter: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Excerpts warm_ticket() retrieved for the product, if they cover the
+        question as well as session excerpts must (session_reuse_threshold)
+        """
+        if self.prefetch_cache is None or not model_filter:
+            return None
+        excerpts = self.prefetch_cache.get(("excerpts", model_filter))
+        if not excerpts:
+            return None
+        best = max(self.session_scorer.score(query, excerpts))
+        if best < self.session_reuse_threshold:
+            self.prefetch_stats["excerpt_misses"] += 1
+            return None
+        self.prefetch_stats["excerpt_hits"] += 1
+        print(f"    - Prefetched excerpts for {model_filter} (best score {best:.2f})")
+        return excerpts
+    
+    async def warm_ticket(
+        self,
+        ticket_id: str,
+        text: str,
+        products: List[ProductContext],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Speculatively prepare a ticket's first question.
+        
+        Keeps the ticket's products (a question naming none is about them)
+        and runs a targeted file search per product with the ticket text,
+        so a question the excerpts cover skips retrieval.
+        
+        Args:
+            ticket_id: Freshdesk ticket ID
+            text: Ticket subject and description
+            products: Products named in the ticket, best first
+            deadline: Time budget for the searches
+            
+        Returns:
+            {"models": [...], "excerpts": {model: count}}
+        """
+        if self.prefetch_cache is None:
+            return {"models": [], "excerpts": {}}
+        self.prefetch_cache.set(("ticket", ticket_id), products)
+        self.prefetch_stats["tickets_warmed"] += 1
+        
+        max_results = self._max_results(self.intent_classifier.classify(text))
+        
+        async def warm(product: ProductContext) -> int:
+            excerpts = await self._search(
+                query=text,
+                model_filter=product.model_number,
+                max_results=max_results,
+                deadline=deadline,
+                use_prefetched=False
+            )
+            if excerpts:
+                self.prefetch_cache.set(("excerpts", product.model_number), excerpts)
+            return len(excerpts)
+        
+        counts = await asyncio.gather(*(warm(product) for product in products), return_exceptions=True)
+        excerpts = {
+            product.model_number: count if isinstance(count, int) else 0
+            for product, count in zip(products, counts)
+        }
+        self.prefetch_stats["models_warmed"] += sum(1 for count in excerpts.values() if count)
+        return {"models": [product.model_number for product in products], "excerpts": excerpts}
+    
+    def _ticket_products(self, ticket_id: Optional[str]) -> List[ProductContext]:
+        """Products warm_ticket() kept for a ticket (empty if not prefetched or expired)"""
+        if self.prefetch_cache is None or not ticket_id:
+            return []
+        return self.prefetch_cache.get(("ticket", ticket_id)) or []
+    
+    def _ticket_scope(self, ticket_id: Optional[str]) -> Optional[str]:
+        """
+        The product a question on this ticket defaults to (response cache
+        scope): the ticket's first product, if the ticket named it exactly
+        rather than by fuzzy match.
+        """
+        products = self._ticket_products(ticket_id)
+        if products and products[0].matched_confidence >= 0.95:
+            return products[0].model_number
+        return None
+    
+    def _resolve_ticket_product(
+        self,
+        ticket_id: str,
+        found: Optional[ProductContext]
+    ) -> Optional[ProductContext]:
+        """
+        Product of a question asked while working a prefetched ticket: the
+        ticket's default product (_ticket_scope) when the question names none.
+        """
+        self.prefetch_stats["ticket_turns"] += 1
+        products = self._ticket_products(ticket_id)
+        if not products:
+            return found
+        if found is None and self._ticket_scope(ticket_id):
+            self.prefetch_stats["product_hits"] += 1
+            print(f"  → Product from ticket #{ticket_id}: {products[0].model_number}")
+            return products[0]
+        if found is not None and any(p.model_number == found.model_number for p in products):
+            self.prefetch_stats["product_hits"] += 1
+        return found
+    
+    async def _extract_product(self, query: str) -> Optional[ProductContext]:
         """
         STAGE 1: Extract product from query.
         
-        Uses ProductDatabase's fuzzy/regex matching capabilities.
+        Uses ProductDatabase's fuzzy/regex matching capabilities, on the
+        CPU executor when one is configured.
         """
+        if self.cpu_executor:
+            return await self.cpu_executor.find_product(query)
         return self.product_db.find_product(query)
     
-    async def _retrieve_data(
+    async def _cached_product(self, cached: Dict[str, Any]) -> Optional[ProductContext]:
+        """ProductContext of a cached response's matched product (None if it had none)"""
+        model_number = cached.get("matched_product")
+        if not model_number:
+            return None
+        if self.cpu_executor:
+            return await self.cpu_executor.run("get_product_by_model", model_number)
+        return self.product_db.get_product_by_model(model_number)
+    
+    def _resolve_session_product(
         self,
         query: str,
+        found: Optional[ProductContext],
+        session: ConversationSession
+    ) -> Optional[ProductContext]:
+        """
+        Product a follow-up refers to.
+        
+        An explicit model number (exact or base match) switches products;
+        otherwise a finish named in the query selects a sibling of the
+        session product ("what about the brushed nickel one?"), and anything
+        else ("does it come with a drain?") stays on the session product.
+        """
+        current = session.product_context
+        if current is None or (found and found.matched_confidence >= 0.95):
+            return found
+        
+        variant = self.product_db.find_variant(current, query)
+        if variant and variant.model_number != current.model_number:
+            self.session_stats["variant_switches"] += 1
+            print(f"  → Follow-up switched to finish variant {variant.model_number}")
+            return variant
+        
+        print(f"  → Follow-up resolved to session product {current.model_number}")
+        return current
+    
+    def _end_session_turn(
+        self,
+        session: Optional[ConversationSession],
+        query: str,
+        output: Dict[str, Any],
+        product_context: Optional[ProductContext] = None
+    ) -> Dict[str, Any]:
+        """Record a finished turn (the agent's query and the answer) in the session, if any, and return output"""
+        if session is None:
+            return output
+        if product_context is not None:
+            session.set_product(product_context)
+        session.record_turn(query, output["markdown_response"])
+        self.session_stats["turns"] += 1
+        if session.turns > 1:
+            self.session_stats["follow_up_turns"] += 1
+        return output
+    
+    def _lookup_precomputed(
+        self,
+        query: str,
+        model_mode: str,
         product_context: Optional[ProductContext]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Serve a precomputed answer if the query matches a template question
+        for the resolved product and the stored answer is still current.
+        """
+        if not self.template_matcher or not product_context:
+            return None
+        
+        template_id = self.template_matcher.match(query, product_context.model_number)
+        if not template_id:
+            return None
+        
+        result = self.answer_store.get(
+            model_number=product_context.model_number,
+            template_id=template_id,
+            model_mode=model_mode,
+            catalog_version=self.product_db.catalog_version,
+            prompt_version=self.prompts.get_prompt_version()
+        )
+        if not result:
+            self.precomputed_stats["misses"] += 1
+            return None
+        
+        self.precomputed_stats["hits"] += 1
+        result["timestamp"] = datetime.utcnow().isoformat() + "Z"
+        return result
+    
+    async def _retrieve_data(
+        self,
+        query: str,
+        product_context: Optional[ProductContext],
+        deadline: Optional[Deadline] = None,
+        intent: Optional[IntentResult] = None
     ) -> Dict[str, Any]:
         """
         STAGE 2: Retrieve structured and unstructured data.
         
         Strategy:
         - If product found: Get specs/media + targeted file search
+          (skipped for pure spec lookups and for alternatives questions
+          the precomputed related products answer)
         - If no product: Broad file search
+        - Troubleshooting / installation / documentation questions
+          retrieve more excerpts
         """
         retrieval_context = {
             "structured": {},
             "unstructured": []
         }
+        max_results = self._max_results(intent)
         
         # Get structured data if product found
         if product_context:
             print(f"  → Retrieving structured data for {product_context.model_number}")
-            retrieval_context["structured"] = {
-                "specs": product_context.specs,
-                "media": product_context.media,
-                "documents": product_context.documents
-            }
+            retrieval_context["structured"] = self._structured_data(product_context, intent)
             print(f"    - Specs: {len(product_context.specs)} fields")
             # Defensive: Ensure media is a dict before using .get
             media = product_context.media if isinstance(product_context.media, dict) else {"videos": [], "images": []}
             print(f"    - Videos: {len(media.get('videos', []))}")
             print(f"    - Images: {len(media.get('images', []))}")
             print(f"    - Documents: {len(product_context.documents)}")
+            print(f"    - Finish variants: {len(product_context.variants)}")
+            print(f"    - Alternatives: {len(retrieval_context['structured'].get('alternatives', []))}")
+            
+            if intent and intent.primary == SPEC_LOOKUP and not intent.needs_llm:
+                print("  → Spec lookup: catalog data only, skipping file search")
+                self.intent_stats["file_search_skipped"] += 1
+                return retrieval_context
+            
+            if intent and intent.primary == "alternatives" and product_context.alternatives \
+                    and not any(intent.has(name) for name in DEEP_RETRIEVAL_INTENTS):
+                print("  → Alternatives: related products index, skipping file search")
+                self.intent_stats["file_search_skipped"] += 1
+                self.intent_stats["alternatives_from_index"] += 1
+                return retrieval_context
             
             # Targeted file search
-            print(f"  → Performing targeted file search...")
-            file_search_results = await self.gemini.file_search(
+            print(f"  → Performing targeted file search ({self.retriever.name})...")
+            file_search_results = await self._search(
                 query=query,
                 model_filter=product_context.model_number,
-                max_results=5
+                max_results=max_results,
+                deadline=deadline
             )
         else:
-            print(f"  → Performing broad file search...")
+            print(f"  → Performing broad file search ({self.retriever.name})...")
             # Broad file search
-            file_search_results = await self.gemini.file_search(
+            file_search_results = await self._search(
                 query=query,
-                max_results=5
+                max_results=max_results,
+                deadline=deadline
             )
         
-        retrieval_context["unstructured"] = file_search_results
         print(f"    - File search results: {len(file_search_results)}")
         
+        # Score and prune excerpts so irrelevant text never reaches the prompt
+        if self.reranker and file_search_results:
+            file_search_results, rerank_report = self.reranker.rerank(
+                query, file_search_results, product_context
+            )
+            retrieval_context["rerank"] = rerank_report
+            print(f"    - Reranked: kept {rerank_report['chunks_kept']}/{rerank_report['chunks_in']} "
+                  f"(~{rerank_report['tokens_pruned']} tokens pruned)")
+        
+        retrieval_context["unstructured"] = file_search_results
+        
         return retrieval_context
     
+    def _match_catalog(
+        self,
+        query: str,
+        product_context: Optional[ProductContext],
+        intent: IntentResult
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Catalog rows matching the spec constraints in a query that names no
+        product (finish, category, price bounds), for the prompt.
+        
+        Skipped for troubleshooting / installation / documentation
+        questions, where a named category ("drain") describes a problem
+        rather than a shopping list.
+        """
+        engine = getattr(self.product_db, "catalog_query", None)
+        if engine is None or product_context is not None:
+            return None
+        if any(intent.has(name) for name in DEEP_RETRIEVAL_INTENTS):
+            return None
+        filters = engine.parse_text(query)
+        if not filters:
+            return None
+        
+        matches = engine.query(filters, sort=("-popularity", "price"), limit=self.catalog_match_limit)
+        self.catalog_query_stats["queries"] += 1
+        if matches["total"]:
+            self.catalog_query_stats["with_matches"] += 1
+        print(f"  → Catalog query: {matches['total']} products match "
+              f"{[(f['field'], f['op'], f['value']) for f in filters]} ({matches['elapsed_ms']}ms)")
+        return matches
+    
+    def _use_single_call(self, pipeline: Optional[str], session: Optional[ConversationSession]) -> bool:
+        """
+        Whether this request retrieves inside the synthesis call. Needs the
+        Gemini File Search backend. A session's first turn qualifies (its
+        grounding excerpts are kept for follow-ups); later turns keep the
+        two-call path so the session's excerpts can be reused.
+        """
+        if (pipeline or self.pipeline_mode) != "single_call":
+            return False
+        return (session is None or session.turns == 0) and self.retriever.name == "gemini"
+    
+    @staticmethod
+    def _max_results(intent: Optional[IntentResult]) -> int:
+        """Excerpts to retrieve for a query"""
+        if intent and any(intent.has(name) for name in DEEP_RETRIEVAL_INTENTS):
+            return 8
+        return 5
+    
+    @staticmethod
+    def _structured_data(
+        product_context: Optional[ProductContext],
+        intent: Optional[IntentResult] = None
+    ) -> Dict[str, Any]:
+        """
+        Catalog data for the prompt's product block. Alternatives are
+        included when asked for or when the product is no longer active.
+        """
+        if not product_context:
+            return {}
+        structured = {
+            "specs": product_context.specs,
+            "media": product_context.media,
+            "documents": product_context.documents,
+            "variants": product_context.variants
+        }
+        status = str(product_context.specs.get("Product_Status", "active")).strip().lower()
+        if product_context.alternatives and ((intent and intent.has("alternatives")) or status != "active"):
+            structured["alternatives"] = product_context.alternatives
+        return structured
+    
+    async def _retrieve_for_session(
+        self,
+        query: str,
+        product_context: Optional[ProductContext],
+        session: ConversationSession,
+        deadline: Optional[Deadline] = None,
+        intent: Optional[IntentResult] = None
+    ) -> Dict[str, Any]:
+        """
+        STAGE 2 for a session turn.
+        
+        Reuses the session's excerpts when the product is unchanged and they
+        still cover the question; otherwise retrieves and adds the excerpts
+        not already held to the session.
+        
+        Returns:
+            Retrieval context holding the session excerpts that score best
+            against the question (at most _max_results(intent) of them)
+        """
+        limit = self._max_results(intent)
+        current = session.product_context.model_number if session.product_context else None
+        requested = product_context.model_number if product_context else None
+        if session.excerpts and current == requested:
+            scores = self.session_scorer.score(query, session.excerpts)
+            best = max(scores)
+            if best >= self.session_reuse_threshold:
+                self.session_stats["retrievals_reused"] += 1
+                selected = self._top_excerpts(session.excerpts, scores, limit)
+                print(f"  → Reusing {len(selected)}/{len(session.excerpts)} session excerpts (best score {best:.2f})")
+                return {
+                    "structured": self._structured_data(product_context, intent),
+                    "unstructured": selected
+                }
+        
+        self.session_stats["retrievals_run"] += 1
+        retrieval_context = await self._retrieve_data(query, product_context, deadline, intent)
+        session.set_product(product_context)
+        new_excerpts = session.add_excerpts(retrieval_context["unstructured"])
+        retrieval_context["unstructured"] = self._top_excerpts(
+            session.excerpts, self.session_scorer.score(query, session.excerpts), limit
+        )
+        print(f"    - New excerpts for this turn: {len(new_excerpts)}")
+        return retrieval_context
+    
+    @staticmethod
+    def _top_excerpts(excerpts: List[Dict[str, Any]], scores: List[float], limit: int) -> List[Dict[str, Any]]:
+        """The limit best-scoring excerpts, best first"""
+        ranked = sorted(range(len(excerpts)), key=lambda i: scores[i], reverse=True)
+        return [excerpts[i] for i in ranked[:limit]]
+    
     async def _synthesize_response(
         self,
         query: str,
         context: Dict[str, Any],
         mode: str,
-        product_context: Optional[ProductContext]
+        product_context: Optional[ProductContext],
+        deadline: Optional[Deadline] = None,
+        session: Optional[ConversationSession] = None,
+        intent: Optional[IntentResult] = None,
+        grounded: bool = False
     ) -> Dict[str, Any]:
         """
         STAGE 3: Synthesize response with LLM.
         
         Combines query + structured data + unstructured data
         and sends to LLM for comprehensive response generation.
+        Session turns replay the stored questions and answers, with the
+        session's excerpts sent alongside the new question;
+        grounded calls retrieve their own excerpts via the File Search tool.
+        The system prompt follows the primary intent.
         """
         # Select appropriate system prompt
-        system_prompt = self.prompts.get_synthesis_prompt()
-        
-        # Check if this is a troubleshooting query
-        troubleshooting_keywords = ['not working', 'broken', 'leak', 'issue', 'problem', 'fix', 'repair']
-        if any(keyword in query.lower() for keyword in troubleshooting_keywords):
+        intent = intent or self.intent_classifier.classify(query)
+        prompt_variant = self._prompt_variant(intent)
+        if prompt_variant == "troubleshooting":
             system_prompt = self.prompts.get_troubleshooting_prompt()
             print("  → Using troubleshooting prompt")
-        
-        # Check if this is a comparison query
-        comparison_keywords = ['compare', 'difference', 'versus', 'vs', 'better']
-        if any(keyword in query.lower() for keyword in comparison_keywords):
+        elif prompt_variant == "comparison":
             system_prompt = self.prompts.get_comparison_prompt()
             print("  → Using comparison prompt")
+        else:
+            system_prompt = self.prompts.get_synthesis_prompt()
+        
+        scope = usage.current_scope()
+        if scope:
+            scope.prompt_variant = prompt_variant
         
         print(f"  → Generating response with {mode} model...")
         
         # Generate response
-        llm_response = await self.gemini.generate_response(
-            query=query,
-            context=context,
-            mode=mode,
-            system_prompt=system_prompt
-        )
+        if grounded:
+            llm_response = await self.gemini.generate_grounded(
+                query=query,
+                context=context,
+                mode=mode,
+                system_prompt=system_prompt,
+                deadline=deadline,
+                max_results=self._max_results(intent)
+            )
+            print(f"    - Grounding excerpts: {len(llm_response.get('excerpts', []))}")
+        elif session is not None:
+            print(f"    - History: {len(session.history)} messages")
+            llm_response = await self.gemini.generate_turn(
+                query=query,
+                context=context,
+                history=session.history,
+                mode=mode,
+                system_prompt=system_prompt,
+                deadline=deadline
+            )
+        else:
+            llm_response = await self.gemini.generate_response(
+                query=query,
+                context=context,
+                mode=mode,
+                system_prompt=system_prompt,
+                deadline=deadline
+            )
         
         print(f"    - Model used: {llm_response['model_used']}")
         print(f"    - Sources: {len(llm_response['sources'])}")
@@ -261,6 +1062,8 @@ class Orchestrator:
             "model_used": llm_response["model_used"],
             "matched_product": product_context.model_number if product_context else None,
             "confidence": product_context.matched_confidence if product_context else 0.0,
+            "rerank": retrieval_context.get("rerank"),
+            "catalog_matches": retrieval_context.get("structured", {}).get("catalog_matches"),
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
         
@@ -273,9 +1076,57 @@ class Orchestrator:
         """Get orchestrator statistics"""
         return {
             "database_stats": self.product_db.get_stats(),
+            "retrieval": self.retriever.get_stats(),
+            "rerank": self.reranker.get_stats() if self.reranker else {"enabled": False},
+            "caches": {
+                "retrieval": self.retrieval_cache.get_stats() if self.retrieval_cache else {"enabled": False},
+                "response": self.response_cache.get_stats() if self.response_cache else {"enabled": False},
+                "context": (
+                    self.gemini.context_cache.get_stats()
+                    if getattr(self.gemini, "context_cache", None) else {"enabled": False}
+                )
+            },
+            "fast_path": self.fast_path.get_stats() if self.fast_path else {"enabled": False},
+            "intents": {**self.intent_classifier.get_stats(), **self.intent_stats},
+            "pipeline": {"default": self.pipeline_mode, **self.pipeline_stats},
+            "catalog_query": {
+                **self.catalog_query_stats,
+                **(self.product_db.catalog_query.get_stats() if getattr(self.product_db, "catalog_query", None) else {})
+            },
+            "gemini": self.gemini.get_stats() if hasattr(self.gemini, "get_stats") else {},
+            "precomputed_answers": {
+                **self.precomputed_stats,
+                "stored": self.answer_store.count() if self.answer_store else 0
+            },
+            "sessions": dict(self.session_stats),
+            "prefetch": self._prefetch_summary(),
+            "notes": (
+                {**self.note_stats, "cache": self.note_cache.get_stats()}
+                if self.note_cache is not None else {"enabled": False}
+            ),
+            "cancellation": {
+                **self.cancel_stats,
+                "by_reason": dict(self.cancel_stats["by_reason"]),
+                "by_stage": dict(self.cancel_stats["by_stage"])
+            },
             "orchestrator_ready": True
         }
 
+    
+    def _prefetch_summary(self) -> Dict[str, Any]:
+        """prefetch_stats with hit rates (product: ticket turns whose product
+        the ticket supplied or confirmed; excerpts: prefetched excerpts used)"""
+        if self.prefetch_cache is None:
+            return {"enabled": False}
+        stats = self.prefetch_stats
+        excerpt_lookups = stats["excerpt_hits"] + stats["excerpt_misses"]
+        return {
+            **stats,
+            "product_hit_rate": round(stats["product_hits"] / stats["ticket_turns"], 4) if stats["ticket_turns"] else 0.0,
+            "excerpt_hit_rate": round(stats["excerpt_hits"] / excerpt_lookups, 4) if excerpt_lookups else 0.0,
+            "cache": self.prefetch_cache.get_stats()
+        }
+
 
 # Global instance (initialized in main.py)
 orchestrator: Optional[Orchestrator] = None
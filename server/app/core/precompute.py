@@ -0,0 +1,358 @@
+"""
+Precomputed Answers - Offline per-product answer fragments
+
+Agents ask the same installation / troubleshooting questions about the
+same popular SKUs over and over. This module:
+- Runs the orchestrator pipeline offline for a set of template questions
+  per model (bounded concurrency, resumable)
+- Persists the formatted answers in a local SQLite store
+- Lets the Orchestrator serve a stored answer when a live query matches
+  a template for the resolved product
+
+Stored answers are tagged with the catalog and prompt versions they were
+generated from; a change to either invalidates them.
+
+Usage (from the repository root):
+    python -m server.app.core.precompute --limit 300 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Default template questions. {model} is replaced with the model number.
+DEFAULT_TEMPLATES: List[Dict[str, Any]] = [
+    {
+        "id": "install",
+        "question": "How do I install the {model}?",
+        "aliases": ["Installation instructions for {model}", "How to install {model}"]
+    },
+    {
+        "id": "troubleshoot_leak",
+        "question": "The {model} is leaking, how do I fix it?",
+        "aliases": ["How do I fix a leak on the {model}?"]
+    },
+    {
+        "id": "parts",
+        "question": "What parts are included with the {model}?",
+        "aliases": ["What comes in the box with {model}?"]
+    },
+    {
+        "id": "maintenance",
+        "question": "How do I clean and maintain the {model}?",
+        "aliases": ["Care instructions for {model}"]
+    }
+]
+
+DEFAULT_STORE_FILENAME = "precomputed_answers.sqlite3"
+
+# Filler words ignored when matching a live query against a template
+_STOPWORDS = {
+    "the", "a", "an", "my", "this", "is", "are", "model", "product", "please",
+    "for", "of", "on", "with", "to"
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9.\-]*")
+
+
+def load_templates(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Load template questions from a JSON file, or return the defaults.
+
+    The file must contain a list of {"id", "question", "aliases"?} objects.
+    """
+    if not path:
+        return DEFAULT_TEMPLATES
+    with open(path, 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    for template in templates:
+        if "id" not in template or "{model}" not in template.get("question", ""):
+            raise ValueError(f"Invalid template (needs id and a {{model}} placeholder): {template}")
+    return templates
+
+
+def normalize_question(text: str, model_number: str) -> str:
+    """
+    Reduce a question to its intent-bearing words.
+
+    Drops the model number (in any dotted/dashed/compact form),
+    punctuation and filler words so that "How do I install 10.FGC.4003CP?"
+    and "how do i install the 10fgc4003cp" normalize identically.
+    """
+    model_key = re.sub(r'[.\s-]', '', model_number.lower())
+    words = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.strip('.-')
+        compact = re.sub(r'[.\-]', '', token)
+        if not compact or compact == model_key or (len(compact) > 4 and compact in model_key):
+            continue
+        if token in _STOPWORDS:
+            continue
+        words.append(token)
+    return " ".join(words)
+
+
+class TemplateMatcher:
+    """Matches live queries to template ids"""
+
+    _PLACEHOLDER = "zzmodelzz"
+
+    def __init__(self, templates: List[Dict[str, Any]]):
+        self.templates = templates
+        # Normalize every phrasing once, with a placeholder standing in for the model
+        self._index: Dict[str, str] = {}
+        for template in templates:
+            for phrasing in [template["question"], *template.get("aliases", [])]:
+                key = normalize_question(phrasing.format(model=self._PLACEHOLDER), self._PLACEHOLDER)
+                self._index[key] = template["id"]
+
+    def match(self, query: str, model_number: str) -> Optional[str]:
+        """Return the template id the query corresponds to, if any"""
+        return self._index.get(normalize_question(query, model_number))
+
+
+class AnswerStore:
+    """
+    SQLite-backed store of precomputed orchestrator results.
+
+    One row per (model, template, model mode); each row remembers the
+    catalog and prompt versions it was generated from.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                model_number TEXT NOT NULL,
+                template_id TEXT NOT NULL,
+                model_mode TEXT NOT NULL,
+                catalog_version TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (model_number, template_id, model_mode)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(
+        self,
+        model_number: str,
+        template_id: str,
+        model_mode: str,
+        catalog_version: Optional[str],
+        prompt_version: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the stored result if it exists and is still current"""
+        row = self._conn.execute(
+            "SELECT result_json FROM answers WHERE model_number = ? AND template_id = ? "
+            "AND model_mode = ? AND catalog_version = ? AND prompt_version = ?",
+            (model_number, template_id, model_mode, catalog_version or "", prompt_version)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(
+        self,
+        model_number: str,
+        template_id: str,
+        model_mode: str,
+        catalog_version: Optional[str],
+        prompt_version: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """Insert or replace a stored result"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                model_number, template_id, model_mode, catalog_version or "", prompt_version,
+                json.dumps(result, default=str), datetime.utcnow().isoformat() + "Z"
+            )
+        )
+        self._conn.commit()
+
+    def purge_stale(self, catalog_version: Optional[str], prompt_version: str) -> int:
+        """Delete rows generated from an older catalog or prompt version"""
+        cursor = self._conn.execute(
+            "DELETE FROM answers WHERE catalog_version != ? OR prompt_version != ?",
+            (catalog_version or "", prompt_version)
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def select_top_models(product_db, limit: Optional[int] = None) -> List[str]:
+    """
+    Pick the models to precompute, most popular first.
+
+    Walks ProductDatabase.get_all_models() and orders by the catalog's
+    Popularity column when present.
+    """
+    models = sorted(product_db.get_all_models())
+    popularity: Dict[str, float] = {}
+    df = product_db.catalog_df
+    if df is not None and 'Popularity' in df.columns:
+        popularity = dict(zip(df['Model_NO'], df['Popularity'].fillna(0)))
+    models.sort(key=lambda m: popularity.get(m, 0), reverse=True)
+    return models[:limit] if limit else models
+
+
+class PrecomputeRunner:
+    """
+    Offline batch job that fills an AnswerStore.
+
+    Resumable: (model, template) pairs that already have a current answer
+    are skipped, so an interrupted run can simply be restarted.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        store: AnswerStore,
+        templates: List[Dict[str, Any]],
+        concurrency: int = 4,
+        model_mode: str = "flash"
+    ):
+        self.orchestrator = orchestrator
+        self.store = store
+        self.templates = templates
+        self.concurrency = max(1, concurrency)
+        self.model_mode = model_mode
+        self.catalog_version = orchestrator.product_db.catalog_version
+        self.prompt_version = orchestrator.prompts.get_prompt_version()
+
+    async def run(self, models: List[str]) -> Dict[str, Any]:
+        """
+        Generate answers for every (model, template) pair.
+
+        Returns:
+            Summary counters: generated, skipped, mismatched, failed, elapsed_s
+        """
+        summary = {"generated": 0, "skipped": 0, "mismatched": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        for model in models:
+            for template in self.templates:
+                if self.store.get(model, template["id"], self.model_mode,
+                                  self.catalog_version, self.prompt_version):
+                    summary["skipped"] += 1
+                else:
+                    pending.append((model, template))
+
+        total = len(pending)
+        print(f"→ Precomputing {total} answers ({summary['skipped']} already current)")
+
+        async def generate(model: str, template: Dict[str, Any]) -> None:
+            async with semaphore:
+                question = template["question"].format(model=model)
+                try:
+                    result = await self.orchestrator.process_query(
+                        query=question,
+                        model_mode=self.model_mode
+                    )
+                except Exception as e:
+                    print(f"  ✗ {model} / {template['id']}: {e}")
+                    summary["failed"] += 1
+                    return
+
+                # Only store answers that were grounded on the intended product
+                if result.get("matched_product") != model:
+                    summary["mismatched"] += 1
+                    return
+
+                self.store.put(model, template["id"], self.model_mode,
+                               self.catalog_version, self.prompt_version, result)
+                summary["generated"] += 1
+                done = summary["generated"] + summary["failed"] + summary["mismatched"]
+                if done % 25 == 0 or done == total:
+                    print(f"  … {done}/{total}")
+
+        await asyncio.gather(*(generate(model, template) for model, template in pending))
+
+        summary["elapsed_s"] = round(time.perf_counter() - started, 2)
+        return summary
+
+
+def _build_services():
+    """Initialize services the same way main.py does"""
+    from ..services.data_loader import ProductDatabase
+    from ..services.gemini_service import GeminiService
+    from .orchestrator import Orchestrator
+    from .prompts import PromptsManager
+
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not google_api_key:
+        raise RuntimeError("GOOGLE_API_KEY environment variable not set")
+
+    product_db = ProductDatabase(data_dir=os.getenv("DATA_DIR", "data"))
+    product_db.load_data()
+    gemini = GeminiService(api_key=google_api_key, corpus_id=os.getenv("FILE_SEARCH_CORPUS_ID"))
+    # Never serve from the store while filling it; the fast path is irrelevant here
+    orchestrator = Orchestrator(
+        product_db=product_db,
+        gemini=gemini,
+        prompts=PromptsManager(),
+        enable_fast_path=False
+    )
+    return orchestrator
+
+
+def main() -> None:
+    """CLI entry point"""
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Precompute per-product answers offline")
+    parser.add_argument("--store", default=os.getenv("PRECOMPUTED_ANSWERS_PATH"),
+                        help="SQLite store path (defaults to the data directory)")
+    parser.add_argument("--templates", default=os.getenv("PRECOMPUTE_TEMPLATES"),
+                        help="JSON file with template questions (defaults to built-ins)")
+    parser.add_argument("--limit", type=int, default=300, help="Number of top models to precompute")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent pipeline runs")
+    parser.add_argument("--mode", default="flash", choices=["flash", "reasoning"], help="LLM mode")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).resolve().parent.parent.parent.parent / '.env'
+    if env_path.exists():
+        load_dotenv(dotenv_path=env_path)
+
+    orchestrator = _build_services()
+    store = AnswerStore(args.store or str(orchestrator.product_db.data_dir / DEFAULT_STORE_FILENAME))
+    purged = store.purge_stale(orchestrator.product_db.catalog_version,
+                               orchestrator.prompts.get_prompt_version())
+    if purged:
+        print(f"✓ Purged {purged} stale answers")
+
+    runner = PrecomputeRunner(
+        orchestrator=orchestrator,
+        store=store,
+        templates=load_templates(args.templates),
+        concurrency=args.concurrency,
+        model_mode=args.mode
+    )
+    models = select_top_models(orchestrator.product_db, args.limit)
+    summary = asyncio.run(runner.run(models))
+    print(f"✓ Precompute complete: {summary} (store has {store.count()} answers)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
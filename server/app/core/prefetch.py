@@ -0,0 +1,187 @@
+"""
+Ticket Prefetch - Warm product context when an agent opens a ticket
+
+Agents enter the Freshdesk ticket ID before asking anything, so the
+ticket's text is known seconds before the first question. TicketPrefetcher
+fetches the ticket (FreshdeskService's pooled session and ticket cache),
+finds the catalog models its subject and description name, and has the
+orchestrator warm them (Orchestrator.warm_ticket): the products are kept
+for questions that name none, and a targeted file search per product runs
+with the ticket text. A first question the prefetched excerpts cover then
+skips retrieval; hit rates are in the orchestrator's "prefetch" stats.
+
+Prefetches of the same ticket share one run, and a chat turn on a ticket
+whose prefetch is still running waits for it (settle) instead of
+repeating its file search.
+"""
+
+import asyncio
+import html
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..services import tracing
+from ..services.data_loader import ProductContext
+from ..services.freshdesk import FreshdeskService
+from ..services.resilience import Deadline
+from .offload import CpuExecutor
+from .orchestrator import Orchestrator
+
+
+# Ticket text searched for models and used as the warm-up query
+MAX_TEXT_CHARS = 2000
+
+_TAGS = re.compile(r"<[^>]+>")
+
+
+class TicketNotFound(Exception):
+    """Freshdesk has no such ticket (or it could not be fetched)"""
+
+
+class TicketPrefetcher:
+    """
+    Fetches tickets and warms the orchestrator's caches for them.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Orchestrator,
+        freshdesk_getter: Callable[[], Optional[FreshdeskService]],
+        cpu_executor: Optional[CpuExecutor] = None,
+        max_models: int = 3,
+        timeout_seconds: float = 20.0
+    ):
+        """
+        Args:
+            orchestrator: Orchestrator whose prefetch cache is warmed
+            freshdesk_getter: Returns the Freshdesk service (None if not configured)
+            cpu_executor: Pool for model extraction (None = inline)
+            max_models: Products warmed per ticket
+            timeout_seconds: Budget for one ticket's file searches
+        """
+        self.orchestrator = orchestrator
+        self.freshdesk_getter = freshdesk_getter
+        self.cpu_executor = cpu_executor
+        self.max_models = max_models
+        self.timeout_seconds = timeout_seconds
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {
+            "prefetches": 0,
+            "joined": 0,
+            "not_found": 0,
+            "without_models": 0,
+            "failed": 0,
+            "settle_waits": 0
+        }
+        print(f"✓ Ticket prefetcher initialized (up to {max_models} products per ticket)")
+
+    async def prefetch(self, ticket_id: str) -> Dict[str, Any]:
+        """
+        Fetch a ticket and warm its products.
+
+        Args:
+            ticket_id: Freshdesk ticket ID
+
+        Returns:
+            {"ticket_id", "subject", "products": [{"model_number", "title",
+             "excerpts"}], "elapsed_ms"}
+
+        Raises:
+            RuntimeError: Freshdesk is not configured
+            TicketNotFound: Freshdesk returned no ticket
+        """
+        task = self._inflight.get(ticket_id)
+        if task is not None:
+            self.stats["joined"] += 1
+        else:
+            task = asyncio.create_task(self._prefetch(ticket_id))
+            self._inflight[ticket_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ticket_id, None))
+        # A caller going away does not cancel a run others may share
+        return await asyncio.shield(task)
+
+    async def settle(self, ticket_id: str) -> None:
+        """Wait for a running prefetch of this ticket (errors are the prefetch caller's)"""
+        task = self._inflight.get(ticket_id)
+        if task is None:
+            return
+        self.stats["settle_waits"] += 1
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            pass
+
+    async def _prefetch(self, ticket_id: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        self.stats["prefetches"] += 1
+        freshdesk = self.freshdesk_getter()
+        if freshdesk is None:
+            raise RuntimeError("Freshdesk service not configured")
+
+        with tracing.span("ticket_prefetch", **{"freshdesk.ticket_id": str(ticket_id)}) as span:
+            try:
+                ticket = await freshdesk.get_ticket(ticket_id)
+                if not ticket:
+                    self.stats["not_found"] += 1
+                    raise TicketNotFound(f"Ticket not found: {ticket_id}")
+
+                text = self.ticket_text(ticket)
+                products = await self._find_products(text)
+                if not products:
+                    self.stats["without_models"] += 1
+                warmed = await self.orchestrator.warm_ticket(
+                    ticket_id,
+                    text,
+                    products,
+                    deadline=Deadline.after(self.timeout_seconds)
+                )
+                span.set_attributes({
+                    "catalog.models": warmed["models"],
+                    "ticket_prefetch.excerpts": sum(warmed["excerpts"].values())
+                })
+            except TicketNotFound:
+                raise
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+
+        elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        print(f"✓ Prefetched ticket #{ticket_id}: {warmed['models'] or 'no products'} ({elapsed_ms}ms)")
+        return {
+            "ticket_id": ticket_id,
+            "subject": ticket.get("subject"),
+            "products": [
+                {
+                    "model_number": product.model_number,
+                    "title": product.specs.get("Product_Title"),
+                    "excerpts": warmed["excerpts"].get(product.model_number, 0)
+                }
+                for product in products
+            ],
+            "elapsed_ms": elapsed_ms
+        }
+
+    async def _find_products(self, text: str) -> List[ProductContext]:
+        if self.cpu_executor:
+            return await self.cpu_executor.run("find_products", text, self.max_models)
+        return self.orchestrator.product_db.find_products(text, self.max_models)
+
+    @staticmethod
+    def ticket_text(ticket: Dict[str, Any]) -> str:
+        """Subject and plain-text description of a Freshdesk ticket"""
+        description = ticket.get("description_text") or _TAGS.sub(" ", ticket.get("description") or "")
+        text = f"{ticket.get('subject') or ''}\n{html.unescape(description)}"
+        return " ".join(text.split())[:MAX_TEXT_CHARS]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "inflight": len(self._inflight)}
+
+
+# Global instance (initialized in main.py)
+ticket_prefetcher: Optional[TicketPrefetcher] = None
+
+
+def get_ticket_prefetcher() -> Optional[TicketPrefetcher]:
+    """Get global ticket prefetcher (None if disabled)"""
+    return ticket_prefetcher
@@ -5,10 +5,32 @@ All LLM system prompts and instructions are defined here
 for easy maintenance and consistency.
 """
 
+import hashlib
+import html
+
+from .note_html import render_markdown
+
 
 class PromptsManager:
     """Centralized prompt management"""
     
+    @classmethod
+    def get_prompt_version(cls) -> str:
+        """
+        Content hash of all system prompts.
+        
+        Used to invalidate anything derived from LLM output (e.g. precomputed
+        answers) whenever a prompt is edited.
+        """
+        digest = hashlib.sha256()
+        for prompt in (
+            cls.get_synthesis_prompt(),
+            cls.get_troubleshooting_prompt(),
+            cls.get_comparison_prompt()
+        ):
+            digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
     @staticmethod
     def get_synthesis_prompt() -> str:
         """
@@ -188,6 +210,9 @@ Use tables for clear comparison when comparing 2-3 products.
         """
         Format response for Freshdesk private note.
         
+        The response Markdown is rendered to sanitized HTML; query, sources
+        and model name are escaped.
+        
         Args:
             query: Original user query
             response: AI-generated response (Markdown)
@@ -197,20 +222,18 @@ Use tables for clear comparison when comparing 2-3 products.
         Returns:
             HTML formatted note for Freshdesk
         """
-        # Note: In production, you'd use a Markdown to HTML converter
-        # For now, basic formatting
-        html = f"""
+        note = f"""
 <div style="font-family: Arial, sans-serif; padding: 15px; border: 1px solid #e0e0e0; border-radius: 5px; background-color: #f9f9f9;">
     <h3 style="color: #2c3e50; margin-top: 0;">🤖 Agent Assist Console Research</h3>
     
     <div style="margin-bottom: 15px;">
-        <strong>Query:</strong> {query}
+        <strong>Query:</strong> {html.escape(query)}
     </div>
     
     <div style="background-color: white; padding: 15px; border-radius: 3px; margin-bottom: 15px;">
         <strong>Research Results:</strong>
         <div style="margin-top: 10px;">
-            {response.replace('\\n', '<br>')}
+            {render_markdown(response)}
         </div>
     </div>
     
@@ -218,14 +241,14 @@ Use tables for clear comparison when comparing 2-3 products.
     <div style="margin-bottom: 10px;">
         <strong>Sources:</strong>
         <ul>
-            {"".join([f"<li>{source}</li>" for source in sources])}
+            {"".join([f"<li>{html.escape(str(source))}</li>" for source in sources])}
         </ul>
     </div>
     ''' if sources else ''}
     
     <div style="font-size: 0.85em; color: #7f8c8d; margin-top: 15px; padding-top: 10px; border-top: 1px solid #e0e0e0;">
-        Generated by Agent Assist Console | Model: {model_used}
+        Generated by Agent Assist Console | Model: {html.escape(str(model_used))}
     </div>
 </div>
 """
-        return html
+        return note.strip()
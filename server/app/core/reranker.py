@@ -0,0 +1,204 @@
+"""
+Excerpt Reranker - Prune retrieved documentation before synthesis
+
+Retrieval returns a fixed number of excerpts regardless of relevance.
+The reranker scores each excerpt against the query and the matched
+product's metadata (model number, category, finish) with a blend of
+lexical overlap and hashed-embedding similarity, drops low scorers and
+near-duplicates, and reports how much prompt text was pruned.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..services.data_loader import ProductContext
+from ..services.retrieval import HashedEmbedder, tokenize
+
+
+# Common words that carry no retrieval signal
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "my", "of", "on", "or", "the", "this",
+    "to", "what", "when", "where", "which", "with", "you", "your"
+}
+
+# Product metadata columns used to describe the matched product
+METADATA_FIELDS = [
+    "Product_Title", "Product_Category", "Sub_Product_Category",
+    "Sub_Sub_Product_Category", "Collection", "Finish"
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)"""
+    return (len(text) + 3) // 4
+
+
+def _content_tokens(text: str) -> List[str]:
+    return [t for t in tokenize(text) if t not in _STOPWORDS]
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class ExcerptReranker:
+    """
+    Lexical + embedding reranker with threshold pruning and deduplication.
+    """
+
+    def __init__(
+        self,
+        lexical_weight: float = 0.6,
+        min_score: float = 0.15,
+        duplicate_threshold: float = 0.8,
+        model_bonus: float = 0.15,
+        min_keep: int = 1,
+        embedder: Optional[HashedEmbedder] = None
+    ):
+        """
+        Args:
+            lexical_weight: Weight of lexical overlap (embedding gets the rest)
+            min_score: Excerpts scoring below this are dropped
+            duplicate_threshold: 3-gram Jaccard similarity treated as duplicate
+            model_bonus: Added when the excerpt mentions the matched model
+            min_keep: Always keep at least this many excerpts (best first)
+            embedder: Embedder for similarity (defaults to HashedEmbedder)
+        """
+        self.lexical_weight = lexical_weight
+        self.min_score = min_score
+        self.duplicate_threshold = duplicate_threshold
+        self.model_bonus = model_bonus
+        self.min_keep = min_keep
+        self.embedder = embedder or HashedEmbedder()
+        self.totals = {
+            "requests": 0,
+            "chunks_in": 0,
+            "chunks_pruned": 0,
+            "tokens_in": 0,
+            "tokens_pruned": 0
+        }
+
+    def _reference_terms(
+        self,
+        query: str,
+        product_context: Optional[ProductContext]
+    ) -> Tuple[Dict[str, float], str]:
+        """Weighted query terms (query words 1.0, product metadata 0.5) and reference text"""
+        weights: Dict[str, float] = {t: 1.0 for t in _content_tokens(query)}
+        reference = [query]
+
+        if product_context:
+            metadata = [product_context.model_number] + [
+                str(product_context.specs[f]) for f in METADATA_FIELDS if f in product_context.specs
+            ]
+            for token in _content_tokens(" ".join(metadata)):
+                weights.setdefault(token, 0.5)
+            reference.extend(metadata)
+
+        return weights, " ".join(reference)
+
+    def score(
+        self,
+        query: str,
+        excerpts: List[Dict[str, Any]],
+        product_context: Optional[ProductContext] = None
+    ) -> List[float]:
+        """Blend score in [0, 1 + model_bonus] for each excerpt"""
+        if not excerpts:
+            return []
+
+        weights, reference = self._reference_terms(query, product_context)
+        total_weight = sum(weights.values()) or 1.0
+
+        texts = [f"{e.get('title', '')} {e.get('text', '')}" for e in excerpts]
+        vectors = self.embedder.embed([reference] + texts)
+        similarities = np.clip(vectors[1:] @ vectors[0], 0.0, 1.0)
+
+        model_key = None
+        if product_context:
+            model_key = re.sub(r'[.\s-]', '', product_context.model_number.lower())
+
+        scores = []
+        for text, similarity in zip(texts, similarities):
+            tokens = set(tokenize(text))
+            lexical = sum(w for t, w in weights.items() if t in tokens) / total_weight
+            blended = self.lexical_weight * lexical + (1 - self.lexical_weight) * float(similarity)
+            if model_key and model_key in re.sub(r'[.\s-]', '', text.lower()):
+                blended += self.model_bonus
+            scores.append(round(blended, 4))
+        return scores
+
+    def rerank(
+        self,
+        query: str,
+        excerpts: List[Dict[str, Any]],
+        product_context: Optional[ProductContext] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Score, prune and deduplicate excerpts.
+
+        Args:
+            query: User query
+            excerpts: Retrieval results ({"title", "text", ...})
+            product_context: Matched product, if any
+
+        Returns:
+            (kept excerpts ordered best first with "rerank_score",
+             per-request pruning report)
+        """
+        scores = self.score(query, excerpts, product_context)
+        ranked = sorted(zip(excerpts, scores), key=lambda item: item[1], reverse=True)
+
+        kept: List[Dict[str, Any]] = []
+        kept_shingles: List[Set[Tuple[str, ...]]] = []
+        pruned_low = pruned_dup = 0
+
+        for excerpt, score in ranked:
+            if score < self.min_score and len(kept) >= self.min_keep:
+                pruned_low += 1
+                continue
+            shingles = _shingles(excerpt.get("text", ""))
+            if any(self._jaccard(shingles, other) >= self.duplicate_threshold for other in kept_shingles):
+                pruned_dup += 1
+                continue
+            kept.append({**excerpt, "rerank_score": score})
+            kept_shingles.append(shingles)
+
+        tokens_in = sum(estimate_tokens(e.get("text", "")) for e in excerpts)
+        tokens_kept = sum(estimate_tokens(e.get("text", "")) for e in kept)
+        report = {
+            "chunks_in": len(excerpts),
+            "chunks_kept": len(kept),
+            "chunks_pruned_low_score": pruned_low,
+            "chunks_pruned_duplicate": pruned_dup,
+            "tokens_in": tokens_in,
+            "tokens_pruned": tokens_in - tokens_kept
+        }
+
+        self.totals["requests"] += 1
+        self.totals["chunks_in"] += len(excerpts)
+        self.totals["chunks_pruned"] += pruned_low + pruned_dup
+        self.totals["tokens_in"] += tokens_in
+        self.totals["tokens_pruned"] += tokens_in - tokens_kept
+
+        return kept, report
+
+    @staticmethod
+    def _jaccard(a: Set, b: Set) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cumulative pruning statistics"""
+        stats = dict(self.totals)
+        stats["token_prune_ratio"] = (
+            round(stats["tokens_pruned"] / stats["tokens_in"], 4) if stats["tokens_in"] else 0.0
+        )
+        return stats
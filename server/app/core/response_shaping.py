@@ -0,0 +1,131 @@
+"""
+Response Shaping - Field projection and fast JSON for large payloads
+
+Product specs carry ~70 spreadsheet columns, but the UI shows a handful.
+Clients pick a named field set per request:
+- "full":    everything (default, backwards compatible)
+- "summary": key specs only, variants reduced to model + finish
+- "minimal": answer text and matched product, no media assets / specs
+
+Serialization goes through orjson when it is installed.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+FIELD_SETS = ("full", "summary", "minimal")
+
+# Spec columns kept by the "summary" field set, in display order
+SUMMARY_SPEC_FIELDS: List[str] = [
+    "Model_NO",
+    "Product_Title",
+    "Finish",
+    "List_Price",
+    "MAP_Price",
+    "Product_Status",
+    "Product_Category",
+    "Sub_Product_Category",
+    "Collection",
+    "Flow_Rate_GPM",
+    "Product_Height_Inches",
+    "Product_Length_Inches",
+    "Product_Width_Inches",
+    "Warranty"
+]
+
+
+def project_specs(specs: Optional[Dict[str, Any]], field_set: str) -> Optional[Dict[str, Any]]:
+    """Keep only the spec columns that belong to the field set"""
+    if not specs or field_set == "full":
+        return specs
+    return {key: specs[key] for key in SUMMARY_SPEC_FIELDS if key in specs}
+
+
+def _project_variants(variants: Optional[List[Dict[str, Any]]], field_set: str) -> Optional[List[Dict[str, Any]]]:
+    if not variants or field_set == "full":
+        return variants
+    return [{"model_number": v.get("model_number"), "finish": v.get("finish")} for v in variants]
+
+
+def shape_chat_response(result: Dict[str, Any], field_set: str = "full") -> Dict[str, Any]:
+    """
+    Project an orchestrator result onto a field set.
+
+    Args:
+        result: Orchestrator.process_query output
+        field_set: One of FIELD_SETS
+
+    Returns:
+        New dict; the input (which may be cached) is not modified
+    """
+    if field_set == "full":
+        return result
+
+    shaped = dict(result)
+    if field_set == "minimal":
+        shaped["media_assets"] = None
+        return shaped
+
+    assets = result.get("media_assets")
+    if assets:
+        shaped["media_assets"] = {
+            **assets,
+            "specs": project_specs(assets.get("specs"), field_set)
+        }
+    return shaped
+
+
+def shape_product(product: Dict[str, Any], field_set: str = "full") -> Dict[str, Any]:
+    """Project a ProductContext.to_dict() payload onto a field set"""
+    if field_set == "full":
+        return product
+
+    shaped = dict(product)
+    shaped["specs"] = project_specs(product.get("specs"), field_set)
+    shaped["variants"] = _project_variants(product.get("variants"), field_set)
+    if field_set == "minimal":
+        shaped.pop("media", None)
+        shaped.pop("documents", None)
+        shaped["specs"] = {k: v for k, v in (shaped["specs"] or {}).items()
+                           if k in ("Model_NO", "Product_Title", "Finish", "List_Price")}
+    return shaped
+
+
+def _default(value: Any) -> Any:
+    """Fallback for types neither encoder handles natively (numpy scalars, timestamps)"""
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falls back to compact stdlib json)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Build a FastJSONResponse"""
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
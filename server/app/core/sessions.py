@@ -0,0 +1,166 @@
+"""
+Conversation Sessions - Server-side state for multi-turn chat
+
+A session keeps what earlier turns already paid for: the resolved
+ProductContext, the retrieved excerpts and the chat history sent to the
+model. Follow-up turns resolve "it" / "the brushed nickel one" against
+the session product, reuse excerpts that still cover the question, and
+replay the stored history (questions and answers only). The session
+holds its most recent max_excerpts excerpts; each new question is sent
+with the ones that score best against it, not all of them.
+
+Sessions live in a bounded in-memory store (LRU) and are evicted after
+idle_ttl_seconds without activity.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..services.data_loader import ProductContext
+
+
+@dataclass
+class ConversationSession:
+    """State carried between turns of one conversation"""
+
+    session_id: str
+    product_context: Optional[ProductContext] = None
+    excerpts: List[Dict[str, Any]] = field(default_factory=list)
+    history: List[Dict[str, str]] = field(default_factory=list)  # [{"role": "user"|"model", "text"}]
+    turns: int = 0
+    max_history_turns: int = 10
+    max_excerpts: int = 24
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def set_product(self, product_context: Optional[ProductContext]) -> None:
+        """Switch the product under discussion; excerpts are per-product"""
+        current = self.product_context.model_number if self.product_context else None
+        new = product_context.model_number if product_context else None
+        if new != current:
+            self.product_context = product_context
+            self.excerpts = []
+
+    def add_excerpts(self, excerpts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store excerpts not already held, keeping the last max_excerpts; returns the new ones"""
+        seen = {e.get("text") for e in self.excerpts}
+        new = [e for e in excerpts if e.get("text") not in seen]
+        self.excerpts.extend(new)
+        overflow = len(self.excerpts) - self.max_excerpts
+        if overflow > 0:
+            del self.excerpts[:overflow]
+        return new
+
+    def record_turn(self, query: str, response: str) -> None:
+        """Append a user/model exchange, keeping the last max_history_turns"""
+        self.history.append({"role": "user", "text": query})
+        self.history.append({"role": "model", "text": response})
+        overflow = len(self.history) - 2 * self.max_history_turns
+        if overflow > 0:
+            del self.history[:overflow]
+        self.turns += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "product": self.product_context.model_number if self.product_context else None,
+            "turns": self.turns,
+            "excerpts": len(self.excerpts),
+            "history_messages": len(self.history)
+        }
+
+
+class SessionStore:
+    """
+    Bounded LRU store of conversation sessions with idle eviction.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl_seconds: float = 1800.0,
+        max_history_turns: int = 10,
+        max_excerpts: int = 24
+    ):
+        """
+        Args:
+            max_sessions: Sessions kept in memory (least recently used evicted)
+            idle_ttl_seconds: Sessions idle longer than this are dropped
+            max_history_turns: User/model exchanges replayed to the model
+            max_excerpts: Excerpts held per session (oldest dropped first)
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_history_turns = max_history_turns
+        self.max_excerpts = max_excerpts
+        self.sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self.stats = {
+            "created": 0,
+            "evicted_idle": 0,
+            "evicted_capacity": 0
+        }
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_active <= self.idle_ttl_seconds:
+                break
+            del self.sessions[session_id]
+            self.stats["evicted_idle"] += 1
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.stats["evicted_capacity"] += 1
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        """Live session by id (refreshes its idle timer), or None"""
+        self._evict()
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        session.last_active = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def create(self) -> ConversationSession:
+        session = ConversationSession(
+            session_id=uuid.uuid4().hex,
+            max_history_turns=self.max_history_turns,
+            max_excerpts=self.max_excerpts
+        )
+        self.sessions[session.session_id] = session
+        self.stats["created"] += 1
+        self._evict()
+        return session
+
+    def get_or_create(self, session_id: Optional[str]) -> ConversationSession:
+        """Existing session, or a new one if the id is missing or expired"""
+        return (self.get(session_id) if session_id else None) or self.create()
+
+    def delete(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._evict()
+        return {
+            "active": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            **self.stats
+        }
+
+
+# Global instance (initialized in main.py)
+session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Get global session store instance"""
+    if session_store is None:
+        raise RuntimeError("Session store not initialized")
+    return session_store
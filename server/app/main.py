@@ -28,12 +28,28 @@ from . import services
 from .services import data_loader as data_loader_module
 from .services import gemini_service as gemini_module
 from .services import freshdesk as freshdesk_module
+from .services import usage as usage_module
+from .services import tracing as tracing_module
 from .core import orchestrator as orchestrator_module
+from .core import batch as batch_module
+from .core import admission as admission_module
+from .core import sessions as sessions_module
+from .core import cancellation as cancellation_module
+from .core import offload as offload_module
+from .core import loop_monitor as loop_monitor_module
+from .core import prefetch as prefetch_module
 
 # Import routers
 from .routers import health, api
 
 
+def _build_cache(ttl_env: str, default_ttl: int):
+    """Build a TTLCache from an env TTL in seconds (0 disables the cache)"""
+    from .core.cache import TTLCache
+    ttl = int(os.getenv(ttl_env, str(default_ttl)))
+    return TTLCache(ttl_seconds=ttl) if ttl > 0 else None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -59,26 +75,57 @@ async def lifespan(app: FastAPI):
         raise RuntimeError("GOOGLE_API_KEY environment variable not set")
     
     try:
+        # Initialize Tracing (spans per pipeline stage and upstream call; none = disabled)
+        tracing_exporter = os.getenv("TRACING_EXPORTER", "none").lower()
+        if tracing_exporter != "none":
+            tracer = tracing_module.configure(
+                tracing_exporter,
+                path=os.getenv("TRACING_FILE_PATH") or str(Path(data_dir) / "traces.jsonl"),
+                service_name=os.getenv("OTEL_SERVICE_NAME", tracing_module.DEFAULT_SERVICE_NAME)
+            )
+            print(f"✓ Tracing enabled ({tracing_exporter}"
+                  f"{': ' + str(tracer.path) if tracer.path else ''})")
+        
         # Initialize Product Database
         print("📊 Initializing Product Database...")
         product_db = data_loader_module.ProductDatabase(data_dir=data_dir)
-        product_db.load_data()
+        with tracing_module.span("startup.load_catalog"):
+            product_db.load_data()
         data_loader_module.product_db = product_db
         
         # Initialize Gemini Service
         print("\n🤖 Initializing Gemini Service...")
+        from .services.resilience import UpstreamPolicy
         gemini_service = gemini_module.GeminiService(
             api_key=google_api_key,
-            corpus_id=file_search_corpus_id
+            corpus_id=file_search_corpus_id,
+            policy=UpstreamPolicy(
+                hedge_enabled=os.getenv("UPSTREAM_HEDGING", "true").lower() == "true",
+                failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                recovery_seconds=float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+            ),
+            search_timeout=float(os.getenv("FILE_SEARCH_TIMEOUT", "10"))
         )
         gemini_module.gemini_service = gemini_service
         
+        if os.getenv("CONTEXT_CACHE_ENABLED", "true").lower() == "true":
+            from .services.context_cache import ContextCacheManager
+            gemini_service.context_cache = ContextCacheManager(
+                gemini_service.client.aio.caches,
+                ttl_seconds=int(os.getenv("CONTEXT_CACHE_TTL", "3600")),
+                min_tokens=int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024")),
+                promote_after=int(os.getenv("CONTEXT_CACHE_PROMOTE_AFTER", "2")),
+                failure_ttl_seconds=float(os.getenv("CONTEXT_CACHE_FAILURE_TTL", "600"))
+            )
+            print("  ✓ Context caching enabled for static prompt prefixes")
+        
         # Initialize Freshdesk Service (optional)
         if freshdesk_domain and freshdesk_api_key:
             print("\n📧 Initializing Freshdesk Service...")
             freshdesk_service = freshdesk_module.FreshdeskService(
                 domain=freshdesk_domain,
-                api_key=freshdesk_api_key
+                api_key=freshdesk_api_key,
+                ticket_cache=_build_cache("FRESHDESK_TICKET_CACHE_TTL", 300)
             )
             freshdesk_module.freshdesk_service = freshdesk_service
             
@@ -95,13 +142,126 @@ async def lifespan(app: FastAPI):
         # Initialize Orchestrator
         print("\n🎯 Initializing Orchestrator...")
         from .core.prompts import PromptsManager
+        from .core import precompute
+        from .services import retrieval
+        
+        retrieval_backend = os.getenv("RETRIEVAL_BACKEND", "gemini")
+        retriever = retrieval.create_backend(
+            retrieval_backend,
+            gemini=gemini_service,
+            index_dir=os.getenv("LOCAL_INDEX_DIR") or str(product_db.data_dir / "local_index"),
+            embedder_name=os.getenv("LOCAL_EMBEDDER")
+        )
+        print(f"  ✓ Retrieval backend: {retrieval_backend}")
+        
+        from .core.reranker import ExcerptReranker
+        reranker = None
+        if os.getenv("RERANK_ENABLED", "true").lower() == "true":
+            reranker = ExcerptReranker(min_score=float(os.getenv("RERANK_MIN_SCORE", "0.15")))
+        
+        # Precomputed answers are served only if the offline job has produced a store
+        answer_store = None
+        answers_path = os.getenv("PRECOMPUTED_ANSWERS_PATH") or str(
+            product_db.data_dir / precompute.DEFAULT_STORE_FILENAME
+        )
+        if Path(answers_path).exists():
+            answer_store = precompute.AnswerStore(answers_path)
+            print(f"  ✓ Precomputed answers: {answer_store.count()} stored")
+        
+        # CPU executor: product extraction / category scans off the event loop
+        cpu_executor_kind = os.getenv("CPU_EXECUTOR", "thread")
+        if cpu_executor_kind != "inline":
+            workers = os.getenv("CPU_EXECUTOR_WORKERS")
+            offload_module.cpu_executor = offload_module.CpuExecutor(
+                product_db,
+                kind=cpu_executor_kind,
+                max_workers=int(workers) if workers else None,
+                max_queue=int(os.getenv("CPU_EXECUTOR_QUEUE", "64"))
+            )
+        
         orchestrator = orchestrator_module.Orchestrator(
             product_db=product_db,
             gemini=gemini_service,
-            prompts=PromptsManager()
+            prompts=PromptsManager(),
+            enable_fast_path=os.getenv("CATALOG_FAST_PATH", "true").lower() == "true",
+            answer_store=answer_store,
+            answer_templates=precompute.load_templates(os.getenv("PRECOMPUTE_TEMPLATES")),
+            retriever=retriever,
+            reranker=reranker,
+            retrieval_cache=_build_cache("RETRIEVAL_CACHE_TTL", 900),
+            response_cache=_build_cache("RESPONSE_CACHE_TTL", 600),
+            default_deadline_seconds=float(os.getenv("REQUEST_DEADLINE_SECONDS", "60")),
+            session_reuse_threshold=float(os.getenv("SESSION_REUSE_THRESHOLD", "0.3")),
+            pipeline_mode=os.getenv("PIPELINE_MODE", "two_call"),
+            cpu_executor=offload_module.cpu_executor,
+            catalog_match_limit=int(os.getenv("CATALOG_MATCH_LIMIT", "15")),
+            prefetch_cache=_build_cache("PREFETCH_TTL", 1800),
+            note_cache=_build_cache("NOTE_CACHE_TTL", 3600)
         )
         orchestrator_module.orchestrator = orchestrator
         
+        # Ticket prefetch: warm a ticket's products when the agent enters its ID
+        if orchestrator.prefetch_cache is not None:
+            prefetch_module.ticket_prefetcher = prefetch_module.TicketPrefetcher(
+                orchestrator=orchestrator,
+                freshdesk_getter=freshdesk_module.get_freshdesk_service,
+                cpu_executor=offload_module.cpu_executor,
+                max_models=int(os.getenv("PREFETCH_MAX_MODELS", "3")),
+                timeout_seconds=float(os.getenv("PREFETCH_TIMEOUT", "20"))
+            )
+        
+        # Browser / proxy cache lifetime for catalog reads
+        from .core import http_cache
+        http_cache.catalog_response_cache.max_age = int(os.getenv("CATALOG_CACHE_MAX_AGE", "300"))
+        
+        # Initialize Admission Controller (per-lane concurrency for /api/chat)
+        admission_module.admission_controller = admission_module.AdmissionController(
+            limits={
+                "cheap": int(os.getenv("ADMISSION_CHEAP_CONCURRENCY", "32")),
+                "flash": int(os.getenv("ADMISSION_FLASH_CONCURRENCY", "8")),
+                "reasoning": int(os.getenv("ADMISSION_REASONING_CONCURRENCY", "2"))
+            },
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "50")),
+            max_wait_seconds=float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))
+        )
+        
+        # Initialize Event Loop Lag Monitor
+        loop_monitor_module.loop_monitor = loop_monitor_module.LoopLagMonitor(
+            interval_seconds=float(os.getenv("LOOP_LAG_INTERVAL_MS", "100")) / 1000,
+            stall_threshold_seconds=float(os.getenv("LOOP_STALL_THRESHOLD_MS", "100")) / 1000
+        )
+        loop_monitor_module.loop_monitor.start()
+        
+        # Initialize In-flight Request Registry (disconnect / supersede cancellation)
+        cancellation_module.inflight_requests = cancellation_module.InflightRequests(
+            latest_wins=os.getenv("CHAT_LATEST_WINS", "false").lower() == "true"
+        )
+        
+        # Initialize Usage Ledger (token / cost accounting, append-only log)
+        usage_module.usage_ledger = usage_module.UsageLedger(
+            log_path=os.getenv("USAGE_LOG_PATH") or str(product_db.data_dir / "usage_log.jsonl"),
+            flush_interval_seconds=float(os.getenv("USAGE_FLUSH_SECONDS", "30")),
+            max_agents=int(os.getenv("USAGE_MAX_AGENTS", "500")),
+            max_pending=int(os.getenv("USAGE_MAX_PENDING", "10000"))
+        )
+        usage_module.usage_ledger.start()
+        
+        # Initialize Session Store (multi-turn /api/chat conversations)
+        sessions_module.session_store = sessions_module.SessionStore(
+            max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+            idle_ttl_seconds=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+            max_history_turns=int(os.getenv("SESSION_HISTORY_TURNS", "10")),
+            max_excerpts=int(os.getenv("SESSION_MAX_EXCERPTS", "24"))
+        )
+        
+        # Initialize Batch Job Manager
+        batch_module.batch_manager = batch_module.BatchJobManager(
+            orchestrator=orchestrator,
+            freshdesk_getter=freshdesk_module.get_freshdesk_service,
+            prompts=orchestrator.prompts,
+            default_concurrency=int(os.getenv("BATCH_CONCURRENCY", "4"))
+        )
+        
         print("\n" + "="*60)
         print("✅ STARTUP COMPLETE - Ready to serve requests")
         print("="*60 + "\n")
@@ -118,6 +278,15 @@ async def lifespan(app: FastAPI):
         
         # Shutdown
         print("\n🛑 Shutting down Agent Assist Console...")
+        if gemini_service.context_cache:
+            await gemini_service.context_cache.close()
+        await usage_module.usage_ledger.close()
+        await loop_monitor_module.loop_monitor.stop()
+        if freshdesk_module.freshdesk_service:
+            await freshdesk_module.freshdesk_service.close()
+        if offload_module.cpu_executor:
+            offload_module.cpu_executor.shutdown()
+        tracing_module.get_tracer().shutdown()
         
     except Exception as e:
         print(f"\n❌ STARTUP FAILED: {e}")
@@ -150,6 +319,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (brotli when installed, else gzip)
+if os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true":
+    from .core.compression import CompressionMiddleware
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", "512"))
+    )
+
 
 # Include routers
 app.include_router(health.router)
@@ -189,8 +366,12 @@ async def root():
             "health": "/health",
             "stats": "/stats",
             "chat": "/api/chat",
+            "chat_batch": "/api/chat/batch",
             "freshdesk": "/api/freshdesk",
+            "ticket_prefetch": "/api/freshdesk/prefetch/{ticket_id}",
             "products": "/api/products",
+            "product_query": "/api/products/query",
+            "product_suggest": "/api/products/suggest?prefix=",
             "docs": "/docs"
         }
     }
@@ -4,9 +4,14 @@ Main API Router
 Handles chat queries and Freshdesk integration.
 """
 
-from fastapi import APIRouter, HTTPException
+import json
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from ..core.response_shaping import FIELD_SETS, FastJSONResponse, shape_chat_response, shape_product
 
 router = APIRouter(prefix="/api", tags=["api"])
 
@@ -18,6 +23,22 @@ class ChatRequest(BaseModel):
     
     query: str = Field(..., min_length=1, max_length=2000, description="User query")
     model_mode: str = Field(default="flash", pattern="^(flash|reasoning)$", description="LLM mode")
+    fields: str = Field(default="full", pattern="^(full|summary|minimal)$", description="Response field set")
+    timeout_ms: Optional[int] = Field(default=None, ge=1000, le=300000, description="Request deadline")
+    session_id: Optional[str] = Field(default=None, max_length=64, description="Conversation to continue")
+    agent_id: Optional[str] = Field(default=None, max_length=64, description="Support agent (usage attribution)")
+    pipeline: Optional[str] = Field(
+        default=None, pattern="^(two_call|single_call)$",
+        description="Retrieval + synthesis as two upstream calls or one grounded call (server default if omitted)"
+    )
+    latest_wins: Optional[bool] = Field(
+        default=None,
+        description="Cancel this agent's in-flight query when this one arrives (server default if omitted)"
+    )
+    ticket_id: Optional[str] = Field(
+        default=None, max_length=32,
+        description="Freshdesk ticket being worked (questions naming no product use its prefetched product)"
+    )
 
 
 class ChatResponse(BaseModel):
@@ -30,13 +51,58 @@ class ChatResponse(BaseModel):
     model_used: str
     matched_product: Optional[str] = None
     confidence: float = 0.0
+    rerank: Optional[Dict[str, Any]] = None
+    catalog_matches: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+    response_id: Optional[str] = None
     timestamp: str
 
 
+class BatchChatItem(BaseModel):
+    """Single query within a batch job"""
+    model_config = {"protected_namespaces": ()}
+    
+    query: str = Field(..., min_length=1, max_length=2000, description="User query")
+    model_mode: str = Field(default="flash", pattern="^(flash|reasoning)$", description="LLM mode")
+    ticket_id: Optional[str] = Field(default=None, description="Freshdesk ticket the answer belongs to")
+
+
+class BatchChatRequest(BaseModel):
+    """Batch chat job request"""
+    items: List[BatchChatItem] = Field(..., min_length=1, max_length=1000)
+    auto_export: bool = Field(default=False, description="Post each answer to its Freshdesk ticket")
+    concurrency: Optional[int] = Field(default=None, ge=1, le=64, description="Concurrent queries")
+
+
+class CatalogFilter(BaseModel):
+    """Single catalog predicate"""
+    field: str = Field(..., description="Query field (price, finish, category, height, ...)")
+    op: str = Field(default="eq", description="eq, ne, in, not_in, lt, lte, gt, gte, between, contains, exists")
+    value: Any = Field(default=None, description="Scalar, [low, high] for between, list for in / not_in")
+
+
+class CatalogQueryRequest(BaseModel):
+    """Structured catalog query"""
+    filters: List[CatalogFilter] = Field(default_factory=list, max_length=20)
+    text: Optional[str] = Field(
+        default=None, max_length=500,
+        description="Free text whose finish / category / price constraints are added as filters"
+    )
+    sort: List[str] = Field(default=["-popularity"], max_length=5, description="Fields, '-' prefix = descending")
+    limit: int = Field(default=50, ge=0, le=500)
+    offset: int = Field(default=0, ge=0)
+    fields: Optional[List[str]] = Field(default=None, description="Fields per row (default set if omitted)")
+
+
 class FreshdeskRequest(BaseModel):
-    """Freshdesk note request"""
+    """Freshdesk note request (by response_id, or with the note HTML)"""
     ticket_id: str = Field(..., description="Freshdesk ticket ID")
-    formatted_note: str = Field(..., description="HTML formatted note content")
+    response_id: Optional[str] = Field(
+        default=None, max_length=64,
+        description="Chat answer whose server-rendered note to post"
+    )
+    formatted_note: Optional[str] = Field(default=None, description="HTML formatted note content")
 
 
 class FreshdeskResponse(BaseModel):
@@ -48,32 +114,93 @@ class FreshdeskResponse(BaseModel):
     timestamp: str
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def process_chat(request: ChatRequest) -> ChatResponse:
+@router.post("/chat", response_model=ChatResponse, response_class=FastJSONResponse)
+async def process_chat(request: ChatRequest, http_request: Request) -> ChatResponse:
     """
     Process chat query through orchestrator pipeline.
     
-    This is the main endpoint for product research queries.
+    This is the main endpoint for product research queries. If the client
+    disconnects (or, with latest_wins, the agent sends a newer query) the
+    in-flight work is cancelled down to the upstream LLM calls.
     
     Args:
-        request: ChatRequest with query and model_mode
+        request: ChatRequest with query, model_mode, field set, optional
+                 timeout and the session_id of the conversation to continue
+        http_request: Raw request (watched for client disconnect)
         
     Returns:
         ChatResponse with comprehensive answer and media assets
+        (specs projected to the requested field set) and the session_id
+        to send with the next turn
     """
     from ..core.orchestrator import get_orchestrator
+    from ..core.admission import Overloaded, get_admission_controller
+    from ..core.cancellation import DISCONNECTED, RequestCancelled, get_inflight_requests
+    from ..core.prefetch import get_ticket_prefetcher
+    from ..core.sessions import get_session_store
+    from ..services.resilience import CircuitOpenError, Deadline, DeadlineExceeded
     
     try:
         orchestrator = get_orchestrator()
+        deadline = Deadline.after(
+            request.timeout_ms / 1000 if request.timeout_ms else orchestrator.default_deadline_seconds
+        )
+        # Unknown or expired ids start a new conversation
+        session = get_session_store().get_or_create(request.session_id)
+        prefetcher = get_ticket_prefetcher()
         
-        # Process query through pipeline
-        result = await orchestrator.process_query(
-            query=request.query,
-            model_mode=request.model_mode
+        async def run_turn() -> Dict[str, Any]:
+            # A prefetch of this ticket still running is about to fill the caches
+            if request.ticket_id and prefetcher:
+                await prefetcher.settle(request.ticket_id)
+            # Turns of one conversation run one at a time
+            async with session.lock:
+                # Admission control: queue time counts against the deadline
+                lane = orchestrator.admission_lane(request.query, request.model_mode, session, request.ticket_id)
+                async with get_admission_controller().admit(lane, deadline):
+                    # Process query through pipeline
+                    return await orchestrator.process_query(
+                        query=request.query,
+                        model_mode=request.model_mode,
+                        deadline=deadline,
+                        session=session,
+                        agent_id=request.agent_id,
+                        pipeline=request.pipeline,
+                        ticket_id=request.ticket_id
+                    )
+        
+        result = await get_inflight_requests().run(
+            run_turn(),
+            receive=http_request.receive,
+            agent_id=request.agent_id,
+            latest_wins=request.latest_wins
         )
         
-        return ChatResponse(**result)
+        return ChatResponse(**shape_chat_response(result, request.fields), session_id=session.session_id)
         
+    except RequestCancelled as e:
+        # 499: client closed request (nobody is listening); 409: a newer query replaced this one
+        raise HTTPException(
+            status_code=499 if e.reason == DISCONNECTED else 409,
+            detail=str(e)
+        )
+    except Overloaded as e:
+        print(f"⚠ Chat request shed: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    except DeadlineExceeded as e:
+        print(f"✗ Chat deadline exceeded: {e}")
+        raise HTTPException(status_code=504, detail=f"Query timed out: {str(e)}")
+    except CircuitOpenError as e:
+        print(f"✗ Chat upstream unavailable: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Language model temporarily unavailable: {str(e)}",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
     except Exception as e:
         print(f"✗ Error processing chat: {e}")
         raise HTTPException(
@@ -82,20 +209,132 @@ async def process_chat(request: ChatRequest) -> ChatResponse:
         )
 
 
+@router.delete("/chat/session/{session_id}")
+async def end_chat_session(session_id: str) -> Dict[str, Any]:
+    """Drop a conversation's server-side state (product, excerpts, history)"""
+    from ..core.sessions import get_session_store
+    
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+    return {"session_id": session_id, "deleted": True}
+
+
+@router.post("/chat/batch")
+async def create_batch_job(request: BatchChatRequest) -> Dict[str, Any]:
+    """
+    Queue a batch of chat queries for background processing.
+    
+    Results can be polled at /api/chat/batch/{job_id} or streamed as
+    NDJSON from /api/chat/batch/{job_id}/stream.
+    
+    Args:
+        request: BatchChatRequest with items and export options
+        
+    Returns:
+        Job progress summary including job_id
+    """
+    from ..core.batch import BatchItem, get_batch_manager
+    
+    try:
+        manager = get_batch_manager()
+        items = [
+            BatchItem(index=i, query=item.query, model_mode=item.model_mode, ticket_id=item.ticket_id)
+            for i, item in enumerate(request.items)
+        ]
+        job = manager.create_job(items, auto_export=request.auto_export, concurrency=request.concurrency)
+        return job.progress()
+        
+    except Exception as e:
+        print(f"✗ Error creating batch job: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error creating batch job: {str(e)}"
+        )
+
+
+@router.get("/chat/batch/{job_id}")
+async def get_batch_job(job_id: str, include_results: bool = False) -> Dict[str, Any]:
+    """
+    Get batch job progress (and optionally all results so far).
+    """
+    from ..core.batch import get_batch_manager
+    
+    job = get_batch_manager().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    
+    progress = job.progress()
+    if include_results:
+        progress["results"] = sorted(job.results, key=lambda r: r["index"])
+    return progress
+
+
+@router.get("/chat/batch/{job_id}/stream")
+async def stream_batch_job(job_id: str, cancel_on_disconnect: bool = False) -> StreamingResponse:
+    """
+    Stream batch results as newline-delimited JSON as items complete.
+    
+    Each line is {"type": "result", ...} and the final line is
+    {"type": "progress", ...}. Jobs keep running when the stream is
+    closed (results stay pollable) unless cancel_on_disconnect is set.
+    """
+    from ..core.batch import get_batch_manager
+    from ..core.cancellation import DISCONNECTED
+    
+    manager = get_batch_manager()
+    job = manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    
+    async def lines():
+        try:
+            async for record in manager.stream(job):
+                yield json.dumps(record, default=str) + "\n"
+        finally:
+            # Stream closed before the job finished: the client went away
+            if cancel_on_disconnect and not job.done:
+                manager.cancel_job(job_id, reason=DISCONNECTED)
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.delete("/chat/batch/{job_id}")
+async def cancel_batch_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a running batch job"""
+    from ..core.batch import get_batch_manager
+    
+    manager = get_batch_manager()
+    job = manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    
+    cancelled = manager.cancel_job(job_id)
+    return {"job_id": job_id, "cancelled": cancelled, "status": job.status}
+
+
 @router.post("/freshdesk", response_model=FreshdeskResponse)
 async def export_to_freshdesk(request: FreshdeskRequest) -> FreshdeskResponse:
     """
     Export research results to Freshdesk ticket as private note.
     
+    The note is the one rendered on the server when the answer was
+    produced (response_id), or HTML supplied by the client.
+    
     Args:
-        request: FreshdeskRequest with ticket_id and formatted note
+        request: FreshdeskRequest with ticket_id and response_id or
+                 formatted note
         
     Returns:
-        FreshdeskResponse with success status
+        FreshdeskResponse with success status (404 if the response_id is
+        unknown or its note expired and no formatted_note was sent)
     """
     from ..services.freshdesk import get_freshdesk_service
+    from ..core.orchestrator import get_orchestrator
     from datetime import datetime
     
+    if not request.response_id and not request.formatted_note:
+        raise HTTPException(status_code=400, detail="Provide response_id or formatted_note")
+    
     try:
         freshdesk = get_freshdesk_service()
         
@@ -105,10 +344,15 @@ async def export_to_freshdesk(request: FreshdeskRequest) -> FreshdeskResponse:
                 detail="Freshdesk service not configured. Set FRESHDESK_DOMAIN and FRESHDESK_API_KEY."
             )
         
+        note_html = get_orchestrator().get_note(request.response_id) if request.response_id else None
+        note_html = note_html or request.formatted_note
+        if note_html is None:
+            raise HTTPException(status_code=404, detail=f"Response not found: {request.response_id}")
+        
         # Add note to ticket
         result = await freshdesk.add_private_note(
             ticket_id=request.ticket_id,
-            note_html=request.formatted_note
+            note_html=note_html
         )
         
         return FreshdeskResponse(
@@ -129,39 +373,108 @@ async def export_to_freshdesk(request: FreshdeskRequest) -> FreshdeskResponse:
         )
 
 
+@router.post("/freshdesk/prefetch/{ticket_id}")
+async def prefetch_ticket(ticket_id: str) -> Dict[str, Any]:
+    """
+    Warm product context for a ticket before the agent asks anything.
+    
+    Fetches the ticket, finds the catalog models its subject and
+    description name, and prefetches their documentation excerpts. Chat
+    requests carrying the same ticket_id then default to its product and
+    skip retrieval when the excerpts cover the question.
+    
+    Args:
+        ticket_id: Freshdesk ticket ID
+        
+    Returns:
+        {"ticket_id", "subject", "products": [{"model_number", "title",
+         "excerpts"}], "elapsed_ms"}
+    """
+    from ..core.prefetch import TicketNotFound, get_ticket_prefetcher
+    from ..services.freshdesk import get_freshdesk_service
+    
+    prefetcher = get_ticket_prefetcher()
+    if not prefetcher or not get_freshdesk_service():
+        raise HTTPException(
+            status_code=503,
+            detail="Ticket prefetch unavailable. Set FRESHDESK_DOMAIN and FRESHDESK_API_KEY (and PREFETCH_TTL > 0)."
+        )
+    
+    try:
+        return await prefetcher.prefetch(ticket_id.strip())
+    except TicketNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        print(f"✗ Error prefetching ticket {ticket_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error prefetching ticket: {str(e)}"
+        )
+
+
 @router.get("/products")
 async def list_products(
+    request: Request,
     category: Optional[str] = None,
-    limit: int = 50
-) -> Dict[str, Any]:
+    limit: int = Query(50, ge=1, le=500),
+    page: int = 1,
+    group_by: Optional[str] = None
+) -> Response:
     """
     List available products.
     
-    Optional category filter for browsing products.
+    Optional category filter for browsing products. Responses carry an
+    ETag tied to the catalog version and honour If-None-Match.
     
     Args:
         category: Optional category filter
-        limit: Maximum number of results
+        limit: Maximum number of results per page (1-500)
+        page: 1-based page number
+        group_by: "family" to return one entry per product family
+                  (finish variants nested) instead of every variant
         
     Returns:
         List of products
     """
     from ..services.data_loader import get_product_database
+    from ..core.http_cache import get_catalog_response_cache
+    from ..core.offload import get_cpu_executor
+    
+    if group_by not in (None, "family"):
+        raise HTTPException(status_code=400, detail=f"Unsupported group_by: {group_by}")
+    
+    page = max(page, 1)
     
     try:
         product_db = get_product_database()
+        cpu_executor = get_cpu_executor()
         
-        if category:
-            products = product_db.search_by_category(category)
-        else:
-            models = product_db.get_all_models()
-            products = [{"model_number": model} for model in models[:limit]]
+        async def build() -> Dict[str, Any]:
+            if group_by == "family":
+                products = product_db.list_families(category)
+            elif category and cpu_executor:
+                products = await cpu_executor.run("search_by_category", category)
+            elif category:
+                products = product_db.search_by_category(category)
+            else:
+                models = product_db.get_all_models()
+                products = [{"model_number": model} for model in models]
+            
+            start = (page - 1) * limit
+            return {
+                "products": products[start:start + limit],
+                "total": len(products),
+                "limit": limit,
+                "page": page,
+                "group_by": group_by
+            }
         
-        return {
-            "products": products[:limit],
-            "total": len(products),
-            "limit": limit
-        }
+        return await get_catalog_response_cache().respond(
+            request,
+            key=("products", (category or "").lower(), limit, page, group_by),
+            catalog_version=product_db.catalog_version,
+            build=build
+        )
         
     except Exception as e:
         print(f"✗ Error listing products: {e}")
@@ -171,31 +484,114 @@ async def list_products(
         )
 
 
+@router.post("/products/query", response_class=FastJSONResponse)
+async def query_products(request: CatalogQueryRequest) -> Dict[str, Any]:
+    """
+    Filter and sort the whole catalog by typed spec predicates.
+    
+    Example: matte black kitchen faucets under $400 is
+    [{"field": "finish", "op": "eq", "value": "Matte Black"},
+     {"field": "category", "op": "eq", "value": "Kitchen Faucets"},
+     {"field": "price", "op": "lte", "value": 400}]
+    or text="matte black kitchen faucets under $400".
+    
+    Args:
+        request: CatalogQueryRequest with filters and/or text, sort,
+                 paging and the fields to return
+        
+    Returns:
+        {"total", "rows", "filters" (as applied), "sort", "elapsed_ms"}
+    """
+    from ..services.data_loader import get_product_database
+    
+    engine = get_product_database().catalog_query
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Catalog not loaded")
+    
+    filters = [f.model_dump() for f in request.filters]
+    if request.text:
+        filters.extend(engine.parse_text(request.text))
+    
+    try:
+        return engine.query(
+            filters,
+            sort=request.sort,
+            limit=request.limit,
+            offset=request.offset,
+            fields=request.fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/products/suggest")
+async def suggest_products(prefix: str, limit: int = 10) -> Dict[str, Any]:
+    """
+    Autocomplete model numbers from a partial SKU.
+    
+    Args:
+        prefix: Partial model number as typed (any separators)
+        limit: Maximum number of suggestions (1-20)
+        
+    Returns:
+        Suggestions ranked by popularity
+    """
+    from ..services.data_loader import get_product_database
+    
+    product_db = get_product_database()
+    suggestions = product_db.suggest_models(prefix, max(1, min(limit, 20)))
+    return {
+        "prefix": prefix,
+        "suggestions": suggestions
+    }
+
+
 @router.get("/product/{model_number}")
-async def get_product_details(model_number: str) -> Dict[str, Any]:
+async def get_product_details(request: Request, model_number: str, fields: str = "full") -> Response:
     """
     Get detailed information for a specific product.
     
+    Responses carry an ETag tied to the catalog version and the record,
+    and honour If-None-Match.
+    
     Args:
         model_number: Product model number
+        fields: Field set - "full", "summary" or "minimal"
         
     Returns:
         Product details with specs and media
     """
     from ..services.data_loader import get_product_database
+    from ..core.http_cache import get_catalog_response_cache
+    from ..core.offload import get_cpu_executor
+    
+    if fields not in FIELD_SETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported fields: {fields}")
     
     try:
         product_db = get_product_database()
+        cpu_executor = get_cpu_executor()
         
-        product = product_db.get_product_by_model(model_number)
+        async def build() -> Dict[str, Any]:
+            if cpu_executor:
+                product = await cpu_executor.run("get_product_by_model", model_number)
+            else:
+                product = product_db.get_product_by_model(model_number)
+            
+            if not product:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Product not found: {model_number}"
+                )
+            
+            return shape_product(product.to_dict(), fields)
         
-        if not product:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Product not found: {model_number}"
-            )
-        
-        return product.to_dict()
+        return await get_catalog_response_cache().respond(
+            request,
+            key=("product", model_number.strip().upper(), fields),
+            catalog_version=product_db.catalog_version,
+            build=build
+        )
         
     except HTTPException:
         raise
@@ -4,7 +4,8 @@ Health Check Router
 Provides system health status and statistics.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
 from typing import Dict, Any
 
 router = APIRouter(prefix="", tags=["health"])
@@ -60,20 +61,45 @@ async def health_check() -> Dict[str, Any]:
 
 
 @router.get("/stats")
-async def get_stats() -> Dict[str, Any]:
+async def get_stats(request: Request) -> Response:
     """
     Get detailed system statistics.
+    
+    Revalidated on every request (Cache-Control: no-cache); an unchanged
+    snapshot answers If-None-Match with 304.
     """
     from ..services.data_loader import get_product_database
     from ..core.orchestrator import get_orchestrator
+    from ..core.batch import get_batch_manager
+    from ..core.admission import get_admission_controller
+    from ..core.sessions import get_session_store
+    from ..core.cancellation import get_inflight_requests
+    from ..core.offload import get_cpu_executor
+    from ..core.loop_monitor import get_loop_monitor
+    from ..core.prefetch import get_ticket_prefetcher
+    from ..services.freshdesk import get_freshdesk_service
+    from ..services.usage import get_usage_ledger
+    from ..services.tracing import get_tracer
+    from ..core.http_cache import conditional_response, get_catalog_response_cache
     
     try:
         product_db = get_product_database()
         orchestrator = get_orchestrator()
         
-        return {
+        stats = {
             "database": product_db.get_stats(),
             "orchestrator": orchestrator.get_stats(),
+            "batch": get_batch_manager().get_stats(),
+            "admission": get_admission_controller().get_stats(),
+            "sessions": get_session_store().get_stats(),
+            "inflight": get_inflight_requests().get_stats(),
+            "cpu_executor": get_cpu_executor().get_stats() if get_cpu_executor() else {"kind": "inline"},
+            "event_loop": get_loop_monitor().get_stats(),
+            "usage": get_usage_ledger().get_stats(),
+            "http_cache": get_catalog_response_cache().get_stats(),
+            "freshdesk": get_freshdesk_service().get_stats() if get_freshdesk_service() else {"configured": False},
+            "ticket_prefetch": get_ticket_prefetcher().get_stats() if get_ticket_prefetcher() else {"enabled": False},
+            "tracing": get_tracer().get_stats(),
             "models": {
                 "available": ["flash", "reasoning"],
                 "default": "flash"
@@ -81,6 +107,8 @@ async def get_stats() -> Dict[str, Any]:
         }
         
     except Exception as e:
-        return {
+        stats = {
             "error": str(e)
         }
+    
+    return conditional_response(request, stats, cache_control="private, no-cache")
@@ -0,0 +1,430 @@
+"""
+Catalog Query Engine - Typed columns and vectorized multi-attribute filters
+
+ProductDatabase answers "which product is 10.FGC.4003CP?"; questions like
+"all matte black kitchen faucets under $400" need predicates over the
+whole catalog. CatalogQueryEngine builds a column-oriented view of
+catalog_df once at load time:
+- numeric columns (prices, dimensions, weight, ...) parsed to float64
+  arrays (currency / unit text stripped, NaN when missing)
+- categorical columns (finish, category levels, collection, ...) encoded
+  as int32 codes over a category list, matched case-insensitively
+- YES/NO and boolean flags as bool arrays
+- identifiers and titles as lower-cased text for substring matches
+
+A query is a list of {"field", "op", "value"} predicates ANDed into one
+boolean mask with numpy (a categorical predicate is evaluated once per
+category, then gathered through the codes), followed by a lexsort and a
+page slice. parse_text() turns the constraints in a free-text question
+(finish, category, price bounds) into the same predicates, so the
+orchestrator can put matching rows in front of the LLM.
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Query field -> catalog column
+NUMERIC_FIELDS = {
+    "price": "List_Price",
+    "map_price": "MAP_Price",
+    "cad_price": "CAD_List_Price",
+    "height": "Product_Height_Inches",
+    "length": "Product_Length_Inches",
+    "width": "Product_Width_Inches",
+    "weight": "Package_Weight_lbs",
+    "flow_rate": "Flow_Rate_GPM",
+    "holes": "Holes_Needed_For_Installation",
+    "popularity": "Popularity"
+}
+CATEGORICAL_FIELDS = {
+    "finish": "Finish",
+    "product_category": "Product_Category",
+    "subcategory": "Sub_Product_Category",
+    "type": "Sub_Sub_Product_Category",
+    "collection": "Collection",
+    "style": "Style",
+    "status": "Product_Status"
+}
+BOOLEAN_FIELDS = {
+    "sell_online": "Can_Sell_Online",
+    "on_website": "Display_On_Website",
+    "special_finish": "Is_Special_Finish",
+    "spare_part": "Is_Spare_Part",
+    "touch": "IS_Touch_Capable"
+}
+TEXT_FIELDS = {
+    "model_number": "Model_NO",
+    "family": "Common_Group_Number",
+    "title": "Product_Title"
+}
+
+# "category" matches any of the three category levels
+CATEGORY_LEVELS = ("product_category", "subcategory", "type")
+
+OPERATORS = ("eq", "ne", "in", "not_in", "lt", "lte", "gt", "gte", "between", "contains", "exists")
+
+DEFAULT_FIELDS = (
+    "model_number", "title", "finish", "product_category", "subcategory", "type",
+    "collection", "price", "map_price", "status"
+)
+
+# Category values too generic to recognise in free text
+_GENERIC_CATEGORIES = {"other", "inch"}
+
+
+def parse_numeric(series: pd.Series) -> np.ndarray:
+    """Float64 array from a column of numbers or text like "$1,299.00" / '8"' (NaN if unparseable)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    cleaned = series.astype("string").str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def parse_flag(series: pd.Series) -> np.ndarray:
+    """Bool array from a YES/NO, true/false, 1/0 or boolean column (missing = False)"""
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=bool)
+    text = series.astype("string").str.strip().str.lower()
+    return text.isin(["yes", "y", "true", "1", "1.0"]).to_numpy(dtype=bool)
+
+
+@dataclass
+class _Categorical:
+    codes: np.ndarray  # int32, -1 = missing
+    categories: List[str]
+    lowered: np.ndarray  # categories, lower-cased (object array)
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "_Categorical":
+        values = series.astype("string").str.strip()
+        codes, categories = pd.factorize(values, sort=True)
+        categories = [str(c) for c in categories]
+        return cls(
+            codes=codes.astype(np.int32),
+            categories=categories,
+            lowered=np.array([c.lower() for c in categories], dtype=object)
+        )
+
+    def mask(self, category_mask: np.ndarray) -> np.ndarray:
+        """Row mask from a per-category mask (missing rows never match)"""
+        lookup = np.append(category_mask, False)  # code -1 -> last slot
+        return lookup[self.codes]
+
+
+class CatalogQueryEngine:
+    """
+    Column-oriented, typed view of the catalog with vectorized filtering.
+    """
+
+    def __init__(self, catalog_df: pd.DataFrame):
+        """
+        Args:
+            catalog_df: ProductDatabase.catalog_df (columns missing from it
+                        are simply not queryable)
+        """
+        started = time.perf_counter()
+        self.size = len(catalog_df)
+        self.numeric: Dict[str, np.ndarray] = {
+            field: parse_numeric(catalog_df[column])
+            for field, column in NUMERIC_FIELDS.items() if column in catalog_df.columns
+        }
+        self.categorical: Dict[str, _Categorical] = {
+            field: _Categorical.from_series(catalog_df[column])
+            for field, column in CATEGORICAL_FIELDS.items() if column in catalog_df.columns
+        }
+        self.boolean: Dict[str, np.ndarray] = {
+            field: parse_flag(catalog_df[column])
+            for field, column in BOOLEAN_FIELDS.items() if column in catalog_df.columns
+        }
+        self.text: Dict[str, np.ndarray] = {}
+        self._text_lower: Dict[str, np.ndarray] = {}
+        for field, column in TEXT_FIELDS.items():
+            if column in catalog_df.columns:
+                values = catalog_df[column].astype("string").fillna("")
+                self.text[field] = values.to_numpy(dtype=object)
+                self._text_lower[field] = values.str.lower().to_numpy(dtype=object)
+
+        self.stats = {"queries": 0, "rows_matched": 0, "total_ms": 0.0}
+        self._text_pattern, self._text_groups = self._compile_text_pattern()
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    @property
+    def fields(self) -> List[str]:
+        """Every queryable field name"""
+        names = [*self.numeric, *self.categorical, *self.boolean, *self.text]
+        if any(level in self.categorical for level in CATEGORY_LEVELS):
+            names.append("category")
+        return names
+
+    def query(
+        self,
+        filters: Sequence[Dict[str, Any]] = (),
+        sort: Sequence[str] = ("-popularity",),
+        limit: int = 50,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Filter, sort and page the catalog.
+
+        Args:
+            filters: [{"field", "op", "value"}], ANDed
+            sort: Field names, "-" prefix for descending (missing values last)
+            limit: Rows returned
+            offset: Rows skipped
+            fields: Fields per row (default: DEFAULT_FIELDS)
+
+        Returns:
+            {"total", "rows", "filters", "sort", "elapsed_ms"}
+
+        Raises:
+            ValueError: Unknown field, operator or malformed value
+        """
+        started = time.perf_counter()
+        mask = np.ones(self.size, dtype=bool)
+        for predicate in filters:
+            mask &= self._mask(predicate)
+        matched = np.flatnonzero(mask)
+
+        if sort and len(matched):
+            keys = [self._sort_key(name)[matched] for name in reversed(sort)]
+            matched = matched[np.lexsort(keys)]
+
+        page = matched[offset:offset + limit]
+        rows = self.rows(page, fields)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stats["queries"] += 1
+        self.stats["rows_matched"] += len(matched)
+        self.stats["total_ms"] += elapsed
+        return {
+            "total": int(len(matched)),
+            "rows": rows,
+            "filters": list(filters),
+            "sort": list(sort),
+            "elapsed_ms": round(elapsed, 3)
+        }
+
+    def rows(self, positions: np.ndarray, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Row dicts for catalog positions, typed values (None when missing)"""
+        if not fields:
+            # The default set only names the columns this catalog has
+            available = set(self.fields)
+            fields = [f for f in DEFAULT_FIELDS if f in available]
+        fields = [f for f in fields if f != "category"]
+        columns = {}
+        for field in fields:
+            kind = self._kind(field)
+            if kind == "numeric":
+                values = self.numeric[field][positions]
+                columns[field] = [None if np.isnan(v) else float(v) for v in values]
+            elif kind == "categorical":
+                cat = self.categorical[field]
+                columns[field] = [cat.categories[c] if c >= 0 else None for c in cat.codes[positions]]
+            elif kind == "boolean":
+                columns[field] = [bool(v) for v in self.boolean[field][positions]]
+            else:
+                columns[field] = [v or None for v in self.text[field][positions]]
+        return [{field: columns[field][i] for field in fields} for i in range(len(positions))]
+
+    def _kind(self, field: str) -> str:
+        if field in self.numeric:
+            return "numeric"
+        if field in self.categorical:
+            return "categorical"
+        if field in self.boolean:
+            return "boolean"
+        if field in self.text:
+            return "text"
+        raise ValueError(f"Unknown field: {field}")
+
+    def _mask(self, predicate: Dict[str, Any]) -> np.ndarray:
+        field = predicate.get("field")
+        op = predicate.get("op", "eq")
+        value = predicate.get("value")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+
+        if field == "category":
+            levels = [level for level in CATEGORY_LEVELS if level in self.categorical]
+            if not levels:
+                raise ValueError("Unknown field: category")
+            # ne / not_in: no level matches (a blank level does not hide the row)
+            negate = op in ("ne", "not_in")
+            level_op = {"ne": "eq", "not_in": "in"}.get(op, op)
+            mask = np.zeros(self.size, dtype=bool)
+            for level in levels:
+                mask |= self._mask({"field": level, "op": level_op, "value": value})
+            return ~mask if negate else mask
+
+        kind = self._kind(field)
+        if kind == "numeric":
+            return self._numeric_mask(self.numeric[field], op, value, field)
+        if kind == "categorical":
+            cat = self.categorical[field]
+            if op == "exists":
+                return (cat.codes >= 0) == bool(True if value is None else value)
+            return cat.mask(self._string_mask(cat.lowered, op, value, field))
+        if kind == "boolean":
+            if op not in ("eq", "ne"):
+                raise ValueError(f"Operator {op} not supported for boolean field {field}")
+            flags = self.boolean[field]
+            return flags == bool(value) if op == "eq" else flags != bool(value)
+        lowered = self._text_lower[field]
+        if op == "exists":
+            return (lowered != "") == bool(True if value is None else value)
+        return self._string_mask(lowered, op, value, field)
+
+    @staticmethod
+    def _numeric_mask(values: np.ndarray, op: str, value: Any, field: str) -> np.ndarray:
+        if op == "exists":
+            return ~np.isnan(values) == bool(True if value is None else value)
+        try:
+            if op == "between":
+                low, high = (float(v) for v in value)
+                return (values >= low) & (values <= high)
+            if op in ("in", "not_in"):
+                inside = np.isin(values, [float(v) for v in value])
+                return inside if op == "in" else ~inside
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Bad value for {field} {op}: {value!r}")
+        comparisons = {
+            "eq": values == number, "ne": values != number,
+            "lt": values < number, "lte": values <= number,
+            "gt": values > number, "gte": values >= number
+        }
+        if op not in comparisons:
+            raise ValueError(f"Operator {op} not supported for numeric field {field}")
+        return comparisons[op]
+
+    @staticmethod
+    def _string_mask(lowered: np.ndarray, op: str, value: Any, field: str) -> np.ndarray:
+        """Case-insensitive comparison over an object array of lower-cased strings"""
+        if op in ("in", "not_in"):
+            if isinstance(value, str) or not isinstance(value, (list, tuple)):
+                raise ValueError(f"{op} on {field} needs a list of values")
+            inside = np.isin(lowered, [str(v).strip().lower() for v in value])
+            return inside if op == "in" else ~inside
+        if value is None:
+            raise ValueError(f"Missing value for {field} {op}")
+        needle = str(value).strip().lower()
+        if op == "eq":
+            return lowered == needle
+        if op == "ne":
+            return lowered != needle
+        if op == "contains":
+            return np.fromiter((needle in s for s in lowered), dtype=bool, count=len(lowered))
+        raise ValueError(f"Operator {op} not supported for field {field}")
+
+    def _sort_key(self, name: str) -> np.ndarray:
+        descending = name.startswith("-")
+        field = name.lstrip("-+")
+        kind = self._kind(field)
+        if kind == "numeric":
+            key = self.numeric[field].copy()
+        elif kind == "categorical":
+            cat = self.categorical[field]
+            key = np.where(cat.codes >= 0, cat.codes, np.nan).astype(np.float64)  # categories are sorted
+        elif kind == "boolean":
+            key = self.boolean[field].astype(np.float64)
+        else:
+            codes, _ = pd.factorize(self._text_lower[field], sort=True)
+            key = codes.astype(np.float64)
+        if descending:
+            key = -key
+        return np.where(np.isnan(key), np.inf, key)
+
+    # -- Free text ----------------------------------------------------------
+
+    def _compile_text_pattern(self) -> Tuple[Optional["re.Pattern[str]"], Dict[str, Tuple[str, str]]]:
+        """One longest-first alternation over finish and category phrases"""
+        phrases: List[Tuple[str, str, str]] = []  # (regex, field, category value)
+        for field in ("finish", *CATEGORY_LEVELS):
+            cat = self.categorical.get(field)
+            if cat is None:
+                continue
+            for category in cat.categories:
+                # Sizes and stray letters ('8"', "Combo's") are not how agents name a category
+                words = [w for w in re.findall(r"[a-z0-9]+", category.lower()) if len(w) > 1 and not w.isdigit()]
+                if field == "finish":
+                    words = [w for w in words if w != "pvd"]
+                if not words or " ".join(words) in _GENERIC_CATEGORIES:
+                    continue
+                # Singular / plural either way: "faucet" matches "Faucets"
+                regex = r"[\W_]+".join(re.escape(w[:-1] if w.endswith("s") else w) + "s?" for w in words)
+                phrases.append((regex, field, category))
+
+        if not phrases:
+            return None, {}
+        phrases.sort(key=lambda p: len(p[0]), reverse=True)
+        groups = {}
+        alternatives = []
+        for i, (regex, field, category) in enumerate(phrases):
+            groups[f"p{i}"] = (field, category)
+            alternatives.append(f"(?P<p{i}>{regex})")
+        return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE), groups
+
+    _PRICE = r"\$?\s*(\d[\d,]*(?:\.\d+)?)"
+    _PRICE_BETWEEN = re.compile(r"\bbetween\s+" + _PRICE + r"\s+and\s+" + _PRICE, re.IGNORECASE)
+    _PRICE_MAX = re.compile(r"(?:\b(?:under|below|less\s+than|cheaper\s+than|up\s+to|at\s+most|max(?:imum)?)|<=?)\s*" + _PRICE, re.IGNORECASE)
+    _PRICE_MIN = re.compile(r"(?:\b(?:over|above|more\s+than|at\s+least|min(?:imum)?)|>=?)\s*" + _PRICE, re.IGNORECASE)
+
+    def parse_text(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Predicates for the catalog constraints named in a question.
+
+        Recognises finishes ("matte black", "brushed nickel"), category
+        names at any level ("kitchen faucets", "shower heads") and price
+        bounds ("under $400", "over 200", "between $200 and $400").
+        Several values of one field are ORed ("in").
+
+        Returns:
+            [{"field", "op", "value"}] (empty if nothing recognised)
+        """
+        filters: List[Dict[str, Any]] = []
+        if self._text_pattern is not None:
+            found: Dict[str, List[str]] = {}
+            for match in self._text_pattern.finditer(text):
+                field, category = self._text_groups[match.lastgroup]
+                # A phrase found at several category levels counts once, as "category"
+                field = "category" if field in CATEGORY_LEVELS else field
+                if category not in found.setdefault(field, []):
+                    found[field].append(category)
+            for field, values in found.items():
+                if len(values) == 1:
+                    filters.append({"field": field, "op": "eq", "value": values[0]})
+                else:
+                    filters.append({"field": field, "op": "in", "value": values})
+
+        if "price" in self.numeric:
+            number = lambda s: float(s.replace(",", ""))
+            between = self._PRICE_BETWEEN.search(text)
+            if between:
+                low, high = sorted((number(between.group(1)), number(between.group(2))))
+                filters.append({"field": "price", "op": "between", "value": [low, high]})
+            else:
+                upper = self._PRICE_MAX.search(text)
+                if upper:
+                    filters.append({"field": "price", "op": "lte", "value": number(upper.group(1))})
+                lower = self._PRICE_MIN.search(text)
+                if lower:
+                    filters.append({"field": "price", "op": "gte", "value": number(lower.group(1))})
+        return filters
+
+    def get_stats(self) -> Dict[str, Any]:
+        queries = self.stats["queries"]
+        return {
+            "rows": self.size,
+            "fields": len(self.fields),
+            "build_ms": self.build_ms,
+            "queries": queries,
+            "avg_query_ms": round(self.stats["total_ms"] / queries, 3) if queries else 0.0,
+            "avg_rows_matched": round(self.stats["rows_matched"] / queries, 1) if queries else 0.0
+        }
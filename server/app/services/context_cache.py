@@ -0,0 +1,260 @@
+"""
+Context Cache - Provider-side caching of static prompt prefixes
+
+Synthesis calls repeat the same system instruction and, for popular
+products, the same specification block. This manager stores such
+prefixes as Gemini cached contents (client.aio.caches) so later calls
+only send the variable part (excerpts + query) and pay the cached-token
+rate for the rest.
+
+- A prefix is cached once it has been seen promote_after times and is
+  at least min_tokens long (the provider rejects smaller caches).
+- Entries are refreshed (TTL extended) when used within
+  refresh_margin_seconds of expiry; unused entries simply expire.
+- Creation failures are remembered for failure_ttl_seconds so a
+  rejected prefix is not retried on every request (but a transient API
+  error does not disable caching for it for good).
+
+Per-prefix bookkeeping is bounded: locks exist only while a prefix has
+an acquire() in progress, and seen counts / failures keep at most
+max_entries * 20 prefixes (oldest dropped first).
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from google.genai import types
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)"""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class CachedPrefix:
+    """A provider-side cached context"""
+
+    name: str
+    model: str
+    expires_at: float  # Unix time
+    tokens: int
+    uses: int = 0
+
+
+class ContextCacheManager:
+    """
+    Creates, reuses and refreshes cached contexts for
+    (model, system instruction, stable prefix) combinations.
+    """
+
+    def __init__(
+        self,
+        caches_api: Any,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        min_tokens: int = 1024,
+        promote_after: int = 2,
+        max_entries: int = 100,
+        failure_ttl_seconds: float = 600.0
+    ):
+        """
+        Args:
+            caches_api: Async caches API (genai client.aio.caches or a compatible fake)
+            ttl_seconds: TTL requested on create / refresh
+            refresh_margin_seconds: Extend TTL when this close to expiry
+            min_tokens: Smallest prefix worth caching (provider minimum)
+            promote_after: Times a prefix must be seen before it is cached
+            max_entries: Live cached contexts kept (oldest deleted first)
+            failure_ttl_seconds: How long a prefix whose creation failed is
+                                 sent uncached before creation is retried
+        """
+        self.caches_api = caches_api
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.min_tokens = min_tokens
+        self.promote_after = promote_after
+        self.max_entries = max_entries
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.max_tracked = max_entries * 20
+
+        self.entries: "OrderedDict[str, CachedPrefix]" = OrderedDict()
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._failed: "OrderedDict[str, float]" = OrderedDict()  # key -> retry after (unix time)
+        self._locks: Dict[str, List[Any]] = {}  # key -> [lock, acquire() calls holding or waiting]
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "refreshed": 0,
+            "expired": 0,
+            "failed": 0,
+            "skipped_small": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0
+        }
+
+    @staticmethod
+    def cache_key(model: str, system_prompt: str, prefix: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, prefix):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _ttl(self) -> str:
+        return f"{self.ttl_seconds}s"
+
+    @staticmethod
+    def _expiry(cached: Any, fallback: float) -> float:
+        expire_time = getattr(cached, "expire_time", None)
+        return expire_time.timestamp() if expire_time else fallback
+
+    async def acquire(self, model: str, system_prompt: str, prefix: str = "") -> Optional[str]:
+        """
+        Cached content name covering system_prompt + prefix, or None if
+        the caller should send the full prompt uncached.
+        """
+        tokens = estimate_tokens(system_prompt) + estimate_tokens(prefix)
+        if tokens < self.min_tokens:
+            self.stats["skipped_small"] += 1
+            return None
+
+        key = self.cache_key(model, system_prompt, prefix)
+        async with self._key_lock(key):
+            entry = self.entries.get(key)
+            now = time.time()
+
+            if entry and entry.expires_at - now > self.refresh_margin_seconds:
+                entry.uses += 1
+                self.entries.move_to_end(key)
+                self.stats["reused"] += 1
+                return entry.name
+
+            if entry:
+                # Already proven popular: refresh, or recreate if refresh is impossible
+                if entry.expires_at > now and await self._refresh(key, entry):
+                    return entry.name
+                if entry.expires_at <= now:
+                    self.stats["expired"] += 1
+                self.entries.pop(key, None)
+                return await self._create(key, model, system_prompt, prefix, tokens)
+
+            retry_at = self._failed.get(key)
+            if retry_at is not None:
+                if retry_at > now:
+                    return None
+                del self._failed[key]
+
+            seen = self._seen.pop(key, 0) + 1
+            self._seen[key] = seen
+            while len(self._seen) > self.max_tracked:
+                self._seen.popitem(last=False)
+            if seen < self.promote_after:
+                return None
+
+            return await self._create(key, model, system_prompt, prefix, tokens)
+
+    @asynccontextmanager
+    async def _key_lock(self, key: str) -> AsyncIterator[None]:
+        """Serialize acquire() per prefix; the lock is dropped once no call holds or awaits it"""
+        slot = self._locks.get(key)
+        if slot is None:
+            slot = self._locks[key] = [asyncio.Lock(), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                yield
+        finally:
+            slot[1] -= 1
+            if not slot[1]:
+                del self._locks[key]
+
+    async def _create(self, key: str, model: str, system_prompt: str, prefix: str, tokens: int) -> Optional[str]:
+        config = types.CreateCachedContentConfig(
+            system_instruction=system_prompt,
+            contents=[types.Content(role="user", parts=[types.Part(text=prefix)])] if prefix else None,
+            ttl=self._ttl(),
+            display_name=f"agent-assist-{key[:12]}"
+        )
+        try:
+            cached = await self.caches_api.create(model=model, config=config)
+        except Exception as e:
+            print(f"⚠ Context cache create failed ({model}, ~{tokens} tokens): {e}")
+            self._failed.pop(key, None)
+            self._failed[key] = time.time() + self.failure_ttl_seconds
+            while len(self._failed) > self.max_tracked:
+                self._failed.popitem(last=False)
+            self.stats["failed"] += 1
+            return None
+
+        usage = getattr(cached, "usage_metadata", None)
+        self.entries[key] = CachedPrefix(
+            name=cached.name,
+            model=model,
+            expires_at=self._expiry(cached, time.time() + self.ttl_seconds),
+            tokens=getattr(usage, "total_token_count", None) or tokens,
+            uses=1
+        )
+        self._seen.pop(key, None)
+        self.stats["created"] += 1
+        await self._evict()
+        return cached.name
+
+    async def _refresh(self, key: str, entry: CachedPrefix) -> bool:
+        try:
+            cached = await self.caches_api.update(
+                name=entry.name,
+                config=types.UpdateCachedContentConfig(ttl=self._ttl())
+            )
+        except Exception as e:
+            print(f"⚠ Context cache refresh failed for {entry.name}: {e}")
+            return False
+        entry.expires_at = self._expiry(cached, time.time() + self.ttl_seconds)
+        entry.uses += 1
+        self.entries.move_to_end(key)
+        self.stats["refreshed"] += 1
+        return True
+
+    async def _evict(self) -> None:
+        while len(self.entries) > self.max_entries:
+            _, entry = self.entries.popitem(last=False)
+            await self._delete(entry.name)
+
+    async def _delete(self, name: str) -> None:
+        try:
+            await self.caches_api.delete(name=name)
+        except Exception as e:
+            print(f"⚠ Context cache delete failed for {name}: {e}")
+
+    def invalidate(self, name: str) -> None:
+        """Forget a cached content the provider no longer accepts"""
+        for key, entry in list(self.entries.items()):
+            if entry.name == name:
+                del self.entries[key]
+
+    def record_usage(self, usage_metadata: Any) -> None:
+        """Accumulate prompt / cached token counts from a response"""
+        if usage_metadata is None:
+            return
+        self.stats["prompt_tokens"] += getattr(usage_metadata, "prompt_token_count", None) or 0
+        self.stats["cached_tokens"] += getattr(usage_metadata, "cached_content_token_count", None) or 0
+
+    async def close(self) -> None:
+        """Delete every live cached context (storage is billed until expiry)"""
+        for entry in list(self.entries.values()):
+            await self._delete(entry.name)
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["live_entries"] = len(self.entries)
+        stats["failed_prefixes"] = len(self._failed)
+        stats["cached_token_ratio"] = (
+            round(stats["cached_tokens"] / stats["prompt_tokens"], 4) if stats["prompt_tokens"] else 0.0
+        )
+        return stats
@@ -5,16 +5,29 @@ Loads product catalog (CSV) and media assets (JSON) into memory
 at startup for fast product lookup and retrieval.
 """
 
-import json
+import hashlib
 import os
 import re
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
+from collections import Counter, defaultdict
 from fuzzywuzzy import fuzz
 
+from . import tracing
+from .catalog_query import CatalogQueryEngine
+from .manifest import compact_manifest_item, iter_manifest_items
+from .model_trie import ModelTrie
+from .related_products import RelatedProductsIndex
+
+
+# Model-number-like tokens in free text: "10.FGC.4003CP", "GC-303-T", "B1200SS"
+_MODEL_TOKEN = re.compile(r'[A-Za-z0-9]+(?:[.-][A-Za-z0-9]+)*')
+
 
 @dataclass
 class ProductContext:
@@ -25,6 +38,9 @@ class ProductContext:
     media: Dict[str, List[Dict]] = field(default_factory=dict)
     documents: List[Dict] = field(default_factory=list)
     matched_confidence: float = 0.0
+    base_model: Optional[str] = None  # Finish-independent family model number
+    variants: List[Dict] = field(default_factory=list)  # Sibling finishes + differing specs
+    alternatives: List[Dict] = field(default_factory=list)  # Similar products from other families
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
@@ -33,7 +49,10 @@ class ProductContext:
             "specs": self.specs,
             "media": self.media,
             "documents": self.documents,
-            "matched_confidence": self.matched_confidence
+            "matched_confidence": self.matched_confidence,
+            "base_model": self.base_model,
+            "variants": self.variants,
+            "alternatives": self.alternatives
         }
 
 
@@ -58,6 +77,16 @@ class ProductDatabase:
         self.media_data: Dict[str, Any] = {}
         self.catalog_df: Optional[pd.DataFrame] = None
         self.model_index: Dict[str, str] = {}  # Normalized model -> Original model
+        self.catalog_version: Optional[str] = None  # Content hash of loaded source files
+        self.model_trie = ModelTrie()  # Prefix autocomplete over model_index
+        self._suggest_info: Dict[str, Dict[str, Any]] = {}  # Model -> title/finish for suggestions
+        self._row_index: Dict[str, int] = {}  # Model -> first catalog row position
+        self.family_index: Dict[str, List[str]] = {}  # Base model -> finish variants
+        self.model_family: Dict[str, str] = {}  # Model -> base model
+        self._family_summaries: List[Dict[str, Any]] = []  # Sorted per-family summaries
+        self.catalog_query: Optional[CatalogQueryEngine] = None  # Typed columns for spec filters
+        self.related_products: Optional[RelatedProductsIndex] = None  # Precomputed alternatives
+        self.load_timings: Dict[str, float] = {}  # load_data() stage -> milliseconds
         self.loaded = False
         
     def load_data(self) -> None:
@@ -65,29 +94,45 @@ class ProductDatabase:
         try:
             # Load media data (JSON) - metadata_manifest.json format
             media_path = self.data_dir / "metadata_manifest.json"
-            if media_path.exists():
-                with open(media_path, 'r', encoding='utf-8') as f:
-                    raw_data = json.load(f)
-                    # Transform the data structure: extract metadata by Model_NO
-                    for item in raw_data:
-                        if 'metadata' in item and 'Model_NO' in item['metadata']:
-                            model_no = item['metadata']['Model_NO']
-                            # Store the complete item including originalUrl, savedAs, and metadata
-                            self.media_data[model_no] = item
-                print(f"✓ Loaded {len(self.media_data)} products from metadata_manifest.json")
-            else:
-                print(f"⚠ Media file not found: {media_path}")
+            with self._timed("manifest"):
+                if media_path.exists():
+                    # Streamed item by item; only the media / document fields are kept
+                    for item in iter_manifest_items(media_path):
+                        record = compact_manifest_item(item)
+                        if record:
+                            self.media_data[record['metadata']['Model_NO']] = record
+                    print(f"✓ Loaded {len(self.media_data)} products from metadata_manifest.json")
+                else:
+                    print(f"⚠ Media file not found: {media_path}")
             
             # Load catalog data (Excel) - Product-2025-11-12.xlsx
             catalog_path = self.data_dir / "Product-2025-11-12.xlsx"
-            if catalog_path.exists():
-                self.catalog_df = pd.read_excel(catalog_path)
-                print(f"✓ Loaded {len(self.catalog_df)} products from Excel catalog")
-            else:
-                print(f"⚠ Catalog file not found: {catalog_path}")
+            with self._timed("catalog"):
+                if catalog_path.exists():
+                    self.catalog_df = pd.read_excel(catalog_path)
+                    print(f"✓ Loaded {len(self.catalog_df)} products from Excel catalog")
+                else:
+                    print(f"⚠ Catalog file not found: {catalog_path}")
             
             # Build model index for fast lookup
-            self._build_model_index()
+            with self._timed("model_index"):
+                self._build_model_index()
+            with self._timed("suggest_index"):
+                self._build_suggest_index()
+            with self._timed("family_index"):
+                self._build_family_index()
+            if self.catalog_df is not None:
+                with self._timed("catalog_query"):
+                    self.catalog_query = CatalogQueryEngine(self.catalog_df)
+                print(f"✓ Built catalog query view: {self.catalog_query.size} rows, "
+                      f"{len(self.catalog_query.fields)} fields in {self.catalog_query.build_ms}ms")
+                with self._timed("related_products"):
+                    self.related_products = RelatedProductsIndex(self.catalog_query, self.model_family)
+                print(f"✓ Built related products index: top {self.related_products.top_k} for "
+                      f"{len(self.catalog_df)} products in {self.related_products.build_ms}ms")
+            
+            with self._timed("catalog_version"):
+                self.catalog_version = self._compute_catalog_version([media_path, catalog_path])
             
             self.loaded = True
             print(f"✓ Product database loaded successfully")
@@ -96,6 +141,16 @@ class ProductDatabase:
             print(f"✗ Error loading product database: {e}")
             raise
     
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        """Record a load_data() stage's duration in load_timings (and trace it)"""
+        started = time.perf_counter()
+        try:
+            with tracing.span(f"catalog.load.{stage}"):
+                yield
+        finally:
+            self.load_timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+    
     def _build_model_index(self) -> None:
         """Build normalized model number index for fuzzy matching"""
         # Index from CSV
@@ -111,6 +166,215 @@ class ProductDatabase:
         
         print(f"✓ Built model index with {len(self.model_index)} entries")
     
+    def _build_suggest_index(self) -> None:
+        """Build the autocomplete trie, ranked by the catalog Popularity column"""
+        popularity: Dict[str, float] = {}
+        self._suggest_info = {}
+        if self.catalog_df is not None:
+            columns = [c for c in ('Model_NO', 'Product_Title', 'Finish', 'Popularity') if c in self.catalog_df.columns]
+            for row in self.catalog_df[columns].itertuples(index=False):
+                record = row._asdict()
+                model = record['Model_NO']
+                if pd.isna(model):
+                    continue
+                popularity[model] = float(record.get('Popularity', 0) or 0)
+                self._suggest_info[model] = {
+                    "title": record.get('Product_Title') if pd.notna(record.get('Product_Title')) else None,
+                    "finish": record.get('Finish') if pd.notna(record.get('Finish')) else None
+                }
+        self.model_trie.build(self.model_index, popularity)
+        print(f"✓ Built autocomplete trie with {self.model_trie.size} models")
+    
+    def _build_family_index(self) -> None:
+        """
+        Group finish variants (10.FGC.4003CP / BN / MB ...) under a base model.
+        
+        Finish suffix codes are learned from the catalog: for rows whose
+        Common_Group_Number is a prefix of Model_NO, the remainder is the code
+        for that row's Finish ("Chrome" -> "CP"). Every model is then reduced
+        to a base by stripping a known code for its own Finish, falling back
+        to Common_Group_Number, then to the model itself.
+        """
+        self._row_index = {}
+        self.family_index = {}
+        self.model_family = {}
+        if self.catalog_df is None:
+            return
+        
+        df = self.catalog_df
+        models = df['Model_NO'].tolist()
+        finishes = df['Finish'].tolist() if 'Finish' in df.columns else [None] * len(df)
+        groups = df['Common_Group_Number'].tolist() if 'Common_Group_Number' in df.columns else [None] * len(df)
+        
+        finish_codes: Dict[str, Counter] = defaultdict(Counter)
+        for model, finish, group in zip(models, finishes, groups):
+            if isinstance(model, str) and isinstance(group, str) and isinstance(finish, str) \
+                    and len(model) > len(group) and model.startswith(group):
+                finish_codes[finish][model[len(group):]] += 1
+        # Longest code first so "ADGR" is tried before "DGR"
+        codes_by_finish = {
+            finish: sorted(counter, key=len, reverse=True)
+            for finish, counter in finish_codes.items()
+        }
+        
+        families: Dict[str, List[str]] = defaultdict(list)
+        for position, (model, finish, group) in enumerate(zip(models, finishes, groups)):
+            if not isinstance(model, str) or model in self._row_index:
+                continue
+            self._row_index[model] = position
+            base = None
+            for code in codes_by_finish.get(finish, []):
+                if model.endswith(code) and len(model) > len(code):
+                    base = model[:-len(code)]
+                    break
+            if base is None:
+                base = group if isinstance(group, str) and model.startswith(group) else model
+            self.model_family[model] = base
+            families[base].append(model)
+        
+        self.family_index = dict(families)
+        self._build_family_summaries()
+        print(f"✓ Built family index: {len(self.family_index)} families "
+              f"from {len(self.model_family)} models")
+    
+    # Columns that always differ between variants and carry no comparison value
+    _VARIANT_SKIP_PREFIXES = ('Model_NO', 'Image_URL', 'product_image_', 'product_url', 'Sub_UPC_')
+    
+    def _get_catalog_record(self, model_number: str) -> Dict[str, Any]:
+        """Non-NaN catalog columns for a model (empty if not in the catalog)"""
+        position = self._row_index.get(model_number)
+        if position is None or self.catalog_df is None:
+            return {}
+        record = self.catalog_df.iloc[position].to_dict()
+        return {k: v for k, v in record.items() if pd.notna(v)}
+    
+    def get_variants(self, model_number: str, specs: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Sibling finish variants with the specs that differ from this model.
+        
+        Args:
+            model_number: Model to compare against
+            specs: This model's specs, if already loaded
+            
+        Returns:
+            [{"model_number", "finish", "differing_specs": {...}}]
+        """
+        base = self.model_family.get(model_number)
+        if not base:
+            return []
+        specs = specs if specs is not None else self._get_catalog_record(model_number)
+        
+        variants = []
+        for sibling in self.family_index.get(base, []):
+            if sibling == model_number:
+                continue
+            sibling_specs = self._get_catalog_record(sibling)
+            differing = {
+                key: value for key, value in sibling_specs.items()
+                if not key.startswith(self._VARIANT_SKIP_PREFIXES) and specs.get(key) != value
+            }
+            variants.append({
+                "model_number": sibling,
+                "finish": sibling_specs.get('Finish'),
+                "differing_specs": differing
+            })
+        return variants
+
+    # Finish words that don't distinguish one finish from another
+    _FINISH_NOISE_WORDS = {"pvd", "finish"}
+
+    def find_variant(self, product: ProductContext, query: str) -> Optional[ProductContext]:
+        """
+        Resolve a finish mentioned in a follow-up ("what about the brushed
+        nickel one?") to a member of product's family.
+
+        Args:
+            product: Product currently under discussion
+            query: Follow-up query
+
+        Returns:
+            ProductContext of the named finish, or None if no finish (or an
+            ambiguous one, e.g. just "nickel") is mentioned
+        """
+        query_words = set(re.findall(r'[a-z]+', query.lower()))
+        candidates = [(product.model_number, product.specs.get('Finish'))]
+        candidates += [(v["model_number"], v.get("finish")) for v in product.variants]
+
+        scored = []
+        for model, finish in candidates:
+            words = set(re.findall(r'[a-z]+', str(finish or '').lower())) - self._FINISH_NOISE_WORDS
+            matched = len(words & query_words)
+            if words and matched:
+                scored.append((matched / len(words), matched, model))
+        if not scored:
+            return None
+
+        scored.sort(reverse=True)
+        if len(scored) > 1 and scored[0][:2] == scored[1][:2]:
+            return None
+        best_fraction, _, model = scored[0]
+        if best_fraction < 0.5:
+            return None
+        if model == product.model_number:
+            return product
+        return self.get_product_by_model(model)
+    
+    def list_families(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        One summary per product family, optionally filtered by category.
+        
+        Returns:
+            [{"base_model", "title", "category", "variants": [{"model_number", "finish", "list_price"}]}]
+        """
+        if not category or self.catalog_df is None:
+            return self._family_summaries
+        
+        allowed = set(self.catalog_df.loc[self._category_mask(category), 'Model_NO'])
+        families = []
+        for summary in self._family_summaries:
+            variants = [v for v in summary["variants"] if v["model_number"] in allowed]
+            if variants:
+                families.append({**summary, "variants": variants})
+        return families
+    
+    def _build_family_summaries(self) -> None:
+        """Precompute list_families() output for paging"""
+        df = self.catalog_df
+        column = lambda name: df[name].tolist() if name in df.columns else [None] * len(df)
+        titles, finishes = column('Product_Title'), column('Finish')
+        categories, prices = column('Product_Category'), column('List_Price')
+        clean = lambda value: value if pd.notna(value) else None
+        
+        self._family_summaries = []
+        for base in sorted(self.family_index):
+            members = self.family_index[base]
+            first = self._row_index[members[0]]
+            self._family_summaries.append({
+                "base_model": base,
+                "title": clean(titles[first]),
+                "category": clean(categories[first]),
+                "variants": [
+                    {
+                        "model_number": m,
+                        "finish": clean(finishes[self._row_index[m]]),
+                        "list_price": clean(prices[self._row_index[m]])
+                    }
+                    for m in members
+                ]
+            })
+    
+    @staticmethod
+    def _compute_catalog_version(paths: List[Path]) -> str:
+        """Hash source file contents so derived data can detect catalog changes"""
+        digest = hashlib.sha256()
+        for path in paths:
+            if path.exists():
+                digest.update(path.name.encode('utf-8'))
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+        return digest.hexdigest()[:16]
+    
     @staticmethod
     def _normalize_model(model: str) -> str:
         """Normalize model number for matching (remove dots, spaces, lowercase)"""
@@ -126,7 +390,7 @@ class ProductDatabase:
             return f'https://{url}'
         return url
     
-    def find_product(self, query: str) -> Optional[ProductContext]:
+    def find_product(self, query: str, record_hit: bool = True) -> Optional[ProductContext]:
         """
         Search for product model number in query using multiple strategies.
         
@@ -137,6 +401,8 @@ class ProductDatabase:
         
         Args:
             query: User query string
+            record_hit: Bump the match's suggestion popularity (off when
+                        called from a pool worker; the caller bumps it)
             
         Returns:
             ProductContext if found, None otherwise
@@ -144,8 +410,30 @@ class ProductDatabase:
         if not self.loaded:
             raise RuntimeError("Database not loaded. Call load_data() first.")
         
-        query_normalized = query.lower()
+        with tracing.span("catalog.find_product", **{"catalog.query_chars": len(query)}) as span:
+            best_match, best_confidence, strategy = self._match_model(query)
+            span.set_attributes({
+                "catalog.strategy": strategy,
+                "catalog.model": best_match,
+                "catalog.confidence": best_confidence
+            })
+            
+            # If match found, build ProductContext
+            if best_match and best_confidence > 0.5:
+                if record_hit:
+                    self.model_trie.record_hit(best_match)
+                return self._build_product_context(best_match, best_confidence)
+            
+            return None
+    
+    def _match_model(self, query: str) -> Tuple[Optional[str], float, str]:
+        """
+        find_product's matching strategies, in order.
         
+        Returns:
+            (model number or None, confidence, strategy: "exact" /
+             "pattern" / "fuzzy" / "none")
+        """
         # Strategy 1: Check if any known model is in the query (exact substring)
         best_match = None
         best_confidence = 0.0
@@ -157,53 +445,84 @@ class ProductDatabase:
                 if confidence > best_confidence:
                     best_match = original_model
                     best_confidence = confidence
+        if best_match:
+            return best_match, best_confidence, "exact"
         
         # Strategy 2: Regex pattern matching for common model formats
-        if not best_match:
-            # Patterns like: GC-303-T, 10.FGC.4003CP, FF-1234-CP
-            patterns = [
-                r'\b([A-Z]{2,3}[-.]?\d{3,4}[-.]?[A-Z]{1,3})\b',  # GC-303-T, FF-1234-CP
-                r'\b(\d{1,2}\.[A-Z]{2,3}\.\d{4}[A-Z]{2,3})\b',  # 10.FGC.4003CP
-                r'\b([A-Z]{2}-\d{4}-[A-Z]{2,3})\b'              # SD-5678-BN
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, query, re.IGNORECASE)
-                for match in matches:
-                    match_normalized = self._normalize_model(match)
-                    if match_normalized in self.model_index:
-                        best_match = self.model_index[match_normalized]
-                        best_confidence = 0.95
-                        break
-                if best_match:
-                    break
+        # Patterns like: GC-303-T, 10.FGC.4003CP, FF-1234-CP
+        patterns = [
+            r'\b([A-Z]{2,3}[-.]?\d{3,4}[-.]?[A-Z]{1,3})\b',  # GC-303-T, FF-1234-CP
+            r'\b(\d{1,2}\.[A-Z]{2,3}\.\d{4}[A-Z]{2,3})\b',  # 10.FGC.4003CP
+            r'\b([A-Z]{2}-\d{4}-[A-Z]{2,3})\b'              # SD-5678-BN
+        ]
+        
+        for pattern in patterns:
+            matches = re.findall(pattern, query, re.IGNORECASE)
+            for match in matches:
+                match_normalized = self._normalize_model(match)
+                if match_normalized in self.model_index:
+                    return self.model_index[match_normalized], 0.95, "pattern"
         
         # Strategy 3: Fuzzy matching as fallback
-        if not best_match and len(query) > 5:
+        if len(query) > 5:
             for normalized_model, original_model in self.model_index.items():
                 # Use fuzzy matching
                 ratio = fuzz.partial_ratio(normalized_model, self._normalize_model(query))
                 if ratio > 80 and ratio / 100.0 > best_confidence:
                     best_match = original_model
                     best_confidence = ratio / 100.0
+            if best_match:
+                return best_match, best_confidence, "fuzzy"
+        
+        return None, 0.0, "none"
+    
+    def mentions_model(self, text: str) -> bool:
+        """
+        Whether text names a catalog model number exactly (one model
+        index lookup per model-number-like token; no fuzzy matching).
+        """
+        return any(self._normalize_model(token) in self.model_index for token in _MODEL_TOKEN.findall(text))
+    
+    def find_products(self, text: str, limit: int = 3) -> List[ProductContext]:
+        """
+        Products named in a longer text (e.g. a ticket's subject and body).
         
-        # If match found, build ProductContext
-        if best_match and best_confidence > 0.5:
-            return self._build_product_context(best_match, best_confidence)
+        Each model-number-like token is looked up in the model index, so a
+        long description costs one dict lookup per token; if none is a
+        catalog model, falls back to find_product's matching.
         
-        return None
+        Args:
+            text: Free text
+            limit: Maximum products returned
+            
+        Returns:
+            ProductContexts in order of first mention (popularity is not
+            bumped: the text is not a search)
+        """
+        if not self.loaded:
+            raise RuntimeError("Database not loaded. Call load_data() first.")
+        
+        with tracing.span("catalog.find_products", **{"catalog.query_chars": len(text), "catalog.limit": limit}) as span:
+            models: List[str] = []
+            for token in _MODEL_TOKEN.findall(text):
+                model = self.model_index.get(self._normalize_model(token))
+                if model and model not in models:
+                    models.append(model)
+                    if len(models) >= limit:
+                        break
+            if models:
+                span.set_attributes({"catalog.strategy": "token", "catalog.models": models})
+                return [self._build_product_context(model, 1.0) for model in models]
+            
+            product = self.find_product(text, record_hit=False)
+            span.set_attribute("catalog.models", [product.model_number] if product else [])
+            return [product] if product else []
     
     def _build_product_context(self, model_number: str, confidence: float) -> ProductContext:
         """Build complete ProductContext from all data sources"""
         
-        # Get specs from Excel
-        specs = {}
-        if self.catalog_df is not None:
-            product_row = self.catalog_df[self.catalog_df['Model_NO'] == model_number]
-            if not product_row.empty:
-                specs = product_row.iloc[0].to_dict()
-                # Clean up NaN values
-                specs = {k: v for k, v in specs.items() if pd.notna(v)}
+        # Get specs from Excel (NaN values dropped)
+        specs = self._get_catalog_record(model_number)
         
         # Get media from JSON (metadata_manifest structure)
         media = {
@@ -266,31 +585,83 @@ class ProductDatabase:
             specs=specs,
             media=media,
             documents=documents,
-            matched_confidence=confidence
+            matched_confidence=confidence,
+            base_model=self.model_family.get(model_number),
+            variants=self.get_variants(model_number, specs),
+            alternatives=self.get_alternatives(model_number)
         )
     
+    def get_alternatives(self, model_number: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Similar active products from other families (precomputed at load).
+        
+        Returns:
+            [{"model_number", "title", "finish", "subcategory", "type",
+              "price", "status", "score", "shared"}] best first
+        """
+        if self.related_products is None:
+            return []
+        return self.related_products.get(model_number, limit)
+    
     def get_product_by_model(self, model_number: str) -> Optional[ProductContext]:
         """Get product by exact model number"""
-        if model_number in self.model_index.values():
-            return self._build_product_context(model_number, 1.0)
-        return None
+        with tracing.span("catalog.get_product_by_model", **{"catalog.model": model_number}) as span:
+            found = model_number in self.model_index.values()
+            span.set_attribute("catalog.found", found)
+            return self._build_product_context(model_number, 1.0) if found else None
+    
+    def suggest_models(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Autocomplete model numbers from a partial SKU.
+        
+        Args:
+            prefix: Partial model number in any format ("10.FGC.40", "10fgc40")
+            limit: Maximum suggestions
+            
+        Returns:
+            [{"model_number", "title", "finish"}] ordered by popularity
+        """
+        normalized = self._normalize_model(prefix)
+        if not normalized:
+            return []
+        return [
+            {"model_number": model, **self._suggest_info.get(model, {"title": None, "finish": None})}
+            for model in self.model_trie.suggest(normalized, limit)
+        ]
     
     def get_all_models(self) -> List[str]:
-        """Return list of all known model numbers"""
-        return list(set(self.model_index.values()))
+        """Return all known model numbers, sorted (stable paging across workers)"""
+        return sorted(set(self.model_index.values()))
     
-    def search_by_category(self, category: str) -> List[Dict]:
-        """Search products by category"""
-        if self.catalog_df is None:
-            return []
+    def search_by_category(self, category: str, group_by_family: bool = False) -> List[Dict]:
+        """
+        Search products by category.
         
-        matches = self.catalog_df[
+        Args:
+            category: Substring matched against the three category columns
+            group_by_family: Return one summary per family instead of every variant
+        """
+        with tracing.span(
+            "catalog.search_by_category",
+            **{"catalog.category": category, "catalog.group_by_family": group_by_family}
+        ) as span:
+            if group_by_family:
+                results = self.list_families(category)
+            elif self.catalog_df is None:
+                results = []
+            else:
+                matches = self.catalog_df[self._category_mask(category)]
+                results = matches.to_dict('records')
+            span.set_attribute("catalog.results", len(results))
+            return results
+    
+    def _category_mask(self, category: str) -> pd.Series:
+        """Rows whose category columns contain the given text"""
+        return (
             self.catalog_df['Product_Category'].str.contains(category, case=False, na=False) |
             self.catalog_df['Sub_Product_Category'].str.contains(category, case=False, na=False) |
             self.catalog_df['Sub_Sub_Product_Category'].str.contains(category, case=False, na=False)
-        ]
-        
-        return matches.to_dict('records')
+        )
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
@@ -298,6 +669,10 @@ class ProductDatabase:
             "total_products": len(self.model_index),
             "products_with_media": len(self.media_data),
             "products_with_specs": len(self.catalog_df) if self.catalog_df is not None else 0,
+            "product_families": len(self.family_index),
+            "related_products": self.related_products.get_stats() if self.related_products else None,
+            "catalog_version": self.catalog_version,
+            "load_timings_ms": self.load_timings,
             "loaded": self.loaded
         }
 
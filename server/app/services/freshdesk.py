@@ -1,11 +1,20 @@
 """
 Freshdesk Service - Freshdesk API Integration
 
-Handles posting private notes to Freshdesk tickets.
+Handles posting private notes to Freshdesk tickets and reading tickets
+(prefetch). All calls share one pooled HTTP session, so repeated calls
+reuse keep-alive connections instead of a TLS handshake each.
 """
 
 import aiohttp
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+from . import tracing
+
+
+# Connections kept open to the Freshdesk API
+POOL_SIZE = 10
+REQUEST_TIMEOUT_SECONDS = 15
 
 
 class FreshdeskService:
@@ -16,13 +25,14 @@ class FreshdeskService:
     from the Agent Assist Console to specific tickets.
     """
     
-    def __init__(self, domain: str, api_key: str):
+    def __init__(self, domain: str, api_key: str, ticket_cache: Optional[Any] = None):
         """
         Initialize Freshdesk service.
         
         Args:
             domain: Freshdesk subdomain (e.g., 'yourcompany' or 'yourcompany.freshdesk.com')
             api_key: Freshdesk API key
+            ticket_cache: Optional TTLCache for get_ticket results
         """
         # FIX: Clean the domain to ensure no double .freshdesk.com
         domain = domain.replace("https://", "").replace("http://", "")
@@ -32,9 +42,28 @@ class FreshdeskService:
         self.base_url = f"https://{domain}.freshdesk.com/api/v2"
         self.api_key = api_key
         self.auth = aiohttp.BasicAuth(api_key, 'X')  # Freshdesk uses API key as username
+        self.ticket_cache = ticket_cache
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats = {"requests": 0, "ticket_fetches": 0, "ticket_cache_hits": 0, "errors": 0}
         
         print(f"✓ Freshdesk service initialized for domain: {domain}")
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session (created on first use, inside the running event loop)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                auth=self.auth,
+                connector=aiohttp.TCPConnector(limit=POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+            )
+        self.stats["requests"] += 1
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the pooled session (shutdown)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
     async def add_private_note(
         self,
         ticket_id: str,
@@ -56,22 +85,25 @@ class FreshdeskService:
                 "error": Optional[str]
             }
         """
-        try:
-            url = f"{self.base_url}/tickets/{ticket_id}/notes"
-            
-            payload = {
-                "body": note_html,
-                "private": True,
-                "notify_emails": [] if not notify_agents else None
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
+        with tracing.span(
+            "freshdesk.add_private_note",
+            **{"http.request.method": "POST", "freshdesk.ticket_id": str(ticket_id)}
+        ) as span:
+            try:
+                url = f"{self.base_url}/tickets/{ticket_id}/notes"
+                
+                payload = {
+                    "body": note_html,
+                    "private": True,
+                    "notify_emails": [] if not notify_agents else None
+                }
+                
+                async with self._get_session().post(
                     url,
                     json=payload,
-                    auth=self.auth,
                     headers={"Content-Type": "application/json"}
                 ) as response:
+                    span.set_attribute("http.response.status_code", response.status)
                     
                     if response.status in [200, 201]:
                         data = await response.json()
@@ -88,35 +120,60 @@ class FreshdeskService:
                             "error": f"HTTP {response.status}: {error_text}"
                         }
                         
-        except Exception as e:
-            return {
-                "success": False,
-                "note_id": None,
-                "error": str(e)
-            }
+            except Exception as e:
+                self.stats["errors"] += 1
+                span.set_attribute("error.type", type(e).__name__)
+                return {
+                    "success": False,
+                    "note_id": None,
+                    "error": str(e)
+                }
     
-    async def get_ticket(self, ticket_id: str) -> Optional[Dict]:
+    async def get_ticket(self, ticket_id: str, use_cache: bool = True) -> Optional[Dict]:
         """
-        Get ticket details (for validation).
+        Get ticket details (validation, prefetch).
+        
+        Tickets found are kept in ticket_cache (if configured), so an agent
+        re-entering a ticket ID does not refetch it.
         
         Args:
             ticket_id: Freshdesk ticket ID
+            use_cache: Serve from / store in ticket_cache
             
         Returns:
             Ticket data or None if not found
         """
-        try:
-            url = f"{self.base_url}/tickets/{ticket_id}"
+        with tracing.span(
+            "freshdesk.get_ticket",
+            **{"http.request.method": "GET", "freshdesk.ticket_id": str(ticket_id)}
+        ) as span:
+            if use_cache and self.ticket_cache is not None:
+                cached = self.ticket_cache.get(str(ticket_id))
+                if cached is not None:
+                    self.stats["ticket_cache_hits"] += 1
+                    span.set_attribute("freshdesk.cache_hit", True)
+                    return cached
+            span.set_attribute("freshdesk.cache_hit", False)
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, auth=self.auth) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
-                    
-        except Exception as e:
-            print(f"✗ Error fetching ticket {ticket_id}: {e}")
-            return None
+            try:
+                url = f"{self.base_url}/tickets/{ticket_id}"
+                
+                self.stats["ticket_fetches"] += 1
+                async with self._get_session().get(url) as response:
+                    span.set_attribute("http.response.status_code", response.status)
+                    if response.status != 200:
+                        return None
+                    ticket = await response.json()
+                
+                if use_cache and self.ticket_cache is not None:
+                    self.ticket_cache.set(str(ticket_id), ticket)
+                return ticket
+                        
+            except Exception as e:
+                self.stats["errors"] += 1
+                span.set_attribute("error.type", type(e).__name__)
+                print(f"✗ Error fetching ticket {ticket_id}: {e}")
+                return None
     
     async def validate_connection(self) -> bool:
         """
@@ -125,17 +182,26 @@ class FreshdeskService:
         Returns:
             True if connection is valid, False otherwise
         """
-        try:
-            # Try to fetch tickets (with limit 1) as a connection test
-            url = f"{self.base_url}/tickets?per_page=1"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, auth=self.auth) as response:
+        with tracing.span("freshdesk.validate_connection", **{"http.request.method": "GET"}) as span:
+            try:
+                # Try to fetch tickets (with limit 1) as a connection test
+                url = f"{self.base_url}/tickets?per_page=1"
+                
+                async with self._get_session().get(url) as response:
+                    span.set_attribute("http.response.status_code", response.status)
                     return response.status == 200
-                    
-        except Exception as e:
-            print(f"✗ Freshdesk connection validation failed: {e}")
-            return False
+                        
+            except Exception as e:
+                span.set_attribute("error.type", type(e).__name__)
+                print(f"✗ Freshdesk connection validation failed: {e}")
+                return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters and ticket cache effectiveness"""
+        return {
+            **self.stats,
+            "ticket_cache": self.ticket_cache.get_stats() if self.ticket_cache is not None else {"enabled": False}
+        }
 
 
 # Global instance (initialized in main.py)
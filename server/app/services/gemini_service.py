@@ -6,30 +6,63 @@ chat completions and file search capabilities.
 """
 
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from google import genai
 from google.genai import types
 
+from . import tracing, usage
+from .context_cache import ContextCacheManager
+from .resilience import CircuitOpenError, Deadline, DeadlineExceeded, UpstreamPolicy
+
+
+def _trace_usage(span: Any, record: Optional[Dict[str, Any]]) -> None:
+    """Token counts of a call (usage.record_call record) as span attributes"""
+    if not record:
+        return
+    span.set_attributes({
+        "gen_ai.usage.input_tokens": record["prompt_tokens"],
+        "gen_ai.usage.cached_tokens": record["cached_tokens"],
+        "gen_ai.usage.output_tokens": record["output_tokens"],
+        "gen_ai.usage.cost_usd": record["cost_usd"]
+    })
+
 
 class GeminiService:
     """
     Wrapper for Google GenAI API with support for:
     - Multiple models (flash vs pro)
     - File Search tool integration
-    - Context management
+    - Context management (provider-side cached prompt prefixes)
+    - Deadlines, hedged retries and per-model circuit breaking
     """
     
-    def __init__(self, api_key: str, corpus_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        corpus_id: Optional[str] = None,
+        policy: Optional[UpstreamPolicy] = None,
+        search_timeout: float = 10.0,
+        reasoning_latency_estimate: float = 30.0
+    ):
         """
         Initialize Gemini service.
         
         Args:
             api_key: Google API key
             corpus_id: Optional File Search store name (e.g., fileSearchStores/abc123)
+            policy: Deadline / hedging / circuit breaker policy for upstream calls
+            search_timeout: Per-call cap on File Search in seconds
+            reasoning_latency_estimate: Assumed reasoning p95 (seconds) until
+                enough calls have been observed; used for downgrade decisions
         """
         self.client = genai.Client(api_key=api_key)
         self.file_search_store_name = corpus_id  # Renamed for clarity
+        self.context_cache: Optional[ContextCacheManager] = None  # Enabled in main.py
+        self.policy = policy or UpstreamPolicy()
+        self.search_timeout = search_timeout
+        self.reasoning_latency_estimate = reasoning_latency_estimate
+        self.downgrades = 0
         
         # Model configurations
         self.models = {
@@ -39,12 +72,29 @@ class GeminiService:
         
         print("✓ Gemini service initialized")
     
+    def _select_mode(self, mode: str, deadline: Optional[Deadline]) -> str:
+        """Downgrade reasoning to flash when its circuit is open or the deadline is at risk"""
+        if mode != "reasoning":
+            return mode
+        model_name = self.models["reasoning"]
+        if not self.policy.is_available(model_name):
+            print(f"  ⚠ {model_name} circuit open, downgrading to flash")
+        elif deadline and deadline.remaining() < self.policy.expected_latency(
+            model_name, self.reasoning_latency_estimate
+        ):
+            print(f"  ⚠ {deadline.remaining():.1f}s left, below {model_name} p95, downgrading to flash")
+        else:
+            return mode
+        self.downgrades += 1
+        return "flash"
+    
     async def generate_response(
         self,
         query: str,
         context: Dict[str, Any],
         mode: str = "flash",
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Generate LLM response with optional context.
@@ -54,63 +104,255 @@ class GeminiService:
             context: Structured data (specs, media, file search results)
             mode: "flash" (fast) or "reasoning" (complex)
             system_prompt: Custom system instructions
+            deadline: Request deadline; reasoning is downgraded to flash
+                      when it cannot finish in time
             
         Returns:
             {
                 "response": str,
                 "sources": List[str],
-                "model_used": str
+                "model_used": str,
+                "usage": Optional[Dict] (token counts and cost of the call)
             }
-        """
-        try:
-            model_name = self.models.get(mode, self.models["flash"])
-            
-            # Build the prompt with context
-            full_prompt = self._build_prompt(query, context)
-            
-            # Prepare configuration
-            config = types.GenerateContentConfig(
-                temperature=0.2 if mode == "flash" else 0.4,
-                top_p=0.95,
-                top_k=40,
-                max_output_tokens=4096,
-                system_instruction=system_prompt if system_prompt else None
-            )
-            
-            # Generate response
-            response = self.client.models.generate_content(
-                model=model_name,
-                contents=full_prompt,
-                config=config
-            )
             
-            # Extract sources from context
-            sources = self._extract_sources(context)
+        Raises:
+            DeadlineExceeded: No answer before the deadline
+            CircuitOpenError: The model is failing fast
+        """
+        # Build the prompt: stable product block first, variable query last
+        prefix, suffix = self._build_prompt_parts(query, context)
+        return await self._complete(context, prefix, [], suffix, mode, system_prompt, deadline)
+    
+    async def generate_turn(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        history: List[Dict[str, str]],
+        mode: str = "flash",
+        system_prompt: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate the next turn of a multi-turn conversation.
+        
+        The product block stays the static prefix (served from the context
+        cache when promoted); earlier turns are replayed from history (the
+        agent's questions and the answers) and the conversation's excerpts
+        go with the new question.
+        
+        Args:
+            query: User's follow-up question
+            context: Structured data and every excerpt of the conversation
+            history: Earlier exchanges [{"role": "user"|"model", "text": str}]
+            mode: "flash" (fast) or "reasoning" (complex)
+            system_prompt: Custom system instructions
+            deadline: Request deadline
             
-            return {
-                "response": response.text,
-                "sources": sources,
-                "model_used": model_name
-            }
+        Returns:
+            Same as generate_response
+        """
+        prefix, message = self._build_prompt_parts(query, context)
+        return await self._complete(context, prefix, history, message, mode, system_prompt, deadline)
+    
+    async def generate_grounded(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        mode: str = "flash",
+        system_prompt: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        max_results: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Retrieve and answer in one call: synthesis with the File Search
+        tool attached, instead of file_search() followed by
+        generate_response().
+        
+        Args:
+            query: User's question
+            context: Structured catalog data (no excerpts needed)
+            mode: "flash" (fast) or "reasoning" (complex)
+            system_prompt: Custom system instructions
+            deadline: Request deadline
+            max_results: Chunks the File Search tool may retrieve
             
-        except Exception as e:
-            print(f"✗ Error generating response: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+        Returns:
+            Same as generate_response, plus "excerpts": the chunks the
+            answer was grounded on (sources are taken from them)
+        """
+        if not self.file_search_store_name:
+            print("⚠ File Search store not configured, answering without retrieval")
+            result = await self.generate_response(query, context, mode, system_prompt, deadline)
+            result["excerpts"] = []
+            return result
+        
+        prefix, suffix = self._build_prompt_parts(query, context)
+        return await self._complete(
+            context, prefix, [], suffix, mode, system_prompt, deadline,
+            tools=[self._file_search_tool(max_results)],
+            stage="grounded_synthesis"
+        )
+    
+    async def _complete(
+        self,
+        context: Dict[str, Any],
+        prefix: str,
+        history: List[Dict[str, str]],
+        message: str,
+        mode: str,
+        system_prompt: Optional[str],
+        deadline: Optional[Deadline],
+        tools: Optional[List[types.Tool]] = None,
+        stage: str = "synthesis"
+    ) -> Dict[str, Any]:
+        """Mode selection, context cache and upstream policy around one generation"""
+        with tracing.span(f"gemini.{stage}", **{
+            "gen_ai.system": "gemini",
+            "gen_ai.operation.name": stage,
+            "gemini.requested_mode": mode
+        }) as span:
+            try:
+                requested_mode = mode
+                mode = self._select_mode(mode, deadline)
+                model_name = self.models.get(mode, self.models["flash"])
+                span.set_attributes({
+                    "gen_ai.request.model": model_name,
+                    "gemini.mode": mode,
+                    "gemini.downgraded": mode != requested_mode
+                })
+                
+                # Reuse a provider-side cached context for the static prefix when available
+                # (the API rejects tools alongside cached content, so tool calls skip it)
+                cache_name = None
+                if self.context_cache and system_prompt and not tools:
+                    cache_name = await self.context_cache.acquire(model_name, system_prompt, prefix)
+                span.set_attribute("gemini.context_cache.hit", bool(cache_name))
+                
+                async def attempt():
+                    nonlocal cache_name
+                    if cache_name:
+                        try:
+                            return await self._generate(model_name, mode, prefix, history, message, system_prompt, cache_name)
+                        except Exception as e:
+                            print(f"⚠ Cached context {cache_name} rejected ({e}), retrying uncached")
+                            self.context_cache.invalidate(cache_name)
+                            cache_name = None
+                    return await self._generate(model_name, mode, prefix, history, message, system_prompt, None, tools)
+                
+                try:
+                    response = await self.policy.call(model_name, attempt, deadline=deadline)
+                except CircuitOpenError:
+                    if mode != "reasoning":
+                        raise
+                    # Reasoning tripped between selection and the call: answer with flash
+                    self.downgrades += 1
+                    return await self._complete(
+                        context, prefix, history, message, "flash", system_prompt, deadline, tools, stage
+                    )
+                
+                usage_metadata = getattr(response, "usage_metadata", None)
+                if self.context_cache:
+                    self.context_cache.record_usage(usage_metadata)
+                
+                # Grounded calls retrieved their own excerpts
+                excerpts = None
+                if tools:
+                    excerpts = self._grounding_excerpts(response)
+                    context = {**context, "unstructured": excerpts}
+                
+                # Extract sources from context
+                sources = self._extract_sources(context)
+                
+                result = {
+                    "response": response.text,
+                    "sources": sources,
+                    "model_used": model_name,
+                    "usage": usage.record_call(stage, model_name, mode, usage_metadata)
+                }
+                if excerpts is not None:
+                    result["excerpts"] = excerpts
+                _trace_usage(span, result["usage"])
+                # False if a rejected cached context was retried uncached
+                span.set_attribute("gemini.context_cache.used", bool(cache_name))
+                return result
+                
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                print(f"✗ Error generating response: {e}")
+                raise
+            except Exception as e:
+                print(f"✗ Error generating response: {e}")
+                import traceback
+                traceback.print_exc()
+                raise
+    
+    @staticmethod
+    def _contents(prefix: str, history: List[Dict[str, str]], message: str, cached: bool):
+        """
+        Request contents for one call.
+        
+        Single-turn calls send a plain string. With history the turns are
+        sent as Content objects; the uncached prefix rides on the first
+        user turn so the model sees product data before the conversation.
+        """
+        if not history:
+            return message if cached else "\n".join(part for part in (prefix, message) if part)
+        contents = []
+        for i, turn in enumerate(history):
+            text = turn["text"]
+            if i == 0 and not cached and prefix:
+                text = f"{prefix}\n{text}"
+            contents.append(types.Content(role=turn["role"], parts=[types.Part(text=text)]))
+        contents.append(types.Content(role="user", parts=[types.Part(text=message)]))
+        return contents
+    
+    async def _generate(
+        self,
+        model_name: str,
+        mode: str,
+        prefix: str,
+        history: List[Dict[str, str]],
+        message: str,
+        system_prompt: Optional[str],
+        cache_name: Optional[str],
+        tools: Optional[List[types.Tool]] = None
+    ):
+        """Single generate_content call, with or without a cached prefix"""
+        config = types.GenerateContentConfig(
+            temperature=0.2 if mode == "flash" else 0.4,
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=4096,
+            # A cached context already carries the system instruction and prefix
+            system_instruction=None if cache_name else (system_prompt or None),
+            cached_content=cache_name,
+            tools=tools
+        )
+        
+        return await self.client.aio.models.generate_content(
+            model=model_name,
+            contents=self._contents(prefix, history, message, cached=bool(cache_name)),
+            config=config
+        )
     
     async def file_search(
         self,
         query: str,
         model_filter: Optional[str] = None,
-        max_results: int = 5
+        max_results: int = 5,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict[str, Any]]:
         """
         Execute File Search against knowledge base using Gemini file search tool (async, google-genai >=1.55.0).
+        
+        Runs under the upstream policy (hedged, capped at search_timeout and
+        the request deadline). Failures degrade to no excerpts rather than
+        failing the request; they are counted in get_stats().
+        
         Args:
             query: Search query
             model_filter: Optional model number to filter results
             max_results: Maximum number of results to return
+            deadline: Request deadline
         Returns:
             List of document chunks with metadata
         """
@@ -118,57 +360,101 @@ class GeminiService:
         if not self.file_search_store_name:
             print("⚠ File Search store not configured, skipping")
             return []
-        try:
-            search_query = query
-            if model_filter:
-                search_query = f"{model_filter} {query}"
-            # Use async client for file search
-            aclient = self.client.aio
-            response = await aclient.models.generate_content(
-                model=self.models["flash"],
-                contents=search_query,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(
-                        file_search=types.FileSearch(
-                            file_search_store_names=[self.file_search_store_name],
-                            top_k=max_results
-                        )
-                    )]
+        with tracing.span("gemini.file_search", **{
+            "gen_ai.system": "gemini",
+            "gen_ai.operation.name": "file_search",
+            "gen_ai.request.model": self.models["flash"],
+            "gemini.model_filter": model_filter,
+            "gemini.max_results": max_results
+        }) as span:
+            try:
+                search_query = query
+                if model_filter:
+                    search_query = f"{model_filter} {query}"
+                # Use async client for file search
+                aclient = self.client.aio
+                response = await self.policy.call(
+                    f"file_search:{self.models['flash']}",
+                    lambda: aclient.models.generate_content(
+                        model=self.models["flash"],
+                        contents=search_query,
+                        config=types.GenerateContentConfig(tools=[self._file_search_tool(max_results)])
+                    ),
+                    deadline=deadline,
+                    timeout=self.search_timeout
                 )
+                _trace_usage(span, usage.record_call(
+                    "file_search", self.models["flash"], "flash", getattr(response, "usage_metadata", None)
+                ))
+                results = self._grounding_excerpts(response)[:max_results]
+                span.set_attribute("gemini.file_search.results", len(results))
+                print(f"✓ File search returned {len(results)} results")
+                return results
+            # Degraded to no excerpts: the span stays ok, the reason is an attribute
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                span.set_attribute("gemini.file_search.skipped", type(e).__name__)
+                print(f"⚠ File search skipped: {e}")
+                return []
+            except errors.APIError as e:
+                span.set_attribute("gemini.file_search.skipped", f"APIError {e.code}")
+                print(f"⚠ Gemini API error: {e.code} {e.message}")
+                return []
+            except Exception as e:
+                span.set_attribute("gemini.file_search.skipped", type(e).__name__)
+                print(f"⚠ File search error: {e}")
+                return []
+    
+    def _file_search_tool(self, max_results: int) -> types.Tool:
+        """File Search tool bound to the configured store"""
+        return types.Tool(
+            file_search=types.FileSearch(
+                file_search_store_names=[self.file_search_store_name],
+                top_k=max_results
             )
-            results = []
-            candidates = getattr(response, "candidates", None)
-            if candidates and hasattr(candidates[0], "grounding_metadata"):
-                grounding = candidates[0].grounding_metadata
-                if grounding and getattr(grounding, "grounding_chunks", None):
-                    for chunk in grounding.grounding_chunks[:max_results]:
-                        ctx = getattr(chunk, "retrieved_context", None)
-                        results.append({
-                            "title": getattr(ctx, "title", "Unknown") if ctx else "Unknown",
-                            "text": getattr(ctx, "text", "") if ctx else "",
-                            "uri": getattr(ctx, "uri", "") if ctx else ""
-                        })
-            print(f"✓ File search returned {len(results)} results")
-            return results
-        except errors.APIError as e:
-            print(f"⚠ Gemini API error: {e.code} {e.message}")
-            return []
-        except Exception as e:
-            print(f"⚠ File search error: {e}")
-            return []
+        )
+    
+    @staticmethod
+    def _grounding_excerpts(response: Any) -> List[Dict[str, Any]]:
+        """Retrieved chunks from a response's grounding metadata"""
+        results = []
+        candidates = getattr(response, "candidates", None)
+        if candidates and hasattr(candidates[0], "grounding_metadata"):
+            grounding = candidates[0].grounding_metadata
+            if grounding and getattr(grounding, "grounding_chunks", None):
+                for chunk in grounding.grounding_chunks:
+                    ctx = getattr(chunk, "retrieved_context", None)
+                    results.append({
+                        "title": getattr(ctx, "title", "Unknown") if ctx else "Unknown",
+                        "text": getattr(ctx, "text", "") if ctx else "",
+                        "uri": getattr(ctx, "uri", "") if ctx else ""
+                    })
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Upstream call statistics per model"""
+        return {
+            "upstream": self.policy.get_stats(),
+            "downgrades": self.downgrades
+        }
     
     def _build_prompt(self, query: str, context: Dict[str, Any]) -> str:
         """Build comprehensive prompt with structured context"""
+        prefix, suffix = self._build_prompt_parts(query, context)
+        return "\n".join(part for part in (prefix, suffix) if part)
+    
+    def _build_prompt_parts(self, query: str, context: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Split the prompt into a stable prefix and a variable suffix.
         
-        prompt_parts = [f"User Query: {query}\n"]
+        The prefix holds only product data (identical for every question
+        about the same product) so it can be served from a cached context;
+        excerpts and the query itself go in the suffix.
+        """
+        prompt_parts: List[str] = []
         
         # Check if this is a general query (no product context)
         has_product = "structured" in context and context["structured"] and context["structured"].get("specs")
         
-        if not has_product:
-            # GENERAL QUERY: Use only file search results from policy documents
-            prompt_parts.append("\n**Note:** This is a general query about company policies, programs, or procedures. Do NOT include product-specific details. Answer using ONLY the documentation excerpts below.\n")
-        
         # Add structured data (specs) - only if product was found
         if "structured" in context and context["structured"]:
             structured = context["structured"]
@@ -213,6 +499,31 @@ class GeminiService:
                         elif isinstance(image, str):
                             prompt_parts.append(f"- Image: {image}")
             
+            # Sibling finishes: only the price-relevant differences, to keep the prompt small
+            if structured.get("variants"):
+                prompt_parts.append("\n## Other Finishes of This Product:")
+                for variant in structured["variants"]:
+                    if not isinstance(variant, dict):
+                        continue
+                    differing = variant.get("differing_specs", {})
+                    details = [f"{key}: {differing[key]}" for key in ("List_Price", "MAP_Price", "Product_Status") if key in differing]
+                    suffix = f" - {', '.join(details)}" if details else ""
+                    prompt_parts.append(f"- {variant.get('model_number')} ({variant.get('finish', 'Unknown finish')}){suffix}")
+            
+            # Precomputed similar products from other families (replacements, upsell)
+            if structured.get("alternatives"):
+                prompt_parts.append("\n## Similar Products (alternatives from other product families):")
+                for alternative in structured["alternatives"][:5]:
+                    if not isinstance(alternative, dict):
+                        continue
+                    price = f"${alternative['price']:,.2f}" if alternative.get("price") is not None else "price n/a"
+                    shared = f" - shares {', '.join(alternative['shared'])}" if alternative.get("shared") else ""
+                    prompt_parts.append(
+                        f"- {alternative.get('model_number')}: {alternative.get('title')} "
+                        f"({alternative.get('finish') or 'no finish'}, {alternative.get('type') or alternative.get('subcategory')}) "
+                        f"- {price}{shared}"
+                    )
+            
             if "documents" in structured and structured["documents"]:
                 documents = structured["documents"]
                 if isinstance(documents, list):
@@ -224,6 +535,32 @@ class GeminiService:
                             url = doc.get('url', '')
                             prompt_parts.append(f"- {title} ({doc_type}): {url}")
         
+        prefix = "\n".join(prompt_parts).lstrip("\n")
+        prompt_parts = []
+        
+        # Catalog rows selected by the query's spec constraints (query-specific: suffix)
+        catalog_matches = context.get("structured", {}).get("catalog_matches") if context.get("structured") else None
+        if catalog_matches:
+            constraints = ", ".join(
+                f"{f['field']} {f['op']} {f['value']}" for f in catalog_matches.get("filters", [])
+            )
+            prompt_parts.append(
+                f"\n## Catalog Matches ({catalog_matches['total']} products match {constraints}; "
+                f"top {len(catalog_matches['rows'])} by popularity):"
+            )
+            for row in catalog_matches["rows"]:
+                price = f"${row['price']:,.2f}" if row.get("price") is not None else "price n/a"
+                prompt_parts.append(
+                    f"- {row.get('model_number')}: {row.get('title')} ({row.get('finish') or 'no finish'}, "
+                    f"{row.get('subcategory') or row.get('product_category')}) - {price}"
+                )
+            if not catalog_matches["rows"]:
+                prompt_parts.append("- No catalog products match these constraints.")
+        
+        if not has_product and not catalog_matches:
+            # GENERAL QUERY: Use only file search results from policy documents
+            prompt_parts.append("**Note:** This is a general query about company policies, programs, or procedures. Do NOT include product-specific details. Answer using ONLY the documentation excerpts below.\n")
+        
         # Add unstructured data (file search results)
         if "unstructured" in context and context["unstructured"]:
             prompt_parts.append("\n## Relevant Documentation Excerpts:")
@@ -232,7 +569,9 @@ class GeminiService:
                     prompt_parts.append(f"\n### Excerpt {idx} (from {result.get('title', 'Unknown')})")
                     prompt_parts.append(result.get('text', ''))
         
-        return "\n".join(prompt_parts)
+        prompt_parts.append(f"\nUser Query: {query}")
+        
+        return prefix, "\n".join(prompt_parts).lstrip("\n")
     
     def _extract_sources(self, context: Dict[str, Any]) -> List[str]:
         """Extract source references from context"""
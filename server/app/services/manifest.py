@@ -0,0 +1,127 @@
+"""
+Media Manifest Reader - Streaming metadata_manifest.json ingestion
+
+The manifest is one JSON array with an item per product image, each
+carrying the product's full catalog record as "metadata". json.load()
+materializes the whole array before a single item is used, so peak
+memory is the decoded manifest plus the copy kept in media_data.
+
+iter_manifest_items() decodes the array one item at a time from
+fixed-size text chunks (json.JSONDecoder.raw_decode on a sliding
+buffer), and compact_manifest_item() keeps only what
+ProductDatabase._build_product_context reads: image, video and document
+fields. Memory is then bounded by the kept records, not the file.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+
+# metadata fields _build_product_context uses (Model_NO is the key)
+MANIFEST_FIELDS = (
+    "Model_NO",
+    "Image_URL",
+    "Installation_video_Link",
+    "Operational_Video_Link",
+    "Lifestyle_Video_Link",
+    "Spec_Sheet_File_Name",
+    "Spec_Sheet_Full_URL",
+    "Installation_Manual_File_Name",
+    "Installation_manual_Full_URL",
+    "Parts_Diagram_File_Name",
+    "Part_Diagram_Full_URL"
+)
+ITEM_FIELDS = ("originalUrl", "savedAs")
+
+CHUNK_CHARS = 1 << 20
+# An item that does not decode within this much buffered text is malformed
+MAX_ITEM_CHARS = 64 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = " \t\n\r,]"
+
+
+def iter_manifest_items(path: Union[str, Path], chunk_chars: int = CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array without loading it whole.
+
+    Args:
+        path: JSON file holding an array
+        chunk_chars: Characters read per refill
+
+    Raises:
+        ValueError: Not an array, truncated or malformed
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buffer = ""
+        position = 0
+        eof = False
+        opened = False
+        items = 0
+        expect_item = True  # After "[" or ","; otherwise "," or "]" must follow
+
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position < len(buffer):
+                char = buffer[position]
+                if not opened:
+                    if char != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    opened = True
+                    position += 1
+                    continue
+                if char == "]" and (not expect_item or items == 0):
+                    return
+                if not expect_item:
+                    if char != ",":
+                        raise ValueError(f"{path}: expected ',' or ']' after item {items}")
+                    position += 1
+                    expect_item = True
+                    continue
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof or len(buffer) - position > MAX_ITEM_CHARS:
+                        raise
+                else:
+                    # A number cut by the buffer end still decodes ("12" of "123", "1.5" of
+                    # "1.5e3"): it is complete only once a delimiter follows
+                    number = isinstance(item, (int, float)) and not isinstance(item, bool)
+                    if eof or (end < len(buffer) and (not number or buffer[end] in _DELIMITERS)):
+                        position = end
+                        items += 1
+                        expect_item = False
+                        yield item
+                        continue
+            elif eof:
+                raise ValueError(f"{path}: unexpected end of JSON array")
+
+            # Item incomplete or buffer exhausted: drop consumed text, read more
+            chunk = f.read(chunk_chars)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def compact_manifest_item(item: Any) -> Optional[Dict[str, Any]]:
+    """
+    The fields of a manifest item that product contexts use.
+
+    Keys come from MANIFEST_FIELDS / ITEM_FIELDS, so every kept record
+    shares the same key strings; empty values are dropped.
+
+    Returns:
+        {"originalUrl", "savedAs", "metadata": {...}} or None if the item
+        has no Model_NO
+    """
+    if not isinstance(item, dict):
+        return None
+    metadata = item.get("metadata")
+    if not isinstance(metadata, dict) or not metadata.get("Model_NO"):
+        return None
+    record: Dict[str, Any] = {key: item[key] for key in ITEM_FIELDS if item.get(key)}
+    record["metadata"] = {key: metadata[key] for key in MANIFEST_FIELDS if metadata.get(key)}
+    return record
@@ -0,0 +1,150 @@
+"""
+Model Trie - Prefix autocomplete over normalized model numbers
+
+A compressed (radix) trie built once at load time from
+ProductDatabase.model_index. Every node caches the top-K models of its
+subtree by popularity, so a suggestion lookup is a walk down the prefix
+plus a slice - no subtree traversal while the agent types.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("edges", "model", "top")
+
+    def __init__(self):
+        # First character -> (edge label, child node)
+        self.edges: Dict[str, Tuple[str, "_Node"]] = {}
+        self.model: Optional[str] = None  # Original model number ending here
+        self.top: List[Tuple[float, str]] = []  # (-score, model), best first
+
+
+class ModelTrie:
+    """
+    Radix trie with per-node top-K popularity caches.
+
+    Popularity is a static catalog score plus live selection counts;
+    record_hit() updates the cached rankings along one root-to-leaf path.
+    """
+
+    def __init__(self, top_k: int = 20, hit_weight: float = 1000.0):
+        """
+        Args:
+            top_k: Suggestions cached per node (upper bound on limit)
+            hit_weight: Score added per recorded lookup of a model
+        """
+        self.top_k = top_k
+        self.hit_weight = hit_weight
+        self.root = _Node()
+        self.scores: Dict[str, float] = {}
+        self.keys: Dict[str, str] = {}  # Original model -> normalized key
+        self.size = 0
+
+    def build(self, model_index: Dict[str, str], popularity: Optional[Dict[str, float]] = None) -> None:
+        """
+        Build from a normalized -> original model index.
+
+        Args:
+            model_index: ProductDatabase.model_index
+            popularity: Optional static score per original model number
+        """
+        popularity = popularity or {}
+        self.root = _Node()
+        self.scores = {}
+        self.keys = {}
+        for normalized, original in model_index.items():
+            self.scores[original] = float(popularity.get(original, 0.0))
+            self.keys[original] = normalized
+            self._insert(normalized, original)
+        self.size = len(model_index)
+        self._compute_top(self.root)
+
+    def _insert(self, key: str, model: str) -> None:
+        node = self.root
+        while True:
+            if not key:
+                node.model = model
+                return
+            edge = node.edges.get(key[0])
+            if edge is None:
+                leaf = _Node()
+                leaf.model = model
+                node.edges[key[0]] = (key, leaf)
+                return
+
+            label, child = edge
+            common = 0
+            while common < len(label) and common < len(key) and label[common] == key[common]:
+                common += 1
+
+            if common == len(label):
+                node, key = child, key[common:]
+                continue
+
+            # Split the edge at the divergence point
+            middle = _Node()
+            middle.edges[label[common]] = (label[common:], child)
+            node.edges[key[0]] = (label[:common], middle)
+            node, key = middle, key[common:]
+
+    def _compute_top(self, node: _Node) -> List[Tuple[float, str]]:
+        candidates: List[Tuple[float, str]] = []
+        if node.model is not None:
+            candidates.append((-self.scores[node.model], node.model))
+        for _, child in node.edges.values():
+            candidates.extend(self._compute_top(child))
+        candidates.sort()
+        node.top = candidates[:self.top_k]
+        return node.top
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        """Node whose subtree holds every key starting with prefix"""
+        node = self.root
+        while prefix:
+            edge = node.edges.get(prefix[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if prefix.startswith(label):
+                node, prefix = child, prefix[len(label):]
+            elif label.startswith(prefix):
+                return child
+            else:
+                return None
+        return node
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Most popular original model numbers whose key starts with prefix"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [model for _, model in node.top[:limit]]
+
+    def record_hit(self, model: str) -> None:
+        """Bump a model's popularity and refresh cached rankings on its path"""
+        key = self.keys.get(model)
+        if key is None:
+            return
+        old_entry = (-self.scores[model], model)
+        self.scores[model] += self.hit_weight
+        new_entry = (-self.scores[model], model)
+
+        node = self.root
+        rest = key
+        while True:
+            top = node.top
+            if old_entry in top:
+                top[top.index(old_entry)] = new_entry
+                top.sort()
+            elif not top or len(top) < self.top_k or new_entry < top[-1]:
+                top.append(new_entry)
+                top.sort()
+                del top[self.top_k:]
+            if not rest:
+                return
+            edge = node.edges.get(rest[0])
+            if edge is None:
+                return
+            label, node = edge
+            rest = rest[len(label):]
@@ -0,0 +1,265 @@
+"""
+Related Products Index - Precomputed alternatives per model
+
+"What can I offer instead of 10.FGC.4003CP?" used to mean a broad file
+search plus a long reasoning call. The catalog already holds what makes
+two products interchangeable, so the neighbours are computed once at
+load time from CatalogQueryEngine's typed columns:
+
+    score = 3 * same type + 2 * same subcategory + 1 * same category
+          + 2 * price proximity   exp(-|ln p1 - ln p2| / PRICE_BAND)
+          + 1 * same finish + 0.5 * same collection
+          + 0.5 * each of height / length / width / flow rate proximity
+            (1 - relative difference)
+          + 0.1 * popularity
+
+normalized to 0..1. Candidates must be active, share the subcategory or
+type (the category when neither is set), match the spare-part flag and
+belong to another family (sibling finishes are already the variants).
+So scores are only computed within each subcategory, sorted by type
+and price: dense numpy blocks of up to BLOCK_SIZE source rows against
+the rows sharing their subcategory or type, limited to WINDOW rows either
+side of the block in that order. Type and price carry most of the score,
+so the window holds the best candidates; it keeps the build linear in
+catalog size (merged multi-brand catalogs have subcategories of 100k+
+rows) and is exact for subcategories of up to BLOCK_SIZE + WINDOW rows
+(on the shipped catalog every model's top-k scores match an unbounded
+search). Only the top-k per model are kept, one per family (the member
+whose finish and price fit best).
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .catalog_query import CatalogQueryEngine
+
+
+DEFAULT_TOP_K = 8
+BLOCK_SIZE = 256
+# Candidates either side of a block, in (type, price) order
+WINDOW = 512
+
+# Width of the price kernel on a log scale (0.25: a product 28% dearer
+# scores exp(-1) of an identically priced one)
+PRICE_BAND = 0.25
+
+# Feature -> weight (see module docstring)
+WEIGHTS = {
+    "type": 3.0,
+    "subcategory": 2.0,
+    "product_category": 1.0,
+    "price": 2.0,
+    "finish": 1.0,
+    "collection": 0.5,
+    "height": 0.5,
+    "length": 0.5,
+    "width": 0.5,
+    "flow_rate": 0.5,
+    "popularity": 0.1
+}
+_MAX_SCORE = sum(WEIGHTS.values())
+
+DIMENSIONS = ("height", "length", "width", "flow_rate")
+
+ALTERNATIVE_FIELDS = ("model_number", "title", "finish", "subcategory", "type", "price", "status")
+
+
+class RelatedProductsIndex:
+    """
+    Top-k similar products per catalog model, computed at load.
+    """
+
+    def __init__(
+        self,
+        engine: CatalogQueryEngine,
+        model_family: Dict[str, str],
+        top_k: int = DEFAULT_TOP_K
+    ):
+        """
+        Args:
+            engine: Typed catalog view (row positions = catalog_df rows)
+            model_family: Model -> base model (ProductDatabase.model_family)
+            top_k: Neighbours kept per model
+        """
+        started = time.perf_counter()
+        self.engine = engine
+        self.top_k = top_k
+        # Catalogs without a column (e.g. no Product_Status) return the rest
+        self._fields = [f for f in ALTERNATIVE_FIELDS if f in engine.fields]
+        models = engine.text.get("model_number", np.array([], dtype=object))
+        self._positions: Dict[str, int] = {}
+        for position, model in enumerate(models):
+            if model and model not in self._positions:
+                self._positions[model] = position
+        families = [model_family.get(model, model) for model in models]
+        self._family_codes, _ = pd.factorize(pd.Series(families, dtype=object))
+
+        self.neighbours = np.full((engine.size, top_k), -1, dtype=np.int32)
+        self.scores = np.zeros((engine.size, top_k), dtype=np.float32)
+        self._build()
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.lookups = 0
+
+    def _codes(self, field: str) -> np.ndarray:
+        cat = self.engine.categorical.get(field)
+        return cat.codes if cat is not None else np.full(self.engine.size, -1, dtype=np.int32)
+
+    def _positive(self, field: str) -> np.ndarray:
+        """Numeric column as float32 with zero / negative treated as missing"""
+        values = self.engine.numeric.get(field)
+        if values is None:
+            return np.full(self.engine.size, np.nan, dtype=np.float32)
+        return np.where(values > 0, values, np.nan).astype(np.float32)
+
+    def _groups(self, codes: Dict[str, np.ndarray]):
+        """
+        (source rows, candidate rows) per subcategory: only rows sharing the
+        subcategory or a type with a source row can be related. Rows without
+        subcategory / type fall back to their category.
+        """
+        subcategory, kind, category = codes["subcategory"], codes["type"], codes["product_category"]
+        for code in np.unique(subcategory[subcategory >= 0]):
+            rows = np.flatnonzero(subcategory == code)
+            types = np.unique(kind[rows][kind[rows] >= 0])
+            yield rows, np.flatnonzero((subcategory == code) | np.isin(kind, types))
+        loose = subcategory < 0
+        for code in np.unique(kind[loose & (kind >= 0)]):
+            yield np.flatnonzero(loose & (kind == code)), np.flatnonzero(kind == code)
+        unlevelled = loose & (kind < 0)
+        for code in np.unique(category[unlevelled]):
+            rows = np.flatnonzero(unlevelled & (category == code))
+            yield rows, np.flatnonzero(category == code) if code >= 0 else rows
+
+    def _build(self) -> None:
+        size = self.engine.size
+        if size == 0:
+            return
+        codes = {field: self._codes(field) for field in ("type", "subcategory", "product_category", "finish", "collection")}
+        log_price = np.log(self._positive("price"))
+        dimensions = {field: self._positive(field) for field in DIMENSIONS}
+        popularity = np.nan_to_num(self.engine.numeric.get("popularity", np.zeros(size)), nan=0.0)
+        popularity = (popularity / popularity.max() if popularity.max() > 0 else popularity).astype(np.float32)
+
+        status = self.engine.categorical.get("status")
+        if status is not None:
+            active = status.mask(status.lowered == "active")
+        else:
+            active = np.ones(size, dtype=bool)
+        spare = self.engine.boolean.get("spare_part", np.zeros(size, dtype=bool))
+        family = self._family_codes
+
+        for group_rows, group_candidates in self._groups(codes):
+            group_candidates = group_candidates[np.lexsort((log_price[group_candidates], codes["type"][group_candidates]))]
+            sources = np.flatnonzero(np.isin(group_candidates, group_rows))
+            for start in range(0, len(sources), BLOCK_SIZE):
+                block = sources[start:start + BLOCK_SIZE]
+                rows = group_candidates[block]
+                candidates = group_candidates[max(block[0] - WINDOW, 0):block[-1] + WINDOW + 1]
+                # Candidates considered per source row before keeping one per family
+                shortlist = min(len(candidates), self.top_k * 6)
+                score = np.zeros((len(rows), len(candidates)), dtype=np.float32)
+                same = {}
+                for field, column in codes.items():
+                    same[field] = (column[rows, None] == column[None, candidates]) & (column[None, candidates] >= 0)
+                    score += WEIGHTS[field] * same[field]
+
+                price_gap = np.abs(log_price[rows, None] - log_price[None, candidates])
+                score += WEIGHTS["price"] * np.nan_to_num(np.exp(-price_gap / PRICE_BAND), nan=0.0)
+                for field, values in dimensions.items():
+                    a, b = values[rows, None], values[None, candidates]
+                    closeness = 1 - np.minimum(np.abs(a - b) / np.fmax(a, b), 1)
+                    score += WEIGHTS[field] * np.nan_to_num(closeness, nan=0.0)
+                score += WEIGHTS["popularity"] * popularity[None, candidates]
+
+                has_level = (codes["subcategory"][rows] >= 0) | (codes["type"][rows] >= 0)
+                related = np.where(
+                    has_level[:, None],
+                    same["subcategory"] | same["type"],
+                    same["product_category"] | (codes["product_category"][rows, None] < 0)
+                )
+                eligible = (
+                    related
+                    & active[None, candidates]
+                    & (spare[rows, None] == spare[None, candidates])
+                    & (family[rows, None] != family[None, candidates])
+                )
+                score[~eligible] = -np.inf
+
+                top = np.argpartition(-score, shortlist - 1, axis=1)[:, :shortlist]
+                top_scores = np.take_along_axis(score, top, axis=1)
+                order = np.argsort(-top_scores, axis=1)
+                top = candidates[np.take_along_axis(top, order, axis=1)]
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+                self._keep_per_family(rows, top, top_scores)
+
+    def _keep_per_family(self, rows: np.ndarray, top: np.ndarray, top_scores: np.ndarray) -> None:
+        """
+        Store, per source row, the best-scoring member of each family up to
+        top_k (top / top_scores: candidates per row, best first).
+        """
+        families = self._family_codes[top]
+        # A stable sort by family keeps each family's best candidate first in its run
+        by_family = np.argsort(families, axis=1, kind="stable")
+        sorted_families = np.take_along_axis(families, by_family, axis=1)
+        first = np.ones(families.shape, dtype=bool)
+        first[:, 1:] = sorted_families[:, 1:] != sorted_families[:, :-1]
+        keep = np.zeros(families.shape, dtype=bool)
+        np.put_along_axis(keep, by_family, first, axis=1)
+        keep &= np.isfinite(top_scores)
+
+        # Kept candidates to the front, score order preserved
+        front = np.argsort(~keep, axis=1, kind="stable")[:, :self.top_k]
+        kept = np.take_along_axis(keep, front, axis=1)
+        width = front.shape[1]
+        self.neighbours[rows, :width] = np.where(kept, np.take_along_axis(top, front, axis=1), -1)
+        self.scores[rows, :width] = np.where(kept, np.take_along_axis(top_scores, front, axis=1) / _MAX_SCORE, 0)
+
+    def get(self, model_number: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Precomputed alternatives for a model.
+
+        Args:
+            model_number: Catalog model number
+            limit: Maximum alternatives (default: top_k)
+
+        Returns:
+            [{"model_number", "title", "finish", "subcategory", "type",
+              "price", "status", "score", "shared"}] best first; "shared"
+            lists the attributes in common (type, finish, collection,
+            price_band). Empty for unknown models.
+        """
+        position = self._positions.get(model_number)
+        if position is None:
+            return []
+        self.lookups += 1
+        count = int((self.neighbours[position] >= 0).sum())
+        neighbours = self.neighbours[position, :min(count, limit or self.top_k)]
+        alternatives = self.engine.rows(neighbours, self._fields)
+        for alternative, candidate, score in zip(alternatives, neighbours, self.scores[position]):
+            alternative["score"] = round(float(score), 3)
+            alternative["shared"] = self._shared(position, candidate)
+        return alternatives
+
+    def _shared(self, position: int, candidate: int) -> List[str]:
+        shared = [
+            field for field in ("type", "finish", "collection")
+            if self._codes(field)[position] >= 0 and self._codes(field)[position] == self._codes(field)[candidate]
+        ]
+        prices = self.engine.numeric.get("price")
+        if prices is not None and prices[position] > 0 and prices[candidate] > 0:
+            if abs(np.log(prices[candidate] / prices[position])) <= PRICE_BAND:
+                shared.append("price_band")
+        return shared
+
+    def get_stats(self) -> Dict[str, Any]:
+        covered = int((self.neighbours[:, 0] >= 0).sum()) if self.engine.size else 0
+        return {
+            "models": len(self._positions),
+            "with_alternatives": covered,
+            "top_k": self.top_k,
+            "build_ms": self.build_ms,
+            "lookups": self.lookups
+        }
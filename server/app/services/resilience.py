@@ -0,0 +1,325 @@
+"""
+Resilience - Deadlines, hedged retries and circuit breaking for upstream calls
+
+Every upstream call (Gemini generation, File Search) goes through an
+UpstreamPolicy keyed by model name:
+- Deadline: absolute per-request budget passed down from the API layer;
+  each call is bounded by what is left of it.
+- Hedging: if the first attempt is still running after the key's observed
+  p95 latency, a second identical attempt is fired and the first to
+  succeed wins. A retryable failure fires the spare attempt immediately.
+- Circuit breaker: after failure_threshold consecutive failures the key
+  fails fast for recovery_seconds, then lets one probe through. A timeout
+  is a failure only when the per-call timeout fired, not the request's
+  own (possibly very tight) deadline.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import numpy as np
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before an upstream call finished"""
+
+
+class CircuitOpenError(Exception):
+    """Upstream key is failing; call rejected without being attempted"""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Circuit open for {key}, retry in {retry_after:.0f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must finish"""
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Client errors (4xx other than 408/429) are not worth retrying"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and 400 <= code < 500 and code not in (408, 429):
+        return False
+    return not isinstance(error, (ValueError, TypeError, KeyError))
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile in seconds, or None until min_samples are recorded"""
+        if len(self.samples) < self.min_samples:
+            return None
+        return float(np.percentile(self.samples, p))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half_open -> closed"""
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.recovery_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.recovery_seconds - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Call neither succeeded nor failed (e.g. cancelled); free the probe slot"""
+        self._probe_in_flight = False
+
+
+class UpstreamPolicy:
+    """
+    Applies deadline, hedging and circuit breaking to upstream calls.
+    """
+
+    def __init__(
+        self,
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 95.0,
+        min_hedge_delay: float = 0.05,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        latency_window: int = 200,
+        min_samples: int = 20
+    ):
+        """
+        Args:
+            hedge_enabled: Fire a second attempt for slow or failed calls
+            hedge_percentile: Latency percentile after which to hedge
+            min_hedge_delay: Lower bound on the hedge delay in seconds
+            failure_threshold: Consecutive failures that open a key's circuit
+            recovery_seconds: Time an open circuit fails fast before probing
+            latency_window: Successful latencies kept per key
+            min_samples: Samples needed before latency-based hedging starts
+        """
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.latency_window = latency_window
+        self.min_samples = min_samples
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(self.failure_threshold, self.recovery_seconds)
+        return self.breakers[key]
+
+    def tracker(self, key: str) -> LatencyTracker:
+        if key not in self.latencies:
+            self.latencies[key] = LatencyTracker(self.latency_window, self.min_samples)
+        return self.latencies[key]
+
+    def _count(self, key: str, name: str) -> None:
+        counters = self.counters.setdefault(key, {
+            "calls": 0, "succeeded": 0, "failed": 0, "timeouts": 0,
+            "short_circuited": 0, "hedges": 0, "hedge_wins": 0, "cancelled": 0
+        })
+        counters[name] += 1
+
+    def is_available(self, key: str) -> bool:
+        """False while the key's circuit is open (does not consume a probe)"""
+        breaker = self.breakers.get(key)
+        if breaker is None or breaker.state == "closed":
+            return True
+        return breaker.state == "open" and breaker.retry_after() <= 0
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None if there is no latency profile yet"""
+        p = self.tracker(key).percentile(self.hedge_percentile)
+        return None if p is None else max(p, self.min_hedge_delay)
+
+    def expected_latency(self, key: str, default: float) -> float:
+        """p95 latency for the key, or default until enough samples exist"""
+        p = self.tracker(key).percentile(self.hedge_percentile)
+        return default if p is None else p
+
+    async def call(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        deadline: Optional[Deadline] = None,
+        timeout: Optional[float] = None,
+        hedge: bool = True
+    ) -> Any:
+        """
+        Run fn() under the policy for key.
+
+        Args:
+            key: Upstream identity (model name) for breaker / latency tracking
+            fn: Zero-argument coroutine factory; called once per attempt
+            deadline: Request deadline bounding the call
+            timeout: Per-call cap in seconds (applied within the deadline)
+            hedge: Allow a second attempt for this call
+
+        Raises:
+            CircuitOpenError: key is failing fast
+            DeadlineExceeded: budget ran out
+            Exception: the last attempt's error
+        """
+        breaker = self.breaker(key)
+        self._count(key, "calls")
+        if not breaker.allow():
+            self._count(key, "short_circuited")
+            raise CircuitOpenError(key, breaker.retry_after())
+
+        remaining = deadline.remaining() if deadline else None
+        budgets = [b for b in (timeout, remaining) if b is not None]
+        budget = min(budgets) if budgets else None
+        # The caller's own deadline running out says nothing about upstream health
+        deadline_bound = remaining is not None and (timeout is None or remaining < timeout)
+        if budget is not None and budget <= 0:
+            breaker.release()
+            self._count(key, "timeouts")
+            raise DeadlineExceeded(f"No time left for {key}")
+
+        started = time.monotonic()
+        try:
+            result = await self._attempt(key, fn, started + budget if budget is not None else None,
+                                         hedge and self.hedge_enabled)
+        except asyncio.CancelledError:
+            # Caller gave up (client disconnected / superseded); in-flight attempts are aborted
+            breaker.release()
+            self._count(key, "cancelled")
+            raise
+        except asyncio.TimeoutError:
+            if deadline_bound:
+                breaker.release()
+            else:
+                breaker.record_failure()
+            self._count(key, "timeouts")
+            raise DeadlineExceeded(f"{key} did not respond within {budget:.1f}s")
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            self._count(key, "failed")
+            raise
+
+        breaker.record_success()
+        self._count(key, "succeeded")
+        self.tracker(key).record(time.monotonic() - started)
+        return result
+
+    async def _attempt(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        until: Optional[float],
+        hedge: bool
+    ) -> Any:
+        primary = asyncio.ensure_future(fn())
+        pending = {primary}
+        spare = 1 if hedge else 0
+        delay = self.hedge_delay(key) if hedge else None
+        last_error: Optional[BaseException] = None
+
+        try:
+            while True:
+                remaining = None if until is None else until - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError()
+
+                wait = remaining
+                if spare and delay is not None:
+                    wait = delay if wait is None else min(wait, delay)
+
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is not primary:
+                            self._count(key, "hedge_wins")
+                        return task.result()
+                    last_error = error
+
+                out_of_time = until is not None and until - time.monotonic() <= 0
+                slow = not done and delay is not None
+                failed = bool(done) and not pending and last_error is not None and is_retryable(last_error)
+                if spare and not out_of_time and (slow or failed):
+                    spare -= 1
+                    self._count(key, "hedges")
+                    pending.add(asyncio.ensure_future(fn()))
+                    continue
+
+                if not pending and last_error is not None:
+                    raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-key counters, breaker state and latency profile"""
+        stats: Dict[str, Any] = {}
+        for key, counters in self.counters.items():
+            breaker = self.breakers.get(key)
+            tracker = self.latencies.get(key)
+            p50 = tracker.percentile(50) if tracker else None
+            p95 = tracker.percentile(95) if tracker else None
+            stats[key] = {
+                **counters,
+                "circuit": breaker.state if breaker else "closed",
+                "times_opened": breaker.times_opened if breaker else 0,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+            }
+        return stats
@@ -0,0 +1,506 @@
+"""
+Retrieval Service - Pluggable document retrieval backends
+
+The orchestrator's RETRIEVAL stage asks a backend for documentation
+excerpts. Two backends are available:
+- "gemini": Gemini File Search (hosted, one generate_content call per search)
+- "local":  In-process chunk store with a NumPy vector index and a
+            BM25 lexical fallback, built offline by the ingestion CLI
+
+Embeddings for the local index come from a deterministic hashed-feature
+embedder (no model download, runs anywhere) or, if installed, a small
+sentence-transformers model.
+
+Usage (from the repository root):
+    python -m server.app.services.retrieval ingest --source manuals/ --index server/data/local_index
+    python -m server.app.services.retrieval search --index server/data/local_index "install 10.FGC.4003CP"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .resilience import Deadline
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+# ---------------------------------------------------------------------------
+# Embedders
+# ---------------------------------------------------------------------------
+
+class HashedEmbedder:
+    """
+    Deterministic bag-of-features embedder (feature hashing).
+
+    Unigrams and bigrams are hashed into a fixed number of signed buckets
+    and L2-normalized. No model weights, identical output on every machine,
+    good enough for lexical-ish semantic matching and for benchmarks.
+    """
+
+    name = "hashed"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self._cache: Dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        cached = self._cache.get(feature)
+        if cached is None:
+            h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            cached = (h % self.dim, 1.0 if (h >> 63) & 1 else -1.0)
+            if len(self._cache) < 500_000:
+                self._cache[feature] = cached
+        return cached
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 matrix of unit vectors"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                idx, sign = self._bucket(feature)
+                matrix[row, idx] += sign
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder:
+    """Small local embedding model (optional sentence-transformers dependency)"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "sentence-transformers is not installed; use the 'hashed' embedder "
+                "or `pip install sentence-transformers`"
+            ) from e
+        self.name = f"st:{model_name}"
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(texts, normalize_embeddings=True).astype(np.float32)
+
+
+def get_embedder(name: str = "hashed"):
+    """
+    Build an embedder from its config name.
+
+    Args:
+        name: "hashed" or "st:<sentence-transformers model name>"
+    """
+    if name == "hashed":
+        return HashedEmbedder()
+    if name.startswith("st:"):
+        return SentenceTransformerEmbedder(name[3:])
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+# ---------------------------------------------------------------------------
+# Lexical index
+# ---------------------------------------------------------------------------
+
+class LexicalIndex:
+    """Okapi BM25 over an inverted index"""
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths = np.zeros(len(texts), dtype=np.float32)
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                self.postings[term].append((doc_id, tf))
+
+        n = max(len(texts), 1)
+        self.avg_length = float(self.doc_lengths.mean()) if len(texts) else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def score(self, query: str) -> Dict[int, float]:
+        """BM25 score for every document sharing at least one query term"""
+        scores: Dict[int, float] = defaultdict(float)
+        avg = self.avg_length or 1.0
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        scores = self.score(query)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+# ---------------------------------------------------------------------------
+# Chunk store + ingestion
+# ---------------------------------------------------------------------------
+
+def chunk_text(text: str, chunk_size: int = 800, overlap: int = 150) -> List[str]:
+    """Split text into overlapping character windows, preferring whitespace boundaries"""
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            space = text.rfind(' ', start + chunk_size // 2, end)
+            if space != -1:
+                end = space
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return [c for c in chunks if c]
+
+
+def extract_document_pages(path: Path) -> List[Tuple[Optional[int], str]]:
+    """
+    Extract (page number, text) pairs from a PDF, text or markdown file.
+
+    PDF support needs the optional pypdf package.
+    """
+    suffix = path.suffix.lower()
+    if suffix in ('.txt', '.md'):
+        return [(None, path.read_text(encoding='utf-8', errors='ignore'))]
+    if suffix == '.pdf':
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            print(f"⚠ pypdf not installed, skipping {path.name}")
+            return []
+        reader = PdfReader(str(path))
+        return [(i, page.extract_text() or '') for i, page in enumerate(reader.pages, 1)]
+    return []
+
+
+class LocalChunkStore:
+    """
+    Chunks + embedding matrix persisted in an index directory:
+        chunks.json      chunk records (title, text, uri, page)
+        embeddings.npy   float32 (n_chunks, dim), unit-normalized
+        meta.json        embedder name, dimension, build time
+    """
+
+    def __init__(self, chunks: List[Dict[str, Any]], embeddings: np.ndarray, embedder_name: str):
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.embedder_name = embedder_name
+
+    @classmethod
+    def build(
+        cls,
+        documents: List[Dict[str, Any]],
+        embedder,
+        chunk_size: int = 800,
+        overlap: int = 150
+    ) -> "LocalChunkStore":
+        """
+        Chunk and embed documents.
+
+        Args:
+            documents: [{"title", "text", "uri", "page"?}]
+            embedder: Embedder instance
+        """
+        chunks = []
+        for doc in documents:
+            for piece in chunk_text(doc["text"], chunk_size, overlap):
+                chunks.append({
+                    "title": doc.get("title", "Unknown"),
+                    "text": piece,
+                    "uri": doc.get("uri", ""),
+                    "page": doc.get("page")
+                })
+        embeddings = embedder.embed([f"{c['title']} {c['text']}" for c in chunks]) if chunks \
+            else np.zeros((0, embedder.dim), dtype=np.float32)
+        return cls(chunks, embeddings, embedder.name)
+
+    def save(self, index_dir: Path) -> None:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        with open(index_dir / "chunks.json", 'w', encoding='utf-8') as f:
+            json.dump(self.chunks, f)
+        np.save(index_dir / "embeddings.npy", self.embeddings)
+        with open(index_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                "embedder": self.embedder_name,
+                "dim": int(self.embeddings.shape[1]) if self.embeddings.ndim == 2 else 0,
+                "chunks": len(self.chunks),
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, index_dir: Path) -> "LocalChunkStore":
+        with open(index_dir / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(index_dir / "chunks.json", 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        embeddings = np.load(index_dir / "embeddings.npy")
+        return cls(chunks, embeddings, meta["embedder"])
+
+
+class LocalRetriever:
+    """
+    Brute-force cosine search over the chunk store, with BM25 fallback.
+
+    The lexical index is used when the embedder is unavailable or the best
+    vector score is below min_vector_score (e.g. queries that are mostly
+    part numbers the embedding cannot place).
+
+    search() is CPU-bound and safe to call from several threads at once
+    (LocalIndexBackend runs it off the event loop).
+    """
+
+    def __init__(self, store: LocalChunkStore, embedder=None, min_vector_score: float = 0.12):
+        self.store = store
+        self.embedder = embedder
+        self.min_vector_score = min_vector_score
+        self.lexical = LexicalIndex([f"{c['title']} {c['text']}" for c in store.chunks])
+        self.stats = {"searches": 0, "vector": 0, "lexical_fallback": 0, "total_ms": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def vector_search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        if self.embedder is None or not len(self.store.chunks):
+            return []
+        q = self.embedder.embed([query])[0]
+        scores = self.store.embeddings @ q
+        top_k = min(top_k, len(scores))
+        idx = np.argpartition(-scores, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [(int(i), float(scores[i])) for i in idx]
+
+    def search(
+        self,
+        query: str,
+        model_filter: Optional[str] = None,
+        max_results: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Return up to max_results chunks in the same shape as
+        GeminiService.file_search ({"title", "text", "uri", ...}).
+        """
+        started = time.perf_counter()
+        search_query = f"{model_filter} {query}" if model_filter else query
+        candidates = max_results * 4
+
+        hits = self.vector_search(search_query, candidates)
+        method = "vector"
+        if not hits or hits[0][1] < self.min_vector_score:
+            hits = self.lexical.search(search_query, candidates)
+            method = "lexical"
+
+        # Prefer chunks that mention the requested model
+        if model_filter:
+            key = re.sub(r'[.\s-]', '', model_filter.lower())
+            top = max((score for _, score in hits), default=0.0)
+            boost = 0.2 * top if top > 0 else 0.0
+            hits = sorted(
+                ((i, s + boost if key in re.sub(r'[.\s-]', '', self.store.chunks[i]["text"].lower()) else s)
+                 for i, s in hits),
+                key=lambda item: item[1],
+                reverse=True
+            )
+
+        results = []
+        for chunk_id, score in [hit for hit in hits if hit[1] > 0][:max_results]:
+            chunk = self.store.chunks[chunk_id]
+            results.append({
+                "title": chunk["title"],
+                "text": chunk["text"],
+                "uri": chunk.get("uri", ""),
+                "page": chunk.get("page") or "",
+                "score": round(score, 4),
+                "retrieval": method
+            })
+
+        with self._stats_lock:
+            self.stats["searches"] += 1
+            self.stats["vector" if method == "vector" else "lexical_fallback"] += 1
+            self.stats["total_ms"] += (time.perf_counter() - started) * 1000
+        return results
+
+
+# ---------------------------------------------------------------------------
+# Backends used by the orchestrator
+# ---------------------------------------------------------------------------
+
+class RetrievalBackend:
+    """Interface for the orchestrator's unstructured retrieval"""
+
+    name = "base"
+
+    async def search(
+        self,
+        query: str,
+        model_filter: Optional[str] = None,
+        max_results: int = 5,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        """Excerpts for the query; remote backends bound the call by deadline"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class GeminiFileSearchBackend(RetrievalBackend):
+    """Hosted Gemini File Search (the original behaviour)"""
+
+    name = "gemini"
+
+    def __init__(self, gemini):
+        self.gemini = gemini
+
+    async def search(
+        self,
+        query: str,
+        model_filter: Optional[str] = None,
+        max_results: int = 5,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.gemini.file_search(
+            query=query,
+            model_filter=model_filter,
+            max_results=max_results,
+            deadline=deadline
+        )
+
+
+class LocalIndexBackend(RetrievalBackend):
+    """In-process index built by the ingestion CLI (searched on a worker thread)"""
+
+    name = "local"
+
+    def __init__(self, retriever: LocalRetriever):
+        self.retriever = retriever
+
+    @classmethod
+    def from_directory(cls, index_dir: str, embedder_name: Optional[str] = None) -> "LocalIndexBackend":
+        store = LocalChunkStore.load(Path(index_dir))
+        embedder = get_embedder(embedder_name or store.embedder_name)
+        print(f"✓ Local retrieval index loaded: {len(store.chunks)} chunks ({store.embedder_name})")
+        return cls(LocalRetriever(store, embedder))
+
+    async def search(
+        self,
+        query: str,
+        model_filter: Optional[str] = None,
+        max_results: int = 5,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        # Embedding + BM25 scoring would otherwise block the event loop
+        results = await asyncio.to_thread(self.retriever.search, query, model_filter, max_results)
+        print(f"✓ Local search returned {len(results)} results")
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.retriever.stats)
+        searches = stats["searches"]
+        stats["avg_ms"] = round(stats.pop("total_ms") / searches, 3) if searches else 0.0
+        return {"backend": self.name, "chunks": len(self.retriever.store.chunks), **stats}
+
+
+def create_backend(name: str, gemini=None, index_dir: Optional[str] = None,
+                   embedder_name: Optional[str] = None) -> RetrievalBackend:
+    """
+    Build the configured retrieval backend.
+
+    Args:
+        name: "gemini" or "local"
+        gemini: GeminiService (required for "gemini")
+        index_dir: Index directory (required for "local")
+        embedder_name: Override the embedder recorded in the index
+    """
+    if name == "gemini":
+        return GeminiFileSearchBackend(gemini)
+    if name == "local":
+        if not index_dir:
+            raise ValueError("Local retrieval backend requires an index directory")
+        return LocalIndexBackend.from_directory(index_dir, embedder_name)
+    raise ValueError(f"Unknown retrieval backend: {name}")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _ingest(args) -> None:
+    source = Path(args.source)
+    files = [source] if source.is_file() else sorted(
+        p for p in source.rglob('*') if p.suffix.lower() in ('.pdf', '.txt', '.md')
+    )
+    documents = []
+    for path in files:
+        for page, text in extract_document_pages(path):
+            if text.strip():
+                documents.append({"title": path.name, "text": text, "uri": str(path), "page": page})
+    print(f"→ Extracted {len(documents)} pages/sections from {len(files)} files")
+
+    started = time.perf_counter()
+    store = LocalChunkStore.build(documents, get_embedder(args.embedder), args.chunk_size, args.overlap)
+    store.save(Path(args.index))
+    print(f"✓ Indexed {len(store.chunks)} chunks in {time.perf_counter() - started:.2f}s → {args.index}")
+
+
+def _search(args) -> None:
+    backend = LocalIndexBackend.from_directory(args.index)
+    for result in backend.retriever.search(args.query, args.model, args.k):
+        print(f"[{result['score']:.3f} {result['retrieval']}] {result['title']} p{result['page']}: "
+              f"{result['text'][:120]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local retrieval index tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Build an index from PDFs / text / markdown")
+    ingest.add_argument("--source", required=True, help="File or directory to ingest")
+    ingest.add_argument("--index", required=True, help="Output index directory")
+    ingest.add_argument("--embedder", default="hashed", help="'hashed' or 'st:<model>'")
+    ingest.add_argument("--chunk-size", type=int, default=800)
+    ingest.add_argument("--overlap", type=int, default=150)
+    ingest.set_defaults(func=_ingest)
+
+    search = sub.add_parser("search", help="Query an index")
+    search.add_argument("--index", required=True)
+    search.add_argument("--model", default=None, help="Optional model number filter")
+    search.add_argument("-k", type=int, default=5)
+    search.add_argument("query")
+    search.set_defaults(func=_search)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
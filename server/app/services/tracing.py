@@ -0,0 +1,291 @@
+"""
+Tracing - Spans across orchestrator stages and upstream calls
+
+A slow chat request can be slow in product extraction (fuzzy matching),
+the File Search call, synthesis or Freshdesk. span() wraps each of those
+in a timed span carrying the model, token counts and cache hits; spans
+started inside another one (including in tasks it spawns, and catalog
+calls run on the CPU executor's threads) become its children, so one
+request is one trace.
+
+Exporters (configure(); TRACING_EXPORTER in main.py):
+- "none":  span() returns a shared no-op span: no clock reads, ids or
+           context switches (the default)
+- "file":  finished spans appended to a JSONL file, one object per span
+           (trace / span / parent ids, name, start and end in unix ns,
+           duration, attributes, status); for local debugging and tests
+- "otlp":  OpenTelemetry SDK with the OTLP/HTTP exporter, batched
+           (needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http;
+           endpoint and headers from the standard OTEL_EXPORTER_OTLP_* env)
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+EXPORTERS = ("none", "file", "otlp")
+
+DEFAULT_SERVICE_NAME = "agent-assist-console"
+
+
+def _attribute(value: Any) -> Any:
+    """Span attribute value: scalars as-is, sequences of scalars as lists, anything else as text"""
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [v if isinstance(v, (str, bool, int, float)) else str(v) for v in value if v is not None]
+    return str(value)
+
+
+class NoopSpan:
+    """Span that records nothing (tracing disabled)"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+
+_NOOP_SPAN = NoopSpan()
+
+
+class _OtelSpan:
+    """OpenTelemetry span (or start_as_current_span context) with Span's attribute handling"""
+
+    __slots__ = ("_span", "_context")
+
+    def __init__(self, span: Any = None, context: Any = None):
+        self._span = span
+        self._context = context
+
+    def __enter__(self) -> "_OtelSpan":
+        self._span = self._context.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return self._context.__exit__(exc_type, exc, tb)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self._span.set_attribute(key, _attribute(value))
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+
+class Span:
+    """
+    One timed operation (context manager). Attributes set to None are
+    dropped; an exception leaving the block marks the span as an error
+    (cancellation as "cancelled") and is re-raised.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "status", "error", "_tracer", "_token"
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.attributes: Dict[str, Any] = {}
+        self.set_attributes(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_ns = 0
+        self.end_ns = 0
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = os.urandom(8).hex()
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            if issubclass(exc_type, asyncio.CancelledError):
+                self.status = "cancelled"
+            else:
+                self.status = "error"
+                self.error = f"{exc_type.__name__}: {exc}"
+        self._tracer.export(self)
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = _attribute(value)
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_unix_ns": self.start_ns,
+            "end_unix_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    """
+    Span factory for one exporter.
+    """
+
+    def __init__(self, exporter: str = "none", path: Optional[Union[str, Path]] = None, service_name: str = DEFAULT_SERVICE_NAME):
+        """
+        Args:
+            exporter: One of EXPORTERS
+            path: JSONL file for the "file" exporter
+            service_name: service.name resource attribute / file records
+        """
+        if exporter not in EXPORTERS:
+            raise ValueError(f"Unknown tracing exporter: {exporter} (expected one of {EXPORTERS})")
+        self.exporter = exporter
+        self.enabled = exporter != "none"
+        self.service_name = service_name
+        self.exported = 0
+        self.export_errors = 0
+        self.path: Optional[Path] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._otel_tracer = None
+        self._otel_provider = None
+
+        if exporter == "file":
+            if not path:
+                raise ValueError("The file exporter needs a path")
+            self.path = Path(path)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        elif exporter == "otlp":
+            self._init_otlp()
+
+    def _init_otlp(self) -> None:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as e:
+            raise RuntimeError(
+                "TRACING_EXPORTER=otlp needs opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http"
+            ) from e
+        self._otel_provider = TracerProvider(resource=Resource.create({"service.name": self.service_name}))
+        self._otel_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        self._otel_tracer = self._otel_provider.get_tracer(__name__)
+
+    def span(self, name: str, **attributes: Any):
+        """Context manager timing a block as a child of the current span"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        if self._otel_tracer is not None:
+            return _OtelSpan(context=self._otel_tracer.start_as_current_span(
+                name,
+                attributes={key: _attribute(value) for key, value in attributes.items() if value is not None}
+            ))
+        return Span(self, name, attributes)
+
+    def current(self) -> Any:
+        """The innermost open span (a no-op span outside any, or when disabled)"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        if self._otel_tracer is not None:
+            from opentelemetry import trace
+            return _OtelSpan(span=trace.get_current_span())
+        return _current_span.get() or _NOOP_SPAN
+
+    def export(self, span: Span) -> None:
+        """Write a finished span (file exporter)"""
+        record = span.to_dict()
+        record["service"] = self.service_name
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with self._lock:
+                self._file.write(line)
+            self.exported += 1
+        except Exception as e:
+            self.export_errors += 1
+            print(f"⚠ Span export failed: {e}")
+
+    def shutdown(self) -> None:
+        """Flush and close the exporter"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.enabled = False
+        if self._otel_provider is not None:
+            self._otel_provider.shutdown()
+            self.enabled = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"exporter": self.exporter, "enabled": self.enabled}
+        if self.exporter == "file":
+            stats.update(path=str(self.path), exported=self.exported, export_errors=self.export_errors)
+        return stats
+
+
+# Global instance (configured in main.py; disabled until then)
+tracer = Tracer()
+
+
+def configure(exporter: str = "none", path: Optional[Union[str, Path]] = None, service_name: str = DEFAULT_SERVICE_NAME) -> Tracer:
+    """Replace the global tracer (closing the previous one)"""
+    global tracer
+    previous = tracer
+    tracer = Tracer(exporter, path=path, service_name=service_name)
+    previous.shutdown()
+    return tracer
+
+
+def span(name: str, **attributes: Any):
+    """
+    Trace a block with the global tracer.
+
+    Usage:
+        with tracing.span("gemini.generate", **{"gen_ai.request.model": model}) as s:
+            ...
+            s.set_attribute("gen_ai.usage.output_tokens", n)
+    """
+    return tracer.span(name, **attributes)
+
+
+def current_span() -> Any:
+    """Innermost open span of the global tracer, for attributes known further down the call"""
+    return tracer.current()
+
+
+def get_tracer() -> Tracer:
+    """Get global tracer"""
+    return tracer
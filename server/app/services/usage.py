@@ -0,0 +1,279 @@
+"""
+Token Usage Accounting - Per-call, per-request and aggregate LLM spend
+
+GeminiService reports the usage_metadata of every generate_content call
+(synthesis and the File Search call hidden inside retrieval) through
+record_call(). Each call is:
+- added to the current request's UsageScope (opened by the orchestrator
+  with track(); attached to the result as "usage")
+- aggregated in memory by the global UsageLedger, rolled up by model,
+  model mode, prompt variant, stage and agent (agent ids are client
+  supplied: past max_agents distinct ids, new ones roll up as "other")
+- queued for the ledger's periodic flush to an append-only JSONL log
+
+Costs are estimates from list prices (USD per 1M tokens); cached prompt
+tokens are billed at the cached rate, thinking tokens as output.
+"""
+
+import asyncio
+import contextvars
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICING = {
+    "gemini-2.5-flash": (0.30, 0.03, 2.50),
+    "gemini-2.5-pro": (1.25, 0.125, 10.00)
+}
+
+TOKEN_FIELDS = ("prompt_tokens", "cached_tokens", "output_tokens", "total_tokens")
+
+
+def usage_counts(usage_metadata: Any) -> Dict[str, int]:
+    """Token counts from a generate_content usage_metadata (missing = 0)"""
+    def count(name: str) -> int:
+        return int(getattr(usage_metadata, name, None) or 0)
+
+    output = count("candidates_token_count") + count("thoughts_token_count")
+    prompt = count("prompt_token_count")
+    return {
+        "prompt_tokens": prompt,
+        "cached_tokens": count("cached_content_token_count"),
+        "output_tokens": output,
+        "total_tokens": count("total_token_count") or prompt + output
+    }
+
+
+def estimate_cost(model: str, counts: Dict[str, int]) -> float:
+    """Estimated USD cost of one call (0.0 for unknown models)"""
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    input_rate, cached_rate, output_rate = pricing
+    uncached = max(counts["prompt_tokens"] - counts["cached_tokens"], 0)
+    cost = (
+        uncached * input_rate
+        + counts["cached_tokens"] * cached_rate
+        + counts["output_tokens"] * output_rate
+    ) / 1_000_000
+    return round(cost, 8)
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, **{f: 0 for f in TOKEN_FIELDS}, "cost_usd": 0.0}
+
+
+def _add(totals: Dict[str, Any], record: Dict[str, Any]) -> None:
+    totals["calls"] += 1
+    for f in TOKEN_FIELDS:
+        totals[f] += record[f]
+    totals["cost_usd"] = round(totals["cost_usd"] + record["cost_usd"], 8)
+
+
+class UsageScope:
+    """Calls made on behalf of one request"""
+
+    def __init__(self, agent_id: Optional[str] = None):
+        self.agent_id = agent_id
+        self.prompt_variant: Optional[str] = None  # Set once synthesis picks its prompt
+        self.calls: List[Dict[str, Any]] = []
+
+    def summary(self) -> Dict[str, Any]:
+        """Request totals plus the per-stage breakdown"""
+        totals = _empty_totals()
+        for record in self.calls:
+            _add(totals, record)
+        totals["by_stage"] = [
+            {k: record[k] for k in ("stage", "model", "mode", *TOKEN_FIELDS, "cost_usd")}
+            for record in self.calls
+        ]
+        return totals
+
+
+_current_scope: contextvars.ContextVar[Optional[UsageScope]] = contextvars.ContextVar(
+    "usage_scope", default=None
+)
+
+
+@contextmanager
+def track(agent_id: Optional[str] = None) -> Iterator[UsageScope]:
+    """Collect the calls made inside the block (including spawned tasks)"""
+    scope = UsageScope(agent_id)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> Optional[UsageScope]:
+    return _current_scope.get()
+
+
+class UsageLedger:
+    """
+    In-memory usage aggregation with periodic flush to an append-only log.
+    """
+
+    ROLLUPS = ("model", "mode", "prompt_variant", "stage", "agent")
+
+    # Agent rollup bucket for ids past max_agents
+    OTHER_AGENTS = "other"
+
+    def __init__(
+        self,
+        log_path: Optional[str] = None,
+        flush_interval_seconds: float = 30.0,
+        max_agents: int = 500,
+        max_pending: int = 10000
+    ):
+        """
+        Args:
+            log_path: JSONL file records are appended to (None = memory only)
+            flush_interval_seconds: How often pending records are written
+            max_agents: Distinct agents rolled up individually (the log
+                        keeps every record's own agent id)
+            max_pending: Unwritten records kept while the log cannot be
+                         written (oldest dropped first)
+        """
+        self.log_path = Path(log_path) if log_path else None
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_agents = max_agents
+        self.max_pending = max_pending
+        self.totals = _empty_totals()
+        self.rollups: Dict[str, Dict[str, Dict[str, Any]]] = {
+            name: defaultdict(_empty_totals) for name in self.ROLLUPS
+        }
+        self.pending: List[Dict[str, Any]] = []
+        self.flushed_records = 0
+        self.flush_errors = 0
+        self.dropped_records = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Aggregate one call record and queue it for the log"""
+        _add(self.totals, record)
+        for name in self.ROLLUPS:
+            key = record.get(name) or "none"
+            if name == "agent" and key not in self.rollups[name] and len(self.rollups[name]) >= self.max_agents:
+                key = self.OTHER_AGENTS
+            _add(self.rollups[name][key], record)
+        if self.log_path:
+            self.pending.append(record)
+            self._trim_pending()
+
+    def _trim_pending(self) -> None:
+        """Drop the oldest unwritten records beyond max_pending"""
+        overflow = len(self.pending) - self.max_pending
+        if overflow > 0:
+            del self.pending[:overflow]
+            self.dropped_records += overflow
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    async def flush(self) -> int:
+        """Append pending records to the log; returns how many were written"""
+        if not self.pending or not self.log_path:
+            return 0
+        records, self.pending = self.pending, []
+        try:
+            await asyncio.to_thread(self._write, records)
+        except OSError as e:
+            self.pending = records + self.pending
+            self.flush_errors += 1
+            self._trim_pending()
+            print(f"⚠ Usage log flush failed ({e}), keeping {len(self.pending)} records "
+                  f"({self.dropped_records} oldest dropped so far)")
+            return 0
+        self.flushed_records += len(records)
+        return len(records)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush task (call from a running event loop)"""
+        if self.log_path and self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop the flush task and write whatever is pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals and rollups by model, model mode, prompt variant, stage and agent"""
+        return {
+            "totals": dict(self.totals),
+            **{f"by_{name}": {k: dict(v) for k, v in self.rollups[name].items()} for name in self.ROLLUPS},
+            "log": {
+                "path": str(self.log_path) if self.log_path else None,
+                "pending": len(self.pending),
+                "flushed": self.flushed_records,
+                "flush_errors": self.flush_errors,
+                "dropped": self.dropped_records
+            }
+        }
+
+
+def record_call(stage: str, model: str, mode: str, usage_metadata: Any) -> Optional[Dict[str, Any]]:
+    """
+    Account one generate_content call.
+
+    Args:
+        stage: Pipeline stage ("synthesis", "file_search", ...)
+        model: Model that served the call
+        mode: Model mode ("flash" / "reasoning")
+        usage_metadata: response.usage_metadata (None is ignored)
+
+    Returns:
+        The call record, or None if the response carried no usage
+    """
+    if usage_metadata is None:
+        return None
+
+    counts = usage_counts(usage_metadata)
+    scope = _current_scope.get()
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "stage": stage,
+        "model": model,
+        "mode": mode,
+        "prompt_variant": scope.prompt_variant if scope else None,
+        "agent": scope.agent_id if scope else None,
+        **counts,
+        "cost_usd": estimate_cost(model, counts)
+    }
+    if scope:
+        scope.calls.append(record)
+    if usage_ledger:
+        usage_ledger.record(record)
+    return record
+
+
+# Global instance (initialized in main.py)
+usage_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get global usage ledger instance"""
+    if usage_ledger is None:
+        raise RuntimeError("Usage ledger not initialized")
+    return usage_ledger
@@ -0,0 +1,144 @@
+"""
+Event loop benchmark - /health tail latency under extraction load
+
+Runs the real FastAPI app in-process (httpx ASGI transport, one event
+loop, as in a single uvicorn worker) and, for each CPU executor mode,
+keeps several concurrent product extractions running (fuzzy-matched
+queries without a model number: the slowest find_product path) while a
+probe requests /health every few milliseconds.
+
+    inline   find_product runs on the event loop (previous behaviour)
+    thread   CpuExecutor thread pool
+    process  CpuExecutor process pool (workers load the catalog first;
+             start-up is excluded from the timings)
+
+Reports /health latency percentiles, event-loop lag and extraction
+throughput per mode.
+
+Usage (from server/):
+    python benchmarks/bench_event_loop.py [--seconds 5] [--concurrency 4] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+
+from app import main
+from app.core import orchestrator as orchestrator_module
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.offload import CpuExecutor
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+from app.services import data_loader, freshdesk, gemini_service
+from app.services.data_loader import ProductDatabase
+
+# No model number: every query falls through to fuzzy matching over all models
+QUERIES = [
+    "my kitchen faucet is leaking from the base, what should I do",
+    "customer wants a matte black shower head with a handheld",
+    "which bathroom fixture has the lowest flow rate",
+    "the thermostatic valve makes a whistling noise",
+    "looking for a wall mounted tub filler in brushed nickel"
+]
+
+
+async def run_mode(db, mode: str, seconds: float, concurrency: int, workers: int, probe_interval: float):
+    executor = None
+    if mode != "inline":
+        executor = CpuExecutor(db, kind=mode, max_workers=workers)
+        # Let every worker start (process workers load the catalog) before timing
+        await asyncio.gather(*(executor.run("get_product_by_model", "warmup") for _ in range(workers * 2)))
+    orchestrator = Orchestrator(db, SimpleNamespace(), PromptsManager(), cpu_executor=executor)
+    orchestrator_module.orchestrator = orchestrator
+
+    monitor = LoopLagMonitor(interval_seconds=0.01, stall_threshold_seconds=float("inf"))
+    stop_at = time.perf_counter() + seconds
+    extractions = 0
+
+    async def load(offset: int):
+        nonlocal extractions
+        i = offset
+        while time.perf_counter() < stop_at:
+            await orchestrator._extract_product(QUERIES[i % len(QUERIES)])
+            extractions += 1
+            i += 1
+            await asyncio.sleep(0)  # Separate requests yield between extractions
+
+    async def probe(client: httpx.AsyncClient):
+        # Latency from each probe's scheduled send time, so time spent
+        # waiting for the loop to run the probe at all is counted
+        latencies = []
+        scheduled = time.perf_counter()
+        while scheduled < stop_at:
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            response = await client.get("/health")
+            latencies.append(time.perf_counter() - scheduled)
+            assert response.status_code == 200
+            scheduled = max(scheduled + probe_interval, time.perf_counter())
+        return latencies
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        monitor.start()
+        results = await asyncio.gather(probe(client), *(load(i) for i in range(concurrency)))
+        await monitor.stop()
+
+    if executor:
+        executor.shutdown()
+    latencies = np.array(results[0]) * 1000
+    lag = monitor.get_stats()
+    return {
+        "health_p50": float(np.percentile(latencies, 50)),
+        "health_p99": float(np.percentile(latencies, 99)),
+        "health_max": float(latencies.max()),
+        "probes": len(latencies),
+        "lag_p99": lag["lag_p99_ms"],
+        "extractions_per_s": extractions / seconds
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Load duration per mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent extraction loops")
+    parser.add_argument("--workers", type=int, default=2, help="Executor pool size")
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0)
+    parser.add_argument("--modes", default="inline,thread,process")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("EVENT LOOP BENCHMARK (/health under extraction load)")
+    print("=" * 60)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = ProductDatabase("data")
+        db.load_data()
+    data_loader.product_db = db
+    gemini_service.gemini_service = SimpleNamespace()
+    freshdesk.freshdesk_service = None
+
+    print(f"{len(db.model_index)} models, {args.concurrency} concurrent extractions, "
+          f"{args.workers} workers, {args.seconds:.0f}s per mode\n")
+    print(f"  {'mode':<8} {'health p50':>11} {'p99':>9} {'max':>9} {'loop lag p99':>13} {'extractions/s':>14}")
+    for mode in args.modes.split(","):
+        with contextlib.redirect_stdout(io.StringIO()):
+            r = asyncio.run(run_mode(
+                db, mode, args.seconds, args.concurrency, args.workers, args.probe_interval_ms / 1000
+            ))
+        print(f"  {mode:<8} {r['health_p50']:>9.1f}ms {r['health_p99']:>7.1f}ms {r['health_max']:>7.1f}ms "
+              f"{r['lag_p99']:>11.1f}ms {r['extractions_per_s']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,91 @@
+"""
+Intent classification benchmark - accuracy and throughput
+
+Runs the labeled corpus from test_intents.py through:
+- the legacy substring keyword scans formerly in _synthesize_response
+  plus the fast path's LLM-required regex (troubleshooting/comparison/
+  other only)
+- the compiled IntentClassifier (memoization disabled, so every call
+  does the full match)
+
+and reports routing accuracy and queries per second.
+
+Usage (from server/):
+    python benchmarks/bench_intents.py [--repeat 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.fast_path import attribute_patterns
+from app.core.intents import IntentClassifier
+from test_intents import LABELED_QUERIES
+
+TROUBLESHOOTING_KEYWORDS = ['not working', 'broken', 'leak', 'issue', 'problem', 'fix', 'repair']
+COMPARISON_KEYWORDS = ['compare', 'difference', 'versus', 'vs', 'better']
+
+# Only the prompts the legacy code could choose between
+PROMPT_INTENTS = ("troubleshooting", "comparison")
+
+
+def legacy_route(query: str) -> str:
+    """What _synthesize_response did: comparison overrides troubleshooting"""
+    route = "other"
+    if any(keyword in query.lower() for keyword in TROUBLESHOOTING_KEYWORDS):
+        route = "troubleshooting"
+    if any(keyword in query.lower() for keyword in COMPARISON_KEYWORDS):
+        route = "comparison"
+    return route
+
+
+def expected_route(label: str) -> str:
+    return label if label in PROMPT_INTENTS else "other"
+
+
+def throughput(fn, queries, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return repeat * len(queries) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the corpus per timing")
+    args = parser.parse_args()
+
+    classifier = IntentClassifier(attributes=attribute_patterns(), cache_size=0)
+    queries = [query for query, _ in LABELED_QUERIES]
+
+    legacy_correct = sum(legacy_route(q) == expected_route(label) for q, label in LABELED_QUERIES)
+    routed_correct = sum(
+        expected_route(classifier.classify(q).primary) == expected_route(label) for q, label in LABELED_QUERIES
+    )
+    intent_correct = sum(classifier.classify(q).primary == label for q, label in LABELED_QUERIES)
+
+    print(f"Corpus: {len(LABELED_QUERIES)} labeled queries\n")
+    print("Prompt routing accuracy (troubleshooting / comparison / other):")
+    print(f"  legacy keyword scans : {legacy_correct}/{len(LABELED_QUERIES)}")
+    print(f"  IntentClassifier     : {routed_correct}/{len(LABELED_QUERIES)}")
+    print(f"Full intent accuracy   : {intent_correct}/{len(LABELED_QUERIES)}\n")
+
+    for query, label in LABELED_QUERIES:
+        legacy = legacy_route(query)
+        if legacy != expected_route(label):
+            print(f"  legacy misroute: {query!r} -> {legacy} (expected {expected_route(label)})")
+
+    legacy_qps = throughput(legacy_route, queries, args.repeat)
+    classifier_qps = throughput(classifier.classify, queries, args.repeat)
+    print("\nThroughput (queries/s):")
+    print(f"  legacy keyword scans : {legacy_qps:,.0f}")
+    print(f"  IntentClassifier     : {classifier_qps:,.0f} (all intents + spec attributes, one pass)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Response payload benchmark - bytes on the wire and serialization time
+
+For a sample of catalog products, builds /api/product and /api/chat
+style payloads, then reports per field set:
+- raw / gzip / brotli size
+- serialization time with stdlib json (FastAPI's default path) vs orjson
+
+Usage (from server/):
+    python benchmarks/bench_payloads.py [--products 200]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core import compression, response_shaping
+from app.core.response_shaping import FIELD_SETS, shape_chat_response, shape_product
+from app.services.data_loader import ProductDatabase
+
+# Typical synthesized answer length (characters)
+ANSWER_TEXT = ("The faucet ships with a 1.2 GPM aerator and a ceramic disc cartridge. " * 30).strip()
+
+
+def chat_payload(product) -> dict:
+    """Orchestrator-shaped result for a product"""
+    data = product.to_dict()
+    return {
+        "markdown_response": ANSWER_TEXT,
+        "media_assets": {
+            "specs": data["specs"],
+            "videos": data["media"].get("videos", []),
+            "images": data["media"].get("images", []),
+            "documents": data["documents"]
+        },
+        "sources": ["Product Catalog", "Installation Guide"],
+        "model_used": "gemini-2.5-flash",
+        "matched_product": product.model_number,
+        "confidence": 1.0,
+        "rerank": None,
+        "timestamp": "2025-01-01T00:00:00Z"
+    }
+
+
+def stdlib_dumps(payload) -> bytes:
+    """What JSONResponse does: jsonable_encoder + json.dumps"""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def time_ms(fn, payloads) -> float:
+    started = time.perf_counter()
+    for payload in payloads:
+        fn(payload)
+    return (time.perf_counter() - started) * 1000 / len(payloads)
+
+
+def report(name, payloads):
+    print(f"\n{name}")
+    print(f"  {'fields':<8} {'raw':>9} {'gzip':>9} {'brotli':>9}   {'json ms':>8} {'orjson ms':>9}")
+    for field_set, shaped in payloads.items():
+        raw = [response_shaping.dumps(p) for p in shaped]
+        sizes = {
+            "raw": np.mean([len(b) for b in raw]),
+            "gzip": np.mean([len(gzip.compress(b, 6)) for b in raw]),
+            "br": np.mean([len(compression.compress(b, "br")) for b in raw]) if compression.brotli else float("nan")
+        }
+        json_ms = time_ms(stdlib_dumps, shaped)
+        orjson_ms = time_ms(response_shaping.dumps, shaped)
+        print(f"  {field_set:<8} {sizes['raw']:>8.0f}B {sizes['gzip']:>8.0f}B {sizes['br']:>8.0f}B   "
+              f"{json_ms:>8.3f} {orjson_ms:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PAYLOAD BENCHMARK")
+    print("=" * 60)
+    print(f"orjson: {'yes' if response_shaping.orjson else 'no (stdlib fallback)'}  "
+          f"brotli: {'yes' if compression.brotli else 'no'}")
+
+    db = ProductDatabase("data")
+    db.load_data()
+    models = random.Random(7).sample(db.get_all_models(), min(args.products, len(db.get_all_models())))
+    products = [db.get_product_by_model(m) for m in models]
+    products = [p for p in products if p]
+    print(f"Sampled {len(products)} products (mean sizes per response)")
+
+    product_dicts = [p.to_dict() for p in products]
+    chats = [chat_payload(p) for p in products]
+
+    report("/api/product/{model}", {f: [shape_product(d, f) for d in product_dicts] for f in FIELD_SETS})
+    report("/api/chat", {f: [shape_chat_response(c, f) for c in chats] for f in FIELD_SETS})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Pipeline benchmark - two-call vs single-call retrieval + synthesis
+
+Runs catalog questions through the real Orchestrator and GeminiService
+against a local fake of client.aio.models.generate_content whose latency
+follows a simple model:
+
+    round trip + File Search (when the tool is attached)
+    + prompt tokens x prefill time + output tokens x decode time
+
+The two-call path pays for a File Search call that also generates (and
+discards) an answer before synthesis starts; the single-call path
+attaches the File Search tool to synthesis. Reports upstream calls,
+tokens and end-to-end latency per mode (simulated upstream seconds plus
+measured local processing; --scale only shortens the wall-clock run).
+
+Usage (from server/):
+    python benchmarks/bench_pipeline.py [--queries 40] [--scale 0.02]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.orchestrator import PIPELINE_MODES, Orchestrator
+from app.core.prompts import PromptsManager
+from app.services import usage
+from app.services.data_loader import ProductDatabase
+from app.services.gemini_service import GeminiService
+from app.services.resilience import UpstreamPolicy
+
+QUESTIONS = [
+    "How do I install {model}?",
+    "My {model} is leaking from the handle, how do I fix it?",
+    "What cartridge does {model} use and how is it replaced?",
+    "Is {model} compatible with a 3-hole deck?"
+]
+
+
+class LatencyModel:
+    """Fake generate_content with token-proportional latency"""
+
+    def __init__(self, scale: float, round_trip: float = 0.2, search: float = 0.5,
+                 prefill_per_token: float = 0.00005, decode_per_token: float = 0.004,
+                 search_answer_tokens: int = 250, answer_tokens: int = 600):
+        self.scale = scale
+        self.round_trip = round_trip
+        self.search = search
+        self.prefill_per_token = prefill_per_token
+        self.decode_per_token = decode_per_token
+        self.search_answer_tokens = search_answer_tokens
+        self.answer_tokens = answer_tokens
+        self.calls = 0
+        self.simulated_seconds = 0.0
+
+    @staticmethod
+    def _prompt_tokens(contents, config) -> int:
+        text = contents if isinstance(contents, str) else " ".join(
+            part.text for content in contents for part in content.parts
+        )
+        return (len(text) + len(config.system_instruction or "")) // 4
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        tools = bool(config.tools)
+        is_search_only = tools and not config.system_instruction
+        prompt = self._prompt_tokens(contents, config)
+        output = self.search_answer_tokens if is_search_only else self.answer_tokens
+        chunks = [
+            SimpleNamespace(retrieved_context=SimpleNamespace(
+                title=f"Installation Guide {i}", text="Seat the cartridge and tighten the bonnet nut. " * 20, uri=""
+            ))
+            for i in range(5)
+        ] if tools else []
+        if tools:
+            prompt += sum(len(c.retrieved_context.text) for c in chunks) // 4
+
+        seconds = (
+            self.round_trip
+            + (self.search if tools else 0.0)
+            + prompt * self.prefill_per_token
+            + output * self.decode_per_token
+        )
+        self.simulated_seconds += seconds
+        await asyncio.sleep(seconds * self.scale)
+        return SimpleNamespace(
+            text="answer " * output,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt, candidates_token_count=output, total_token_count=prompt + output
+            ),
+            candidates=[SimpleNamespace(grounding_metadata=SimpleNamespace(grounding_chunks=chunks))]
+        )
+
+
+def make_gemini(models: LatencyModel) -> GeminiService:
+    service = GeminiService.__new__(GeminiService)
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    service.file_search_store_name = "fileSearchStores/bench"
+    service.models = {"flash": "gemini-2.5-flash", "reasoning": "gemini-2.5-pro"}
+    service.context_cache = None
+    service.policy = UpstreamPolicy(hedge_enabled=False)
+    service.search_timeout = 60.0
+    service.reasoning_latency_estimate = 30.0
+    service.downgrades = 0
+    return service
+
+
+async def run_mode(db, mode: str, queries, scale: float):
+    models = LatencyModel(scale)
+    with contextlib.redirect_stdout(io.StringIO()):
+        orchestrator = Orchestrator(db, make_gemini(models), PromptsManager(), enable_fast_path=False)
+    latencies, tokens = [], []
+    for query in queries:
+        simulated = models.simulated_seconds
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await orchestrator.process_query(query, pipeline=mode)
+        upstream = models.simulated_seconds - simulated
+        local = max(time.perf_counter() - started - upstream * scale, 0.0)
+        latencies.append(upstream + local)
+        tokens.append(result["usage"]["total_tokens"])
+    return {
+        "calls_per_query": models.calls / len(queries),
+        "tokens_per_query": float(np.mean(tokens)),
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--scale", type=float, default=0.02, help="Wall-clock fraction of simulated latency")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PIPELINE BENCHMARK (local fake upstream)")
+    print("=" * 60)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = ProductDatabase("data")
+        db.load_data()
+    rng = random.Random(7)
+    models = rng.sample(db.get_all_models(), min(args.queries, len(db.get_all_models())))
+    queries = [rng.choice(QUESTIONS).format(model=m) for m in models]
+    usage.usage_ledger = None
+
+    print(f"{len(queries)} queries\n")
+    print(f"  {'mode':<12} {'calls/query':>11} {'tokens/query':>12} {'p50 s':>7} {'p95 s':>7}")
+    results = {}
+    for mode in PIPELINE_MODES:
+        results[mode] = asyncio.run(run_mode(db, mode, queries, args.scale))
+        r = results[mode]
+        print(f"  {mode:<12} {r['calls_per_query']:>11.1f} {r['tokens_per_query']:>12.0f} "
+              f"{r['p50']:>7.2f} {r['p95']:>7.2f}")
+
+    saved = 1 - results["single_call"]["p50"] / results["two_call"]["p50"]
+    print(f"\nsingle_call p50 latency: {saved:.0%} lower than two_call")
+
+
+if __name__ == "__main__":
+    main()
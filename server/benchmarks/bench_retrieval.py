@@ -0,0 +1,119 @@
+"""
+Retrieval latency / recall benchmark for the local index
+
+Builds an offline corpus from the shipped catalog (one document per
+product family: title, description and bullets), generates queries with
+a known relevant document, and compares vector, lexical and the
+backend's combined strategy.
+
+Usage (from server/):
+    python benchmarks/bench_retrieval.py [--queries 300] [--embedder hashed]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+
+from app.services.data_loader import ProductDatabase
+from app.services.retrieval import LocalChunkStore, LocalRetriever, get_embedder
+
+
+def build_corpus(db: ProductDatabase):
+    """One document per Common_Group_Number"""
+    df = db.catalog_df
+    bullet_cols = [c for c in df.columns if c.startswith("Description Bullet")]
+    documents = []
+    for group, rows in df.groupby("Common_Group_Number"):
+        row = rows.iloc[0]
+        parts = [str(row.get("Product_Title", "")), str(row.get("Description", ""))]
+        parts += [str(row[c]) for c in bullet_cols if isinstance(row[c], str)]
+        documents.append({
+            "title": str(group),
+            "text": " ".join(p for p in parts if p and p != "nan"),
+            "uri": "",
+            "page": None
+        })
+    return documents
+
+
+def build_queries(documents, count: int, seed: int = 7):
+    """Query = a few words of the title plus a few words of the body"""
+    rng = random.Random(seed)
+    queries = []
+    for doc in rng.sample(documents, min(count, len(documents))):
+        words = doc["text"].split()
+        title_words = words[:6]
+        body_words = rng.sample(words[6:], min(5, max(len(words) - 6, 0)))
+        queries.append((" ".join(rng.sample(title_words, min(3, len(title_words))) + body_words), doc["title"]))
+    return queries
+
+
+def percentile(values, p):
+    return float(np.percentile(values, p)) if values else 0.0
+
+
+def evaluate(name, search_fn, queries, k=5):
+    latencies, hits_at_1, hits_at_k = [], 0, 0
+    for query, relevant in queries:
+        started = time.perf_counter()
+        titles = search_fn(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits_at_1 += bool(titles) and titles[0] == relevant
+        hits_at_k += relevant in titles
+    n = len(queries)
+    print(f"{name:<10} recall@1={hits_at_1 / n:.3f}  recall@{k}={hits_at_k / n:.3f}  "
+          f"p50={percentile(latencies, 50):.2f}ms  p95={percentile(latencies, 95):.2f}ms  "
+          f"p99={percentile(latencies, 99):.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--embedder", default="hashed")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RETRIEVAL BENCHMARK")
+    print("=" * 60)
+
+    db = ProductDatabase("data")
+    db.load_data()
+    documents = build_corpus(db)
+
+    embedder = get_embedder(args.embedder)
+    started = time.perf_counter()
+    store = LocalChunkStore.build(documents, embedder)
+    build_s = time.perf_counter() - started
+    retriever = LocalRetriever(store, embedder)
+    print(f"\nCorpus: {len(documents)} documents → {len(store.chunks)} chunks "
+          f"(embed + index {build_s:.2f}s, {store.embeddings.nbytes / 1e6:.1f} MB vectors)")
+
+    queries = build_queries(documents, args.queries)
+    print(f"Queries: {len(queries)} (k={args.k})\n")
+
+    def titles(hits):
+        seen = []
+        for chunk_id, _ in hits:
+            title = store.chunks[chunk_id]["title"]
+            if title not in seen:
+                seen.append(title)
+        return seen
+
+    evaluate("vector", lambda q, k: titles(retriever.vector_search(q, k * 3))[:k], queries, args.k)
+    evaluate("lexical", lambda q, k: titles(retriever.lexical.search(q, k * 3))[:k], queries, args.k)
+    evaluate("backend", lambda q, k: [r["title"] for r in retriever.search(q, max_results=k)], queries, args.k)
+
+    print(f"\nBackend strategy: {retriever.stats['vector']} vector, "
+          f"{retriever.stats['lexical_fallback']} lexical fallback")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Catalog scaling benchmark - load time, memory and lookup latency by SKU count
+
+For each size, generates (or reuses) a synthetic catalog with
+synthetic_catalog.py, then in a fresh process:
+- loads it with ProductDatabase.load_data(), reporting wall time, the
+  per-stage load_timings (manifest parse, Excel read, model / suggest /
+  family indexes, query view, related products) and peak RSS growth
+- times the catalog lookups a chat request or catalog page makes:
+    find_exact     find_product with a model number in the text
+    find_fuzzy     find_product without one (falls through to fuzzy
+                   matching against every model)
+    by_model       get_product_by_model
+    by_category    search_by_category on a subcategory name
+    suggest        suggest_models on a 5-character prefix
+    spec_query     CatalogQueryEngine: finish + price bound
+  and reports p50 / p95 / p99 per lookup. Each lookup runs --lookups
+  times or until --budget seconds are spent, whichever comes first.
+
+One process per size keeps peak memory comparable. Load time and memory
+grow linearly: 100k SKUs took 142 s (125 s of it pd.read_excel) and
+1.5 GB peak RSS, so 1M needs roughly 15 GB of RAM and 25 minutes.
+
+Usage (from server/):
+    python benchmarks/bench_scaling.py [--sizes 10000,100000,1000000] [--lookups 50] [--budget 20]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_catalog import ensure_catalog, load_template
+
+# Questions without a model number (find_product's slowest path)
+FUZZY_QUERIES = [
+    "my kitchen faucet is leaking from the base, what should I do",
+    "customer wants a matte black shower head with a handheld",
+    "which bathroom fixture has the lowest flow rate",
+    "the thermostatic valve makes a whistling noise"
+]
+
+LOOKUPS = ("find_exact", "find_fuzzy", "by_model", "by_category", "suggest", "spec_query")
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def measure(catalog_dir: str, lookups: int, budget: float, seed: int) -> dict:
+    """Load a catalog and time lookups (runs in a fresh process)"""
+    from app.services.data_loader import ProductDatabase
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = ProductDatabase(catalog_dir)
+        db.load_data()
+    load_seconds = time.perf_counter() - started
+    peak = _peak_rss_mb()
+
+    rng = random.Random(seed)
+    models = db.catalog_df["Model_NO"].dropna().tolist()
+    subcategories = db.catalog_df["Sub_Product_Category"].dropna().unique().tolist()
+    finishes = db.catalog_df["Finish"].dropna().unique().tolist()
+    calls = {
+        "find_exact": lambda: db.find_product(f"Is {rng.choice(models)} still available in this finish?"),
+        "find_fuzzy": lambda: db.find_product(rng.choice(FUZZY_QUERIES)),
+        "by_model": lambda: db.get_product_by_model(rng.choice(models)),
+        "by_category": lambda: db.search_by_category(rng.choice(subcategories)),
+        "suggest": lambda: db.suggest_models(rng.choice(models)[:5], 10),
+        "spec_query": lambda: db.catalog_query.query([
+            {"field": "finish", "op": "eq", "value": rng.choice(finishes)},
+            {"field": "price", "op": "lte", "value": rng.choice([200, 500, 1000])}
+        ], limit=20)
+    }
+
+    latencies = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in LOOKUPS:
+            samples = []
+            deadline = time.perf_counter() + budget
+            while len(samples) < lookups and time.perf_counter() < deadline:
+                t = time.perf_counter()
+                calls[name]()
+                samples.append((time.perf_counter() - t) * 1000)
+            latencies[name] = {
+                "n": len(samples),
+                "p50": float(np.percentile(samples, 50)),
+                "p95": float(np.percentile(samples, 95)),
+                "p99": float(np.percentile(samples, 99))
+            }
+
+    return {
+        "rows": len(db.catalog_df),
+        "load_seconds": load_seconds,
+        "load_timings_ms": db.load_timings,
+        "peak_rss_mb": peak,
+        "load_rss_mb": peak - baseline,
+        "lookups": latencies
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated SKU counts")
+    parser.add_argument("--lookups", type=int, default=50, help="Calls per lookup type")
+    parser.add_argument("--budget", type=float, default=20.0, help="Max seconds per lookup type")
+    parser.add_argument("--brands", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--work-dir", default="/tmp/catalog_scaling", help="Generated catalogs (reused across runs)")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CATALOG SCALING BENCHMARK")
+    print("=" * 60)
+
+    template = []
+
+    def template_loader():
+        if not template:
+            template.append(load_template())
+        return template[0]
+
+    results = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        catalog_dir = Path(args.work_dir) / str(size)
+        info = ensure_catalog(template_loader, size, catalog_dir, brands=args.brands, seed=args.seed)
+        source = "reused" if info.get("reused") else f"generated in {info['seconds']}s"
+        print(f"\n{size:,} SKUs ({info['families']:,} families, {args.brands} brands; "
+              f"xlsx {info['catalog_mb']} MB, manifest {info['manifest_mb']} MB; {source})")
+
+        spawn = get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                r = pool.submit(measure, str(catalog_dir), args.lookups, args.budget, args.seed).result()
+        except BrokenProcessPool:
+            print("  ✗ Load process died (out of memory?)")
+            results[size] = None
+            continue
+        results[size] = r
+
+        timings = ", ".join(f"{stage} {ms / 1000:.2f}s" for stage, ms in r["load_timings_ms"].items())
+        print(f"  load      {r['load_seconds']:.1f}s  peak RSS {r['peak_rss_mb']:.0f} MB "
+              f"(+{r['load_rss_mb']:.0f} MB)")
+        print(f"            {timings}")
+        print(f"  {'lookup':<12} {'n':>4} {'p50':>10} {'p95':>10} {'p99':>10}")
+        for name, stats in r["lookups"].items():
+            print(f"  {name:<12} {stats['n']:>4} {stats['p50']:>8.2f}ms {stats['p95']:>8.2f}ms {stats['p99']:>8.2f}ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
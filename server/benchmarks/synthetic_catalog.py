@@ -0,0 +1,263 @@
+"""
+Synthetic catalog generator - realistic catalogs at any size
+
+Builds a catalog directory that ProductDatabase.load_data() reads
+unchanged (Product-2025-11-12.xlsx + metadata_manifest.json) by cloning
+the shipped catalog's product families:
+- each synthetic family copies a real one (titles, categories, bullets,
+  finish set) with its digit runs re-drawn and, for merged brands, a
+  brand prefix ("AQ.160.2705" -> "AQ.160.2705CP", "AQ.160.2705BN", ...),
+  so model numbers keep the real formats and finish codes
+- every column that embeds the model number (image names, URLs, spec
+  sheet files) is rewritten to the new one
+- list price and dimensions are scaled per family (sibling finishes keep
+  their relative prices), popularity and UPCs are drawn per row
+- the manifest holds one item per product with an image, its metadata
+  being the product's catalog record, as in the real export
+
+Rows are generated and written in chunks, so memory stays flat at any
+size (100k SKUs: 34 MB xlsx + 330 MB manifest on disk, ~100 s).
+
+Usage (from server/):
+    python benchmarks/synthetic_catalog.py --size 100000 --out /tmp/catalog_100k [--brands 4] [--seed 7]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import orjson
+import pandas as pd
+from openpyxl import Workbook
+
+server_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(server_dir))
+
+from app.services.data_loader import ProductDatabase
+
+# File names ProductDatabase.load_data() reads
+CATALOG_FILE = "Product-2025-11-12.xlsx"
+MANIFEST_FILE = "metadata_manifest.json"
+# Size / seed of a generated directory, so benchmarks can reuse it
+INFO_FILE = "synthetic.json"
+
+# Merged-brand model prefixes (brand 0 is the shipped catalog's own format)
+BRAND_PREFIXES = ("", "AQ.", "LX.", "ST.", "NV.", "KR.", "OM.", "PX.")
+
+# Columns whose text contains the model number / family base
+MODEL_COLUMNS = (
+    "Model_NO", "Common_Group_Number", "Image_URL", "Parts_Diagram_File_Name", "Spec_Sheet_File_Name",
+    "Installation_Manual_File_Name", "Spec_Sheet_Full_URL", "Part_Diagram_Full_URL",
+    "Installation_manual_Full_URL", "product_url", "product_image_100x100_name",
+    "product_image_250x250_name", "product_image_500x500_name", "product_image_1000x1000_name"
+)
+DIMENSION_COLUMNS = ("Product_Height_Inches", "Product_Length_Inches", "Product_Width_Inches", "Package_Weight_lbs")
+
+CHUNK_ROWS = 20000
+
+
+def load_template(data_dir: str = "data") -> ProductDatabase:
+    """The shipped catalog, whose families are cloned"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = ProductDatabase(data_dir)
+        db.load_data()
+    return db
+
+
+class CatalogGenerator:
+    """
+    Clones template families into a catalog of a requested size.
+    """
+
+    def __init__(self, template: ProductDatabase, brands: int = 4, seed: int = 7):
+        """
+        Args:
+            template: Loaded ProductDatabase to clone
+            brands: Number of brands (model prefixes) in the merged catalog
+            seed: Random seed (same seed + size = same catalog)
+        """
+        if not 1 <= brands <= len(BRAND_PREFIXES):
+            raise ValueError(f"brands must be between 1 and {len(BRAND_PREFIXES)}")
+        self.df = template.catalog_df.reset_index(drop=True)
+        self.bases: List[str] = sorted(template.family_index)
+        self.members: List[np.ndarray] = [
+            np.array([template._row_index[m] for m in template.family_index[base]], dtype=np.int64)
+            for base in self.bases
+        ]
+        self.brands = brands
+        self.rng = np.random.default_rng(seed)
+        self._used_bases = set()
+        self._upc = 810000000000
+
+    def _new_base(self, base: str) -> str:
+        """Template base with fresh digits and a brand prefix, unique in this catalog"""
+        prefix = BRAND_PREFIXES[self.rng.integers(self.brands)]
+        for _ in range(50):
+            digits = lambda m: "".join(str(d) for d in self.rng.integers(0, 10, len(m.group())))
+            candidate = prefix + re.sub(r"\d+", digits, base)
+            if candidate == prefix + base and re.search(r"\d", base):
+                continue
+            if candidate not in self._used_bases:
+                break
+        else:
+            candidate = f"{prefix}{base}.{len(self._used_bases)}"
+        self._used_bases.add(candidate)
+        return candidate
+
+    def chunks(self, size: int) -> Iterator[pd.DataFrame]:
+        """Catalog rows, CHUNK_ROWS at a time, size rows in total"""
+        remaining = size
+        while remaining > 0:
+            positions, old_bases, new_bases, family_ids = [], [], [], []
+            rows = 0
+            while rows < min(CHUNK_ROWS, remaining):
+                family = int(self.rng.integers(len(self.bases)))
+                members = self.members[family]
+                base = self.bases[family]
+                new_base = self._new_base(base)
+                positions.append(members)
+                old_bases += [base] * len(members)
+                new_bases += [new_base] * len(members)
+                family_ids += [len(self._used_bases)] * len(members)
+                rows += len(members)
+            take = min(rows, remaining)
+            chunk = self.df.iloc[np.concatenate(positions)[:take]].reset_index(drop=True)
+            yield self._rewrite(chunk, old_bases[:take], new_bases[:take], np.array(family_ids[:take]))
+            remaining -= take
+
+    def _rewrite(self, chunk: pd.DataFrame, old_bases: List[str], new_bases: List[str], families: np.ndarray) -> pd.DataFrame:
+        compact_old = [b.replace(".", "") for b in old_bases]
+        compact_new = [b.replace(".", "") for b in new_bases]
+        for column in MODEL_COLUMNS:
+            if column not in chunk.columns:
+                continue
+            chunk[column] = [
+                _rebase(value, old, new, c_old, c_new)
+                for value, old, new, c_old, c_new in zip(chunk[column], old_bases, new_bases, compact_old, compact_new)
+            ]
+
+        # One factor per family: sibling finishes keep their relative prices
+        _, family_index = np.unique(families, return_inverse=True)
+        price_factor = self.rng.lognormal(0.0, 0.25, family_index.max() + 1)[family_index]
+        size_factor = self.rng.uniform(0.85, 1.15, family_index.max() + 1)[family_index]
+        for column, factor in (("List_Price", price_factor), ("MAP_Price", price_factor), ("CAD_List_Price", price_factor)):
+            if column in chunk.columns:
+                chunk[column] = np.round(pd.to_numeric(chunk[column], errors="coerce") * factor)
+        for column in DIMENSION_COLUMNS:
+            if column in chunk.columns:
+                chunk[column] = np.round(pd.to_numeric(chunk[column], errors="coerce") * size_factor, 2)
+        if "Popularity" in chunk.columns:
+            chunk["Popularity"] = self.rng.zipf(2.0, len(chunk)).clip(max=10000) - 1
+        if "Item_UPC_Number" in chunk.columns:
+            chunk["Item_UPC_Number"] = [str(self._upc + i) for i in range(len(chunk))]
+            self._upc += len(chunk)
+        return chunk
+
+
+def _rebase(value, old: str, new: str, compact_old: str, compact_new: str):
+    """Swap the family base in a text value, dotted ("10.FGC.4003") or compact ("10FGC4003") form"""
+    if not isinstance(value, str):
+        return value
+    if old in value:
+        return value.replace(old, new)
+    return value.replace(compact_old, compact_new)
+
+
+def _manifest_item(record: Dict) -> Optional[bytes]:
+    """metadata_manifest.json entry for a product with an image"""
+    metadata = {k: v for k, v in record.items() if not (isinstance(v, float) and np.isnan(v))}
+    image = metadata.get("Image_URL")
+    if not image:
+        return None
+    return orjson.dumps({
+        "originalUrl": f"https://{image}",
+        "savedAs": f"{metadata['Model_NO']}.jpg",
+        "metadata": metadata
+    }, option=orjson.OPT_SERIALIZE_NUMPY, default=str)
+
+
+def generate(template: ProductDatabase, size: int, out_dir: Path, brands: int = 4, seed: int = 7) -> Dict:
+    """
+    Write a synthetic catalog directory.
+
+    Args:
+        template: Loaded shipped catalog
+        size: Catalog rows (SKUs)
+        out_dir: Directory to create / overwrite
+        brands: Brands in the merged catalog
+        seed: Random seed
+
+    Returns:
+        {"size", "brands", "seed", "families", "manifest_items", "catalog_mb", "manifest_mb", "seconds"}
+    """
+    started = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    generator = CatalogGenerator(template, brands=brands, seed=seed)
+    columns = list(generator.df.columns)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    manifest_items = 0
+    with open(out_dir / MANIFEST_FILE, "wb") as manifest:
+        manifest.write(b"[")
+        for chunk in generator.chunks(size):
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                sheet.append(row)
+            for record in chunk.to_dict("records"):
+                item = _manifest_item(record)
+                if item is not None:
+                    manifest.write(b",\n" if manifest_items else b"\n")
+                    manifest.write(item)
+                    manifest_items += 1
+        manifest.write(b"\n]\n")
+    workbook.save(out_dir / CATALOG_FILE)
+
+    info = {
+        "size": size,
+        "brands": brands,
+        "seed": seed,
+        "families": len(generator._used_bases),
+        "manifest_items": manifest_items,
+        "catalog_mb": round((out_dir / CATALOG_FILE).stat().st_size / 1e6, 1),
+        "manifest_mb": round((out_dir / MANIFEST_FILE).stat().st_size / 1e6, 1),
+        "seconds": round(time.perf_counter() - started, 1)
+    }
+    (out_dir / INFO_FILE).write_text(json.dumps(info, indent=2))
+    return info
+
+
+def ensure_catalog(template_loader, size: int, out_dir: Path, brands: int = 4, seed: int = 7) -> Dict:
+    """Reuse out_dir if it already holds this size / brands / seed, else generate it"""
+    info_path = out_dir / INFO_FILE
+    if info_path.exists():
+        info = json.loads(info_path.read_text())
+        if (info.get("size"), info.get("brands"), info.get("seed")) == (size, brands, seed):
+            return {**info, "reused": True}
+    return generate(template_loader(), size, out_dir, brands=brands, seed=seed)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, required=True, help="SKUs to generate")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--brands", type=int, default=4, help=f"Merged brands (1-{len(BRAND_PREFIXES)})")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    info = generate(load_template(), args.size, Path(args.out), brands=args.brands, seed=args.seed)
+    print(f"✓ Wrote {info['size']} SKUs in {info['families']} families to {args.out} in {info['seconds']}s "
+          f"({CATALOG_FILE}: {info['catalog_mb']} MB, {MANIFEST_FILE}: {info['manifest_items']} items, "
+          f"{info['manifest_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,160 @@
+"""Tests for lane admission control: priority queueing, displacement, cancellation and timeouts"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.admission import AdmissionController, Overloaded
+from app.services.resilience import Deadline
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def queued(controller, lane, **kwargs):
+    """Start an acquire() that has to wait, once it is in the queue"""
+    task = asyncio.create_task(controller.acquire(lane, **kwargs))
+    await asyncio.sleep(0)
+    assert not task.done()
+    return task
+
+
+def test_release_hands_slot_to_waiter():
+    async def scenario():
+        controller = AdmissionController(limits={"flash": 1})
+        await controller.acquire("flash")
+        waiter = await queued(controller, "flash")
+        assert controller.get_stats()["lanes"]["flash"]["queue_depth"] == 1
+
+        controller.release("flash", service_time=2.0)
+        await waiter
+        assert controller.active["flash"] == 1
+        assert controller.waiters == []
+        return controller.get_stats()["lanes"]["flash"]
+
+    stats = run(scenario())
+    assert stats["admitted"] == 2 and stats["queued"] == 1
+    assert stats["avg_service_s"] == pytest.approx(1.2)
+
+
+def test_higher_priority_waiter_served_first():
+    async def scenario():
+        controller = AdmissionController(total_limit=1)
+        await controller.acquire("flash")
+        reasoning = await queued(controller, "reasoning")
+        cheap = await queued(controller, "cheap")
+
+        controller.release("flash")
+        assert controller.active == {"cheap": 1, "flash": 0, "reasoning": 0}
+        await cheap
+        assert not reasoning.done()
+        controller.release("cheap")
+        await reasoning
+
+    run(scenario())
+
+
+def test_full_queue_displaces_lower_priority_waiter():
+    async def scenario():
+        controller = AdmissionController(limits={"cheap": 1, "flash": 1, "reasoning": 1}, max_queue=1)
+        await controller.acquire("cheap")
+        await controller.acquire("reasoning")
+        reasoning = await queued(controller, "reasoning")
+
+        # A cheap request outranks the queued reasoning one and takes its place
+        cheap = await queued(controller, "cheap")
+        with pytest.raises(Overloaded) as displaced:
+            await reasoning
+        assert displaced.value.reason == "displaced by higher-priority request"
+        assert displaced.value.retry_after >= 1
+
+        # Nothing outranks the cheap waiter: the newcomer is shed
+        with pytest.raises(Overloaded) as full:
+            await controller.acquire("reasoning")
+        assert full.value.reason == "queue full"
+
+        controller.release("cheap")
+        await cheap
+        return controller.get_stats()["lanes"]
+
+    lanes = run(scenario())
+    assert lanes["reasoning"]["shed"] == {"queue_full": 1, "timeout": 0, "displaced": 1}
+    assert lanes["cheap"]["active"] == 1
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        controller = AdmissionController(limits={"flash": 1})
+        await controller.acquire("flash")
+        waiter = await queued(controller, "flash")
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.waiters == []
+
+        # The freed slot is not handed to the cancelled request
+        controller.release("flash")
+        assert controller.active["flash"] == 0
+        await controller.acquire("flash")
+        assert controller.active["flash"] == 1
+
+    run(scenario())
+
+
+def test_waiter_cancelled_after_grant_returns_slot():
+    async def scenario():
+        controller = AdmissionController(limits={"flash": 1})
+        await controller.acquire("flash")
+        waiter = await queued(controller, "flash")
+        controller.release("flash")  # Granted, but the task has not resumed yet
+        assert controller.active["flash"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.active["flash"] == 0
+
+    run(scenario())
+
+
+def test_wait_bounded_by_timeout_and_deadline():
+    async def scenario():
+        controller = AdmissionController(limits={"flash": 1}, max_wait_seconds=0.01)
+        await controller.acquire("flash")
+        with pytest.raises(Overloaded) as timed_out:
+            await controller.acquire("flash")
+        assert timed_out.value.reason == "queue wait timed out"
+        assert timed_out.value.retry_after >= 1
+
+        controller.max_wait_seconds = 10.0
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(Overloaded):
+            await controller.acquire("flash", deadline=Deadline.after(0.02))
+        assert asyncio.get_running_loop().time() - started < 1.0
+        assert controller.waiters == []
+        return controller.lanes["flash"].shed["timeout"]
+
+    assert run(scenario()) == 2
+
+
+def test_admit_releases_on_error():
+    async def scenario():
+        controller = AdmissionController(limits={"flash": 1})
+        with pytest.raises(RuntimeError):
+            async with controller.admit("flash"):
+                raise RuntimeError("boom")
+        assert controller.active["flash"] == 0
+
+    run(scenario())
+
+
+def test_retry_after_scales_with_queue():
+    controller = AdmissionController(limits={"reasoning": 2})
+    controller.lanes["reasoning"].service_time = 3.0
+    assert controller.retry_after("reasoning") == 2.0  # ceil(3 * 1 / 2)
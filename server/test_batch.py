@@ -0,0 +1,146 @@
+"""Tests for batch jobs: bounded concurrency, failures, streaming, export and cancellation"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.batch import BatchItem, BatchJobManager
+from app.core.prompts import PromptsManager
+
+
+class FakeOrchestrator:
+    """process_query stand-in recording peak concurrency; queries containing 'fail' raise"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.cancelled = []
+
+    async def process_query(self, query, model_mode="flash"):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError as e:
+            self.cancelled.append(e.args[0] if e.args else None)
+            raise
+        finally:
+            self.running -= 1
+        if "fail" in query:
+            raise RuntimeError("upstream error")
+        return {"markdown_response": f"answer: {query}", "model_used": "flash", "sources": [], "response_id": query}
+
+    def get_note(self, response_id):
+        return f"<p>note {response_id}</p>"
+
+
+class FakeFreshdesk:
+    def __init__(self):
+        self.notes = []
+
+    async def add_private_note(self, ticket_id, note_html):
+        self.notes.append((ticket_id, note_html))
+        return {"success": True, "note_id": len(self.notes), "error": None}
+
+
+def items(*queries):
+    return [BatchItem(index=i, query=q, ticket_id=f"T{i}") for i, q in enumerate(queries)]
+
+
+def test_job_runs_with_bounded_concurrency_and_counts_failures():
+    orchestrator = FakeOrchestrator()
+
+    async def scenario():
+        manager = BatchJobManager(orchestrator, lambda: None, PromptsManager(), max_concurrency=3)
+        job = manager.create_job(items(*[f"q{i}" for i in range(9)], "please fail"), concurrency=10)
+        await job.task
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.concurrency == 3 and orchestrator.peak == 3
+    assert job.status == "completed"
+    assert len(job.results) == 10 and job.failed == 1
+    failed = next(r for r in job.results if r["status"] == "failed")
+    assert failed["query"] == "please fail" and failed["error"] == "upstream error"
+    progress = job.progress()
+    assert progress["percent"] == 100.0 and progress["eta_s"] is None
+
+
+def test_stream_replays_results_then_progress():
+    async def scenario():
+        manager = BatchJobManager(FakeOrchestrator(), lambda: None, PromptsManager())
+        job = manager.create_job(items("a", "b", "c"), concurrency=1)
+        await asyncio.sleep(0.015)  # Some results exist before the stream starts
+        return [record async for record in manager.stream(job)]
+
+    records = asyncio.run(scenario())
+    assert [r["type"] for r in records] == ["result", "result", "result", "progress"]
+    assert sorted(r["query"] for r in records[:3]) == ["a", "b", "c"]
+    assert records[-1]["completed"] == 3
+
+
+def test_auto_export_posts_rendered_notes():
+    freshdesk = FakeFreshdesk()
+
+    async def scenario():
+        manager = BatchJobManager(FakeOrchestrator(), lambda: freshdesk, PromptsManager())
+        job = manager.create_job(items("a", "fail b"), auto_export=True)
+        await job.task
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.exported == 1
+    assert freshdesk.notes == [("T0", "<p>note a</p>")]
+
+
+def test_cancel_job_cancels_in_flight_queries():
+    orchestrator = FakeOrchestrator(delay=1.0)
+
+    async def scenario():
+        manager = BatchJobManager(orchestrator, lambda: None, PromptsManager())
+        job = manager.create_job(items("a", "b"), concurrency=2)
+        await asyncio.sleep(0.01)
+        assert manager.cancel_job(job.job_id)
+        await asyncio.wait({job.task})
+        return manager, job
+
+    manager, job = asyncio.run(scenario())
+    assert job.status == "cancelled"
+    assert orchestrator.cancelled == ["batch_cancelled", "batch_cancelled"]
+    assert not manager.cancel_job(job.job_id)
+
+
+def test_cancel_before_start_finishes_job():
+    async def scenario():
+        manager = BatchJobManager(FakeOrchestrator(), lambda: None, PromptsManager())
+        job = manager.create_job(items("a", "b"))
+        stream = asyncio.ensure_future(anext(manager.stream(job)))
+        assert manager.cancel_job(job.job_id)
+        record = await asyncio.wait_for(stream, timeout=1.0)
+        return manager, job, record
+
+    manager, job, record = asyncio.run(scenario())
+    assert job.status == "cancelled" and job.done and job.finished_at
+    assert record["type"] == "progress" and record["completed"] == 0
+    assert not manager.cancel_job(job.job_id)
+
+
+def test_finished_jobs_are_evicted():
+    async def scenario():
+        manager = BatchJobManager(FakeOrchestrator(delay=0), lambda: None, PromptsManager(), max_finished_jobs=2)
+        jobs = []
+        for i in range(4):
+            job = manager.create_job(items(f"q{i}"))
+            await job.task
+            jobs.append(job)
+        return manager, jobs
+
+    manager, jobs = asyncio.run(scenario())
+    assert manager.get_job(jobs[0].job_id) is None
+    assert manager.get_job(jobs[-1].job_id) is jobs[-1]
+    assert manager.get_stats()["jobs"] == 2
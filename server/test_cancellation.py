@@ -0,0 +1,109 @@
+"""Tests for in-flight request cancellation: client disconnect and latest-request-wins"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.cancellation import DISCONNECTED, SUPERSEDED, InflightRequests, RequestCancelled
+
+
+class Work:
+    """A request's coroutine that records how it ended"""
+
+    def __init__(self, result, delay=0.05):
+        self.result = result
+        self.delay = delay
+        self.cancelled_with = None
+
+    async def __call__(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError as e:
+            self.cancelled_with = e.args[0] if e.args else None
+            raise
+        return self.result
+
+
+def connection(disconnect_after=None):
+    """ASGI receive() that reports http.disconnect after a delay (never if None)"""
+    async def receive():
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+    return receive
+
+
+def test_completed_request_returns_result():
+    registry = InflightRequests()
+    assert asyncio.run(registry.run(Work("answer")(), receive=connection())) == "answer"
+    assert registry.get_stats() == {
+        "latest_wins": False, "inflight": 0, "agents_inflight": 0,
+        "started": 1, "completed": 1, DISCONNECTED: 0, SUPERSEDED: 0
+    }
+
+
+def test_disconnect_cancels_work():
+    registry = InflightRequests()
+    work = Work("answer", delay=1.0)
+    with pytest.raises(RequestCancelled) as cancelled:
+        asyncio.run(registry.run(work(), receive=connection(disconnect_after=0.01)))
+    assert cancelled.value.reason == DISCONNECTED
+    assert work.cancelled_with == DISCONNECTED
+    assert registry.stats[DISCONNECTED] == 1 and registry.inflight == 0
+
+
+def test_superseded_request_cancelled_while_new_one_completes():
+    registry = InflightRequests(latest_wins=True)
+    old, new = Work("old"), Work("new")
+
+    async def scenario():
+        first = asyncio.create_task(registry.run(old(), receive=connection(), agent_id="agent-1"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(registry.run(new(), receive=connection(), agent_id="agent-1"))
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, RequestCancelled) and first.reason == SUPERSEDED
+    assert old.cancelled_with == SUPERSEDED
+    assert second == "new"
+    assert registry.stats[SUPERSEDED] == 1 and registry.stats["completed"] == 1
+    assert registry.by_agent == {}
+
+
+def test_other_agents_and_opt_out_are_not_superseded():
+    registry = InflightRequests(latest_wins=True)
+
+    async def scenario():
+        runs = [
+            registry.run(Work("a")(), agent_id="agent-1"),
+            registry.run(Work("b")(), agent_id="agent-2"),
+            registry.run(Work("c")(), agent_id="agent-1", latest_wins=False)
+        ]
+        return await asyncio.gather(*runs)
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+    assert registry.stats[SUPERSEDED] == 0
+
+
+def test_cancelled_handler_cancels_work():
+    registry = InflightRequests()
+    work = Work("answer", delay=1.0)
+
+    async def scenario():
+        handler = asyncio.create_task(registry.run(work()))
+        await asyncio.sleep(0.01)
+        handler.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await handler
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert work.cancelled_with == DISCONNECTED
+    assert registry.inflight == 0
@@ -0,0 +1,163 @@
+"""Tests for the typed catalog view: predicates, free-text parsing, sorting and the /products/query route"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.routers import api
+from app.services import data_loader
+from app.services.catalog_query import CatalogQueryEngine, parse_flag, parse_numeric
+
+
+@pytest.fixture
+def engine():
+    catalog_df = pd.DataFrame({
+        "Model_NO": ["10.FGC.4003CP", "10.FGC.4003MB", "20.SHW.100BN", "30.ACC.5CP", "40.KIT.9MB"],
+        "Product_Title": ["Kitchen Faucet", "Kitchen Faucet", "Shower Head", "Drain", "Pull-Down Faucet"],
+        "Finish": ["Chrome", "Matte Black", "Brushed Nickel", "Chrome", "Matte Black"],
+        "Product_Category": ["Kitchen", "Kitchen", "Bathroom", "Accessories", "Kitchen"],
+        "Sub_Product_Category": ["Kitchen Faucets", "Kitchen Faucets", "Shower", "Drains", "Kitchen Faucets"],
+        "Sub_Sub_Product_Category": ["Single Handle", "Single Handle", "Shower Heads", None, "Pull-Down"],
+        "List_Price": ["$349.00", "$1,299.00", "189", None, "$399.99"],
+        "Popularity": [5, 9, 7, 1, None],
+        "Can_Sell_Online": ["YES", "yes", "NO", "", "Y"]
+    })
+    return CatalogQueryEngine(catalog_df)
+
+
+def models(result):
+    return [row["model_number"] for row in result["rows"]]
+
+
+def test_typed_columns(engine):
+    assert np.allclose(engine.numeric["price"], [349.0, 1299.0, 189.0, np.nan, 399.99], equal_nan=True)
+    assert parse_numeric(pd.Series(['8"', "n/a"])).tolist()[0] == 8.0
+    assert parse_flag(pd.Series(["YES", "no", None, "true"])).tolist() == [True, False, False, True]
+    assert "category" in engine.fields and "sell_online" in engine.fields
+
+
+def test_parse_text_price_bounds(engine):
+    assert engine.parse_text("kitchen faucets under $400") == [
+        {"field": "category", "op": "eq", "value": "Kitchen Faucets"},
+        {"field": "price", "op": "lte", "value": 400.0}
+    ]
+    assert engine.parse_text("anything over 1,000") == [{"field": "price", "op": "gte", "value": 1000.0}]
+    assert engine.parse_text("between $400 and $200") == [{"field": "price", "op": "between", "value": [200.0, 400.0]}]
+    assert engine.parse_text("nothing to see") == []
+
+
+def test_parse_text_finishes_become_in(engine):
+    filters = engine.parse_text("matte black or chrome shower heads")
+    assert {"field": "finish", "op": "in", "value": ["Matte Black", "Chrome"]} in filters
+    assert {"field": "category", "op": "eq", "value": "Shower Heads"} in filters
+
+
+def test_query_from_parsed_text(engine):
+    result = engine.query(engine.parse_text("matte black kitchen faucets under $400"))
+    assert models(result) == ["40.KIT.9MB"]
+
+
+def test_multi_value_in(engine):
+    result = engine.query([{"field": "finish", "op": "in", "value": ["chrome", "BRUSHED NICKEL"]}], sort=["model_number"])
+    assert models(result) == ["10.FGC.4003CP", "20.SHW.100BN", "30.ACC.5CP"]
+    result = engine.query([{"field": "price", "op": "in", "value": [189, 349]}], sort=["price"])
+    assert models(result) == ["20.SHW.100BN", "10.FGC.4003CP"]
+    with pytest.raises(ValueError):
+        engine.query([{"field": "finish", "op": "in", "value": "Chrome"}])
+
+
+def test_category_matches_any_level(engine):
+    def category(op, value):
+        return sorted(models(engine.query([{"field": "category", "op": op, "value": value}])))
+
+    assert category("eq", "kitchen") == ["10.FGC.4003CP", "10.FGC.4003MB", "40.KIT.9MB"]  # top level
+    assert category("eq", "Drains") == ["30.ACC.5CP"]  # second level
+    assert category("eq", "Pull-Down") == ["40.KIT.9MB"]  # third level
+    # Negations exclude a match at any level; a blank level does not drop the row
+    assert category("ne", "Kitchen Faucets") == ["20.SHW.100BN", "30.ACC.5CP"]
+    assert category("not_in", ["Bathroom", "Pull-Down"]) == ["10.FGC.4003CP", "10.FGC.4003MB", "30.ACC.5CP"]
+
+
+def test_exists(engine):
+    assert models(engine.query([{"field": "price", "op": "exists"}], sort=["model_number"])) == [
+        "10.FGC.4003CP", "10.FGC.4003MB", "20.SHW.100BN", "40.KIT.9MB"
+    ]
+    assert models(engine.query([{"field": "type", "op": "exists", "value": False}])) == ["30.ACC.5CP"]
+
+
+def test_boolean_and_contains(engine):
+    result = engine.query([
+        {"field": "sell_online", "op": "eq", "value": True},
+        {"field": "title", "op": "contains", "value": "FAUCET"}
+    ], sort=["model_number"])
+    assert models(result) == ["10.FGC.4003CP", "10.FGC.4003MB", "40.KIT.9MB"]
+
+
+def test_missing_values_sort_last_both_directions(engine):
+    assert models(engine.query(sort=["price"]))[-1] == "30.ACC.5CP"
+    assert models(engine.query(sort=["-price"])) == [
+        "10.FGC.4003MB", "40.KIT.9MB", "10.FGC.4003CP", "20.SHW.100BN", "30.ACC.5CP"
+    ]
+    assert models(engine.query(sort=["-popularity"]))[-1] == "40.KIT.9MB"
+
+
+def test_paging_and_fields(engine):
+    result = engine.query(sort=["-price"], limit=2, offset=1, fields=["model_number", "price", "type"])
+    assert result["total"] == 5
+    assert result["rows"] == [
+        {"model_number": "40.KIT.9MB", "price": 399.99, "type": "Pull-Down"},
+        {"model_number": "10.FGC.4003CP", "price": 349.0, "type": "Single Handle"}
+    ]
+
+
+@pytest.mark.parametrize("predicate", [
+    {"field": "colour", "op": "eq", "value": "red"},
+    {"field": "price", "op": "near", "value": 1},
+    {"field": "price", "op": "lte", "value": "cheap"},
+    {"field": "sell_online", "op": "gt", "value": 1},
+    {"field": "finish", "op": "eq", "value": None}
+])
+def test_bad_predicates_raise(engine, predicate):
+    with pytest.raises(ValueError):
+        engine.query([predicate])
+
+
+def test_route_maps_bad_queries_to_400(engine, monkeypatch):
+    monkeypatch.setattr(data_loader, "product_db", SimpleNamespace(catalog_query=engine))
+    app = FastAPI()
+    app.include_router(api.router)
+
+    async def post(body):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/products/query", json=body)
+
+    bad = asyncio.run(post({"filters": [{"field": "colour", "op": "eq", "value": "red"}]}))
+    assert bad.status_code == 400
+    assert "Unknown field: colour" in bad.json()["detail"]
+
+    good = asyncio.run(post({"text": "matte black faucets", "sort": ["-price"], "fields": ["model_number"]}))
+    assert good.status_code == 200
+    assert good.json()["rows"] == [{"model_number": "10.FGC.4003MB"}, {"model_number": "40.KIT.9MB"}]
+
+
+def test_route_without_catalog_is_503(monkeypatch):
+    monkeypatch.setattr(data_loader, "product_db", SimpleNamespace(catalog_query=None))
+    app = FastAPI()
+    app.include_router(api.router)
+
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/products/query", json={})
+
+    assert asyncio.run(post()).status_code == 503
@@ -0,0 +1,143 @@
+"""Route-level tests for /api/chat against a stubbed Gemini service"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core import admission, cancellation, orchestrator as orchestrator_module, sessions
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+from app.routers import api
+from app.services.gemini_service import GeminiService
+from app.services.resilience import UpstreamPolicy
+
+
+class StubModels:
+    """client.aio.models stand-in; grounded calls carry the File Search tool"""
+
+    def __init__(self):
+        self.calls = []
+        self.delay = 0.001
+
+    async def generate_content(self, model, contents, config):
+        grounded = bool(config and config.tools)
+        self.calls.append("grounded" if grounded else "plain")
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text=f"answer from {model}", usage_metadata=None, candidates=[])
+
+
+def make_service():
+    service = GeminiService.__new__(GeminiService)
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=StubModels()))
+    service.file_search_store_name = "fileSearchStores/test"
+    service.models = {"flash": "gemini-2.5-flash", "reasoning": "gemini-2.5-pro"}
+    service.context_cache = None
+    service.policy = UpstreamPolicy(min_samples=5)
+    service.search_timeout = 10.0
+    service.reasoning_latency_estimate = 0.5
+    service.downgrades = 0
+    return service
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    """(post(json) -> response, service with a generate_grounded call log, orchestrator)"""
+    service = make_service()
+    grounded_calls = []
+    generate_grounded = service.generate_grounded
+
+    async def recording_grounded(*args, **kwargs):
+        grounded_calls.append(kwargs.get("query"))
+        return await generate_grounded(*args, **kwargs)
+
+    service.generate_grounded = recording_grounded
+    service.grounded_calls = grounded_calls
+
+    product_db = SimpleNamespace(find_product=lambda query: None, catalog_version="test")
+    orchestrator = Orchestrator(product_db, service, PromptsManager(), enable_fast_path=False)
+    monkeypatch.setattr(orchestrator_module, "orchestrator", orchestrator)
+    monkeypatch.setattr(sessions, "session_store", sessions.SessionStore())
+    monkeypatch.setattr(admission, "admission_controller", admission.AdmissionController())
+    monkeypatch.setattr(cancellation, "inflight_requests", cancellation.InflightRequests())
+
+    app = FastAPI()
+    app.include_router(api.router)
+
+    def post(*bodies):
+        """Send bodies concurrently, each 10ms after the previous one"""
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                async def send(i, body):
+                    await asyncio.sleep(0.01 * i)
+                    return await client.post("/api/chat", json=body)
+                return await asyncio.gather(*(send(i, body) for i, body in enumerate(bodies)))
+        return asyncio.run(run())
+
+    return post, service, orchestrator
+
+
+def test_single_call_pipeline_reaches_grounded_call(chat):
+    post, service, orchestrator = chat
+    (response,) = post({"query": "what is the return policy?", "pipeline": "single_call"})
+
+    assert response.status_code == 200
+    assert service.grounded_calls == ["what is the return policy?"]
+    # One upstream call: no separate file search
+    assert service.client.aio.models.calls == ["grounded"]
+    assert orchestrator.pipeline_stats["single_call"] == 1
+
+
+def test_follow_up_turn_uses_two_call_pipeline(chat):
+    post, service, orchestrator = chat
+    (first,) = post({"query": "what is the return policy?", "pipeline": "single_call"})
+    session_id = first.json()["session_id"]
+    (second,) = post({"query": "and for returns after 60 days?", "pipeline": "single_call", "session_id": session_id})
+
+    assert second.status_code == 200
+    assert second.json()["session_id"] == session_id
+    assert len(service.grounded_calls) == 1
+    assert orchestrator.pipeline_stats == {"single_call": 1, "two_call": 1}
+
+
+def test_two_call_pipeline_by_default(chat):
+    post, service, orchestrator = chat
+    (response,) = post({"query": "what is the return policy?"})
+
+    assert response.status_code == 200
+    assert service.grounded_calls == []
+    assert service.client.aio.models.calls == ["grounded", "plain"]  # file search, then synthesis
+
+
+def test_shed_request_gets_503_with_retry_after(chat, monkeypatch):
+    post, service, orchestrator = chat
+    monkeypatch.setattr(admission, "admission_controller", admission.AdmissionController(limits={"flash": 1}, max_queue=0))
+    service.client.aio.models.delay = 0.1
+    first, second = post({"query": "what is the return policy?"}, {"query": "do you ship to Canada?"})
+
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "1"
+    assert "queue full" in second.json()["detail"]
+
+
+def test_superseded_chat_gets_409_while_new_one_completes(chat):
+    post, service, orchestrator = chat
+    service.client.aio.models.delay = 0.05
+    first, second = post(
+        {"query": "what is the return policy?", "agent_id": "agent-1", "latest_wins": True},
+        {"query": "do you ship to Canada?", "agent_id": "agent-1", "latest_wins": True}
+    )
+
+    assert first.status_code == 409
+    assert "superseded" in first.json()["detail"]
+    assert second.status_code == 200
+    assert "answer from gemini-2.5-flash" in second.json()["markdown_response"]
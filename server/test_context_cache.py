@@ -0,0 +1,242 @@
+"""Tests for Gemini context caching against a local fake of the caching API"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.prompts import PromptsManager
+from app.services.context_cache import ContextCacheManager
+from app.services.gemini_service import GeminiService
+from app.services.resilience import UpstreamPolicy
+
+
+class FakeCaches:
+    """In-memory stand-in for client.aio.caches"""
+
+    def __init__(self, min_tokens: int = 0):
+        self.min_tokens = min_tokens
+        self.store = {}
+        self.calls = {"create": 0, "update": 0, "delete": 0}
+
+    @staticmethod
+    def _expire(ttl: str) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=int(ttl.rstrip("s")))
+
+    async def create(self, model, config):
+        self.calls["create"] += 1
+        text = config.system_instruction + "".join(
+            part.text for content in (config.contents or []) for part in content.parts
+        )
+        tokens = len(text) // 4
+        if tokens < self.min_tokens:
+            raise ValueError(f"Cached content is too small: {tokens} tokens")
+        name = f"cachedContents/{len(self.store) + 1}"
+        self.store[name] = {"model": model, "text": text, "tokens": tokens}
+        return SimpleNamespace(
+            name=name,
+            expire_time=self._expire(config.ttl),
+            usage_metadata=SimpleNamespace(total_token_count=tokens)
+        )
+
+    async def update(self, name, config):
+        self.calls["update"] += 1
+        if name not in self.store:
+            raise KeyError(name)
+        return SimpleNamespace(name=name, expire_time=self._expire(config.ttl))
+
+    async def delete(self, name):
+        self.calls["delete"] += 1
+        self.store.pop(name, None)
+
+
+class FakeModels:
+    """Records generate_content calls; reports cached tokens like the API"""
+
+    def __init__(self, caches: FakeCaches):
+        self.caches = caches
+        self.calls = []
+
+    async def generate_content(self, model, contents, config):
+        self.calls.append({"model": model, "contents": contents, "config": config})
+        cached = 0
+        if config.cached_content:
+            if config.cached_content not in self.caches.store:
+                raise RuntimeError("CachedContent not found")
+            cached = self.caches.store[config.cached_content]["tokens"]
+        prompt = cached + len(contents) // 4 + len(config.system_instruction or "") // 4
+        return SimpleNamespace(
+            text="answer",
+            usage_metadata=SimpleNamespace(prompt_token_count=prompt, cached_content_token_count=cached)
+        )
+
+
+def make_service(**cache_kwargs):
+    caches = FakeCaches()
+    service = GeminiService.__new__(GeminiService)
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=FakeModels(caches)))
+    service.file_search_store_name = None
+    service.models = {"flash": "gemini-2.5-flash", "reasoning": "gemini-2.5-pro"}
+    service.policy = UpstreamPolicy(hedge_enabled=False)
+    service.reasoning_latency_estimate = 30.0
+    service.downgrades = 0
+    service.context_cache = ContextCacheManager(caches, **cache_kwargs)
+    return service, caches
+
+
+def product_context():
+    specs = {f"Spec_{i}": f"value {i} " * 8 for i in range(40)}
+    specs["Model_NO"] = "10.FGC.4003CP"
+    return {
+        "structured": {"specs": specs, "media": {}, "documents": []},
+        "unstructured": [{"title": "Install Guide", "text": "Tighten the mounting nut."}]
+    }
+
+
+def test_prompt_orders_stable_prefix_before_query():
+    service, _ = make_service()
+    prefix, suffix = service._build_prompt_parts("How do I install it?", product_context())
+    assert "## Product Specifications:" in prefix
+    assert "How do I install it?" not in prefix
+    assert "Install Guide" not in prefix
+    assert suffix.rstrip().endswith("User Query: How do I install it?")
+
+
+def test_cache_created_after_repeat_and_reused():
+    service, caches = make_service(promote_after=2, min_tokens=100)
+    system_prompt = PromptsManager.get_synthesis_prompt()
+
+    async def ask(query):
+        return await service.generate_response(query, product_context(), system_prompt=system_prompt)
+
+    asyncio.run(ask("How do I install it?"))
+    assert caches.calls["create"] == 0
+
+    asyncio.run(ask("What is the warranty?"))
+    asyncio.run(ask("Is it ADA compliant?"))
+    assert caches.calls["create"] == 1
+
+    calls = service.client.aio.models.calls
+    assert calls[0]["config"].cached_content is None
+    assert calls[0]["config"].system_instruction == system_prompt
+    # Cached calls send only the variable suffix and no system instruction
+    for call in calls[1:]:
+        assert call["config"].cached_content == "cachedContents/1"
+        assert call["config"].system_instruction is None
+        assert "## Product Specifications:" not in call["contents"]
+
+    stats = service.context_cache.get_stats()
+    assert stats["created"] == 1 and stats["reused"] == 1
+    assert stats["cached_tokens"] > 0
+    assert 0 < stats["cached_token_ratio"] < 1
+
+
+def test_small_prefix_is_not_cached():
+    service, caches = make_service(promote_after=1, min_tokens=100000)
+    asyncio.run(service.generate_response("q", product_context(), system_prompt="short"))
+    assert caches.calls["create"] == 0
+    assert service.context_cache.get_stats()["skipped_small"] == 1
+
+
+def test_refresh_before_expiry():
+    caches = FakeCaches()
+    manager = ContextCacheManager(caches, ttl_seconds=3600, refresh_margin_seconds=300,
+                                  min_tokens=1, promote_after=1)
+
+    name = asyncio.run(manager.acquire("m", "system prompt", "prefix"))
+    entry = next(iter(manager.entries.values()))
+    entry.expires_at -= 3400  # 200s left: inside the refresh margin
+
+    assert asyncio.run(manager.acquire("m", "system prompt", "prefix")) == name
+    assert caches.calls["update"] == 1
+    assert entry.expires_at - datetime.now(timezone.utc).timestamp() > 3000
+
+
+def test_expired_entry_is_recreated():
+    caches = FakeCaches()
+    manager = ContextCacheManager(caches, min_tokens=1, promote_after=1)
+
+    first = asyncio.run(manager.acquire("m", "system prompt", "prefix"))
+    next(iter(manager.entries.values())).expires_at = 0
+
+    second = asyncio.run(manager.acquire("m", "system prompt", "prefix"))
+    assert second != first
+    assert manager.get_stats()["expired"] == 1
+
+
+def test_rejected_prefix_is_not_retried():
+    caches = FakeCaches(min_tokens=10**6)
+    manager = ContextCacheManager(caches, min_tokens=1, promote_after=1)
+
+    assert asyncio.run(manager.acquire("m", "system prompt", "prefix")) is None
+    assert asyncio.run(manager.acquire("m", "system prompt", "prefix")) is None
+    assert caches.calls["create"] == 1
+
+
+def test_stale_cache_falls_back_to_uncached_call():
+    service, caches = make_service(promote_after=1, min_tokens=100)
+    system_prompt = PromptsManager.get_synthesis_prompt()
+
+    asyncio.run(service.generate_response("q1", product_context(), system_prompt=system_prompt))
+    caches.store.clear()  # Provider dropped the cache
+
+    result = asyncio.run(service.generate_response("q2", product_context(), system_prompt=system_prompt))
+    assert result["response"] == "answer"
+    assert service.client.aio.models.calls[-1]["config"].cached_content is None
+    assert not service.context_cache.entries
+
+
+def test_close_deletes_live_caches():
+    caches = FakeCaches()
+    manager = ContextCacheManager(caches, min_tokens=1, promote_after=1)
+    asyncio.run(manager.acquire("m", "a", "x"))
+    asyncio.run(manager.acquire("m", "b", "x"))
+    asyncio.run(manager.close())
+    assert caches.calls["delete"] == 2
+    assert not caches.store
+
+
+def test_failed_prefix_is_retried_after_failure_ttl():
+    caches = FakeCaches(min_tokens=10**6)
+    manager = ContextCacheManager(caches, min_tokens=1, promote_after=1, failure_ttl_seconds=60)
+
+    assert asyncio.run(manager.acquire("m", "system prompt", "prefix")) is None
+    caches.min_tokens = 0  # Transient error cleared
+    assert asyncio.run(manager.acquire("m", "system prompt", "prefix")) is None
+    assert caches.calls["create"] == 1
+
+    manager._failed[next(iter(manager._failed))] = 0  # Failure TTL elapsed
+    assert asyncio.run(manager.acquire("m", "system prompt", "prefix")) is not None
+    assert caches.calls["create"] == 2
+    assert manager.get_stats()["failed_prefixes"] == 0
+
+
+def test_per_prefix_state_stays_bounded():
+    caches = FakeCaches(min_tokens=10**6)
+    manager = ContextCacheManager(caches, min_tokens=1, promote_after=1, max_entries=2)
+
+    async def run():
+        await asyncio.gather(*(manager.acquire("m", "system prompt", f"prefix {i}") for i in range(100)))
+
+    asyncio.run(run())
+    assert caches.calls["create"] == 100
+    assert not manager._locks
+    assert len(manager._failed) == manager.max_tracked == 40
+
+
+def test_concurrent_acquires_create_once():
+    caches = FakeCaches()
+    manager = ContextCacheManager(caches, min_tokens=1, promote_after=1)
+
+    async def run():
+        return await asyncio.gather(*(manager.acquire("m", "system prompt", "prefix") for _ in range(5)))
+
+    names = asyncio.run(run())
+    assert len(set(names)) == 1
+    assert caches.calls["create"] == 1
+    assert not manager._locks
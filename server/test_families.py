@@ -0,0 +1,130 @@
+"""Tests for finish-variant family grouping: learned finish codes, variants, follow-up finish resolution and family listings"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core import http_cache
+from app.routers import api
+from app.services import data_loader
+from app.services.data_loader import ProductDatabase
+
+
+@pytest.fixture
+def db():
+    database = ProductDatabase()
+    database.catalog_df = pd.DataFrame({
+        "Model_NO": [
+            "10.FGC.4003CP", "10.FGC.4003BN", "10.FGC.4003MB",
+            "20.SHW.100CP", "20.SHW.100PVDBN",
+            "30.ACC.5", "40.KIT.9MB"
+        ],
+        "Common_Group_Number": [
+            "10.FGC.4003", "10.FGC.4003", None,
+            "20.SHW.100", None,
+            None, "40.KIT.9"
+        ],
+        "Finish": ["Chrome", "Brushed Nickel", "Matte Black", "Chrome", "PVD Brushed Nickel", "Chrome", "Matte Black"],
+        "Product_Title": ["Kitchen Faucet"] * 3 + ["Shower Head"] * 2 + ["Drain", "Pull-Down Faucet"],
+        "Product_Category": ["Kitchen"] * 3 + ["Bathroom"] * 2 + ["Accessories", "Kitchen"],
+        "Sub_Product_Category": ["Kitchen Faucets"] * 3 + ["Shower"] * 2 + ["Drains", "Kitchen Faucets"],
+        "Sub_Sub_Product_Category": [None] * 7,
+        "List_Price": [349.0, 399.0, 399.0, 189.0, 229.0, None, 449.0]
+    })
+    database._build_model_index()
+    database._build_family_index()
+    return database
+
+
+def test_codes_learned_from_group_numbers(db):
+    # 10.FGC.4003MB has no group number; "MB" was learned from 40.KIT.9MB
+    assert db.family_index["10.FGC.4003"] == ["10.FGC.4003CP", "10.FGC.4003BN", "10.FGC.4003MB"]
+    assert db.model_family["10.FGC.4003MB"] == "10.FGC.4003"
+    # No group number, but "PVD Brushed Nickel" never taught a code: the model is its own family
+    assert db.model_family["20.SHW.100PVDBN"] == "20.SHW.100PVDBN"
+    assert db.family_index["20.SHW.100"] == ["20.SHW.100CP"]
+    assert db.model_family["30.ACC.5"] == "30.ACC.5"
+
+
+def test_get_variants_reports_differing_specs(db):
+    variants = db.get_variants("10.FGC.4003CP")
+    assert [v["model_number"] for v in variants] == ["10.FGC.4003BN", "10.FGC.4003MB"]
+    assert variants[0]["finish"] == "Brushed Nickel"
+    assert variants[0]["differing_specs"] == {
+        "Finish": "Brushed Nickel", "List_Price": 399.0
+    }
+    assert db.get_variants("30.ACC.5") == []
+    assert db.get_variants("99.UNKNOWN") == []
+
+
+def test_find_variant_resolves_named_finish(db):
+    product = db.get_product_by_model("10.FGC.4003CP")
+    assert product.variants
+
+    assert db.find_variant(product, "what about the brushed nickel one?").model_number == "10.FGC.4003BN"
+    assert db.find_variant(product, "and in matte black").model_number == "10.FGC.4003MB"
+    assert db.find_variant(product, "is the chrome in stock?") is product
+    assert db.find_variant(product, "how tall is it?") is None
+
+
+def test_find_variant_ambiguous_finish_is_none():
+    database = ProductDatabase()
+    database.catalog_df = pd.DataFrame({
+        "Model_NO": ["50.TUB.1BN", "50.TUB.1PN", "50.TUB.1CP"],
+        "Common_Group_Number": ["50.TUB.1"] * 3,
+        "Finish": ["Brushed Nickel", "Polished Nickel", "Chrome"]
+    })
+    database._build_model_index()
+    database._build_family_index()
+    product = database.get_product_by_model("50.TUB.1CP")
+
+    assert database.find_variant(product, "the nickel one") is None
+    assert database.find_variant(product, "polished nickel please").model_number == "50.TUB.1PN"
+
+
+def test_list_families(db):
+    families = db.list_families()
+    assert [f["base_model"] for f in families] == [
+        "10.FGC.4003", "20.SHW.100", "20.SHW.100PVDBN", "30.ACC.5", "40.KIT.9"
+    ]
+    assert families[0]["title"] == "Kitchen Faucet"
+    assert families[0]["variants"][0] == {"model_number": "10.FGC.4003CP", "finish": "Chrome", "list_price": 349.0}
+    assert families[3]["variants"][0]["list_price"] is None
+
+    kitchen = db.list_families("kitchen faucets")
+    assert [f["base_model"] for f in kitchen] == ["10.FGC.4003", "40.KIT.9"]
+    assert db.list_families("shower")[0]["category"] == "Bathroom"
+    assert db.list_families("nothing like this") == []
+
+
+def test_product_listing_is_sorted_and_limit_bounded(db, monkeypatch):
+    # A model_index built in a different order must page identically
+    db.model_index = dict(reversed(list(db.model_index.items())))
+    monkeypatch.setattr(data_loader, "product_db", db)
+    monkeypatch.setattr(http_cache, "catalog_response_cache", http_cache.CatalogResponseCache())
+    db.catalog_version = "test"
+    app = FastAPI()
+    app.include_router(api.router)
+
+    async def get(**params):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/api/products", params=params)
+
+    first = asyncio.run(get(limit=3, page=1)).json()
+    second = asyncio.run(get(limit=3, page=2)).json()
+    listed = [p["model_number"] for p in first["products"] + second["products"]]
+    assert listed == sorted(db.model_index.values())[:6]
+    assert db.get_all_models() == sorted(db.model_index.values())
+
+    assert asyncio.run(get(limit=0)).status_code == 422
+    assert asyncio.run(get(limit=-5)).status_code == 422
+    assert asyncio.run(get(limit=501)).status_code == 422
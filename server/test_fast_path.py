@@ -0,0 +1,98 @@
+"""Tests for the catalog fast path: hit-rate accounting and the cheap admission lane"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.fast_path import CatalogFastPath
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+from app.core.sessions import SessionStore
+from app.services.data_loader import ProductContext, ProductDatabase
+
+MODEL = "10.FGC.4003CP"
+
+
+def product(confidence=1.0):
+    return ProductContext(
+        model_number=MODEL,
+        specs={"Model_NO": MODEL, "List_Price": 349.0, "Product_Title": "Kitchen Faucet"},
+        matched_confidence=confidence
+    )
+
+
+def test_answers_single_attribute_lookup():
+    fast_path = CatalogFastPath()
+    answer = fast_path.try_answer(f"what is the price of {MODEL}?", product())
+    assert answer["model_used"] == "catalog"
+    assert "| List Price | $349.00 |" in answer["response"]
+
+
+def test_only_lookup_shaped_questions_are_answered():
+    fast_path = CatalogFastPath()
+    for query in (
+        f"How much water does {MODEL} use per minute?",
+        f"What size wrench do I need for {MODEL}?",
+        f"How do I clean the finish on {MODEL}?"
+    ):
+        assert fast_path.try_answer(query, product()) is None, query
+    assert fast_path.get_stats()["misses_by_reason"] == {"not_lookup": 1}
+
+    assert fast_path.match_attribute(f"{MODEL} price?") == ("price", "matched")
+    assert fast_path.match_attribute(f"how much does {MODEL} cost?") == ("price", "matched")
+    assert fast_path.match_attribute(f"how many holes do I need for {MODEL}?") == ("holes", "matched")
+
+
+def test_non_spec_questions_do_not_dilute_hit_rate():
+    fast_path = CatalogFastPath()
+    fast_path.try_answer(f"what is the price of {MODEL}?", product())
+    fast_path.try_answer("what is the return policy?", None)
+    fast_path.try_answer(f"how do I install the {MODEL}?", product())
+    fast_path.try_answer("what is the price of kitchen faucets?", None)
+    fast_path.try_answer(f"what is the weight of {MODEL}?", product())  # No weight in the specs
+
+    stats = fast_path.get_stats()
+    assert stats["attempts"] == 3
+    assert stats["hits"] == 1
+    assert stats["hit_rate"] == round(1 / 3, 4)
+    assert stats["not_spec_lookup"] == 2
+    assert stats["misses_by_reason"] == {"not_lookup": 1, "missing_value": 1}
+
+
+def test_fuzzy_product_match_is_a_miss():
+    fast_path = CatalogFastPath()
+    assert fast_path.try_answer("price of 10.FGC.4003?", product(confidence=0.85)) is None
+    assert fast_path.get_stats()["misses_by_reason"] == {"low_confidence": 1}
+
+
+def make_orchestrator():
+    product_db = ProductDatabase.__new__(ProductDatabase)
+    product_db.model_index = {ProductDatabase._normalize_model(MODEL): MODEL}
+    product_db.catalog_version = "test"
+    gemini = SimpleNamespace()
+    return Orchestrator(product_db, gemini, PromptsManager(), retriever=SimpleNamespace(name="gemini"))
+
+
+def test_cheap_lane_needs_attribute_and_model_number():
+    orchestrator = make_orchestrator()
+    assert orchestrator.admission_lane(f"what is the price of {MODEL}?", "flash") == "cheap"
+    assert orchestrator.admission_lane("what is the price of 10.fgc-4003cp", "flash") == "cheap"
+    # An attribute without a catalog model needs the LLM
+    assert orchestrator.admission_lane("what is the price of kitchen faucets?", "flash") == "flash"
+    assert orchestrator.admission_lane("what is the price of the 99.XYZ.0000?", "reasoning") == "reasoning"
+    # A model number without a spec attribute too
+    assert orchestrator.admission_lane(f"how do I install the {MODEL}?", "flash") == "flash"
+
+
+def test_cheap_lane_for_follow_up_on_session_product():
+    orchestrator = make_orchestrator()
+    session = SessionStore().create()
+    assert orchestrator.admission_lane("and its price?", "flash", session) == "flash"
+
+    session.set_product(product())
+    session.record_turn("what is this product?", "A kitchen faucet.")
+    assert orchestrator.admission_lane("and its price?", "flash", session) == "cheap"
@@ -0,0 +1,84 @@
+"""Tests for catalog ETags under response compression"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.compression import CompressionMiddleware
+from app.core.http_cache import CatalogResponseCache, etag_matches, make_etag
+
+PRODUCTS = {"products": [{"model_number": f"10.FGC.{4000 + i}CP", "finish": "Chrome"} for i in range(50)]}
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=64)
+    cache = CatalogResponseCache()
+
+    @app.get("/products")
+    async def products(request: Request):
+        async def build():
+            return PRODUCTS
+        return await cache.respond(request, key=("products",), catalog_version="v1", build=build)
+
+    @app.get("/strong")
+    async def strong():
+        return JSONResponse(PRODUCTS, headers={"ETag": '"abc"'})
+
+    return app
+
+
+def get(app, path, **headers):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(run())
+
+
+def test_make_etag():
+    assert make_etag("v1", b"body") == make_etag("v1", b"body")
+    assert make_etag("v1", b"body", weak=True) == "W/" + make_etag("v1", b"body")
+    assert make_etag("v1", b"body") != make_etag("v2", b"body")
+
+
+def test_etag_matches_uses_weak_comparison():
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('"b", W/"a"', 'W/"a"')
+    assert etag_matches("*", 'W/"a"')
+    assert not etag_matches('"b"', 'W/"a"')
+    assert not etag_matches(None, 'W/"a"')
+
+
+def test_same_weak_etag_for_every_encoding():
+    app = make_app()
+    identity = get(app, "/products", **{"Accept-Encoding": "identity"})
+    gzipped = get(app, "/products", **{"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"].startswith('W/"')
+    assert gzipped.headers["etag"] == identity.headers["etag"]
+    assert gzipped.json() == identity.json() == PRODUCTS
+
+
+def test_revalidation_across_encodings():
+    app = make_app()
+    etag = get(app, "/products", **{"Accept-Encoding": "gzip"}).headers["etag"]
+    revalidated = get(app, "/products", **{"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+
+
+def test_compression_weakens_strong_etag():
+    app = make_app()
+    assert get(app, "/strong", **{"Accept-Encoding": "identity"}).headers["etag"] == '"abc"'
+    assert get(app, "/strong", **{"Accept-Encoding": "gzip"}).headers["etag"] == 'W/"abc"'
@@ -0,0 +1,135 @@
+"""Tests for the compiled query-intent classifier against a labeled corpus"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.fast_path import CatalogFastPath, attribute_patterns
+from app.core.intents import GENERAL, SPEC_LOOKUP, IntentClassifier
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+
+
+# (query, expected primary intent)
+LABELED_QUERIES = [
+    # Troubleshooting
+    ("My 10.FGC.4003CP is leaking at the base", "troubleshooting"),
+    ("the kitchen fixture drips after shutting it off", "troubleshooting"),
+    ("shower valve stopped working", "troubleshooting"),
+    ("how do I fix a broken handle", "troubleshooting"),
+    ("customer reports low water pressure on 10.FGC.4003BN", "troubleshooting"),
+    ("drain is clogged, what should they do", "troubleshooting"),
+    ("handle is stuck and won't turn", "troubleshooting"),
+    ("why won't it drain", "troubleshooting"),
+    ("repair kit for a cracked spout", "troubleshooting"),
+    ("leaking faucet, which cartridge is better", "troubleshooting"),
+    # Comparison
+    ("compare 10.FGC.4003CP and 10.FGC.4003BN", "comparison"),
+    ("chrome vs matte black", "comparison"),
+    ("chrome vs. brushed nickel finish durability", "comparison"),
+    ("what is the difference between the two shower heads", "comparison"),
+    ("is the PVD finish better than chrome", "comparison"),
+    ("bathroom fixture versus kitchen fixture", "comparison"),
+    # Installation
+    ("how do I install 10.FGC.4003CP", "installation"),
+    ("rough-in requirements for the thermostatic valve", "installation"),
+    ("installation steps for a wall mount faucet", "installation"),
+    ("can it be mounted on a 1-hole deck", "installation"),
+    # Alternatives
+    ("alternatives to 10.FGC.4003CP in satin brass", "alternatives"),
+    ("something similar but cheaper", "alternatives"),
+    ("can you recommend a substitute", "alternatives"),
+    # Documentation
+    ("where is the spec sheet", "documentation"),
+    ("send me the video for this product", "documentation"),
+    ("parts diagram for the 4003 series", "documentation"),
+    # Explanation
+    ("explain the thermostatic cartridge", "explanation"),
+    ("how does the pressure balance valve work", "explanation"),
+    # Spec lookups
+    ("What is the price of 10.FGC.4003CP?", SPEC_LOOKUP),
+    ("how tall is 10.FGC.4003BN", SPEC_LOOKUP),
+    ("map price for the brushed nickel one", SPEC_LOOKUP),
+    ("what finish does the fixture come in", SPEC_LOOKUP),
+    ("warranty on 10.FGC.4003CP", SPEC_LOOKUP),
+    ("flow rate of the canvas shower head", SPEC_LOOKUP),
+    ("is the fixture discontinued", SPEC_LOOKUP),
+    # Nothing to route on
+    ("10.FGC.4003CP", GENERAL),
+    ("tell me about the fixtures in the catalog", GENERAL),
+    ("canvas advs model", GENERAL),
+    ("prefix and suffix options", GENERAL)
+]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IntentClassifier(attributes=attribute_patterns())
+
+
+@pytest.mark.parametrize("query,expected", LABELED_QUERIES)
+def test_labeled_corpus(classifier, query, expected):
+    assert classifier.classify(query).primary == expected
+
+
+def test_no_matches_inside_words(classifier):
+    # "fix" in "fixture", "vs" in "advs", "issue" in "tissue"
+    result = classifier.classify("advs fixture with tissue holder")
+    assert not result.needs_llm
+    assert result.primary == GENERAL
+
+
+def test_all_intents_scored(classifier):
+    result = classifier.classify("installation manual for the leaking valve, is it better than chrome?")
+    assert result.has("installation") and result.has("documentation")
+    assert result.has("troubleshooting") and result.has("comparison")
+    assert result.primary == "troubleshooting"
+
+
+def test_comparison_does_not_override_troubleshooting(classifier):
+    assert classifier.classify("it leaks, is the newer cartridge better?").primary == "troubleshooting"
+
+
+def test_repeated_triggers_raise_score(classifier):
+    single = classifier.classify("there is a problem").scores["troubleshooting"]
+    double = classifier.classify("there is a problem with a leak").scores["troubleshooting"]
+    assert double > single
+
+
+def test_longest_attribute_phrase_wins(classifier):
+    assert classifier.classify("what is the map price").attributes == ("map_price",)
+
+
+def test_fast_path_uses_classifier(classifier):
+    fast_path = CatalogFastPath(classifier=classifier)
+    assert fast_path.match_attribute("price of the fixture") == ("price", "matched")
+    assert fast_path.match_attribute("price of the leaking fixture") == (None, "needs_llm")
+    assert fast_path.match_attribute("height and width") == ("dimensions", "matched")
+
+
+def test_orchestrator_prompt_follows_primary_intent():
+    prompts_seen = []
+
+    async def generate_response(query, context, mode, system_prompt, deadline):
+        prompts_seen.append(system_prompt)
+        return {"response": "ok", "sources": [], "model_used": "fake"}
+
+    gemini = SimpleNamespace(generate_response=generate_response)
+    product_db = SimpleNamespace(find_product=lambda query: None, catalog_version="test")
+    orchestrator = Orchestrator(product_db, gemini, PromptsManager(), enable_fast_path=False)
+
+    asyncio.run(orchestrator._synthesize_response("it leaks, is chrome better?", {}, "flash", None))
+    asyncio.run(orchestrator._synthesize_response("chrome vs matte black", {}, "flash", None))
+    asyncio.run(orchestrator._synthesize_response("lighting fixture specs", {}, "flash", None))
+    assert prompts_seen == [
+        PromptsManager.get_troubleshooting_prompt(),
+        PromptsManager.get_comparison_prompt(),
+        PromptsManager.get_synthesis_prompt()
+    ]
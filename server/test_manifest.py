@@ -0,0 +1,75 @@
+"""Tests for streaming metadata_manifest.json ingestion"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.services.manifest import compact_manifest_item, iter_manifest_items
+
+ITEMS = [
+    {"originalUrl": "https://example.com/a.png", "savedAs": "a.png",
+     "metadata": {"Model_NO": "10.FGC.4003CP", "Product_Title": "Kitchen Faucet é \"quoted\" [x], {y}"}},
+    12345,
+    1.5e3,
+    -0.25,
+    True,
+    None,
+    "a string with ] and ,",
+    [],
+    {},
+    {"nested": [[1, 2], {"deep": [3]}]}
+]
+
+
+def write(tmp_path, text, name="manifest.json"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 2, 3, 7, 64, 1 << 20])
+def test_matches_json_load_at_any_chunk_size(tmp_path, chunk_chars):
+    path = write(tmp_path, json.dumps(ITEMS, indent=2))
+    assert list(iter_manifest_items(path, chunk_chars=chunk_chars)) == ITEMS
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 4])
+def test_compact_and_bom_inputs(tmp_path, chunk_chars):
+    compact = write(tmp_path, json.dumps(ITEMS, separators=(",", ":")))
+    assert list(iter_manifest_items(compact, chunk_chars=chunk_chars)) == ITEMS
+    bom = write(tmp_path, "\ufeff [ 1 , 2 ] \n", name="bom.json")
+    assert list(iter_manifest_items(bom, chunk_chars=chunk_chars)) == [1, 2]
+    assert list(iter_manifest_items(write(tmp_path, " [ ] ", name="empty.json"), chunk_chars=chunk_chars)) == []
+
+
+@pytest.mark.parametrize("text", ['{"Model_NO": "x"}', "[1, 2", "[1 2]", "[1,]", "[,1]", "", "[{\"a\": }]"])
+def test_malformed_raises(tmp_path, text):
+    with pytest.raises(ValueError):
+        list(iter_manifest_items(write(tmp_path, text), chunk_chars=2))
+
+
+def test_compact_manifest_item():
+    item = {
+        "originalUrl": "https://example.com/a.png",
+        "savedAs": "",
+        "extra": "dropped",
+        "metadata": {
+            "Model_NO": "10.FGC.4003CP",
+            "Image_URL": "example.com/a.png",
+            "Spec_Sheet_Full_URL": "",
+            "List_Price": 349.0
+        }
+    }
+    assert compact_manifest_item(item) == {
+        "originalUrl": "https://example.com/a.png",
+        "metadata": {"Model_NO": "10.FGC.4003CP", "Image_URL": "example.com/a.png"}
+    }
+    assert compact_manifest_item({"metadata": {"Model_NO": ""}}) is None
+    assert compact_manifest_item({"metadata": "10.FGC.4003CP"}) is None
+    assert compact_manifest_item(["not", "a", "dict"]) is None
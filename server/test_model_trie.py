@@ -0,0 +1,72 @@
+"""Tests for the model-number prefix trie: edge splitting, popularity ranking and live hit updates"""
+
+import random
+import sys
+from pathlib import Path
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.services.model_trie import ModelTrie
+
+MODELS = {
+    "10fgc4003cp": "10.FGC.4003CP",
+    "10fgc4003bn": "10.FGC.4003BN",
+    "10fgc4003mb": "10.FGC.4003MB",
+    "10fgc40": "10.FGC.40",
+    "20shw100bn": "20.SHW.100BN",
+    "gc303t": "GC-303-T"
+}
+POPULARITY = {"10.FGC.4003BN": 5, "10.FGC.4003MB": 9, "20.SHW.100BN": 1}
+
+
+def brute_force(trie, prefix, limit):
+    matches = [model for model, key in trie.keys.items() if key.startswith(prefix)]
+    return sorted(matches, key=lambda model: (-trie.scores[model], model))[:limit]
+
+
+def test_prefix_lookup_ranks_by_popularity():
+    trie = ModelTrie()
+    trie.build(MODELS, POPULARITY)
+    assert trie.size == 6
+    assert trie.suggest("10fgc4003") == ["10.FGC.4003MB", "10.FGC.4003BN", "10.FGC.4003CP"]
+    assert trie.suggest("10fgc4", limit=2) == ["10.FGC.4003MB", "10.FGC.4003BN"]
+    # A key that is a prefix of others, and prefixes ending inside an edge label
+    assert "10.FGC.40" in trie.suggest("10fgc40")
+    assert trie.suggest("gc3") == ["GC-303-T"]
+    assert trie.suggest("2") == ["20.SHW.100BN"]
+    assert trie.suggest("10fgc4003cpx") == [] and trie.suggest("x") == []
+    assert len(trie.suggest("")) == 6
+
+
+def test_record_hit_promotes_model():
+    trie = ModelTrie(top_k=2, hit_weight=100.0)
+    trie.build(MODELS, POPULARITY)
+    assert trie.suggest("10fgc") == ["10.FGC.4003MB", "10.FGC.4003BN"]
+
+    trie.record_hit("10.FGC.4003CP")  # Outside every cached top-2 before the hit
+    assert trie.suggest("10fgc") == ["10.FGC.4003CP", "10.FGC.4003MB"]
+    assert trie.suggest("") == ["10.FGC.4003CP", "10.FGC.4003MB"]
+    trie.record_hit("unknown")  # Ignored
+
+
+def test_matches_brute_force_on_random_catalog():
+    rng = random.Random(7)
+    alphabet = "0123abc"
+    index = {}
+    for _ in range(300):
+        key = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 7)))
+        index[key] = key.upper()
+    popularity = {model: rng.randint(0, 50) for model in index.values()}
+
+    trie = ModelTrie(top_k=5, hit_weight=30.0)
+    trie.build(index, popularity)
+    prefixes = ["", *{key[:n] for key in index for n in range(1, 4)}]
+    for prefix in prefixes:
+        assert trie.suggest(prefix, limit=5) == brute_force(trie, prefix, 5), prefix
+
+    for model in rng.sample(sorted(index.values()), 40):
+        trie.record_hit(model)
+    for prefix in prefixes:
+        assert trie.suggest(prefix, limit=5) == brute_force(trie, prefix, 5), prefix
@@ -0,0 +1,99 @@
+"""Tests for the Markdown -> sanitized HTML conversion of Freshdesk notes"""
+
+import sys
+from pathlib import Path
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.note_html import render_inline, render_markdown
+
+ANCHOR = '<a href="{}" target="_blank" rel="noopener noreferrer">{}</a>'
+
+
+def test_raw_html_is_escaped():
+    assert render_inline('<script>alert("x")</script> & co') == (
+        "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; co"
+    )
+    assert render_markdown("<b>hi</b>") == "<p>&lt;b&gt;hi&lt;/b&gt;</p>"
+
+
+def test_code_spans_are_literal():
+    assert render_inline("run `**not bold** <b>`") == "run <code>**not bold** &lt;b&gt;</code>"
+
+
+def test_emphasis():
+    assert render_inline("**bold**, *it* and ~~gone~~ but snake_case_name") == (
+        "<strong>bold</strong>, <em>it</em> and <del>gone</del> but snake_case_name"
+    )
+
+
+def test_safe_links_kept():
+    assert render_inline('[guide](https://x.com/a "Title")') == ANCHOR.format("https://x.com/a", "guide")
+    assert render_inline("[mail](mailto:help@x.com)") == ANCHOR.format("mailto:help@x.com", "mail")
+    assert render_inline("[wiki](https://x.com/a_(b))") == ANCHOR.format("https://x.com/a_(b)", "wiki")
+
+
+def test_unsafe_link_schemes_keep_only_the_label():
+    assert render_markdown("[x](javascript:alert(1))") == "<p>x</p>"
+    assert render_inline("[x](data:text/html,hi) [y](JavaScript:go)") == "x y"
+
+
+def test_link_label_markup():
+    assert render_inline("[**see** `cfg`](https://x.com)") == ANCHOR.format(
+        "https://x.com", "<strong>see</strong> <code>cfg</code>"
+    )
+
+
+def test_bare_urls():
+    assert render_inline("see https://x.com/a?b=1&c=2.") == "see " + ANCHOR.format(
+        "https://x.com/a?b=1&amp;c=2", "https://x.com/a?b=1&amp;c=2"
+    ) + "."
+    assert render_inline("(https://x.com/a_b_c)") == "(" + ANCHOR.format("https://x.com/a_b_c", "https://x.com/a_b_c") + ")"
+
+
+def test_bare_urls_do_not_split_entities():
+    assert render_inline("https://x.com/<y>") == ANCHOR.format("https://x.com/", "https://x.com/") + "&lt;y&gt;"
+    assert render_inline('"https://x.com/a" end') == (
+        "&quot;" + ANCHOR.format("https://x.com/a", "https://x.com/a") + "&quot; end"
+    )
+
+
+def test_headings_paragraphs_and_rules():
+    assert render_markdown("## Steps ##\nfirst line\nsecond line\n\n---\nend") == (
+        "<h2>Steps</h2>\n<p>first line second line</p>\n<hr>\n<p>end</p>"
+    )
+
+
+def test_table():
+    markdown = "| Spec | Value |\n|:--|--:|\n| Flow | 1.8 **gpm** |\n| Finish |"
+    assert render_markdown(markdown) == (
+        "<table><thead><tr><th>Spec</th><th>Value</th></tr></thead><tbody>"
+        "<tr><td>Flow</td><td>1.8 <strong>gpm</strong></td></tr>"
+        "<tr><td>Finish</td><td></td></tr>"
+        "</tbody></table>"
+    )
+
+
+def test_nested_lists():
+    markdown = "1. Shut off water\n   continued\n2. Remove handle\n   - Pry cap\n   - Unscrew\n3. Done"
+    assert render_markdown(markdown) == (
+        "<ol><li>Shut off water continued</li>"
+        "<li>Remove handle<ul><li>Pry cap</li><li>Unscrew</li></ul></li>"
+        "<li>Done</li></ol>"
+    )
+    assert render_markdown("3. third\n4. fourth").startswith('<ol start="3">')
+
+
+def test_code_fence_is_escaped_verbatim():
+    markdown = "```python\nif a < b:\n    **x** = [y](javascript:z)\n```\nafter"
+    assert render_markdown(markdown) == (
+        "<pre><code>if a &lt; b:\n    **x** = [y](javascript:z)</code></pre>\n<p>after</p>"
+    )
+
+
+def test_blockquote_and_empty_input():
+    assert render_markdown("> quoted *text*") == "<blockquote><p>quoted <em>text</em></p></blockquote>"
+    assert render_markdown(None) == ""
+    assert render_markdown("") == ""
@@ -0,0 +1,176 @@
+"""Tests for the CPU executor (thread / process dispatch, slot bounding, failures) and the event-loop lag monitor"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.offload import CpuExecutor
+from app.services.data_loader import ProductContext
+
+MODEL = "10.FGC.4003CP"
+
+
+class FakeCatalog:
+    """ProductDatabase stand-in; search_by_category blocks its worker thread for delay seconds"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.data_dir = Path("unused")
+        self.threads = set()
+        self.find_calls = []
+        self.model_trie = SimpleNamespace(hits=[])
+        self.model_trie.record_hit = self.model_trie.hits.append
+
+    def search_by_category(self, category):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        if category == "broken":
+            raise KeyError(category)
+        return [category]
+
+    def find_product(self, query, record_hit=True):
+        self.find_calls.append((query, record_hit))
+        return ProductContext(model_number=MODEL, specs={}) if MODEL in query else None
+
+
+def test_thread_pool_runs_off_the_loop_and_counts_failures():
+    catalog = FakeCatalog()
+
+    async def scenario():
+        executor = CpuExecutor(catalog, kind="thread", max_workers=2)
+        try:
+            assert await executor.run("search_by_category", "drains") == ["drains"]
+            with pytest.raises(KeyError):
+                await executor.run("search_by_category", "broken")
+            return executor.get_stats()
+        finally:
+            executor.shutdown()
+
+    stats = asyncio.run(scenario())
+    assert threading.get_ident() not in catalog.threads
+    assert stats["calls"] == {"search_by_category": 2}
+    assert stats["failed"] == 1 and stats["active"] == 0
+    assert stats["pool_time"]["p50_ms"] is not None
+
+
+def test_submissions_bounded_by_workers_plus_queue():
+    catalog = FakeCatalog(delay=0.02)
+
+    async def scenario():
+        executor = CpuExecutor(catalog, kind="thread", max_workers=1, max_queue=1)
+        try:
+            results = await asyncio.gather(*(executor.run("search_by_category", f"c{i}") for i in range(5)))
+            return executor, results
+        finally:
+            executor.shutdown()
+
+    executor, results = asyncio.run(scenario())
+    assert results == [[f"c{i}"] for i in range(5)]
+    assert executor.max_active == 2
+    # Later submissions waited for a slot
+    assert executor.get_stats()["slot_wait"]["p95_ms"] >= 20
+
+
+def test_find_product_bumps_popularity_on_the_loop():
+    catalog = FakeCatalog()
+
+    async def scenario():
+        executor = CpuExecutor(catalog, kind="thread", max_workers=1)
+        try:
+            found = await executor.find_product(f"price of {MODEL}")
+            missing = await executor.find_product("price of a faucet")
+            return found, missing
+        finally:
+            executor.shutdown()
+
+    found, missing = asyncio.run(scenario())
+    assert found.model_number == MODEL and missing is None
+    # The worker never records the hit itself; only a match bumps popularity
+    assert catalog.find_calls == [(f"price of {MODEL}", False), ("price of a faucet", False)]
+    assert catalog.model_trie.hits == [MODEL]
+
+
+def test_rejects_unknown_kind_and_method():
+    with pytest.raises(ValueError):
+        CpuExecutor(FakeCatalog(), kind="gpu")
+
+    async def scenario():
+        executor = CpuExecutor(FakeCatalog(), kind="thread", max_workers=1)
+        try:
+            with pytest.raises(ValueError):
+                await executor.run("load_data")
+        finally:
+            executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_process_pool_workers_load_their_own_catalog(tmp_path):
+    pd.DataFrame({
+        "Model_NO": [MODEL, "10.FGC.4003BN"],
+        "Common_Group_Number": ["10.FGC.4003", "10.FGC.4003"],
+        "Finish": ["Chrome", "Brushed Nickel"],
+        "Product_Title": ["Kitchen Faucet", "Kitchen Faucet"],
+        "Product_Category": ["Kitchen", "Kitchen"],
+        "Sub_Product_Category": ["Kitchen Faucets", "Kitchen Faucets"],
+        "Sub_Sub_Product_Category": ["Pull-Down", "Pull-Down"],
+        "List_Price": [349.0, 399.0]
+    }).to_excel(tmp_path / "Product-2025-11-12.xlsx", index=False)
+    catalog = SimpleNamespace(data_dir=tmp_path)
+
+    async def scenario():
+        executor = CpuExecutor(catalog, kind="process", max_workers=1)
+        try:
+            product = await executor.run("get_product_by_model", MODEL)
+            missing = await executor.run("get_product_by_model", "99.NONE")
+            return product, missing
+        finally:
+            executor.shutdown()
+
+    product, missing = asyncio.run(scenario())
+    assert isinstance(product, ProductContext)
+    assert product.specs["List_Price"] == 349.0
+    assert [v["model_number"] for v in product.variants] == ["10.FGC.4003BN"]
+    assert missing is None
+
+
+def test_loop_monitor_counts_stalls_and_throttles_warnings(capsys):
+    monitor = LoopLagMonitor(stall_threshold_seconds=0.1, warn_interval_seconds=60)
+    for lag in (0.001, 0.002, 0.15, 0.3, 0.004):
+        monitor.record(lag)
+
+    stats = monitor.get_stats()
+    assert stats["samples"] == 5 and stats["stalls"] == 2
+    assert stats["lag_max_ms"] == 300.0 and stats["lag_p50_ms"] == 4.0
+    assert not stats["running"]
+    assert capsys.readouterr().out.count("Event loop stalled") == 1
+    assert LoopLagMonitor().get_stats()["lag_p99_ms"] is None
+
+
+def test_loop_monitor_measures_blocking_call():
+    monitor = LoopLagMonitor(interval_seconds=0.01, stall_threshold_seconds=0.05)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)  # Blocks the loop past the next wake-up
+        await asyncio.sleep(0.03)
+        running = monitor.get_stats()["running"]
+        await monitor.stop()
+        return running
+
+    assert asyncio.run(scenario())
+    stats = monitor.get_stats()
+    assert not stats["running"]
+    assert stats["stalls"] >= 1 and stats["lag_max_ms"] >= 50
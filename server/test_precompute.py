@@ -0,0 +1,70 @@
+"""Tests for precomputed answers: question normalization, template matching and the answer store"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.precompute import (
+    DEFAULT_TEMPLATES, AnswerStore, TemplateMatcher, load_templates, normalize_question
+)
+
+MODEL = "10.FGC.4003CP"
+
+
+@pytest.fixture
+def matcher():
+    return TemplateMatcher(DEFAULT_TEMPLATES)
+
+
+def test_normalize_drops_model_in_any_form_and_filler():
+    expected = "how do i install"
+    assert normalize_question(f"How do I install the {MODEL}?", MODEL) == expected
+    assert normalize_question("how do i install the 10fgc4003cp", MODEL) == expected
+    assert normalize_question("How do I install my 10-FGC-4003CP", MODEL) == expected
+    # A partial model number (family prefix) is dropped too
+    assert normalize_question("How do I install the FGC4003?", MODEL) == expected
+
+
+def test_matches_question_and_aliases(matcher):
+    assert matcher.match(f"How do I install the {MODEL}?", MODEL) == "install"
+    assert matcher.match(f"installation instructions for {MODEL}", MODEL) == "install"
+    assert matcher.match(f"what comes in the box with the {MODEL}", MODEL) == "parts"
+    assert matcher.match(f"The {MODEL} is leaking, how do I fix it?", MODEL) == "troubleshoot_leak"
+
+
+def test_other_questions_do_not_match(matcher):
+    assert matcher.match(f"How do I install the {MODEL} on a granite counter?", MODEL) is None
+    assert matcher.match(f"What is the price of {MODEL}?", MODEL) is None
+    # The model of the question must be the resolved product
+    assert matcher.match("How do I install the 20.SHW.100BN?", MODEL) is None
+
+
+def test_load_templates_validates(tmp_path):
+    assert load_templates() is DEFAULT_TEMPLATES
+    path = tmp_path / "templates.json"
+    path.write_text('[{"id": "warranty", "question": "What is the warranty on {model}?"}]')
+    assert load_templates(str(path))[0]["id"] == "warranty"
+    path.write_text('[{"id": "bad", "question": "What is the warranty?"}]')
+    with pytest.raises(ValueError):
+        load_templates(str(path))
+
+
+def test_answer_store_is_versioned(tmp_path):
+    store = AnswerStore(str(tmp_path / "answers.sqlite3"))
+    result = {"response": "Step 1", "matched_product": MODEL}
+    store.put(MODEL, "install", "flash", "cat-1", "prompt-1", result)
+
+    assert store.get(MODEL, "install", "flash", "cat-1", "prompt-1") == result
+    assert store.get(MODEL, "install", "reasoning", "cat-1", "prompt-1") is None
+    assert store.get(MODEL, "install", "flash", "cat-2", "prompt-1") is None
+    assert store.get(MODEL, "install", "flash", "cat-1", "prompt-2") is None
+
+    store.put(MODEL, "parts", "flash", "cat-2", "prompt-1", result)
+    assert store.purge_stale("cat-2", "prompt-1") == 1
+    assert store.count() == 1
+    store.close()
@@ -0,0 +1,103 @@
+"""Tests for ticket prefetch: ticket text extraction and shared prefetch runs"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.prefetch import MAX_TEXT_CHARS, TicketNotFound, TicketPrefetcher
+
+PRODUCT = SimpleNamespace(model_number="10.FGC.4003CP", specs={"Product_Title": "Kitchen Faucet"})
+
+
+def test_ticket_text_prefers_plain_description():
+    ticket = {
+        "subject": "Leaking  faucet",
+        "description_text": "Customer's 10.FGC.4003CP\n drips.",
+        "description": "<div>ignored</div>"
+    }
+    assert TicketPrefetcher.ticket_text(ticket) == "Leaking faucet Customer's 10.FGC.4003CP drips."
+
+
+def test_ticket_text_strips_html_description():
+    ticket = {
+        "subject": None,
+        "description": "<div>Model <b>10.FGC.4003CP</b></div><p>Tom &amp; Jerry&#39;s sink</p>"
+    }
+    assert TicketPrefetcher.ticket_text(ticket) == "Model 10.FGC.4003CP Tom & Jerry's sink"
+    assert TicketPrefetcher.ticket_text({}) == ""
+    assert len(TicketPrefetcher.ticket_text({"subject": "x" * (MAX_TEXT_CHARS + 50)})) == MAX_TEXT_CHARS
+
+
+class StubFreshdesk:
+    def __init__(self, tickets):
+        self.tickets = tickets
+        self.calls = 0
+
+    async def get_ticket(self, ticket_id):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.tickets.get(ticket_id)
+
+
+def make_prefetcher(freshdesk):
+    warmed = []
+
+    async def warm_ticket(ticket_id, text, products, deadline):
+        warmed.append((ticket_id, text, [p.model_number for p in products]))
+        return {"models": [p.model_number for p in products], "excerpts": {p.model_number: 2 for p in products}}
+
+    orchestrator = SimpleNamespace(
+        product_db=SimpleNamespace(find_products=lambda text, limit: [PRODUCT] if "10.FGC" in text else []),
+        warm_ticket=warm_ticket
+    )
+    return TicketPrefetcher(orchestrator, lambda: freshdesk), warmed
+
+
+def test_concurrent_prefetches_share_one_run():
+    freshdesk = StubFreshdesk({"42": {"subject": "10.FGC.4003CP drips"}})
+    prefetcher, warmed = make_prefetcher(freshdesk)
+
+    async def run():
+        results = await asyncio.gather(prefetcher.prefetch("42"), prefetcher.prefetch("42"))
+        await prefetcher.settle("42")
+        return results
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert first["products"] == [{"model_number": "10.FGC.4003CP", "title": "Kitchen Faucet", "excerpts": 2}]
+    assert freshdesk.calls == 1 and len(warmed) == 1
+    stats = prefetcher.get_stats()
+    assert (stats["prefetches"], stats["joined"], stats["settle_waits"], stats["inflight"]) == (1, 1, 0, 0)
+
+
+def test_settle_waits_for_running_prefetch():
+    prefetcher, warmed = make_prefetcher(StubFreshdesk({"42": {"subject": "no model here"}}))
+
+    async def run():
+        task = asyncio.create_task(prefetcher.prefetch("42"))
+        await asyncio.sleep(0)
+        await prefetcher.settle("42")
+        assert warmed == [("42", "no model here", [])]
+        return await task
+
+    assert asyncio.run(run())["products"] == []
+    assert prefetcher.stats["settle_waits"] == 1
+    assert prefetcher.stats["without_models"] == 1
+
+
+def test_missing_ticket_and_unconfigured_freshdesk():
+    prefetcher, _ = make_prefetcher(StubFreshdesk({}))
+    with pytest.raises(TicketNotFound):
+        asyncio.run(prefetcher.prefetch("7"))
+    assert prefetcher.stats["not_found"] == 1 and prefetcher.stats["failed"] == 0
+
+    unconfigured, _ = make_prefetcher(None)
+    with pytest.raises(RuntimeError):
+        asyncio.run(unconfigured.prefetch("7"))
@@ -0,0 +1,90 @@
+"""Tests for the precomputed related-products index"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.services.catalog_query import CatalogQueryEngine
+from app.services.related_products import RelatedProductsIndex
+
+
+@pytest.fixture
+def index():
+    catalog_df = pd.DataFrame({
+        "Model_NO": [
+            "10.FGC.4003CP", "10.FGC.4003BN",   # one family, two finishes
+            "20.FGC.5000CP", "30.FGC.6000CP",   # same type, close / far in price
+            "40.FGC.7000CP",                    # discontinued
+            "50.FGC.8000CP",                    # spare part
+            "60.SHW.100CP",                     # other subcategory
+            "70.DRN.1CP"                        # no subcategory / type
+        ],
+        "Finish": ["Chrome", "Brushed Nickel", "Chrome", "Chrome", "Chrome", "Chrome", "Chrome", "Chrome"],
+        "Product_Category": ["Kitchen"] * 6 + ["Bathroom", "Accessories"],
+        "Sub_Product_Category": ["Kitchen Faucets"] * 6 + ["Shower", None],
+        "Sub_Sub_Product_Category": ["Pull-Down"] * 6 + ["Shower Heads", None],
+        "List_Price": [349.0, 399.0, 359.0, 1299.0, 349.0, 349.0, 189.0, 29.0],
+        "Product_Status": ["Active"] * 4 + ["Discontinued"] + ["Active"] * 3,
+        "Is_Spare_Part": ["NO"] * 5 + ["YES", "NO", "NO"],
+        "Product_Title": ["Faucet A", "Faucet A", "Faucet B", "Faucet C", "Faucet D", "Cartridge", "Shower", "Drain"]
+    })
+    family = {"10.FGC.4003CP": "10.FGC.4003", "10.FGC.4003BN": "10.FGC.4003"}
+    return RelatedProductsIndex(CatalogQueryEngine(catalog_df), family, top_k=3)
+
+
+def models(alternatives):
+    return [a["model_number"] for a in alternatives]
+
+
+def test_get_ranks_eligible_alternatives(index):
+    alternatives = index.get("10.FGC.4003CP")
+    # No sibling finish, discontinued, spare-part or other-subcategory rows
+    assert models(alternatives) == ["20.FGC.5000CP", "30.FGC.6000CP"]
+    best = alternatives[0]
+    assert best["title"] == "Faucet B" and best["price"] == 359.0 and best["status"] == "Active"
+    assert best["shared"] == ["type", "finish", "price_band"]
+    assert alternatives[1]["shared"] == ["type", "finish"]
+    assert 0 < alternatives[1]["score"] < best["score"] <= 1
+
+
+def test_get_limit_and_unknown_model(index):
+    assert models(index.get("10.FGC.4003CP", limit=1)) == ["20.FGC.5000CP"]
+    assert index.get("99.UNKNOWN") == []
+    # A family is not its own alternative; the other family member is
+    assert "10.FGC.4003BN" not in models(index.get("10.FGC.4003CP"))
+    assert "10.FGC.4003CP" in models(index.get("20.FGC.5000CP"))
+
+
+def test_get_without_candidates(index):
+    assert index.get("60.SHW.100CP") == []
+    assert index.get("70.DRN.1CP") == []
+    assert models(index.get("50.FGC.8000CP")) == []
+
+
+def test_catalog_without_optional_columns():
+    catalog_df = pd.DataFrame({
+        "Model_NO": ["10.FGC.4003CP", "20.FGC.5000CP"],
+        "Sub_Product_Category": ["Kitchen Faucets"] * 2,
+        "List_Price": [349.0, 359.0]
+    })
+    index = RelatedProductsIndex(CatalogQueryEngine(catalog_df), {})
+    (alternative,) = index.get("10.FGC.4003CP")
+    assert alternative.pop("score") > 0
+    assert alternative == {
+        "model_number": "20.FGC.5000CP", "subcategory": "Kitchen Faucets", "price": 359.0, "shared": ["price_band"]
+    }
+
+
+def test_stats_count_lookups(index):
+    index.get("10.FGC.4003CP")
+    index.get("99.UNKNOWN")
+    stats = index.get_stats()
+    assert stats["models"] == 8
+    assert stats["lookups"] == 1
+    assert stats["top_k"] == 3
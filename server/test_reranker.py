@@ -0,0 +1,66 @@
+"""Tests for excerpt reranking: relevance order, threshold pruning, deduplication and the model bonus"""
+
+import sys
+from pathlib import Path
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.reranker import ExcerptReranker, estimate_tokens
+from app.services.data_loader import ProductContext
+
+MODEL = "10.FGC.4003CP"
+INSTALL = {"title": "Install Guide", "text": "To install the kitchen faucet, tighten the mounting nut under the sink."}
+CARE = {"title": "Care", "text": "Wipe the chrome finish with a soft damp cloth."}
+UNRELATED = {"title": "Warranty Terms", "text": "Coverage excludes commercial use and improper shipping damage."}
+DUPLICATE = {"title": "Install Guide (copy)", "text": "To install the kitchen faucet, tighten the mounting nut under the sink basin."}
+
+
+def test_ranks_relevant_excerpt_first():
+    reranker = ExcerptReranker(min_score=0.0)
+    kept, report = reranker.rerank("how do I install the kitchen faucet", [CARE, UNRELATED, INSTALL])
+    assert kept[0]["title"] == "Install Guide"
+    assert kept[0]["rerank_score"] >= kept[-1]["rerank_score"]
+    assert report["chunks_kept"] == 3
+
+
+def test_prunes_low_scores_but_keeps_min_keep():
+    reranker = ExcerptReranker(min_score=0.3)
+    kept, report = reranker.rerank("how do I install the kitchen faucet", [UNRELATED, INSTALL])
+    assert [e["title"] for e in kept] == ["Install Guide"]
+    assert report["chunks_pruned_low_score"] == 1
+    assert report["tokens_pruned"] == estimate_tokens(UNRELATED["text"])
+
+    kept, _ = ExcerptReranker(min_score=0.99).rerank("install", [UNRELATED, CARE])
+    assert len(kept) == 1  # min_keep
+
+
+def test_drops_near_duplicates():
+    reranker = ExcerptReranker(min_score=0.0, duplicate_threshold=0.6)
+    kept, report = reranker.rerank("install the kitchen faucet", [INSTALL, DUPLICATE, CARE])
+    assert report["chunks_pruned_duplicate"] == 1
+    assert len([e for e in kept if e["title"].startswith("Install Guide")]) == 1
+
+
+def test_model_mention_and_metadata_raise_score():
+    product = ProductContext(model_number=MODEL, specs={"Finish": "Chrome", "Product_Title": "Kitchen Faucet"})
+    mention = {"title": "Parts", "text": f"Replacement cartridge for {MODEL}."}
+    plain = {"title": "Parts", "text": "Replacement cartridge."}
+    reranker = ExcerptReranker()
+    with_model, without_model = reranker.score("replacement cartridge", [mention, plain], product)
+    assert with_model > without_model
+
+    # Product metadata (finish) counts toward relevance
+    care_score, = reranker.score("cleaning tips", [CARE], product)
+    care_plain, = reranker.score("cleaning tips", [CARE])
+    assert care_score > care_plain
+
+
+def test_totals_accumulate():
+    reranker = ExcerptReranker(min_score=0.3)
+    reranker.rerank("install the kitchen faucet", [UNRELATED, INSTALL])
+    reranker.rerank("install the kitchen faucet", [])
+    stats = reranker.get_stats()
+    assert stats["requests"] == 2 and stats["chunks_in"] == 2 and stats["chunks_pruned"] == 1
+    assert 0 < stats["token_prune_ratio"] < 1
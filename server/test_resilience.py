@@ -0,0 +1,220 @@
+"""Tests for deadlines, hedging, downgrade and circuit breaking against a fault-injecting stub"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+from app.services.gemini_service import GeminiService
+from app.services.resilience import (
+    CircuitOpenError, Deadline, DeadlineExceeded, UpstreamPolicy
+)
+
+
+class UpstreamError(Exception):
+    """Mimics google.genai errors.APIError (has .code)"""
+
+    def __init__(self, code: int):
+        super().__init__(f"{code} upstream error")
+        self.code = code
+
+
+class FaultyModels:
+    """
+    Stand-in for client.aio.models.generate_content.
+
+    faults: model name -> list of per-call behaviours, consumed in order;
+    each is ("ok", delay_s) or ("error", code). When a list runs out the
+    default ("ok", base_delay) applies.
+    """
+
+    def __init__(self, base_delay: float = 0.005):
+        self.base_delay = base_delay
+        self.faults = {}
+        self.calls = []
+
+    def inject(self, model, *behaviours):
+        self.faults.setdefault(model, []).extend(behaviours)
+
+    async def generate_content(self, model, contents, config):
+        self.calls.append(model)
+        queue = self.faults.get(model) or []
+        kind, value = queue.pop(0) if queue else ("ok", self.base_delay)
+        if kind == "error":
+            await asyncio.sleep(self.base_delay)
+            raise UpstreamError(value)
+        await asyncio.sleep(value)
+        return SimpleNamespace(text=f"answer from {model}", usage_metadata=None, candidates=[])
+
+
+def make_service(policy=None, **kwargs):
+    models = FaultyModels()
+    service = GeminiService.__new__(GeminiService)
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    service.file_search_store_name = kwargs.get("store")
+    service.models = {"flash": "gemini-2.5-flash", "reasoning": "gemini-2.5-pro"}
+    service.context_cache = None
+    service.policy = policy or UpstreamPolicy(min_samples=5)
+    service.search_timeout = kwargs.get("search_timeout", 10.0)
+    service.reasoning_latency_estimate = kwargs.get("reasoning_estimate", 0.5)
+    service.downgrades = 0
+    return service, models
+
+
+def generate(service, mode="flash", deadline=None):
+    return asyncio.run(service.generate_response("q", {}, mode=mode, system_prompt="sys", deadline=deadline))
+
+
+def test_deadline_bounds_slow_call():
+    service, models = make_service()
+    models.inject("gemini-2.5-flash", ("ok", 2.0), ("ok", 2.0))
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        generate(service, deadline=Deadline.after(0.1))
+    assert time.monotonic() - started < 0.5
+
+
+def test_request_deadline_does_not_trip_breaker():
+    policy = UpstreamPolicy(hedge_enabled=False, failure_threshold=3)
+    service, models = make_service(policy)
+    models.inject("gemini-2.5-flash", *[("ok", 1.0)] * 5)
+
+    for _ in range(5):
+        with pytest.raises(DeadlineExceeded):
+            generate(service, deadline=Deadline.after(0.02))
+    assert policy.breaker("gemini-2.5-flash").state == "closed"
+    assert policy.get_stats()["gemini-2.5-flash"]["timeouts"] == 5
+    assert generate(service, deadline=Deadline.after(10))["response"]
+
+
+def test_per_call_timeout_trips_breaker():
+    policy = UpstreamPolicy(hedge_enabled=False, failure_threshold=2)
+
+    async def slow():
+        await asyncio.sleep(1.0)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(DeadlineExceeded):
+                await policy.call("file_search", slow, deadline=Deadline.after(10), timeout=0.02)
+
+    asyncio.run(run())
+    assert policy.breaker("file_search").state == "open"
+
+
+def test_hedge_fires_after_p95_and_wins():
+    service, models = make_service()
+    for _ in range(5):
+        generate(service)  # ~5ms latency profile
+
+    models.inject("gemini-2.5-flash", ("ok", 1.0))  # Primary stalls; hedge uses base delay
+    started = time.monotonic()
+    result = generate(service, deadline=Deadline.after(5))
+    assert result["response"] == "answer from gemini-2.5-flash"
+    assert time.monotonic() - started < 0.5
+
+    stats = service.policy.get_stats()["gemini-2.5-flash"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_no_latency_hedge_without_profile():
+    service, models = make_service()
+    models.inject("gemini-2.5-flash", ("ok", 0.1))
+    generate(service)
+    assert len(models.calls) == 1
+
+
+def test_retryable_error_is_retried():
+    service, models = make_service()
+    models.inject("gemini-2.5-flash", ("error", 503))
+    result = generate(service)
+    assert result["response"] == "answer from gemini-2.5-flash"
+    assert len(models.calls) == 2
+
+
+def test_client_error_is_not_retried_and_does_not_trip_breaker():
+    service, models = make_service(UpstreamPolicy(failure_threshold=1))
+    models.inject("gemini-2.5-flash", ("error", 400))
+    with pytest.raises(UpstreamError):
+        generate(service)
+    assert len(models.calls) == 1
+    assert service.policy.breaker("gemini-2.5-flash").state == "closed"
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    policy = UpstreamPolicy(hedge_enabled=False, failure_threshold=3, recovery_seconds=0.1)
+    service, models = make_service(policy)
+    models.inject("gemini-2.5-flash", *[("error", 503)] * 3)
+
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            generate(service)
+
+    calls_before = len(models.calls)
+    with pytest.raises(CircuitOpenError):
+        generate(service)
+    assert len(models.calls) == calls_before  # Rejected without calling upstream
+
+    time.sleep(0.12)
+    assert generate(service)["response"]  # Half-open probe succeeds
+    assert policy.breaker("gemini-2.5-flash").state == "closed"
+    assert policy.get_stats()["gemini-2.5-flash"]["short_circuited"] == 1
+
+
+def test_reasoning_downgraded_when_deadline_at_risk():
+    service, models = make_service(reasoning_estimate=30.0)
+    result = generate(service, mode="reasoning", deadline=Deadline.after(5))
+    assert result["model_used"] == "gemini-2.5-flash"
+    assert models.calls == ["gemini-2.5-flash"]
+    assert service.downgrades == 1
+
+
+def test_reasoning_kept_when_time_allows():
+    service, _ = make_service(reasoning_estimate=0.5)
+    result = generate(service, mode="reasoning", deadline=Deadline.after(5))
+    assert result["model_used"] == "gemini-2.5-pro"
+
+
+def test_reasoning_downgraded_when_circuit_open():
+    policy = UpstreamPolicy(hedge_enabled=False, failure_threshold=1, recovery_seconds=60)
+    service, models = make_service(policy)
+    models.inject("gemini-2.5-pro", ("error", 503))
+    with pytest.raises(UpstreamError):
+        generate(service, mode="reasoning")
+
+    result = generate(service, mode="reasoning")
+    assert result["model_used"] == "gemini-2.5-flash"
+
+
+def test_file_search_times_out_to_empty_results():
+    service, models = make_service(store="fileSearchStores/test", search_timeout=0.05)
+    models.inject("gemini-2.5-flash", ("ok", 2.0), ("ok", 2.0))
+
+    started = time.monotonic()
+    results = asyncio.run(service.file_search("install", deadline=Deadline.after(5)))
+    assert results == []
+    assert time.monotonic() - started < 0.5
+    assert service.policy.get_stats()["file_search:gemini-2.5-flash"]["timeouts"] == 1
+
+
+def test_orchestrator_propagates_deadline():
+    service, models = make_service(store="fileSearchStores/test")
+    models.inject("gemini-2.5-flash", *[("ok", 2.0)] * 4)
+    product_db = SimpleNamespace(find_product=lambda query: None, catalog_version="test")
+    orchestrator = Orchestrator(product_db, service, PromptsManager(), enable_fast_path=False)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(orchestrator.process_query("what is the return policy?", deadline=Deadline.after(0.2)))
+    # Search and synthesis share one budget instead of each taking their own
+    assert time.monotonic() - started < 0.6
@@ -0,0 +1,127 @@
+"""Tests for response field sets, JSON serialization and Content-Encoding negotiation"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.compression import CompressionMiddleware, _choose_encoding
+from app.core.response_shaping import FastJSONResponse, dumps, shape_chat_response, shape_product
+
+SPECS = {
+    "Model_NO": "10.FGC.4003CP",
+    "Product_Title": "Kitchen Faucet",
+    "Finish": "Chrome",
+    "List_Price": 349.0,
+    "Collection": "Fina",
+    "Spout_Reach_Inches": 9.5,
+    "Image_URL": "https://example.com/a.png"
+}
+
+PRODUCT = {
+    "model_number": "10.FGC.4003CP",
+    "specs": SPECS,
+    "media": {"images": [{"url": "https://example.com/a.png"}], "videos": []},
+    "documents": [{"type": "Specification Sheet"}],
+    "variants": [{"model_number": "10.FGC.4003BN", "finish": "Brushed Nickel", "differing_specs": {"Finish": "Brushed Nickel"}}]
+}
+
+
+def test_shape_product_field_sets():
+    assert shape_product(PRODUCT, "full") is PRODUCT
+
+    summary = shape_product(PRODUCT, "summary")
+    assert list(summary["specs"]) == ["Model_NO", "Product_Title", "Finish", "List_Price", "Collection"]
+    assert summary["variants"] == [{"model_number": "10.FGC.4003BN", "finish": "Brushed Nickel"}]
+    assert summary["media"] == PRODUCT["media"]
+
+    minimal = shape_product(PRODUCT, "minimal")
+    assert "media" not in minimal and "documents" not in minimal
+    assert list(minimal["specs"]) == ["Model_NO", "Product_Title", "Finish", "List_Price"]
+    # The input is left untouched
+    assert "Spout_Reach_Inches" in PRODUCT["specs"] and "media" in PRODUCT
+
+
+def test_shape_chat_response_field_sets():
+    result = {"markdown_response": "Chrome", "media_assets": {"images": [], "specs": SPECS}}
+
+    assert shape_chat_response(result) is result
+    assert "Spout_Reach_Inches" not in shape_chat_response(result, "summary")["media_assets"]["specs"]
+    assert shape_chat_response(result, "minimal") == {"markdown_response": "Chrome", "media_assets": None}
+    assert result["media_assets"]["specs"] is SPECS
+    assert shape_chat_response({"markdown_response": "Hi", "media_assets": None}, "summary")["media_assets"] is None
+
+
+def test_dumps_handles_numpy_and_non_str_keys():
+    payload = {"price": np.float64(349.0), "count": np.int64(3), "sizes": np.array([1, 2]), 1: "one"}
+    assert json.loads(dumps(payload)) == {"price": 349.0, "count": 3, "sizes": [1, 2], "1": "one"}
+    assert FastJSONResponse({"title": "Fauçet"}).body == dumps({"title": "Fauçet"})
+
+
+def test_choose_encoding():
+    assert _choose_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert _choose_encoding("gzip, deflate, br", ["gzip"]) == "gzip"
+    assert _choose_encoding("br;q=0, gzip;q=0.5", ["br", "gzip"]) == "gzip"
+    assert _choose_encoding("*", ["br", "gzip"]) == "br"
+    assert _choose_encoding("*;q=0, identity", ["gzip"]) is None
+    assert _choose_encoding("gzip;q=bogus", ["gzip"]) is None
+    assert _choose_encoding("", ["gzip"]) is None
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=256, enable_brotli=False)
+
+    @app.get("/large")
+    async def large():
+        return FastJSONResponse({"rows": [{"model_number": f"10.FGC.{4000 + i}CP"} for i in range(50)]})
+
+    @app.get("/small")
+    async def small():
+        return FastJSONResponse({"ok": True})
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(50):
+                yield json.dumps({"index": i, "padding": "x" * 20}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+def get(app, path, **headers):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(run())
+
+
+def test_large_body_is_gzipped():
+    response = get(make_app(), "/large", **{"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.json()["rows"]) == 50
+    assert int(response.headers["content-length"]) < len(dumps(response.json()))
+
+
+def test_small_body_and_identity_clients_are_not_compressed():
+    app = make_app()
+    assert "content-encoding" not in get(app, "/small", **{"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in get(app, "/large", **{"Accept-Encoding": "identity"}).headers
+
+
+def test_ndjson_stream_passes_through():
+    response = get(make_app(), "/stream", **{"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    lines = response.text.splitlines()
+    assert len(lines) == 50 and json.loads(lines[-1])["index"] == 49
@@ -0,0 +1,83 @@
+"""Tests for the local retrieval backend: chunking, vector / BM25 search and off-loop execution"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.services.retrieval import (
+    HashedEmbedder, LexicalIndex, LocalChunkStore, LocalIndexBackend, LocalRetriever, chunk_text
+)
+
+DOCUMENTS = [
+    {"title": "Install Guide", "text": "Install the faucet: tighten the mounting nut and connect the supply lines.", "uri": "a"},
+    {"title": "Care Guide", "text": "Clean the chrome finish with mild soap and a soft cloth.", "uri": "b"},
+    {"title": "Parts", "text": "Cartridge 10.FGC.4003CP replacement: remove the handle and pull the cartridge.", "uri": "c"}
+]
+
+
+@pytest.fixture
+def retriever():
+    embedder = HashedEmbedder()
+    return LocalRetriever(LocalChunkStore.build(DOCUMENTS, embedder), embedder)
+
+
+def test_chunk_text_overlaps_on_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(400))
+    chunks = chunk_text(text, chunk_size=200, overlap=50)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(not chunk.startswith(" ") and " " in chunk for chunk in chunks)
+    assert chunk_text("   ") == []
+
+
+def test_bm25_ranks_matching_document_first():
+    index = LexicalIndex([doc["text"] for doc in DOCUMENTS])
+    assert index.search("chrome soap", top_k=3)[0][0] == 1
+    assert index.search("nothing relevant", top_k=3) == []
+
+
+def test_vector_search(retriever):
+    results = retriever.search("how do I tighten the mounting nut", max_results=2)
+    assert results[0]["title"] == "Install Guide"
+    assert results[0]["retrieval"] == "vector"
+
+
+def test_lexical_fallback_without_embedder():
+    retriever = LocalRetriever(LocalChunkStore.build(DOCUMENTS, HashedEmbedder()), embedder=None)
+    results = retriever.search("chrome soap")
+    assert results[0]["title"] == "Care Guide" and results[0]["retrieval"] == "lexical"
+    assert retriever.stats["lexical_fallback"] == 1
+
+
+def test_model_filter_boosts_chunks_naming_the_model(retriever):
+    results = retriever.search("remove the handle", model_filter="10-fgc-4003cp")
+    assert results[0]["title"] == "Parts"
+
+
+def test_backend_searches_off_the_event_loop(retriever):
+    threads = []
+    search = retriever.search
+
+    def recording_search(*args):
+        threads.append(threading.get_ident())
+        return search(*args)
+
+    retriever.search = recording_search
+    backend = LocalIndexBackend(retriever)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        results = await asyncio.gather(*(backend.search("chrome finish care") for _ in range(4)))
+        return loop_thread, results
+
+    loop_thread, results = asyncio.run(run())
+    assert all(r[0]["title"] == "Care Guide" for r in results)
+    assert threads and loop_thread not in threads
+    assert backend.get_stats()["searches"] == 4
@@ -0,0 +1,140 @@
+"""Tests for multi-turn sessions: product carry-over and the history replayed to the model"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.cache import TTLCache
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+from app.core.sessions import SessionStore
+from app.services.data_loader import ProductContext
+from app.services.gemini_service import GeminiService
+from app.services.resilience import UpstreamPolicy
+
+MODEL = "10.FGC.4003CP"
+EXCERPT = {"title": "Install Guide", "text": "Tighten the mounting nut to 5 Nm before connecting the supply lines."}
+
+
+class StubModels:
+    """client.aio.models stand-in; File Search calls return one grounding excerpt"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def generate_content(self, model, contents, config):
+        grounded = bool(config and config.tools)
+        self.requests.append((grounded, contents))
+        chunk = SimpleNamespace(retrieved_context=SimpleNamespace(title=EXCERPT["title"], text=EXCERPT["text"], uri=""))
+        metadata = SimpleNamespace(grounding_chunks=[chunk])
+        candidates = [SimpleNamespace(grounding_metadata=metadata)] if grounded else []
+        return SimpleNamespace(text=f"answer {len(self.requests)}", usage_metadata=None, candidates=candidates)
+
+    def synthesis_requests(self):
+        return [contents for grounded, contents in self.requests if not grounded]
+
+
+def make_orchestrator(**kwargs):
+    service = GeminiService.__new__(GeminiService)
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=StubModels()))
+    service.file_search_store_name = "fileSearchStores/test"
+    service.models = {"flash": "gemini-2.5-flash", "reasoning": "gemini-2.5-pro"}
+    service.context_cache = None
+    service.policy = UpstreamPolicy(min_samples=5)
+    service.search_timeout = 10.0
+    service.reasoning_latency_estimate = 0.5
+    service.downgrades = 0
+
+    def product(model_number):
+        return ProductContext(model_number=model_number, specs={"Model_NO": model_number, "Finish": "Chrome"})
+
+    product_db = SimpleNamespace(
+        find_product=lambda query: product(MODEL) if "fgc" in query.lower() else None,
+        get_product_by_model=lambda model_number: product(model_number),
+        find_variant=lambda current, query: None,
+        catalog_version="test"
+    )
+    orchestrator = Orchestrator(product_db, service, PromptsManager(), enable_fast_path=False, **kwargs)
+    return orchestrator, service.client.aio.models
+
+
+def ask(orchestrator, session, query):
+    return asyncio.run(orchestrator.process_query(query, session=session))
+
+
+def test_cached_answer_keeps_product_for_follow_up():
+    orchestrator, models = make_orchestrator(response_cache=TTLCache(ttl_seconds=60))
+    store = SessionStore()
+    ask(orchestrator, store.create(), f"how do I install the {MODEL}?")
+
+    # A new conversation served from the response cache
+    session = store.create()
+    result = ask(orchestrator, session, f"how do I install the {MODEL}?")
+    assert result["matched_product"] == MODEL
+    assert session.product_context.model_number == MODEL
+
+    follow_up = ask(orchestrator, session, "what about its flow rate?")
+    assert follow_up["matched_product"] == MODEL
+
+
+def test_history_records_queries_and_excerpts_stay_in_session():
+    orchestrator, models = make_orchestrator()
+    session = SessionStore().create()
+    ask(orchestrator, session, f"how do I install the {MODEL}?")
+    ask(orchestrator, session, "what torque for the mounting nut?")
+
+    assert [m["text"] for m in session.history if m["role"] == "user"] == [
+        f"how do I install the {MODEL}?",
+        "what torque for the mounting nut?"
+    ]
+    assert [e["text"] for e in session.excerpts] == [EXCERPT["text"]]
+
+    # The second turn replays the plain first question; the excerpts ride with the new one
+    second = models.synthesis_requests()[1]
+    replayed, current = second[0].parts[0].text, second[-1].parts[0].text
+    assert EXCERPT["text"] not in replayed
+    assert EXCERPT["text"] in current and "what torque for the mounting nut?" in current
+
+
+def test_cached_and_pipeline_turns_record_the_same_way():
+    orchestrator, models = make_orchestrator(response_cache=TTLCache(ttl_seconds=60))
+    store = SessionStore()
+    ask(orchestrator, store.create(), f"how do I install the {MODEL}?")
+    cached = store.create()
+    ask(orchestrator, cached, f"how do I install the {MODEL}?")
+    fresh = store.create()
+    ask(orchestrator, fresh, f"where is the {MODEL} made?")
+
+    assert cached.history[0]["text"] == f"how do I install the {MODEL}?"
+    assert fresh.history[0]["text"] == f"where is the {MODEL} made?"
+
+
+def test_session_keeps_most_recent_excerpts():
+    session = SessionStore(max_excerpts=3).create()
+    session.add_excerpts([{"text": f"excerpt {i}"} for i in range(2)])
+    new = session.add_excerpts([{"text": f"excerpt {i}"} for i in range(1, 5)])
+    assert [e["text"] for e in new] == ["excerpt 2", "excerpt 3", "excerpt 4"]
+    assert [e["text"] for e in session.excerpts] == ["excerpt 2", "excerpt 3", "excerpt 4"]
+
+
+def test_follow_up_sends_only_best_session_excerpts():
+    orchestrator, models = make_orchestrator()
+    session = SessionStore().create()
+    ask(orchestrator, session, f"how do I install the {MODEL}?")
+    session.add_excerpts([
+        {"title": f"Shipping {i}", "text": f"Orders to shipping zone {i} leave the warehouse within two days."}
+        for i in range(10)
+    ])
+
+    query = "what torque for the mounting nut?"
+    ask(orchestrator, session, query)
+    current = models.synthesis_requests()[-1][-1].parts[0].text
+    limit = orchestrator._max_results(orchestrator.intent_classifier.classify(query))
+    assert len(session.excerpts) == 11 and limit < 11
+    assert EXCERPT["text"] in current
+    assert current.count("shipping zone") == limit - 1
@@ -0,0 +1,192 @@
+"""Tests for tracing spans: file exporter, context propagation, no-op mode and pipeline stage spans"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.core.cache import TTLCache
+from app.core.offload import CpuExecutor
+from app.core.orchestrator import Orchestrator
+from app.core.prompts import PromptsManager
+from app.services import tracing
+from app.services.gemini_service import GeminiService
+from app.services.resilience import UpstreamPolicy
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure("file", path=path)
+    yield path
+    tracing.configure("none")
+
+
+def read_spans(path):
+    tracing.get_tracer().shutdown()
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def by_name(spans):
+    return {span["name"]: span for span in spans}
+
+
+class StubModels:
+    """client.aio.models stand-in reporting fixed token counts"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate_content(self, model, contents, config):
+        self.calls.append(model)
+        await asyncio.sleep(0.001)
+        return SimpleNamespace(
+            text=f"answer from {model}",
+            usage_metadata=SimpleNamespace(prompt_token_count=120, candidates_token_count=30, total_token_count=150),
+            candidates=[]
+        )
+
+
+def make_service():
+    service = GeminiService.__new__(GeminiService)
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=StubModels()))
+    service.file_search_store_name = "fileSearchStores/test"
+    service.models = {"flash": "gemini-2.5-flash", "reasoning": "gemini-2.5-pro"}
+    service.context_cache = None
+    service.policy = UpstreamPolicy(min_samples=5)
+    service.search_timeout = 10.0
+    service.reasoning_latency_estimate = 0.5
+    service.downgrades = 0
+    return service
+
+
+def test_file_exporter_nests_spans(trace_file):
+    with tracing.span("outer", **{"a": 1, "skipped": None}) as outer:
+        with tracing.span("inner", models=["A", "B"]):
+            pass
+        outer.set_attribute("b", {"not": "scalar"})
+
+    spans = by_name(read_spans(trace_file))
+    assert spans["inner"]["parent_span_id"] == spans["outer"]["span_id"]
+    assert spans["inner"]["trace_id"] == spans["outer"]["trace_id"]
+    assert spans["outer"]["parent_span_id"] is None
+    assert spans["outer"]["attributes"] == {"a": 1, "b": "{'not': 'scalar'}"}
+    assert spans["inner"]["attributes"] == {"models": ["A", "B"]}
+    assert spans["outer"]["end_unix_ns"] >= spans["inner"]["end_unix_ns"]
+    assert spans["outer"]["status"] == "ok"
+
+
+def test_exception_marks_span_as_error(trace_file):
+    with pytest.raises(ValueError):
+        with tracing.span("failing"):
+            raise ValueError("boom")
+    with tracing.span("after"):
+        pass
+
+    spans = by_name(read_spans(trace_file))
+    assert spans["failing"]["status"] == "error"
+    assert spans["failing"]["error"] == "ValueError: boom"
+    # The failed span no longer counts as the current one
+    assert spans["after"]["parent_span_id"] is None
+
+
+def test_gathered_tasks_are_children(trace_file):
+    async def child(name):
+        with tracing.span(name):
+            await asyncio.sleep(0.001)
+
+    async def run():
+        with tracing.span("parent"):
+            await asyncio.gather(child("a"), child("b"))
+
+    asyncio.run(run())
+    spans = by_name(read_spans(trace_file))
+    assert spans["a"]["parent_span_id"] == spans["parent"]["span_id"]
+    assert spans["b"]["parent_span_id"] == spans["parent"]["span_id"]
+
+
+def test_noop_mode_records_nothing(tmp_path):
+    tracer = tracing.configure("none")
+    with tracing.span("ignored", a=1) as span:
+        span.set_attribute("b", 2)
+        assert tracing.current_span() is span
+    assert span is tracing.span("other")
+    assert tracer.get_stats() == {"exporter": "none", "enabled": False}
+    assert not list(tmp_path.iterdir())
+
+
+def test_unknown_exporter_rejected():
+    with pytest.raises(ValueError):
+        tracing.Tracer("zipkin")
+
+
+def test_thread_executor_spans_nest(trace_file):
+    def find_product(query, record_hit=True):
+        with tracing.span("catalog.find_product"):
+            return None
+
+    product_db = SimpleNamespace(find_product=find_product, data_dir="data")
+
+    async def run():
+        executor = CpuExecutor(product_db, kind="thread", max_workers=1)
+        try:
+            return await executor.run("find_product", "q", False)
+        finally:
+            executor.shutdown()
+
+    asyncio.run(run())
+    spans = by_name(read_spans(trace_file))
+    assert spans["catalog.find_product"]["parent_span_id"] == spans["cpu_executor.run"]["span_id"]
+    assert spans["cpu_executor.run"]["attributes"]["cpu_executor.method"] == "find_product"
+
+
+def test_pipeline_stage_spans(trace_file):
+    service = make_service()
+    product_db = SimpleNamespace(find_product=lambda query: None, catalog_version="test")
+    orchestrator = Orchestrator(product_db, service, PromptsManager(), enable_fast_path=False)
+
+    result = asyncio.run(orchestrator.process_query("what is the return policy?"))
+    spans = read_spans(trace_file)
+    named = by_name(spans)
+
+    root = named["orchestrator.process_query"]
+    assert {span["trace_id"] for span in spans} == {root["trace_id"]}
+    for stage in ("extraction", "retrieval", "synthesis", "formatting"):
+        assert named[f"orchestrator.{stage}"]["parent_span_id"] == root["span_id"]
+    assert named["orchestrator.search"]["parent_span_id"] == named["orchestrator.retrieval"]["span_id"]
+    assert named["gemini.file_search"]["parent_span_id"] == named["orchestrator.search"]["span_id"]
+    assert named["gemini.synthesis"]["parent_span_id"] == named["orchestrator.synthesis"]["span_id"]
+
+    synthesis = named["gemini.synthesis"]["attributes"]
+    assert synthesis["gen_ai.request.model"] == "gemini-2.5-flash"
+    assert synthesis["gen_ai.usage.input_tokens"] == 120
+    assert synthesis["gen_ai.usage.output_tokens"] == 30
+    assert synthesis["gemini.context_cache.hit"] is False
+    assert named["orchestrator.search"]["attributes"]["retrieval.served_by"] == "backend"
+
+    assert root["attributes"]["orchestrator.served_by"] == "two_call"
+    assert root["attributes"]["orchestrator.response_cache_hit"] is False
+    assert root["attributes"]["gen_ai.usage.input_tokens"] == result["usage"]["prompt_tokens"] == 240
+
+
+def test_response_cache_hit_recorded(trace_file):
+    service = make_service()
+    product_db = SimpleNamespace(find_product=lambda query: None, catalog_version="test")
+    orchestrator = Orchestrator(
+        product_db, service, PromptsManager(), enable_fast_path=False, response_cache=TTLCache(ttl_seconds=60)
+    )
+
+    asyncio.run(orchestrator.process_query("what is the return policy?"))
+    asyncio.run(orchestrator.process_query("what is the return policy?"))
+    roots = [span for span in read_spans(trace_file) if span["name"] == "orchestrator.process_query"]
+    assert roots[1]["attributes"]["orchestrator.served_by"] == "response_cache"
+    assert roots[1]["attributes"]["orchestrator.response_cache_hit"] is True
+    assert roots[1]["trace_id"] != roots[0]["trace_id"]
@@ -0,0 +1,123 @@
+"""Tests for token usage accounting: counts, cost estimates, request scopes and ledger rollups"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Get the server directory
+server_dir = Path(__file__).parent
+sys.path.insert(0, str(server_dir))
+
+from app.services import usage
+
+
+def metadata(prompt=1000, cached=0, output=100, thoughts=0):
+    return SimpleNamespace(
+        prompt_token_count=prompt,
+        cached_content_token_count=cached,
+        candidates_token_count=output,
+        thoughts_token_count=thoughts,
+        total_token_count=None
+    )
+
+
+def test_counts_and_cost():
+    counts = usage.usage_counts(metadata(prompt=1_000_000, cached=400_000, output=50_000, thoughts=50_000))
+    assert counts == {
+        "prompt_tokens": 1_000_000,
+        "cached_tokens": 400_000,
+        "output_tokens": 100_000,
+        "total_tokens": 1_100_000
+    }
+    # 600k uncached * 0.30 + 400k cached * 0.03 + 100k output * 2.50 (per 1M)
+    assert usage.estimate_cost("gemini-2.5-flash", counts) == pytest.approx(0.18 + 0.012 + 0.25)
+    assert usage.estimate_cost("unknown-model", counts) == 0.0
+
+
+def test_scope_collects_calls_of_one_request(monkeypatch):
+    monkeypatch.setattr(usage, "usage_ledger", usage.UsageLedger())
+    with usage.track("agent-1") as scope:
+        scope.prompt_variant = "troubleshooting"
+        usage.record_call("file_search", "gemini-2.5-flash", "flash", metadata())
+        usage.record_call("synthesis", "gemini-2.5-flash", "flash", metadata())
+        usage.record_call("synthesis", "gemini-2.5-flash", "flash", None)
+    usage.record_call("synthesis", "gemini-2.5-pro", "reasoning", metadata())
+
+    summary = scope.summary()
+    assert summary["calls"] == 2 and summary["prompt_tokens"] == 2000
+    assert [call["stage"] for call in summary["by_stage"]] == ["file_search", "synthesis"]
+
+    stats = usage.usage_ledger.get_stats()
+    assert stats["totals"]["calls"] == 3
+    assert stats["by_agent"]["agent-1"]["calls"] == 2
+    assert stats["by_agent"]["none"]["calls"] == 1
+    assert stats["by_prompt_variant"]["troubleshooting"]["calls"] == 2
+
+
+def test_agent_rollup_is_bounded():
+    ledger = usage.UsageLedger(max_agents=3)
+    record = {"stage": "synthesis", "model": "gemini-2.5-flash", **usage.usage_counts(metadata()), "cost_usd": 0.001}
+    for i in range(10):
+        ledger.record({**record, "agent": f"agent-{i}"})
+    ledger.record({**record, "agent": "agent-0"})
+
+    by_agent = ledger.get_stats()["by_agent"]
+    assert set(by_agent) == {"agent-0", "agent-1", "agent-2", "other"}
+    assert by_agent["agent-0"]["calls"] == 2  # Known agents keep their own bucket
+    assert by_agent["other"]["calls"] == 7
+    assert sum(totals["calls"] for totals in by_agent.values()) == ledger.totals["calls"] == 11
+
+
+def test_flush_appends_records(tmp_path):
+    ledger = usage.UsageLedger(log_path=str(tmp_path / "usage.jsonl"))
+    ledger.record({"stage": "synthesis", "model": "m", "agent": "a", **usage.usage_counts(metadata()), "cost_usd": 0.0})
+    assert asyncio.run(ledger.flush()) == 1
+    assert asyncio.run(ledger.flush()) == 0
+    assert len((tmp_path / "usage.jsonl").read_text().splitlines()) == 1
+
+
+def test_flush_failures_keep_a_bounded_backlog(tmp_path):
+    # A directory as the log path makes every write fail with an OSError
+    ledger = usage.UsageLedger(log_path=str(tmp_path), max_pending=3)
+    record = {"stage": "synthesis", "model": "m", "agent": "a", **usage.usage_counts(metadata()), "cost_usd": 0.0}
+    for i in range(5):
+        ledger.record({**record, "index": i})
+    assert asyncio.run(ledger.flush()) == 0
+    ledger.record({**record, "index": 5})
+
+    assert [r["index"] for r in ledger.pending] == [3, 4, 5]
+    log = ledger.get_stats()["log"]
+    assert log["pending"] == 3 and log["dropped"] == 3 and log["flush_errors"] == 1
+    assert ledger.totals["calls"] == 6  # Rollups still count every call
+
+
+def test_file_search_usage_is_attributed_to_prompt_variant(monkeypatch):
+    from app.core.orchestrator import Orchestrator
+    from app.core.prompts import PromptsManager
+
+    monkeypatch.setattr(usage, "usage_ledger", usage.UsageLedger())
+
+    async def search(query, model_filter=None, max_results=5, deadline=None):
+        usage.record_call("file_search", "gemini-2.5-flash", "flash", metadata())
+        return []
+
+    async def generate_response(query, context, mode, system_prompt, deadline):
+        usage.record_call("synthesis", "gemini-2.5-flash", "flash", metadata())
+        return {"response": "ok", "sources": [], "model_used": "gemini-2.5-flash"}
+
+    orchestrator = Orchestrator(
+        SimpleNamespace(find_product=lambda query: None, catalog_version="test"),
+        SimpleNamespace(generate_response=generate_response),
+        PromptsManager(),
+        retriever=SimpleNamespace(name="local", search=search),
+        enable_fast_path=False
+    )
+    result = asyncio.run(orchestrator.process_query("my faucet is leaking"))
+
+    assert [call["stage"] for call in result["usage"]["by_stage"]] == ["file_search", "synthesis"]
+    by_variant = usage.usage_ledger.get_stats()["by_prompt_variant"]
+    assert list(by_variant) == ["troubleshooting"]
+    assert by_variant["troubleshooting"]["calls"] == 2